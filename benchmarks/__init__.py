@@ -0,0 +1 @@
+"""Benchmarks for openapi_diagram, run them with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,119 @@
+"""Benchmark ``convert_3_dot_1_to_3_dot_0`` on generated specs with many schemas.
+
+Usage::
+
+    python -m benchmarks.convert_3_dot_1_to_3_dot_0 --schemas 10000 --schemas 50000
+
+The conversion runs in linear time, so the time per schema should stay constant when the
+number of schemas grows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+from typing import Any
+
+from openapi_diagram.utils import convert_3_dot_1_to_3_dot_0
+
+
+def generate_spec(schema_count: int, depth: int = 5) -> dict[str, Any]:
+    """Generate an openapi 3.1 spec with ``schema_count`` schemas using 3.1 only keywords.
+
+    Parameters
+    ----------
+    schema_count : int
+        Number of component schemas.
+    depth : int
+        Nesting depth of array items per schema. Defaults to 5
+
+    Returns
+    -------
+    dict[str, Any]
+    """
+    schemas: dict[str, Any] = {}
+    for index in range(schema_count):
+        items: dict[str, Any] = {"type": ["string", "null"], "examples": ["a", "b"]}
+        for _ in range(depth):
+            items = {"type": "array", "items": items}
+        schemas[f"Schema{index}"] = {
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer", "exclusiveMinimum": 0},
+                "kind": {"const": "item"},
+                "parent": {
+                    "anyOf": [
+                        {"$ref": f"#/components/schemas/Schema{index // 2}"},
+                        {"type": "null"},
+                    ]
+                },
+                "values": items,
+            },
+        }
+    paths = {
+        f"/items{index}": {
+            "get": {
+                "operationId": f"getItem{index}",
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": f"#/components/schemas/Schema{index}"}
+                            }
+                        },
+                    }
+                },
+            }
+        }
+        for index in range(0, schema_count, 10)
+    }
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Benchmark", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+
+def benchmark(schema_count: int, repeat: int) -> float:
+    """Best wall time in seconds of converting a spec with ``schema_count`` schemas.
+
+    Parameters
+    ----------
+    schema_count : int
+        Number of component schemas.
+    repeat : int
+        Number of runs.
+
+    Returns
+    -------
+    float
+    """
+    spec = generate_spec(schema_count)
+    durations = []
+    for _ in range(repeat):
+        spec_copy = copy.deepcopy(spec)
+        start = time.perf_counter()
+        convert_3_dot_1_to_3_dot_0(spec_copy)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main() -> None:
+    """Run the benchmark for each ``--schemas`` value and print the timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schemas", type=int, action="append", help="Number of schemas.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per size.")
+    args = parser.parse_args()
+    for schema_count in args.schemas or [1_000, 10_000, 50_000]:
+        duration = benchmark(schema_count, args.repeat)
+        print(  # noqa: T201
+            f"{schema_count:>7} schemas: {duration:8.3f}s "
+            f"({duration / schema_count * 1e6:6.1f}µs per schema)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark loading and writing large specs with each available JSON and YAML backend.
+
+Usage::
+
+    python -m benchmarks.spec_loading --schemas 10000
+
+The generated spec is written as JSON and YAML, then parsed (and serialized again for JSON,
+as ``openapi_3_dot_1_compat`` does) with every backend in
+``openapi_diagram.serialization``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from functools import partial
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING
+
+import yaml
+
+from benchmarks.convert_3_dot_1_to_3_dot_0 import generate_spec
+from openapi_diagram.serialization import JSON_BACKEND_ENV_VAR
+from openapi_diagram.serialization import JSON_BACKENDS
+from openapi_diagram.serialization import YAML_BACKEND_ENV_VAR
+from openapi_diagram.serialization import YAML_BACKENDS
+from openapi_diagram.serialization import dumps_json
+from openapi_diagram.utils import load_openapi_spec
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _best_of(repeat: int, function: Callable[[], object]) -> float:
+    """Best wall time in seconds of calling ``function`` ``repeat`` times.
+
+    Parameters
+    ----------
+    repeat : int
+        Number of runs.
+    function : Callable[[], object]
+        Function to time.
+
+    Returns
+    -------
+    float
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main() -> None:
+    """Run the benchmark for each ``--schemas`` value and print the timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schemas", type=int, action="append", help="Number of schemas.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per backend.")
+    args = parser.parse_args()
+    with TemporaryDirectory() as tmp_dir:
+        for schema_count in args.schemas or [1_000, 10_000]:
+            spec = generate_spec(schema_count)
+            json_file = Path(tmp_dir) / "openapi_spec.json"
+            yaml_file = Path(tmp_dir) / "openapi_spec.yaml"
+            json_file.write_text(json.dumps(spec))
+            yaml_file.write_text(yaml.safe_dump(spec))
+            print(  # noqa: T201
+                f"{schema_count} schemas ({json_file.stat().st_size / 1e6:.1f}MB JSON, "
+                f"{yaml_file.stat().st_size / 1e6:.1f}MB YAML):"
+            )
+            for name in JSON_BACKENDS:
+                os.environ[JSON_BACKEND_ENV_VAR] = name
+                load = _best_of(args.repeat, partial(load_openapi_spec, json_file))
+                dump = _best_of(args.repeat, partial(dumps_json, spec))
+                print(f"  json  {name:<8} load {load:7.3f}s  dump {dump:7.3f}s")  # noqa: T201
+            for name in YAML_BACKENDS:
+                os.environ[YAML_BACKEND_ENV_VAR] = name
+                load = _best_of(args.repeat, partial(load_openapi_spec, yaml_file))
+                print(f"  yaml  {name:<8} load {load:7.3f}s")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
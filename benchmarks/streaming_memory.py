@@ -0,0 +1,124 @@
+"""Benchmark peak memory of downgrading large openapi 3.1 JSON specs to 3.0.
+
+Usage::
+
+    python -m benchmarks.streaming_memory --schemas 50000 --schemas 200000 --render
+
+A generated spec is written to a file and downgraded once by parsing it completely
+(``dumps_openapi_3_dot_0_json``) and once as a stream (``stream_openapi_3_dot_0_json``).
+Peak memory is measured with ``tracemalloc``. It grows with the spec size when the spec is
+parsed completely, and stays at about the size of the largest path item or schema when
+the spec is streamed.
+
+With ``--render`` the spec is also rendered by ``run_openapi_to_plantuml`` with a render
+cache, like the ``create`` command and the server do, which needs java. Only the memory of
+the python process is traced, the JVM runs in a subprocess.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING
+
+from benchmarks.convert_3_dot_1_to_3_dot_0 import generate_spec
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
+from openapi_diagram.render_cache import RenderCache
+from openapi_diagram.serialization import dumps_json
+from openapi_diagram.utils import dumps_openapi_3_dot_0_json
+from openapi_diagram.utils import load_openapi_spec
+from openapi_diagram.utils import stream_openapi_3_dot_0_json
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _in_memory(spec_file: Path, output_file: Path) -> None:
+    """Downgrade ``spec_file`` by parsing it completely.
+
+    Parameters
+    ----------
+    spec_file : Path
+        OpenAPI 3.1 JSON spec file.
+    output_file : Path
+        File to write the OpenAPI 3.0 JSON spec to.
+    """
+    output_file.write_bytes(dumps_openapi_3_dot_0_json(load_openapi_spec(spec_file)))
+
+
+def _render(spec_file: Path, output_file: Path) -> None:
+    """Render ``spec_file`` with an empty render cache.
+
+    Parameters
+    ----------
+    spec_file : Path
+        OpenAPI 3.1 JSON spec file.
+    output_file : Path
+        File the diagram is written next to.
+    """
+    with TemporaryDirectory() as cache_dir:
+        run_openapi_to_plantuml(
+            spec_file,
+            output_file.with_suffix(".puml"),
+            "single",
+            "puml",
+            render_cache=RenderCache(Path(cache_dir)),
+        )
+
+
+def _peak_memory(function: Callable[[], object]) -> tuple[float, int]:
+    """Wall time in seconds and peak traced memory in bytes of calling ``function``.
+
+    Parameters
+    ----------
+    function : Callable[[], object]
+        Function to measure.
+
+    Returns
+    -------
+    tuple[float, int]
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        function()
+        duration = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return duration, peak
+
+
+def main() -> None:
+    """Run the benchmark for each ``--schemas`` value and print time and peak memory."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schemas", type=int, action="append", help="Number of schemas.")
+    parser.add_argument("--render", action="store_true", help="Also render the spec.")
+    args = parser.parse_args()
+    functions: list[tuple[str, Callable[[Path, Path], object]]] = [
+        ("in-memory", _in_memory),
+        ("streaming", stream_openapi_3_dot_0_json),
+    ]
+    if args.render is True:
+        functions.append(("render", _render))
+    with TemporaryDirectory() as tmp_dir:
+        spec_file = Path(tmp_dir) / "openapi_spec.json"
+        output_file = Path(tmp_dir) / "openapi_spec_3_0.json"
+        for schema_count in args.schemas or [10_000, 50_000, 200_000]:
+            spec_file.write_bytes(dumps_json(generate_spec(schema_count)))
+            size = spec_file.stat().st_size
+            print(f"{schema_count} schemas ({size / 1e6:.1f}MB JSON):")  # noqa: T201
+            for name, function in functions:
+                duration, peak = _peak_memory(partial(function, spec_file, output_file))
+                print(  # noqa: T201
+                    f"  {name:<9} {duration:7.2f}s  peak {peak / 1e6:8.1f}MB "
+                    f"({peak / size:5.2f}x spec size)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ CACHE_DIR = Path(user_cache_dir("openapi-diagram", ensure_exists=True))
 
 OPENAPI_TO_PLANTUML_DEFAULT_VERSION = "0.1.28"
 SUPPORTED_SPEC_FILE_FORMATS = (".json", ".yaml", ".yml")
+SUPPORTED_ARCHIVE_FILE_FORMATS = (".zip",)
 
 __author__ = """Sebastian Weigand"""
 __email__ = "s.weigand.phy@gmail.com"
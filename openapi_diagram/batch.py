@@ -0,0 +1,306 @@
+"""Run many ``openapi-to-plantuml`` conversions in a single JVM session."""
+
+from __future__ import annotations
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+from pydantic import TypeAdapter
+
+from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram import SUPPORTED_SPEC_FILE_FORMATS
+from openapi_diagram.bundle import SpecParseCache
+from openapi_diagram.filters import OperationFilter  # noqa: TCH001
+from openapi_diagram.jvm_worker import JvmWorkerPool
+from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
+from openapi_diagram.serialization import loads_json
+from openapi_diagram.serialization import loads_yaml
+from openapi_diagram.utils import UnsopportFileTypeError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from openapi_diagram.render_cache import RenderCache
+
+GLOB_MAGIC = re.compile(r"[*?[]")
+
+
+class BatchJob(BaseModel):
+    """Single conversion of a batch, same arguments as ``run_openapi_to_plantuml``."""
+
+    openapi_spec: Path
+    output_path: Path
+    mode: OpenapiToPlantumlModes
+    diagram_format: OpenapiToPlantumlFormats
+    prune_unused: bool = False
+    operation_filter: OperationFilter | None = None
+
+
+class BatchResult(BaseModel):
+    """Outcome of a :class:`BatchJob`."""
+
+    job: BatchJob
+    files: list[Path] = []
+    error: str | None = None
+    duration: float = 0
+    """Wall time of the job in seconds."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the job finished without an error."""
+        return self.error is None
+
+
+def load_batch_manifest(manifest: Path) -> list[BatchJob]:
+    """Load batch jobs from a JSON or YAML manifest file.
+
+    The manifest is a list of objects with the keys ``openapi_spec``, ``output_path``, ``mode``,
+    ``diagram_format`` and optionally ``prune_unused`` and ``operation_filter``. Relative paths
+    are resolved relative to the manifest file.
+
+    Parameters
+    ----------
+    manifest : Path
+        Path to the manifest file.
+
+    Returns
+    -------
+    list[BatchJob]
+
+    Raises
+    ------
+    UnsopportFileTypeError
+        If the manifest file format is not supported.
+    """
+    if manifest.suffix == ".json":
+        manifest_data = loads_json(manifest.read_bytes())
+    elif manifest.suffix in (".yaml", ".yml"):
+        manifest_data = loads_yaml(manifest.read_bytes())
+    else:
+        msg = f"File type: *{manifest.suffix} is not supported."
+        raise UnsopportFileTypeError(msg)
+    jobs = TypeAdapter(list[BatchJob]).validate_python(manifest_data)
+    return [
+        job.model_copy(
+            update={
+                "openapi_spec": manifest.parent / job.openapi_spec,
+                "output_path": manifest.parent / job.output_path,
+            }
+        )
+        for job in jobs
+    ]
+
+
+def discover_spec_files(spec_location: Path) -> tuple[Path, list[Path]]:
+    """Find spec files by file path, folder (searched recursively) or glob pattern.
+
+    Only files with an extension in ``SUPPORTED_SPEC_FILE_FORMATS`` are returned.
+
+    Parameters
+    ----------
+    spec_location : Path
+        Spec file, folder or glob pattern (e.g. ``specs/**/*.yaml``).
+
+    Returns
+    -------
+    tuple[Path, list[Path]]
+        Root folder the spec files are relative to and the sorted spec files.
+    """
+    if spec_location.is_file():
+        return spec_location.parent, [spec_location]
+    if spec_location.is_dir():
+        root = spec_location
+        candidates = root.rglob("*")
+    else:
+        parts = spec_location.parts
+        magic_index = next(
+            (index for index, part in enumerate(parts) if GLOB_MAGIC.search(part) is not None),
+            None,
+        )
+        if magic_index is None:
+            return spec_location.parent, []
+        root = Path(*parts[:magic_index])
+        candidates = root.glob(Path(*parts[magic_index:]).as_posix())
+    spec_files = sorted(
+        candidate
+        for candidate in candidates
+        if candidate.suffix in SUPPORTED_SPEC_FILE_FORMATS and candidate.is_file()
+    )
+    return root, spec_files
+
+
+def spec_tree_jobs(
+    spec_root: Path,
+    spec_files: Iterable[Path],
+    output_dir: Path,
+    mode: OpenapiToPlantumlModes,
+    diagram_format: OpenapiToPlantumlFormats,
+    *,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+) -> list[BatchJob]:
+    """Create jobs which mirror the folder structure of the spec files into ``output_dir``.
+
+    For ``mode='single'`` ``specs/a/api.yaml`` is rendered to ``output_dir/a/api.<format>``
+    and for ``mode='split'`` to the folder ``output_dir/a/api/``.
+
+    Parameters
+    ----------
+    spec_root : Path
+        Folder the spec files are relative to.
+    spec_files : Iterable[Path]
+        Spec files inside of ``spec_root``.
+    output_dir : Path
+        Folder to mirror the spec tree into.
+    mode : OpenapiToPlantumlModes
+        Mode to run
+    diagram_format : OpenapiToPlantumlFormats
+        Format the diagram/-s should be in.
+    prune_unused : bool
+        Whether to drop unused components before rendering. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render. Defaults to None
+
+    Returns
+    -------
+    list[BatchJob]
+
+    Raises
+    ------
+    ValueError
+        If two spec files (e.g. ``api.yaml`` and ``api.json``) would be rendered to the
+        same output path.
+    """
+    jobs = []
+    output_specs: dict[Path, Path] = {}
+    for spec_file in spec_files:
+        relative_output = output_dir / spec_file.relative_to(spec_root)
+        output_path = (
+            relative_output.with_suffix(f".{diagram_format}")
+            if mode == "single"
+            else relative_output.with_suffix("")
+        )
+        if output_path in output_specs:
+            msg = (
+                f"Spec files {output_specs[output_path].as_posix()!r} and "
+                f"{spec_file.as_posix()!r} would both be rendered to "
+                f"{output_path.as_posix()!r}."
+            )
+            raise ValueError(msg)
+        output_specs[output_path] = spec_file
+        jobs.append(
+            BatchJob(
+                openapi_spec=spec_file,
+                output_path=output_path,
+                mode=mode,
+                diagram_format=diagram_format,
+                prune_unused=prune_unused,
+                operation_filter=operation_filter,
+            )
+        )
+    return jobs
+
+
+def _run_job(
+    job: BatchJob,
+    version: str,
+    worker_pool: JvmWorkerPool,
+    render_cache: RenderCache | None,
+    parse_cache: SpecParseCache,
+) -> BatchResult:
+    """Run a single job and catch all errors.
+
+    Parameters
+    ----------
+    job : BatchJob
+        Conversion to run.
+    version : str
+        Version of ``openapi-to-plantuml`` to use.
+    worker_pool : JvmWorkerPool
+        Worker pool to run the job in.
+    render_cache : RenderCache | None
+        Cache for rendered diagrams.
+    parse_cache : SpecParseCache
+        Cache of parsed files referenced by the specs.
+
+    Returns
+    -------
+    BatchResult
+    """
+    start = time.perf_counter()
+    try:
+        files = run_openapi_to_plantuml(
+            job.openapi_spec,
+            job.output_path,
+            job.mode,
+            job.diagram_format,
+            version,
+            worker_pool=worker_pool,
+            render_cache=render_cache,
+            prune_unused=job.prune_unused,
+            operation_filter=job.operation_filter,
+            parse_cache=parse_cache,
+        )
+    # A broken spec must not abort the whole batch
+    except Exception as error:  # noqa: BLE001
+        return BatchResult(
+            job=job,
+            error=f"{type(error).__name__}: {error}",
+            duration=time.perf_counter() - start,
+        )
+    return BatchResult(job=job, files=files, duration=time.perf_counter() - start)
+
+
+def run_openapi_to_plantuml_batch(
+    jobs: Iterable[BatchJob],
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    worker_pool: JvmWorkerPool | None = None,
+    render_cache: RenderCache | None = None,
+    max_workers: int = 1,
+) -> list[BatchResult]:
+    """Run ``openapi-to-plantuml`` for multiple jobs reusing JVMs.
+
+    Failing jobs do not abort the batch, their error is reported in the corresponding result.
+    Files referenced by several specs via ``$ref`` are only parsed once per batch.
+
+    Parameters
+    ----------
+    jobs : Iterable[BatchJob]
+        Conversions to run.
+    version : str
+        Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    worker_pool : JvmWorkerPool | None
+        Worker pool to run the jobs in. Defaults to None which starts ``max_workers`` workers
+        that are stopped after the batch finished.
+    render_cache : RenderCache | None
+        Cache for rendered diagrams. Defaults to None which always renders.
+    max_workers : int
+        Number of jobs to run concurrently. Defaults to 1
+
+    Returns
+    -------
+    list[BatchResult]
+        Results in the same order as ``jobs``.
+    """
+    own_pool = worker_pool is None
+    pool = JvmWorkerPool(size=max_workers, version=version) if worker_pool is None else worker_pool
+    parse_cache = SpecParseCache()
+    try:
+        if max_workers == 1:
+            return [_run_job(job, version, pool, render_cache, parse_cache) for job in jobs]
+        # Threads are sufficient since the actual work happens in the JVM processes
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(
+                    lambda job: _run_job(job, version, pool, render_cache, parse_cache), jobs
+                )
+            )
+    finally:
+        if own_pool is True:
+            pool.close()
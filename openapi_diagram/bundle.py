@@ -0,0 +1,830 @@
+"""Bundle specs which are split over several files into a single spec.
+
+External ``$ref`` values (e.g. ``'schemas/pet.yaml'`` or
+``'common.yaml#/components/schemas/Error'``) are resolved relative to the file containing
+them, either on the local file system or inside of a zip archive. The referenced values are
+added to the ``components`` of the root spec and the ``$ref`` values are rewritten to local
+references, so ``openapi-to-plantuml`` only needs the bundled spec. Path items, which can not
+be components in OpenAPI 3.0, are inlined. References to remote URLs are kept as they are.
+
+Parsed files are memoized in a :class:`SpecParseCache`, which can be shared between bundles
+(e.g. of a batch) so files referenced by many specs are only parsed once.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import re
+import threading
+from copy import deepcopy
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import unquote
+from zipfile import BadZipFile
+from zipfile import ZipFile
+
+from openapi_diagram import SUPPORTED_SPEC_FILE_FORMATS
+from openapi_diagram.utils import DATA_KEYS
+from openapi_diagram.utils import parse_openapi_spec
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from openapi_diagram.utils import Json
+
+ARCHIVE_DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+"""Maximum uncompressed size of all files in a spec archive in bytes."""
+
+COMPONENT_SECTIONS = frozenset(
+    {
+        "schemas",
+        "responses",
+        "parameters",
+        "examples",
+        "requestBodies",
+        "headers",
+        "securitySchemes",
+        "links",
+        "callbacks",
+    }
+)
+
+# Matches ``$ref`` values which do not start with ``#`` in JSON and YAML content, a false
+# positive (e.g. in a description) only costs an unneeded bundling pass.
+_FILE_REF_PATTERN = re.compile(rb"""\$ref["']?[ \t]*:\s*(?:"(?!#)|'(?!#)|(?![\s"'#]))""")
+# Start of a match of ``_FILE_REF_PATTERN`` which may be cut off at the end of a chunk
+_PARTIAL_FILE_REF_PATTERN = re.compile(
+    rb"""\$(?:r(?:e(?:f(?:["']?[ \t]*(?::\s*["']?)?)?)?)?)?\Z"""
+)
+_REF_SCAN_SIZE = 1024**2
+_INVALID_COMPONENT_NAME_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+# Outside of schemas keys like ``default`` (response) or ``examples`` (map of example objects)
+# can contain references, only example values are plain data
+_OPENAPI_DATA_KEYS = frozenset({"example", "value"})
+
+
+class BundleError(ValueError):
+    """Error raised if a referenced file can not be resolved."""
+
+
+class SpecParseCache:
+    """Parsed spec files by content hash, shared between bundles.
+
+    Cached documents are never modified, bundles copy all values they use.
+    """
+
+    def __init__(self) -> None:
+        """Create empty cache."""
+        self._documents: dict[tuple[str, str], Json] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, name: str, content: bytes) -> Json:
+        """Parse ``content`` of the file ``name`` or get it from the cache.
+
+        Parameters
+        ----------
+        name : str
+            Name of the file, its suffix determines the format.
+        content : bytes
+            Content of the file.
+
+        Returns
+        -------
+        Json
+            Parsed document, which must not be modified.
+        """
+        suffix = posixpath.splitext(name)[1]
+        key = (suffix, sha256(content).hexdigest())
+        with self._lock:
+            if key in self._documents:
+                self.hits += 1
+                return self._documents[key]
+        document = parse_openapi_spec(content, suffix)
+        with self._lock:
+            self.misses += 1
+            return self._documents.setdefault(key, document)
+
+
+def references_spec_files(content: bytes | Path) -> bool:
+    """Check if the content of a spec file may contain ``$ref`` values to other files.
+
+    This only scans the raw content, which is much cheaper than parsing it. Files are scanned
+    in chunks, so large specs are not read into memory at once.
+
+    Parameters
+    ----------
+    content : bytes | Path
+        Content of a JSON or YAML spec file or the file itself.
+
+    Returns
+    -------
+    bool
+    """
+    if isinstance(content, bytes):
+        return _FILE_REF_PATTERN.search(content) is not None
+    tail = b""
+    with content.open("rb") as spec_file:
+        while chunk := spec_file.read(_REF_SCAN_SIZE):
+            data = tail + chunk
+            match = _FILE_REF_PATTERN.search(data)
+            # Matches at the end depend on the start of the next chunk
+            if match is not None and match.end() < len(data):
+                return True
+            partial = _PARTIAL_FILE_REF_PATTERN.search(data)
+            # A single space matches wherever a run of whitespace does, which bounds the tail
+            tail = b"" if partial is None else re.sub(rb"\s+", b" ", partial.group())
+    return _FILE_REF_PATTERN.search(tail) is not None
+
+
+def _split_ref(ref: str) -> tuple[str, str]:
+    """Split ``ref`` into the (URL decoded) file path and the JSON pointer.
+
+    Parameters
+    ----------
+    ref : str
+        Value of a ``$ref``.
+
+    Returns
+    -------
+    tuple[str, str]
+        File path (empty for local references) and JSON pointer without ``#``.
+    """
+    file_path, _, pointer = ref.partition("#")
+    return unquote(file_path), pointer
+
+
+def local_file_references(data: Json) -> set[str]:
+    """Paths of all ``$ref`` values pointing to other local files.
+
+    Parameters
+    ----------
+    data : Json
+        Parsed spec or referenced file.
+
+    Returns
+    -------
+    set[str]
+        Referenced file paths, without JSON pointer.
+    """
+    references = set()
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            ref = item.get("$ref")
+            if isinstance(ref, str) and not ref.startswith("#") and "://" not in ref:
+                references.add(ref.split("#", 1)[0])
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return references
+
+
+def _resolve_pointer(document: Json, pointer: str, file_key: str) -> Json:
+    """Resolve JSON ``pointer`` (e.g. ``'/components/schemas/Pet'``) inside of ``document``.
+
+    Parameters
+    ----------
+    document : Json
+        Parsed file.
+    pointer : str
+        JSON pointer, an empty pointer is the whole document.
+    file_key : str
+        Name of the file for error messages.
+
+    Returns
+    -------
+    Json
+
+    Raises
+    ------
+    BundleError
+        If the pointer can not be resolved.
+    """
+    value = document
+    for part in pointer.split("/")[1:] if pointer else []:
+        key = part.replace("~1", "/").replace("~0", "~")
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            msg = f"Can not resolve '#{pointer}' in {file_key!r}."
+            raise BundleError(msg)
+    return value
+
+
+class _FileSource:
+    """Referenced files on the local file system, keyed by their absolute path."""
+
+    local_url_schemes: tuple[str, ...] = ()
+
+    def key(self, base_key: str, file_path: str) -> str:
+        """Key of a file referenced from the file ``base_key``.
+
+        Parameters
+        ----------
+        base_key : str
+            Key of the referencing file.
+        file_path : str
+            Referenced path, relative to the referencing file.
+
+        Returns
+        -------
+        str
+            Absolute path of the referenced file.
+        """
+        return str((Path(base_key).parent / file_path).resolve())
+
+    def read(self, file_key: str) -> bytes:
+        """Read the content of a file.
+
+        Parameters
+        ----------
+        file_key : str
+            Key of the file.
+
+        Returns
+        -------
+        bytes
+
+        Raises
+        ------
+        BundleError
+            If the file does not exist.
+        """
+        path = Path(file_key)
+        if path.is_file() is False:
+            msg = f"Referenced file {file_key!r} does not exist."
+            raise BundleError(msg)
+        return path.read_bytes()
+
+
+class _ArchiveSource:
+    """Referenced files inside of an archive, keyed by their normalized posix path."""
+
+    local_url_schemes: tuple[str, ...] = ()
+
+    def __init__(self, files: Mapping[str, bytes]) -> None:
+        """Create source of the files of an archive.
+
+        Parameters
+        ----------
+        files : Mapping[str, bytes]
+            File contents by their normalized posix path inside of the archive.
+        """
+        self.files = files
+
+    def key(self, base_key: str, file_path: str) -> str:
+        """Key of a file referenced from the file ``base_key``.
+
+        Parameters
+        ----------
+        base_key : str
+            Key of the referencing file.
+        file_path : str
+            Referenced path, relative to the referencing file.
+
+        Returns
+        -------
+        str
+            Normalized posix path of the referenced file inside of the archive.
+
+        Raises
+        ------
+        BundleError
+            If the referenced file is outside of the archive.
+        """
+        key = posixpath.normpath(posixpath.join(posixpath.dirname(base_key), file_path))
+        if posixpath.isabs(file_path) or key == ".." or key.startswith("../"):
+            msg = f"Referenced file {file_path!r} is outside of the archive."
+            raise BundleError(msg)
+        return key
+
+    def read(self, file_key: str) -> bytes:
+        """Get the content of a file.
+
+        Parameters
+        ----------
+        file_key : str
+            Key of the file.
+
+        Returns
+        -------
+        bytes
+
+        Raises
+        ------
+        BundleError
+            If the file does not exist in the archive.
+        """
+        if file_key not in self.files:
+            msg = f"Referenced file {file_key!r} does not exist in the archive."
+            raise BundleError(msg)
+        return self.files[file_key]
+
+
+class _NoFileSource:
+    """No referenced files, for specs without a location (e.g. uploaded ones)."""
+
+    local_url_schemes = ("file:",)
+    """URL schemes of references which are resolved like files instead of being kept."""
+
+    def key(self, base_key: str, file_path: str) -> str:  # noqa: ARG002
+        """Reject every reference to another file.
+
+        Parameters
+        ----------
+        base_key : str
+            Key of the referencing file.
+        file_path : str
+            Referenced path.
+
+        Returns
+        -------
+        str
+
+        Raises
+        ------
+        BundleError
+            Always.
+        """
+        msg = (
+            f"Referenced file {file_path!r} can not be resolved, references to other files are "
+            "only resolved inside of zip archives containing the spec and the files it "
+            "references."
+        )
+        raise BundleError(msg)
+
+    def read(self, file_key: str) -> bytes:
+        """Reject reading any file.
+
+        Parameters
+        ----------
+        file_key : str
+            Key of the file.
+
+        Returns
+        -------
+        bytes
+
+        Raises
+        ------
+        BundleError
+            Always.
+        """
+        msg = f"Referenced file {file_key!r} can not be read."
+        raise BundleError(msg)
+
+
+class _Bundler:
+    """Copy the root spec while moving externally referenced values into its components."""
+
+    def __init__(
+        self,
+        source: _FileSource | _ArchiveSource | _NoFileSource,
+        parse_cache: SpecParseCache,
+        root_key: str,
+        root: dict[str, Json],
+    ) -> None:
+        """Create bundler of a single root spec.
+
+        Parameters
+        ----------
+        source : _FileSource | _ArchiveSource | _NoFileSource
+            Files the spec references.
+        parse_cache : SpecParseCache
+            Cache of parsed files.
+        root_key : str
+            Key of the root spec in ``source``.
+        root : dict[str, Json]
+            Parsed root spec.
+        """
+        self.source = source
+        self.parse_cache = parse_cache
+        self.root_key = root_key
+        self.root = root
+        components = root.get("components")
+        self.taken_names = {
+            section: set(names)
+            for section, names in (components.items() if isinstance(components, dict) else [])
+            if isinstance(names, dict)
+        }
+        self.added_components: dict[str, dict[str, Json]] = {}
+        self.local_refs: dict[tuple[str, str], str] = {}
+        self.inlining: set[tuple[str, str]] = set()
+
+    def document(self, file_key: str) -> Json:
+        """Get the parsed content of a file.
+
+        Parameters
+        ----------
+        file_key : str
+            Key of the file.
+
+        Returns
+        -------
+        Json
+            Parsed document, which must not be modified.
+        """
+        if file_key == self.root_key:
+            return self.root
+        return self.parse_cache.parse(file_key, self.source.read(file_key))
+
+    def bundle(self) -> dict[str, Json]:
+        """Copy of the root spec with all referenced values of other files in its components.
+
+        Returns
+        -------
+        dict[str, Json]
+        """
+        bundled: dict[str, Json] = self.copy(self.root, self.root_key, None, None, in_schema=False)  # type:ignore[assignment]
+        if len(self.added_components) > 0:
+            components = dict(bundled.get("components") or {})  # type:ignore[arg-type]
+            for section, added in self.added_components.items():
+                components[section] = {**(components.get(section) or {}), **added}  # type:ignore[dict-item]
+            bundled["components"] = components
+        return bundled
+
+    def copy(
+        self,
+        value: Json,
+        file_key: str,
+        key: str | int | None,
+        container_key: str | int | None,
+        *,
+        in_schema: bool,
+    ) -> Json:
+        """Copy ``value`` with all its references rewritten to the bundled spec.
+
+        Parameters
+        ----------
+        value : Json
+            Value to copy.
+        file_key : str
+            Key of the file containing ``value``.
+        key : str | int | None
+            Key or index of ``value`` in its parent.
+        container_key : str | int | None
+            Key of the parent of ``value``.
+        in_schema : bool
+            Whether ``value`` is part of a schema.
+
+        Returns
+        -------
+        Json
+        """
+        if isinstance(value, list):
+            return [
+                self.copy(item, file_key, index, key, in_schema=in_schema)
+                for index, item in enumerate(value)
+            ]
+        if not isinstance(value, dict):
+            return value
+        in_schema = in_schema or key == "schema" or container_key == "schemas"
+        ref = value.get("$ref")
+        if isinstance(ref, str):
+            target = self.rewrite_ref(ref, file_key, key, container_key, in_schema=in_schema)
+            if not isinstance(target, str):
+                return target
+            value = {**value, "$ref": target}
+        copied: dict[str, Json] = {}
+        for child_key, child in value.items():
+            if child_key == "$ref" and isinstance(child, str):
+                copied[child_key] = child
+            elif child_key in (DATA_KEYS if in_schema is True else _OPENAPI_DATA_KEYS):
+                copied[child_key] = deepcopy(child)
+            else:
+                copied[child_key] = self.copy(child, file_key, child_key, key, in_schema=in_schema)
+        return copied
+
+    def rewrite_ref(
+        self,
+        ref: str,
+        file_key: str,
+        key: str | int | None,
+        container_key: str | int | None,
+        *,
+        in_schema: bool,
+    ) -> Json:
+        """Rewrite a reference to the bundled spec, adding the referenced value if needed.
+
+        Parameters
+        ----------
+        ref : str
+            Value of the ``$ref``.
+        file_key : str
+            Key of the file containing the reference.
+        key : str | int | None
+            Key or index of the referencing object.
+        container_key : str | int | None
+            Key of the parent of the referencing object.
+        in_schema : bool
+            Whether the referencing object is part of a schema.
+
+        Returns
+        -------
+        Json
+            Rewritten reference or the inlined value of references to path items.
+
+        Raises
+        ------
+        BundleError
+            If a path item references itself.
+        """
+        if "://" in ref and not ref.lower().startswith(self.source.local_url_schemes):
+            return ref
+        file_path, pointer = _split_ref(ref)
+        target_key = file_key if file_path == "" else self.source.key(file_key, file_path)
+        if target_key == self.root_key:
+            return f"#{pointer}"
+        section = _component_section(pointer, key, container_key, in_schema=in_schema)
+        if section is None:
+            # Path items can not be components in OpenAPI 3.0
+            if (target_key, pointer) in self.inlining:
+                msg = f"Circular reference to path item {ref!r} in {file_key!r}."
+                raise BundleError(msg)
+            self.inlining.add((target_key, pointer))
+            target = _resolve_pointer(self.document(target_key), pointer, target_key)
+            inlined = self.copy(target, target_key, key, container_key, in_schema=False)
+            self.inlining.discard((target_key, pointer))
+            return inlined
+        if (target_key, pointer) in self.local_refs:
+            return self.local_refs[(target_key, pointer)]
+        target = _resolve_pointer(self.document(target_key), pointer, target_key)
+        name = self.unique_name(section, _component_name(target_key, pointer))
+        local_ref = f"#/components/{section}/{name}"
+        # Registered before copying the target so recursive references terminate
+        self.local_refs[(target_key, pointer)] = local_ref
+        self.added_components.setdefault(section, {})[name] = self.copy(
+            target, target_key, name, section, in_schema=section == "schemas"
+        )
+        return local_ref
+
+    def unique_name(self, section: str, name: str) -> str:
+        """Reserve a name in a components section, adding a numeric suffix if it is taken.
+
+        Parameters
+        ----------
+        section : str
+            Components section (e.g. ``'schemas'``).
+        name : str
+            Preferred name.
+
+        Returns
+        -------
+        str
+        """
+        taken = self.taken_names.setdefault(section, set())
+        unique_name = name
+        index = 2
+        while unique_name in taken:
+            unique_name = f"{name}_{index}"
+            index += 1
+        taken.add(unique_name)
+        return unique_name
+
+
+def _component_section(
+    pointer: str, key: str | int | None, container_key: str | int | None, *, in_schema: bool
+) -> str | None:
+    """Components section an externally referenced value is added to.
+
+    Parameters
+    ----------
+    pointer : str
+        JSON pointer of the referenced value.
+    key : str | int | None
+        Key or index of the referencing object.
+    container_key : str | int | None
+        Key of the object or list containing the referencing object.
+    in_schema : bool
+        Whether the referencing object is part of a schema.
+
+    Returns
+    -------
+    str | None
+        Section or None if the value is a path item, which has to be inlined.
+    """
+    parts = pointer.split("/")
+    if len(parts) == 4 and parts[1] == "components" and parts[2] in COMPONENT_SECTIONS:
+        return parts[2]
+    if in_schema is True:
+        return "schemas"
+    if key == "requestBody":
+        return "requestBodies"
+    if container_key == "paths":
+        return None
+    if isinstance(container_key, str) and container_key in COMPONENT_SECTIONS:
+        return container_key
+    return "schemas"
+
+
+def _component_name(file_key: str, pointer: str) -> str:
+    """Name of an externally referenced value in the components of the bundled spec.
+
+    Parameters
+    ----------
+    file_key : str
+        Referenced file.
+    pointer : str
+        JSON pointer of the referenced value.
+
+    Returns
+    -------
+    str
+        Last part of the pointer or the file name without suffix for whole files.
+    """
+    if pointer.strip("/"):
+        name = pointer.rsplit("/", 1)[1].replace("~1", "/").replace("~0", "~")
+    else:
+        name = posixpath.splitext(posixpath.basename(file_key.replace("\\", "/")))[0]
+    return _INVALID_COMPONENT_NAME_CHARS.sub("_", name) or "Component"
+
+
+def _bundle(
+    source: _FileSource | _ArchiveSource, root_key: str, parse_cache: SpecParseCache | None
+) -> dict[str, Json]:
+    """Bundle the spec ``root_key`` of ``source``.
+
+    Parameters
+    ----------
+    source : _FileSource | _ArchiveSource
+        Files of the spec.
+    root_key : str
+        Key of the root spec in ``source``.
+    parse_cache : SpecParseCache | None
+        Cache of parsed files.
+
+    Returns
+    -------
+    dict[str, Json]
+
+    Raises
+    ------
+    BundleError
+        If the root spec has no ``openapi`` key.
+    """
+    parse_cache = SpecParseCache() if parse_cache is None else parse_cache
+    root = parse_cache.parse(root_key, source.read(root_key))
+    if not isinstance(root, dict) or "openapi" not in root:
+        msg = f"{root_key!r} is not an OpenAPI spec, it has no 'openapi' key."
+        raise BundleError(msg)
+    return _Bundler(source, parse_cache, root_key, root).bundle()
+
+
+def check_self_contained(spec_data: dict[str, Json], name: str) -> None:
+    """Check that a spec does not reference other local files.
+
+    Specs without a location (e.g. uploaded to the REST API) must not be resolved against
+    the local file system, they need to be uploaded as zip archive together with the files
+    they reference instead. Values which are plain data (e.g. examples) are not checked,
+    like when bundling.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+    name : str
+        Name of the spec for error messages.
+
+    Raises
+    ------
+    BundleError
+        If the spec references other files, including ``file:`` URLs.
+    """
+    _Bundler(_NoFileSource(), SpecParseCache(), name, spec_data).bundle()
+
+
+def bundle_openapi_spec(
+    openapi_spec: Path, *, parse_cache: SpecParseCache | None = None
+) -> dict[str, Json]:
+    """Bundle a spec file and all local files it references into a single spec.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Root spec file (only JSON and YAML are supported).
+    parse_cache : SpecParseCache | None
+        Cache of parsed files, share it between bundles to parse common files only once.
+        Defaults to None which only memoizes files within this bundle.
+
+    Returns
+    -------
+    dict[str, Json]
+        Bundled spec, which does not share any values with ``parse_cache``.
+    """
+    return _bundle(_FileSource(), str(openapi_spec.resolve()), parse_cache)
+
+
+def read_spec_archive(
+    archive: bytes, max_size: int = ARCHIVE_DEFAULT_MAX_SIZE
+) -> dict[str, bytes]:
+    """Read all files of a zip archive into memory.
+
+    Parameters
+    ----------
+    archive : bytes
+        Content of the zip file.
+    max_size : int
+        Maximum uncompressed size of all files in bytes. Defaults to 64MiB
+
+    Returns
+    -------
+    dict[str, bytes]
+        File contents by their normalized posix path inside of the archive.
+
+    Raises
+    ------
+    BundleError
+        If the archive is invalid or too large.
+    """
+    try:
+        with ZipFile(BytesIO(archive)) as zip_file:
+            members = [
+                info
+                for info in zip_file.infolist()
+                if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+            ]
+            if sum(info.file_size for info in members) > max_size:
+                msg = f"Archive content exceeds {max_size} bytes."
+                raise BundleError(msg)
+            return {posixpath.normpath(info.filename): zip_file.read(info) for info in members}
+    except BadZipFile as error:
+        msg = f"Invalid zip archive: {error}"
+        raise BundleError(msg) from None
+
+
+def _archive_entry(files: Mapping[str, bytes], parse_cache: SpecParseCache) -> str:
+    """Find the only root spec (with an ``openapi`` key) in ``files``.
+
+    Parameters
+    ----------
+    files : Mapping[str, bytes]
+        Files of the archive.
+    parse_cache : SpecParseCache
+        Cache of parsed files.
+
+    Returns
+    -------
+    str
+        Path of the root spec inside of the archive.
+
+    Raises
+    ------
+    BundleError
+        If there is not exactly one root spec.
+    """
+    entries = [
+        name
+        for name in sorted(files)
+        if posixpath.splitext(name)[1] in SUPPORTED_SPEC_FILE_FORMATS
+        and isinstance(document := parse_cache.parse(name, files[name]), dict)
+        and "openapi" in document
+    ]
+    if len(entries) != 1:
+        msg = (
+            f"Expected one spec file with an 'openapi' key in the archive, found {entries}, "
+            "pass the entry file."
+        )
+        raise BundleError(msg)
+    return entries[0]
+
+
+def bundle_openapi_archive(
+    archive: bytes,
+    entry: str | None = None,
+    *,
+    parse_cache: SpecParseCache | None = None,
+    max_size: int = ARCHIVE_DEFAULT_MAX_SIZE,
+) -> dict[str, Json]:
+    """Bundle a spec uploaded as zip archive of the spec and the files it references.
+
+    References are resolved inside of the archive only.
+
+    Parameters
+    ----------
+    archive : bytes
+        Content of the zip file.
+    entry : str | None
+        Path of the root spec inside of the archive. Defaults to None which uses the only spec
+        file with an ``openapi`` key.
+    parse_cache : SpecParseCache | None
+        Cache of parsed files. Defaults to None which only memoizes files within this bundle.
+    max_size : int
+        Maximum uncompressed size of all files in bytes. Defaults to 64MiB
+
+    Returns
+    -------
+    dict[str, Json]
+        Bundled spec.
+    """
+    files = read_spec_archive(archive, max_size)
+    parse_cache = SpecParseCache() if parse_cache is None else parse_cache
+    source = _ArchiveSource(files)
+    root_key = _archive_entry(files, parse_cache) if entry is None else source.key("", entry)
+    return _bundle(source, root_key, parse_cache)
@@ -5,34 +5,176 @@ from __future__ import annotations
 from enum import StrEnum
 from pathlib import Path
 from typing import Annotated
+from typing import cast
 from typing import get_args
 
 import typer
 
+from openapi_diagram.filters import HTTP_METHODS
+from openapi_diagram.filters import HttpMethods
+from openapi_diagram.filters import OperationFilter
+from openapi_diagram.jvm_launch import JvmProfiles
 from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
 from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
+from openapi_diagram.sharding import ShardStrategies
 
 ModesEnum = StrEnum("ModesEnum", get_args(OpenapiToPlantumlModes))  # type:ignore[misc]
 FormatsEnum = StrEnum("Formats", get_args(OpenapiToPlantumlFormats))  # type:ignore[misc]
+JvmProfilesEnum = StrEnum("JvmProfilesEnum", get_args(JvmProfiles))  # type:ignore[misc]
+MethodsEnum = StrEnum("MethodsEnum", HTTP_METHODS)  # type:ignore[misc]
+ShardStrategiesEnum = StrEnum("ShardStrategiesEnum", get_args(ShardStrategies))  # type:ignore[misc]
 
-OpenapiSpec = Annotated[
-    Path,
-    typer.Option(exists=True, help="Spec file to use (only JSON and YAML) are supported."),
-]
+OPENAPI_SPEC_HELP = "Spec file to use (only JSON and YAML) are supported."
+OUTPUT_PATH_HELP = "File (``mode='single'``) or folder (``mode='split'``) to write the output to."
+MODE_HELP = (
+    "Mode to run openapi-to-plantuml in. "
+    "Where 'single' creates one diagram and 'split' creates a diagram per route."
+)
+DIAGRAM_FORMAT_HELP = "Format the diagram should be in."
+JVM_PROFILE_HELP = (
+    "JVM launch profile of one-shot java processes, 'short-lived' and 'low-memory' trade peak "
+    "throughput for faster startup and a smaller footprint."
+)
+PRUNE_UNUSED_HELP = (
+    "Drop components (e.g. schemas) which are not referenced from the paths before rendering, "
+    "which shrinks large shared component libraries to the used part."
+)
+
+OpenapiSpec = Annotated[Path, typer.Option(exists=True, help=OPENAPI_SPEC_HELP)]
+OutputPath = Annotated[Path, typer.Option(help=OUTPUT_PATH_HELP)]
+Mode = Annotated[ModesEnum, typer.Option(help=MODE_HELP)]
+DiagramFormat = Annotated[FormatsEnum, typer.Option(help=DIAGRAM_FORMAT_HELP)]
+JvmProfile = Annotated[JvmProfilesEnum, typer.Option(help=JVM_PROFILE_HELP)]
+PruneUnused = Annotated[bool, typer.Option(help=PRUNE_UNUSED_HELP)]
 
-OutputPath = Annotated[
-    Path,
+# Operation filters, only the selected operations and the components they reference are rendered
+FILTER_PANEL = "Operation filters"
+IncludeTags = Annotated[
+    list[str] | None,
+    typer.Option(
+        "--include-tag",
+        help="Only render operations with this tag. Repeatable.",
+        rich_help_panel=FILTER_PANEL,
+    ),
+]
+ExcludeTags = Annotated[
+    list[str] | None,
+    typer.Option(
+        "--exclude-tag",
+        help="Skip operations with this tag. Repeatable.",
+        rich_help_panel=FILTER_PANEL,
+    ),
+]
+IncludePaths = Annotated[
+    list[str] | None,
     typer.Option(
-        help="File (``mode='single'``) or folder (``mode='split'``) to write the output to.",
+        "--include-path",
+        help="Only render operations whose path matches this glob (e.g. '/pets/*'). Repeatable.",
+        rich_help_panel=FILTER_PANEL,
     ),
 ]
-Mode = Annotated[
-    ModesEnum,
+ExcludePaths = Annotated[
+    list[str] | None,
     typer.Option(
-        help=(
-            "Mode to run openapi-to-plantuml in. "
-            "Where 'single' creates one diagram and 'split' creates a diagram per route."
-        )
+        "--exclude-path",
+        help="Skip operations whose path matches this glob. Repeatable.",
+        rich_help_panel=FILTER_PANEL,
     ),
 ]
-DiagramFormat = Annotated[FormatsEnum, typer.Option(help="Format the diagram should be in.")]
+IncludeOperationIds = Annotated[
+    list[str] | None,
+    typer.Option(
+        "--include-operation-id",
+        help="Only render the operation with this operationId. Repeatable.",
+        rich_help_panel=FILTER_PANEL,
+    ),
+]
+ExcludeOperationIds = Annotated[
+    list[str] | None,
+    typer.Option(
+        "--exclude-operation-id",
+        help="Skip the operation with this operationId. Repeatable.",
+        rich_help_panel=FILTER_PANEL,
+    ),
+]
+IncludeMethods = Annotated[
+    list[MethodsEnum] | None,
+    typer.Option(
+        "--include-method",
+        case_sensitive=False,
+        help="Only render operations with this HTTP method. Repeatable.",
+        rich_help_panel=FILTER_PANEL,
+    ),
+]
+ExcludeMethods = Annotated[
+    list[MethodsEnum] | None,
+    typer.Option(
+        "--exclude-method",
+        case_sensitive=False,
+        help="Skip operations with this HTTP method. Repeatable.",
+        rich_help_panel=FILTER_PANEL,
+    ),
+]
+
+# Variants for commands where the options can be replaced by other options (e.g. ``--batch``)
+OptionalOutputPath = Annotated[Path | None, typer.Option(help=OUTPUT_PATH_HELP)]
+OptionalModes = Annotated[
+    list[ModesEnum] | None,
+    typer.Option("--mode", help=f"{MODE_HELP} Repeat to render both modes."),
+]
+OptionalDiagramFormats = Annotated[
+    list[FormatsEnum] | None,
+    typer.Option(
+        "--diagram-format",
+        help=f"{DIAGRAM_FORMAT_HELP} Repeat to render multiple formats from one parse.",
+    ),
+]
+
+
+def build_operation_filter(
+    include_tag: list[str] | None = None,
+    exclude_tag: list[str] | None = None,
+    include_path: list[str] | None = None,
+    exclude_path: list[str] | None = None,
+    include_operation_id: list[str] | None = None,
+    exclude_operation_id: list[str] | None = None,
+    include_method: list[MethodsEnum] | None = None,
+    exclude_method: list[MethodsEnum] | None = None,
+) -> OperationFilter | None:
+    """Combine the operation filter options.
+
+    Parameters
+    ----------
+    include_tag : list[str] | None
+        Tags of the operations to render.
+    exclude_tag : list[str] | None
+        Tags of the operations to skip.
+    include_path : list[str] | None
+        Path globs of the operations to render.
+    exclude_path : list[str] | None
+        Path globs of the operations to skip.
+    include_operation_id : list[str] | None
+        ``operationId`` of the operations to render.
+    exclude_operation_id : list[str] | None
+        ``operationId`` of the operations to skip.
+    include_method : list[MethodsEnum] | None
+        HTTP methods of the operations to render.
+    exclude_method : list[MethodsEnum] | None
+        HTTP methods of the operations to skip.
+
+    Returns
+    -------
+    OperationFilter | None
+        None if no option was given.
+    """
+    operation_filter = OperationFilter(
+        include_tags=include_tag or [],
+        exclude_tags=exclude_tag or [],
+        include_paths=include_path or [],
+        exclude_paths=exclude_path or [],
+        include_operation_ids=include_operation_id or [],
+        exclude_operation_ids=exclude_operation_id or [],
+        include_methods=[cast(HttpMethods, method.value) for method in include_method or []],
+        exclude_methods=[cast(HttpMethods, method.value) for method in exclude_method or []],
+    )
+    return None if operation_filter.is_empty() else operation_filter
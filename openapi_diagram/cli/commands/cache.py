@@ -9,8 +9,14 @@ import typer
 
 from openapi_diagram import CACHE_DIR
 from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram.cli.commands import JvmProfilesEnum  # noqa: TCH001
+from openapi_diagram.jvm_launch import create_cds_archive
+from openapi_diagram.jvm_launch import get_cds_archive_path
+from openapi_diagram.jvm_launch import measure_startup
+from openapi_diagram.openapi_to_plantuml import _find_java_executable
 from openapi_diagram.openapi_to_plantuml import download_openapi_to_plantuml
 from openapi_diagram.openapi_to_plantuml import get_openapi_to_plantuml_path
+from openapi_diagram.render_cache import RenderCache
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -28,6 +34,28 @@ def _remove_cache_file(file_path: Path) -> None:
     """
     file_path.unlink()
     print(f"Removed {file_path.name!r} from cache.")  # noqa: T201
+    cds_archive = get_cds_archive_path(file_path)
+    if cds_archive.is_file() is True:
+        cds_archive.unlink()
+        print(f"Removed {cds_archive.name!r} from cache.")  # noqa: T201
+
+
+def _create_cds_archive(jar_path: Path) -> None:
+    """Create CDS archive for ``jar_path``, only warning if that is not possible.
+
+    Parameters
+    ----------
+    jar_path : Path
+        Path to the cached jar.
+    """
+    print(f"Creating CDS archive for {jar_path.name!r} to speed up JVM startup.")  # noqa: T201
+    try:
+        cds_archive = create_cds_archive(_find_java_executable(), jar_path)
+    # The archive is an optimization, the jar works without it
+    except Exception as error:  # noqa: BLE001
+        print(f"WARNING: Could not create CDS archive: {error}")  # noqa: T201
+    else:
+        print(cds_archive.resolve().as_posix())  # noqa: T201
 
 
 @cache_app.command()
@@ -68,15 +96,82 @@ def get(
     version: Annotated[
         str, typer.Option(help="Version to download.")
     ] = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    cds: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help=(
+                "Create an AppCDS archive next to the jar (requires Java 13+), which is used "
+                "automatically to speed up JVM startup."
+            )
+        ),
+    ] = True,
 ):
     """Download openapi-to-plantuml *.jar file into cache."""
     cached_file = get_openapi_to_plantuml_path(version)
     if cached_file.is_file() is True:
         print(f"openapi-to-plantuml version {version!r} is already in cache.")  # noqa: T201
         print(cached_file.resolve().as_posix())  # noqa: T201
-        raise typer.Exit(0)
-    print(f"Downloading openapi-to-plantuml version {version!r}.")  # noqa: T201
-    cached_file = download_openapi_to_plantuml(version)
-    print(f"Added openapi-to-plantuml version {version!r} to cache.")  # noqa: T201
-    print(cached_file.resolve().as_posix())  # noqa: T201
+    else:
+        print(f"Downloading openapi-to-plantuml version {version!r}.")  # noqa: T201
+        cached_file = download_openapi_to_plantuml(version)
+        print(f"Added openapi-to-plantuml version {version!r} to cache.")  # noqa: T201
+        print(cached_file.resolve().as_posix())  # noqa: T201
+    if cds is True and get_cds_archive_path(cached_file).is_file() is False:
+        _create_cds_archive(cached_file)
+    raise typer.Exit(0)
+
+
+@cache_app.command()
+def measure_startup_time(
+    version: Annotated[
+        str, typer.Option(help="Cached version to measure.")
+    ] = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    profile: Annotated[
+        list[JvmProfilesEnum] | None,
+        typer.Option(help="Launch profile to measure, repeat for multiple. Defaults to all."),
+    ] = None,
+    repeat: Annotated[int, typer.Option(min=1, help="Number of runs per profile.")] = 3,
+):
+    """Measure JVM startup and conversion time of a small spec per launch profile."""
+    cached_file = get_openapi_to_plantuml_path(version)
+    if cached_file.is_file() is False:
+        msg = f"Nothing cached for version {version!r}."
+        raise FileNotFoundError(msg)
+    profiles = None if not profile else [item.value for item in profile]
+    measurements = measure_startup(
+        _find_java_executable(),
+        cached_file,
+        profiles,  # type:ignore[arg-type]
+        repeat=repeat,
+    )
+    print(f"{'profile':<12} {'cds':<4} {'median':>8} {'min':>8} {'max':>8}")  # noqa: T201
+    for measurement in measurements:
+        print(  # noqa: T201
+            f"{measurement.profile:<12} {'yes' if measurement.cds else 'no':<4} "
+            f"{measurement.median:7.3f}s {min(measurement.durations):7.3f}s "
+            f"{max(measurement.durations):7.3f}s"
+        )
+    raise typer.Exit(0)
+
+
+@cache_app.command()
+def show_renders():
+    """Show cached rendered diagrams, least recently used first."""
+    render_cache = RenderCache()
+    entries = render_cache.entries()
+    for entry in entries:
+        print(f"{entry.key}  {entry.size / 1024:.1f} KiB")  # noqa: T201
+    total_size = sum(entry.size for entry in entries)
+    print(  # noqa: T201
+        f"{len(entries)} cached render(s) using {total_size / 1024**2:.1f} MiB "
+        f"of {render_cache.max_size / 1024**2:.1f} MiB in {render_cache.cache_dir.as_posix()}"
+    )
+    raise typer.Exit(0)
+
+
+@cache_app.command()
+def clear_renders():
+    """Remove all cached rendered diagrams."""
+    removed = RenderCache().clear()
+    print(f"Removed {len(removed)} cached render(s).")  # noqa: T201
     raise typer.Exit(0)
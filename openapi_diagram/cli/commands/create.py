@@ -2,31 +2,577 @@
 
 from __future__ import annotations
 
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path  # noqa: TCH003
+from typing import TYPE_CHECKING
 from typing import Annotated
 
 import typer
+from pydantic import ValidationError
 
 from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
-from openapi_diagram.cli.commands import DiagramFormat  # noqa: TCH001
-from openapi_diagram.cli.commands import Mode  # noqa: TCH001
-from openapi_diagram.cli.commands import OpenapiSpec  # noqa: TCH001
-from openapi_diagram.cli.commands import OutputPath  # noqa: TCH001
-from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
+from openapi_diagram.batch import discover_spec_files
+from openapi_diagram.batch import load_batch_manifest
+from openapi_diagram.batch import run_openapi_to_plantuml_batch
+from openapi_diagram.batch import spec_tree_jobs
+from openapi_diagram.cli.commands import OPENAPI_SPEC_HELP
+from openapi_diagram.cli.commands import ExcludeMethods
+from openapi_diagram.cli.commands import ExcludeOperationIds
+from openapi_diagram.cli.commands import ExcludePaths
+from openapi_diagram.cli.commands import ExcludeTags
+from openapi_diagram.cli.commands import IncludeMethods
+from openapi_diagram.cli.commands import IncludeOperationIds
+from openapi_diagram.cli.commands import IncludePaths
+from openapi_diagram.cli.commands import IncludeTags
+from openapi_diagram.cli.commands import JvmProfile
+from openapi_diagram.cli.commands import OptionalDiagramFormats
+from openapi_diagram.cli.commands import OptionalModes
+from openapi_diagram.cli.commands import OptionalOutputPath
+from openapi_diagram.cli.commands import PruneUnused
+from openapi_diagram.cli.commands import ShardStrategiesEnum
+from openapi_diagram.cli.commands import build_operation_filter
+from openapi_diagram.incremental import run_openapi_to_plantuml_incremental
+from openapi_diagram.jvm_worker import JvmWorkerPool
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml_multi
+from openapi_diagram.process_limits import ProcessLimitError
+from openapi_diagram.process_limits import ProcessLimits
+from openapi_diagram.render_cache import RenderCache
+from openapi_diagram.sharding import ShardRenderError
+from openapi_diagram.sharding import run_openapi_to_plantuml_sharded
+from openapi_diagram.watch import watch_openapi_spec
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from openapi_diagram.batch import BatchJob
+    from openapi_diagram.filters import OperationFilter
+    from openapi_diagram.incremental import IncrementalRenderResult
+    from openapi_diagram.jvm_launch import JvmProfiles
+
+_JVM_OPTIONS = "'--jvm-profile', '--timeout', '--max-heap', '--cpu-time' and '--max-output-size'"
+
+
+def _run_batch(
+    jobs: list[BatchJob], version: str, render_cache: RenderCache | None, max_workers: int
+) -> None:
+    """Run batch jobs and print a line with timing per job and a summary.
+
+    Parameters
+    ----------
+    jobs : list[BatchJob]
+        Conversions to run.
+    version : str
+        Version of ``openapi-to-plantuml`` to use.
+    render_cache : RenderCache | None
+        Cache for rendered diagrams.
+    max_workers : int
+        Number of jobs to run concurrently.
+
+    Raises
+    ------
+    Exit
+        With exit code 1 if any job failed.
+    """
+    start = time.perf_counter()
+    results = run_openapi_to_plantuml_batch(
+        jobs, version, render_cache=render_cache, max_workers=max_workers
+    )
+    for result in results:
+        spec = result.job.openapi_spec.as_posix()
+        if result.ok is True:
+            print(f"OK     {result.duration:7.2f}s  {spec}")  # noqa: T201
+        else:
+            print(f"FAILED {result.duration:7.2f}s  {spec}: {result.error}")  # noqa: T201
+    failed = sum(result.ok is False for result in results)
+    print(  # noqa: T201
+        f"{len(results) - failed} succeeded, {failed} failed in "
+        f"{time.perf_counter() - start:.2f}s using {max_workers} job(s)."
+    )
+    raise typer.Exit(1 if failed > 0 else 0)
+
+
+def _tree_jobs(
+    openapi_spec: Path,
+    output_path: Path,
+    modes: list[str],
+    diagram_formats: list[str],
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+) -> list[BatchJob]:
+    """Jobs mirroring the spec files of a folder or glob pattern into ``output_path``.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Folder or glob pattern of the spec files.
+    output_path : Path
+        Folder to mirror the spec tree into.
+    modes : list[str]
+        Modes to run
+    diagram_formats : list[str]
+        Formats the diagram/-s should be in.
+    prune_unused : bool
+        Whether to drop unused components before rendering.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
+
+    Returns
+    -------
+    list[BatchJob]
+
+    Raises
+    ------
+    BadParameter
+        If no spec files are found or two spec files would be rendered to the same output.
+    """
+    spec_root, spec_files = discover_spec_files(openapi_spec)
+    if len(spec_files) == 0:
+        msg = f"No spec files found for {openapi_spec.as_posix()!r}."
+        raise typer.BadParameter(msg, param_hint="'--openapi-spec'")
+    try:
+        return [
+            job
+            for tree_mode in modes
+            for tree_format in diagram_formats
+            for job in spec_tree_jobs(
+                spec_root,
+                spec_files,
+                output_path,
+                tree_mode,  # type:ignore[arg-type]
+                tree_format,  # type:ignore[arg-type]
+                prune_unused=prune_unused,
+                operation_filter=operation_filter,
+            )
+        ]
+    except ValueError as error:
+        raise typer.BadParameter(str(error), param_hint="'--openapi-spec'") from None
+
+
+def _incremental_summary(result: IncrementalRenderResult) -> str:
+    """Summary line of an incremental render.
+
+    Parameters
+    ----------
+    result : IncrementalRenderResult
+        Result of the incremental render.
+
+    Returns
+    -------
+    str
+    """
+    return (
+        f"Rendered {len(result.rendered)}, deleted {len(result.deleted)} and kept "
+        f"{len(result.files) - len(result.rendered)} diagram(s)."
+    )
+
+
+def _process_limits(
+    timeout: float | None, max_heap: str | None, cpu_time: int | None, max_output_size: int | None
+) -> ProcessLimits:
+    """Create process limits from the cli options.
+
+    Parameters
+    ----------
+    timeout : float | None
+        Wall-clock seconds the JVM may run.
+    max_heap : str | None
+        Maximum JVM heap size.
+    cpu_time : int | None
+        CPU seconds the JVM may use.
+    max_output_size : int | None
+        Bytes the JVM may write.
+
+    Returns
+    -------
+    ProcessLimits
+
+    Raises
+    ------
+    BadParameter
+        If a limit is invalid.
+    """
+    try:
+        return ProcessLimits(
+            timeout=timeout, max_heap=max_heap, cpu_time=cpu_time, max_output_size=max_output_size
+        )
+    except ValidationError as error:
+        details = error.errors()[0]
+        msg = f"Invalid value {details['input']!r}: {details['msg']}"
+        raise typer.BadParameter(msg, param_hint=f"'--{details['loc'][0]}'") from None
+
+
+@contextmanager
+def _exit_on_limit_error() -> Generator[None, None, None]:
+    """Report exceeded process limits as error message instead of a traceback.
+
+    Yields
+    ------
+    None
+
+    Raises
+    ------
+    Exit
+        With exit code 1 if a process limit was exceeded.
+    """
+    try:
+        yield
+    except ProcessLimitError as error:
+        print(f"ERROR: {error}", file=sys.stderr)  # noqa: T201
+        raise typer.Exit(1) from None
+
+
+def _validate_single_spec_options(
+    openapi_spec: Path,
+    modes: list[str],
+    diagram_formats: list[str],
+    *,
+    incremental: bool,
+    watch: bool,
+    shards: int,
+    jvm_options: bool,
+) -> None:
+    """Check the options which only work for a single spec file.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file, folder or glob pattern to render.
+    modes : list[str]
+        Modes to run
+    diagram_formats : list[str]
+        Formats the diagram/-s should be in.
+    incremental : bool
+        Whether to only re-render changed routes in split mode.
+    watch : bool
+        Whether to re-render on changes.
+    shards : int
+        Number of shards to split the spec into.
+    jvm_options : bool
+        Whether a JVM profile or limits of one-shot JVMs are given.
+
+    Raises
+    ------
+    BadParameter
+        If the options can not be combined.
+    """
+    if incremental is True and (modes != ["split"] or len(diagram_formats) != 1):
+        msg = "Incremental rendering requires '--mode split' and a single '--diagram-format'."
+        raise typer.BadParameter(msg, param_hint="'--incremental'")
+    if (incremental is True or watch is True or shards > 1) and openapi_spec.is_file() is False:
+        msg = "'--incremental', '--watch' and '--shards' require a single spec file."
+        raise typer.BadParameter(msg, param_hint="'--openapi-spec'")
+    if shards > 1 and (incremental is True or watch is True):
+        msg = "'--shards' can not be combined with '--incremental' or '--watch'."
+        raise typer.BadParameter(msg, param_hint="'--shards'")
+    if jvm_options is True and (shards > 1 or openapi_spec.is_file() is False):
+        msg = (
+            f"{_JVM_OPTIONS} only apply to one-shot JVMs, spec folders and '--shards' "
+            "are rendered in JVM workers."
+        )
+        raise typer.BadParameter(msg, param_hint="'--jvm-profile'")
+
+
+def _watch(
+    openapi_spec: Path,
+    output_path: Path,
+    modes: list[str],
+    diagram_formats: list[str],
+    version: str,
+    incremental: bool,
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+    jvm_profile: JvmProfiles,
+    limits: ProcessLimits,
+) -> None:
+    """Re-render on changes of the spec until interrupted, printing a line per iteration.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to watch.
+    output_path : Path
+        File or folder to write the output to.
+    modes : list[str]
+        Modes to run
+    diagram_formats : list[str]
+        Formats the diagram/-s should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use.
+    incremental : bool
+        Whether to only re-render changed routes in split mode.
+    prune_unused : bool
+        Whether to drop unused components before rendering.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
+    jvm_profile : JvmProfiles
+        Launch profile of one-shot JVMs, used if the warm worker fails.
+    limits : ProcessLimits
+        Resource limits of one-shot JVMs.
+
+    Raises
+    ------
+    Exit
+        With exit code 0 once interrupted.
+    """
+    # A single long-lived worker keeps the JVM warm between iterations
+    worker_pool = JvmWorkerPool(size=1, version=version)
+
+    def render() -> list[Path]:
+        if incremental is True:
+            result = run_openapi_to_plantuml_incremental(
+                openapi_spec,
+                output_path,
+                diagram_formats[0],  # type:ignore[arg-type]
+                version,
+                worker_pool=worker_pool,
+                jvm_profile=jvm_profile,
+                limits=limits,
+                prune_unused=prune_unused,
+                operation_filter=operation_filter,
+            )
+            return result.rendered
+        results = run_openapi_to_plantuml_multi(
+            openapi_spec,
+            output_path,
+            modes,  # type:ignore[arg-type]
+            diagram_formats,  # type:ignore[arg-type]
+            version,
+            worker_pool=worker_pool,
+            jvm_profile=jvm_profile,
+            limits=limits,
+            prune_unused=prune_unused,
+            operation_filter=operation_filter,
+        )
+        return [file for files in results.values() for file in files]
+
+    print(f"Watching {openapi_spec.as_posix()}, press Ctrl+C to stop.")  # noqa: T201
+    try:
+        for iteration in watch_openapi_spec(openapi_spec, render):
+            prefix = f"[{iteration.iteration}]"
+            if iteration.error is not None:
+                print(f"{prefix} FAILED after {iteration.duration:.2f}s: {iteration.error}")  # noqa: T201
+            elif iteration.rendered is True:
+                print(  # noqa: T201
+                    f"{prefix} Rendered {len(iteration.files)} file(s) in "
+                    f"{iteration.duration:.2f}s"
+                )
+            else:
+                print(f"{prefix} Content unchanged, skipped render.")  # noqa: T201
+    except KeyboardInterrupt:
+        raise typer.Exit(0) from None
+    finally:
+        worker_pool.close()
 
 
 def create(
-    openapi_spec: OpenapiSpec,
-    output_path: OutputPath,
-    mode: Mode,
-    diagram_format: DiagramFormat,
+    openapi_spec: Annotated[
+        Path | None,
+        typer.Option(
+            help=(
+                f"{OPENAPI_SPEC_HELP} Folders are searched recursively for spec files and glob "
+                "patterns (e.g. 'specs/**/*.yaml') are supported as well, in that case "
+                "'--output-path' is the folder the spec tree is mirrored into."
+            )
+        ),
+    ] = None,
+    output_path: OptionalOutputPath = None,
+    mode: OptionalModes = None,
+    diagram_format: OptionalDiagramFormats = None,
     version: Annotated[str, typer.Option()] = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    batch: Annotated[
+        Path | None,
+        typer.Option(
+            exists=True,
+            dir_okay=False,
+            help=(
+                "JSON or YAML manifest with a list of jobs (keys: 'openapi_spec', "
+                "'output_path', 'mode' and 'diagram_format') to run in a single JVM. "
+                "Replaces the other options."
+            ),
+        ),
+    ] = None,
+    use_render_cache: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            "--render-cache/--no-render-cache",
+            help="Reuse previously rendered diagrams of the same spec from the cache.",
+        ),
+    ] = True,
+    incremental: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help=(
+                "Only re-render routes of 'split' mode whose operation or referenced schemas "
+                "changed since the last run and delete diagrams of removed routes."
+            )
+        ),
+    ] = False,
+    watch: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help=(
+                "Keep running and re-render whenever the parsed content of the spec file or "
+                "locally referenced files changes, reusing a warm JVM."
+            )
+        ),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            min=1,
+            help="Number of specs or shards to render concurrently (folder, glob, batch and "
+            "sharded mode).",
+        ),
+    ] = os.cpu_count() or 1,
+    shards: Annotated[
+        int,
+        typer.Option(
+            min=1,
+            help=(
+                "Split a single large spec into up to this many self-contained parts which are "
+                "rendered in parallel. In 'split' mode the diagrams are merged, in 'single' "
+                "mode each part becomes a diagram listed in '<output-stem>.index.md'."
+            ),
+        ),
+    ] = 1,
+    shard_by: Annotated[
+        ShardStrategiesEnum,
+        typer.Option(help="Group operations into shards by their first tag or path segment."),
+    ] = "tag",  # type:ignore[assignment]
+    jvm_profile: JvmProfile = "default",  # type:ignore[assignment]
+    timeout: Annotated[
+        float | None,
+        typer.Option(help="Wall-clock seconds a one-shot JVM may run before it is killed."),
+    ] = None,
+    max_heap: Annotated[
+        str | None,
+        typer.Option(help="Maximum heap of one-shot JVMs in '-Xmx' notation (e.g. '512m')."),
+    ] = None,
+    cpu_time: Annotated[
+        int | None,
+        typer.Option(help="CPU seconds a one-shot JVM may use before it is killed (POSIX only)."),
+    ] = None,
+    max_output_size: Annotated[
+        int | None,
+        typer.Option(help="Bytes a one-shot JVM may write before it is killed."),
+    ] = None,
+    prune_unused: PruneUnused = False,  # noqa: FBT002
+    include_tag: IncludeTags = None,
+    exclude_tag: ExcludeTags = None,
+    include_path: IncludePaths = None,
+    exclude_path: ExcludePaths = None,
+    include_operation_id: IncludeOperationIds = None,
+    exclude_operation_id: ExcludeOperationIds = None,
+    include_method: IncludeMethods = None,
+    exclude_method: ExcludeMethods = None,
 ):
-    """Create diagram/-s from openapi spec file."""
-    run_openapi_to_plantuml(
+    """Create diagram/-s from openapi spec file/-s.
+
+    With multiple formats in 'single' mode the suffix of '--output-path' is replaced by each
+    format and with both modes '--output-path' is a folder containing 'single/' and 'split/'.
+    The operation filters select a subset of the API (e.g. '--include-tag pet') and imply
+    '--prune-unused'.
+    """
+    render_cache = RenderCache() if use_render_cache is True else None
+    limits = _process_limits(timeout, max_heap, cpu_time, max_output_size)
+    jvm_options = jvm_profile.value != "default" or limits != ProcessLimits()
+    if batch is not None:
+        if jvm_options is True:
+            msg = f"{_JVM_OPTIONS} only apply to one-shot JVMs, '--batch' renders in JVM workers."
+            raise typer.BadParameter(msg, param_hint="'--jvm-profile'")
+        _run_batch(load_batch_manifest(batch), version, render_cache, jobs)
+    if openapi_spec is None or output_path is None or not mode or not diagram_format:
+        msg = (
+            "Either '--batch' or all of '--openapi-spec', '--output-path', '--mode' "
+            "and '--diagram-format' are required."
+        )
+        raise typer.BadParameter(msg)
+    modes = [item.value for item in mode]
+    diagram_formats = [item.value for item in diagram_format]
+    _validate_single_spec_options(
         openapi_spec,
-        output_path,
-        mode.value,  # type:ignore[arg-type]
-        diagram_format.value,  # type:ignore[arg-type]
-        version,
+        modes,
+        diagram_formats,
+        incremental=incremental,
+        watch=watch,
+        shards=shards,
+        jvm_options=jvm_options,
+    )
+    operation_filter = build_operation_filter(
+        include_tag,
+        exclude_tag,
+        include_path,
+        exclude_path,
+        include_operation_id,
+        exclude_operation_id,
+        include_method,
+        exclude_method,
     )
+    if watch is True:
+        _watch(
+            openapi_spec,
+            output_path,
+            modes,
+            diagram_formats,
+            version,
+            incremental,
+            prune_unused,
+            operation_filter,
+            jvm_profile.value,  # type:ignore[arg-type]
+            limits,
+        )
+    if incremental is True:
+        with _exit_on_limit_error():
+            result = run_openapi_to_plantuml_incremental(
+                openapi_spec,
+                output_path,
+                diagram_formats[0],  # type:ignore[arg-type]
+                version,
+                jvm_profile=jvm_profile.value,  # type:ignore[arg-type]
+                limits=limits,
+                prune_unused=prune_unused,
+                operation_filter=operation_filter,
+            )
+        print(_incremental_summary(result))  # noqa: T201
+        raise typer.Exit(0)
+    if openapi_spec.is_file() is False:
+        tree_jobs = _tree_jobs(
+            openapi_spec, output_path, modes, diagram_formats, prune_unused, operation_filter
+        )
+        _run_batch(tree_jobs, version, render_cache, jobs)
+    if shards > 1:
+        try:
+            run_openapi_to_plantuml_sharded(
+                openapi_spec,
+                output_path,
+                modes,  # type:ignore[arg-type]
+                diagram_formats,  # type:ignore[arg-type]
+                version,
+                render_cache=render_cache,
+                shards=shards,
+                max_workers=jobs,
+                shard_by=shard_by.value,  # type:ignore[arg-type]
+                prune_unused=prune_unused,
+                operation_filter=operation_filter,
+            )
+        except ShardRenderError as error:
+            print(f"ERROR: {error}", file=sys.stderr)  # noqa: T201
+            raise typer.Exit(1) from None
+        raise typer.Exit(0)
+    with _exit_on_limit_error():
+        run_openapi_to_plantuml_multi(
+            openapi_spec,
+            output_path,
+            modes,  # type:ignore[arg-type]
+            diagram_formats,  # type:ignore[arg-type]
+            version,
+            render_cache=render_cache,
+            jvm_profile=jvm_profile.value,  # type:ignore[arg-type]
+            limits=limits,
+            prune_unused=prune_unused,
+            operation_filter=operation_filter,
+        )
     raise typer.Exit(0)
@@ -2,18 +2,41 @@
 
 from __future__ import annotations
 
+from enum import StrEnum
 from io import BytesIO
 from typing import Annotated
+from typing import cast
+from typing import get_args
 from zipfile import ZipFile
 
 import httpx
-import typer  # noqa: TCH002
+import typer
 
-from openapi_diagram.cli.commands import DiagramFormat  # noqa: TCH001
-from openapi_diagram.cli.commands import Mode  # noqa: TCH001
-from openapi_diagram.cli.commands import OpenapiSpec  # noqa: TCH001
-from openapi_diagram.cli.commands import OutputPath  # noqa: TCH001
-from openapi_diagram.server.models.request_models import CreateDiagram
+from openapi_diagram.bundle import bundle_openapi_spec
+from openapi_diagram.bundle import references_spec_files
+from openapi_diagram.cli.commands import DiagramFormat
+from openapi_diagram.cli.commands import ExcludeMethods
+from openapi_diagram.cli.commands import ExcludeOperationIds
+from openapi_diagram.cli.commands import ExcludePaths
+from openapi_diagram.cli.commands import ExcludeTags
+from openapi_diagram.cli.commands import IncludeMethods
+from openapi_diagram.cli.commands import IncludeOperationIds
+from openapi_diagram.cli.commands import IncludePaths
+from openapi_diagram.cli.commands import IncludeTags
+from openapi_diagram.cli.commands import Mode
+from openapi_diagram.cli.commands import OpenapiSpec
+from openapi_diagram.cli.commands import OutputPath
+from openapi_diagram.cli.commands import PruneUnused
+from openapi_diagram.cli.commands import build_operation_filter
+from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
+from openapi_diagram.serialization import dumps_json
+from openapi_diagram.server.models.request_models import UploadQuery
+from openapi_diagram.server.uploads import UnsupportedContentEncodingError
+from openapi_diagram.server.uploads import UploadCompressions
+from openapi_diagram.server.uploads import iter_compressed
+
+CompressionsEnum = StrEnum("CompressionsEnum", get_args(UploadCompressions))  # type:ignore[misc]
 
 
 def fetch(
@@ -22,25 +45,70 @@ def fetch(
     mode: Mode,
     diagram_format: DiagramFormat,
     base_url: Annotated[str, typer.Option(help="Base url of the openapi-diagram server.")],
+    compression: Annotated[
+        CompressionsEnum,
+        typer.Option(
+            help="Compression of the uploaded spec, 'zstd' needs 'openapi-diagram[zstd]'."
+        ),
+    ] = CompressionsEnum.gzip,  # type:ignore[attr-defined]
+    prune_unused: PruneUnused = False,  # noqa: FBT002
+    include_tag: IncludeTags = None,
+    exclude_tag: ExcludeTags = None,
+    include_path: IncludePaths = None,
+    exclude_path: ExcludePaths = None,
+    include_operation_id: IncludeOperationIds = None,
+    exclude_operation_id: ExcludeOperationIds = None,
+    include_method: IncludeMethods = None,
+    exclude_method: ExcludeMethods = None,
 ):
-    """Fetch diagram from openapi-diagram server."""
-    request_data = CreateDiagram(
-        file_name=openapi_spec,
-        file_content=openapi_spec.read_text(),
-        mode=mode.value,
-        diagram_format=diagram_format.value,
+    """Fetch diagram from openapi-diagram server.
+
+    The spec is uploaded as compressed request body, ``single`` mode diagrams are downloaded
+    as they are and ``split`` mode diagrams as zip file. Specs referencing other local files
+    are bundled into a single spec before the upload.
+    """
+    file_name = openapi_spec
+    file_content = openapi_spec.read_bytes()
+    if references_spec_files(file_content):
+        file_name = openapi_spec.with_suffix(".json")
+        file_content = dumps_json(bundle_openapi_spec(openapi_spec))
+    operation_filter = build_operation_filter(
+        include_tag,
+        exclude_tag,
+        include_path,
+        exclude_path,
+        include_operation_id,
+        exclude_operation_id,
+        include_method,
+        exclude_method,
     )
-    resp = httpx.post(
-        f"{base_url.rstrip('/')}/api/v1/create-diagrams",
-        json=request_data.model_dump(mode="json", by_alias=True),
+    query = UploadQuery(
+        file_name=file_name,
+        mode=[cast(OpenapiToPlantumlModes, mode.value)],
+        diagram_format=[cast(OpenapiToPlantumlFormats, diagram_format.value)],
+        prune_unused=prune_unused,
+        single_file=mode.value == "single",
+        **(operation_filter.model_dump() if operation_filter is not None else {}),
     )
+    try:
+        content = iter_compressed(file_content, cast(UploadCompressions, compression.value))
+        headers = {} if compression.value == "none" else {"Content-Encoding": compression.value}
+        resp = httpx.post(
+            f"{base_url.rstrip('/')}/api/v1/create-diagrams/upload",
+            params=query.model_dump(mode="json", by_alias=True, exclude_defaults=True),
+            content=content,
+            headers={"Content-Type": "application/octet-stream", **headers},
+        )
+    except UnsupportedContentEncodingError as error:
+        raise typer.BadParameter(str(error), param_hint="'--compression'") from None
+    if resp.is_error:
+        print(f"ERROR: Server responded with {resp.status_code}: {resp.text}")  # noqa: T201
+        raise typer.Exit(1)
 
-    with ZipFile(BytesIO(resp.content)) as zip_resp:
-        if mode.value == "single":
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            diagram_zip_info = zip_resp.filelist[0]
-            diagram_zip_info.filename = output_path.name
-            zip_resp.extract(diagram_zip_info, output_path.parent)
-        else:
-            output_path.mkdir(parents=True, exist_ok=True)
+    if mode.value == "single":
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(resp.content)
+    else:
+        output_path.mkdir(parents=True, exist_ok=True)
+        with ZipFile(BytesIO(resp.content)) as zip_resp:
             zip_resp.extractall(output_path)
@@ -0,0 +1,128 @@
+"""Select the operations of a spec to render by tag, path, ``operationId`` or HTTP method.
+
+Within one criterion an operation has to match any of the values (e.g. any of the tags) and
+all given include criteria have to match. Operations matching any exclude criterion are
+dropped. Path items without remaining operations are removed, the components the remaining
+operations do not reference are dropped by the ``prune_unused`` preprocessing stage, which
+is always applied together with a filter.
+"""
+
+from __future__ import annotations
+
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING
+from typing import Literal
+from typing import TypeAlias
+from typing import get_args
+
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic.alias_generators import to_camel
+
+if TYPE_CHECKING:
+    from openapi_diagram.utils import Json
+
+HttpMethods: TypeAlias = Literal[
+    "get", "put", "post", "delete", "options", "head", "patch", "trace"
+]
+HTTP_METHODS: tuple[HttpMethods, ...] = get_args(HttpMethods)
+
+
+class OperationFilter(BaseModel):
+    """Criteria selecting operations, empty criteria do not restrict the selection."""
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True, frozen=True)
+
+    include_tags: list[str] = []
+    exclude_tags: list[str] = []
+    include_paths: list[str] = []
+    """Glob patterns (e.g. ``'/pets/*'``) matched against the whole path, ``*`` matches ``/``."""
+    exclude_paths: list[str] = []
+    include_operation_ids: list[str] = []
+    exclude_operation_ids: list[str] = []
+    include_methods: list[HttpMethods] = []
+    exclude_methods: list[HttpMethods] = []
+
+    def is_empty(self) -> bool:
+        """Check if no criterion is set.
+
+        Returns
+        -------
+        bool
+        """
+        return not any(getattr(self, name) for name in type(self).model_fields)
+
+    def matches(self, path: str, method: str, operation: dict[str, Json]) -> bool:
+        """Check if an operation is selected.
+
+        Parameters
+        ----------
+        path : str
+            Path of the operation (e.g. ``'/pets/{petId}'``).
+        method : str
+            HTTP method of the operation.
+        operation : dict[str, Json]
+            Operation object.
+
+        Returns
+        -------
+        bool
+        """
+        tags = operation.get("tags")
+        tag_set: set[str] = (
+            {tag for tag in tags if isinstance(tag, str)} if isinstance(tags, list) else set()
+        )
+        operation_id = operation.get("operationId")
+        included = (
+            (len(self.include_tags) == 0 or not tag_set.isdisjoint(self.include_tags))
+            and (
+                len(self.include_paths) == 0
+                or any(fnmatchcase(path, pattern) for pattern in self.include_paths)
+            )
+            and (
+                len(self.include_operation_ids) == 0 or operation_id in self.include_operation_ids
+            )
+            and (len(self.include_methods) == 0 or method in self.include_methods)
+        )
+        excluded = (
+            not tag_set.isdisjoint(self.exclude_tags)
+            or any(fnmatchcase(path, pattern) for pattern in self.exclude_paths)
+            or operation_id in self.exclude_operation_ids
+            or method in self.exclude_methods
+        )
+        return included and not excluded
+
+
+def filter_operations(
+    spec_data: dict[str, Json], operation_filter: OperationFilter
+) -> dict[str, Json]:
+    """Copy of ``spec_data`` with only the operations selected by ``operation_filter``.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+    operation_filter : OperationFilter
+        Criteria selecting the operations.
+
+    Returns
+    -------
+    dict[str, Json]
+    """
+    paths: dict[str, Json] = {}
+    for path, path_item in (spec_data.get("paths") or {}).items():  # type:ignore[union-attr]
+        if not isinstance(path_item, dict):
+            continue
+        methods = []
+        for method in HTTP_METHODS:
+            operation = path_item.get(method)
+            if isinstance(operation, dict) and operation_filter.matches(path, method, operation):
+                methods.append(method)
+        if len(methods) == 0:
+            continue
+        paths[path] = {
+            key: value
+            for key, value in path_item.items()
+            if key not in HTTP_METHODS or key in methods
+        }
+    return {**spec_data, "paths": paths}
@@ -0,0 +1,317 @@
+"""Incremental ``split`` mode, which only re-renders operations that changed.
+
+Each operation is fingerprinted together with the path level fields (e.g. shared
+parameters) and all components it references transitively via ``$ref``. The fingerprints
+and the diagram files rendered for them are stored in :data:`MANIFEST_FILE_NAME` inside of
+the output folder. On the next run only operations with a changed fingerprint are rendered
+(from a spec reduced to those operations) and diagrams of removed operations are deleted.
+
+Diagram files are attributed to the operation whose ``operationId`` matches the file name.
+Files which can not be attributed (e.g. operations without ``operationId``) form a group
+with all operations rendered in the same run and are re-rendered together.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from hashlib import sha256
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+
+from pydantic import BaseModel
+from pydantic import ValidationError
+
+from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram.bundle import bundle_openapi_spec
+from openapi_diagram.bundle import references_spec_files
+from openapi_diagram.filters import HTTP_METHODS
+from openapi_diagram.filters import filter_operations
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
+from openapi_diagram.serialization import dumps_json
+from openapi_diagram.utils import load_openapi_spec
+from openapi_diagram.utils import referenced_components
+
+if TYPE_CHECKING:
+    from openapi_diagram.filters import OperationFilter
+    from openapi_diagram.jvm_launch import JvmProfiles
+    from openapi_diagram.jvm_worker import JvmWorkerPool
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+    from openapi_diagram.process_limits import ProcessLimits
+    from openapi_diagram.utils import Json
+
+MANIFEST_FILE_NAME = ".openapi-diagram-fingerprints.json"
+
+
+class RenderGroup(BaseModel):
+    """Operations rendered together and the diagram files created for them."""
+
+    operations: dict[str, str]
+    """Fingerprint by operation key (e.g. ``'get /pets/{petId}'``)."""
+    files: list[str]
+
+
+class IncrementalManifest(BaseModel):
+    """Fingerprints of the rendered operations stored next to the diagrams."""
+
+    diagram_format: str
+    version: str
+    groups: list[RenderGroup] = []
+
+
+class IncrementalRenderResult(NamedTuple):
+    """Outcome of :func:`run_openapi_to_plantuml_incremental`."""
+
+    files: list[Path]
+    """All diagram files of the spec."""
+    rendered: list[Path]
+    """Diagram files rendered in this run."""
+    deleted: list[Path]
+    """Diagram files of changed or removed operations which were deleted."""
+
+
+def operation_fingerprints(spec_data: dict[str, Json]) -> dict[str, str]:
+    """Fingerprint of each operation including everything its diagram depends on.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+
+    Returns
+    -------
+    dict[str, str]
+        Hex digest of the fingerprint by operation key (e.g. ``'get /pets/{petId}'``).
+    """
+    fingerprints = {}
+    paths = spec_data.get("paths") or {}
+    for path, path_item in paths.items():  # type:ignore[union-attr]
+        if not isinstance(path_item, dict):
+            continue
+        path_fields = {key: value for key, value in path_item.items() if key not in HTTP_METHODS}
+        for method in HTTP_METHODS:
+            if method not in path_item:
+                continue
+            dependencies = {"path": path_fields, "operation": path_item[method]}
+            dependencies["references"] = referenced_components(spec_data, dependencies)
+            canonical_json = json.dumps(
+                dependencies, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+            )
+            fingerprints[f"{method} {path}"] = sha256(canonical_json.encode()).hexdigest()
+    return fingerprints
+
+
+def _reduced_spec(spec_data: dict[str, Json], operation_keys: set[str]) -> dict[str, Json]:
+    """Copy of ``spec_data`` with only the operations in ``operation_keys``.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+    operation_keys : set[str]
+        Keys of the operations to keep.
+
+    Returns
+    -------
+    dict[str, Json]
+    """
+    paths: dict[str, Json] = {}
+    for path, path_item in (spec_data.get("paths") or {}).items():  # type:ignore[union-attr]
+        if not isinstance(path_item, dict):
+            continue
+        methods = [method for method in HTTP_METHODS if f"{method} {path}" in operation_keys]
+        if len(methods) == 0:
+            continue
+        paths[path] = {
+            key: value
+            for key, value in path_item.items()
+            if key not in HTTP_METHODS or key in methods
+        }
+    return {**spec_data, "paths": paths}
+
+
+def _operation_ids(spec_data: dict[str, Json], operation_keys: set[str]) -> dict[str, str]:
+    """Map ``operationId`` to operation key for operations in ``operation_keys``.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+    operation_keys : set[str]
+        Keys of the operations.
+
+    Returns
+    -------
+    dict[str, str]
+    """
+    operation_ids = {}
+    paths = spec_data.get("paths") or {}
+    for operation_key in operation_keys:
+        method, path = operation_key.split(" ", 1)
+        path_item = paths.get(path)  # type:ignore[union-attr]
+        if not isinstance(path_item, dict):
+            continue
+        operation = path_item.get(method)
+        if not isinstance(operation, dict):
+            continue
+        operation_id = operation.get("operationId")
+        if isinstance(operation_id, str):
+            operation_ids[operation_id] = operation_key
+    return operation_ids
+
+
+def _load_manifest(
+    output_path: Path, diagram_format: OpenapiToPlantumlFormats, version: str
+) -> IncrementalManifest:
+    """Load manifest of a previous run, starting from scratch if it does not match.
+
+    Parameters
+    ----------
+    output_path : Path
+        Output folder of the split diagrams.
+    diagram_format : OpenapiToPlantumlFormats
+        Format the diagrams should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use.
+
+    Returns
+    -------
+    IncrementalManifest
+    """
+    empty_manifest = IncrementalManifest(diagram_format=diagram_format, version=version)
+    manifest_file = output_path / MANIFEST_FILE_NAME
+    if manifest_file.is_file() is False:
+        return empty_manifest
+    try:
+        manifest = IncrementalManifest.model_validate_json(manifest_file.read_text())
+    except ValidationError:
+        return empty_manifest
+    if manifest.diagram_format != diagram_format or manifest.version != version:
+        return empty_manifest
+    return manifest
+
+
+def run_openapi_to_plantuml_incremental(
+    openapi_spec: Path,
+    output_path: Path,
+    diagram_format: OpenapiToPlantumlFormats,
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    worker_pool: JvmWorkerPool | None = None,
+    jvm_profile: JvmProfiles = "default",
+    limits: ProcessLimits | None = None,
+    *,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+) -> IncrementalRenderResult:
+    """Run ``openapi-to-plantuml`` in ``split`` mode, only rendering changed operations.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use (only JSON and YAML) are supported.
+    output_path : Path
+        Folder to write the output and fingerprints to.
+    diagram_format : OpenapiToPlantumlFormats
+        Format the diagrams should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    worker_pool : JvmWorkerPool | None
+        Pool of warm JVM workers to run the conversion in. Defaults to None
+    jvm_profile : JvmProfiles
+        Launch profile of one-shot JVMs, see ``JVM_LAUNCH_PROFILES``. Defaults to "default"
+    limits : ProcessLimits | None
+        Resource limits of one-shot JVMs. Defaults to None which sets no limits.
+    prune_unused : bool
+        Whether to drop components the rendered operations do not reference. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render, diagrams of operations which are no
+        longer selected are deleted. Defaults to None which renders all operations.
+
+    Returns
+    -------
+    IncrementalRenderResult
+    """
+    # Bundling makes changes of referenced files part of the operation fingerprints
+    spec_data = (
+        bundle_openapi_spec(openapi_spec)
+        if references_spec_files(openapi_spec)
+        else load_openapi_spec(openapi_spec)
+    )
+    if operation_filter is not None:
+        spec_data = filter_operations(spec_data, operation_filter)
+    fingerprints = operation_fingerprints(spec_data)
+    manifest = _load_manifest(output_path, diagram_format, version)
+
+    kept_groups = []
+    deleted = []
+    for group in manifest.groups:
+        group_files = [output_path / file_name for file_name in group.files]
+        unchanged = all(
+            fingerprints.get(operation_key) == fingerprint
+            for operation_key, fingerprint in group.operations.items()
+        )
+        if unchanged is True and all(file.is_file() for file in group_files):
+            kept_groups.append(group)
+            continue
+        for file in group_files:
+            if file.is_file():
+                file.unlink()
+                deleted.append(file)
+    kept_operations = {
+        operation_key for group in kept_groups for operation_key in group.operations
+    }
+    pending = set(fingerprints) - kept_operations
+
+    new_groups = []
+    rendered = []
+    output_path.mkdir(parents=True, exist_ok=True)
+    if len(pending) > 0:
+        with TemporaryDirectory(dir=output_path, prefix=".incremental-") as tmp_dir:
+            reduced_spec_file = Path(tmp_dir) / "openapi_spec.json"
+            reduced_spec_file.write_bytes(dumps_json(_reduced_spec(spec_data, pending)))
+            files = run_openapi_to_plantuml(
+                reduced_spec_file,
+                Path(tmp_dir) / "output",
+                "split",
+                diagram_format,
+                version,
+                worker_pool=worker_pool,
+                jvm_profile=jvm_profile,
+                limits=limits,
+                prune_unused=prune_unused,
+                operation_filter=operation_filter,
+            )
+            operation_ids = _operation_ids(spec_data, pending)
+            shared_files = []
+            for file in sorted(files):
+                operation_key = operation_ids.get(file.stem)
+                if operation_key is None:
+                    shared_files.append(file.name)
+                else:
+                    new_groups.append(
+                        RenderGroup(
+                            operations={operation_key: fingerprints[operation_key]},
+                            files=[file.name],
+                        )
+                    )
+                    pending.discard(operation_key)
+                shutil.move(file, output_path / file.name)
+                rendered.append(output_path / file.name)
+            if len(pending) > 0 or len(shared_files) > 0:
+                new_groups.append(
+                    RenderGroup(
+                        operations={key: fingerprints[key] for key in sorted(pending)},
+                        files=shared_files,
+                    )
+                )
+
+    manifest.groups = kept_groups + new_groups
+    (output_path / MANIFEST_FILE_NAME).write_text(manifest.model_dump_json(indent=2))
+    all_files = sorted(
+        output_path / file_name for group in manifest.groups for file_name in group.files
+    )
+    # Files of changed operations are deleted first and rendered again
+    deleted = [file for file in deleted if file not in rendered]
+    return IncrementalRenderResult(files=all_files, rendered=rendered, deleted=deleted)
@@ -0,0 +1,60 @@
+import java.io.BufferedReader;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.nio.charset.StandardCharsets;
+
+import com.github.davidmoten.oas3.puml.ConverterMain;
+
+/**
+ * Long-lived openapi-to-plantuml worker used by ``openapi_diagram.jvm_worker``.
+ *
+ * <p>Protocol (one UTF-8 line per message):
+ *
+ * <ul>
+ *   <li>On startup the worker writes {@code READY}.
+ *   <li>{@code PING} is answered with {@code PONG}.
+ *   <li>{@code MODE<TAB>SPEC_FILE<TAB>FORMAT<TAB>OUTPUT} runs the converter with the same
+ *       arguments as {@code java -jar openapi-to-plantuml.jar} and is answered with {@code OK}
+ *       or {@code ERR <message>}.
+ *   <li>{@code QUIT} or closing stdin stops the worker.
+ * </ul>
+ */
+public final class OpenapiDiagramWorker {
+
+    private OpenapiDiagramWorker() {
+        // prevent instantiation
+    }
+
+    public static void main(String[] args) throws Exception {
+        PrintStream protocol =
+                new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        // Anything the converter prints must not end up in the protocol stream.
+        System.setOut(System.err);
+        BufferedReader requests =
+                new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        protocol.println("READY");
+        String line;
+        while ((line = requests.readLine()) != null) {
+            if (line.equals("QUIT")) {
+                break;
+            }
+            if (line.equals("PING")) {
+                protocol.println("PONG");
+                continue;
+            }
+            String[] converterArgs = line.split("\t", -1);
+            if (converterArgs.length != 4) {
+                protocol.println("ERR Invalid request: " + line);
+                continue;
+            }
+            try {
+                ConverterMain.main(converterArgs);
+                protocol.println("OK");
+            } catch (Throwable e) {
+                protocol.println("ERR " + String.valueOf(e).replace('\r', ' ').replace('\n', ' '));
+            }
+        }
+    }
+}
@@ -0,0 +1,247 @@
+"""JVM launch options for one-shot ``openapi-to-plantuml`` processes.
+
+Startup of a one-shot ``java -jar`` process is dominated by class loading and JIT warmup.
+Two measures reduce it:
+
+* An AppCDS (application class data sharing) archive, created next to the cached jar by
+  ``openapi-diagram cache get`` and used automatically once it exists.
+* Launch profiles, sets of JVM flags tuned for a use case (e.g. ``short-lived`` processes
+  which only convert a single spec).
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Literal
+from typing import NamedTuple
+from typing import TypeAlias
+
+JvmProfiles: TypeAlias = Literal["default", "short-lived", "low-memory"]
+
+JVM_LAUNCH_PROFILES: dict[JvmProfiles, tuple[str, ...]] = {
+    "default": (),
+    # Single conversion per process, C1 only compiles fast enough and GC barely runs.
+    "short-lived": (
+        "-XX:+UseSerialGC",
+        "-XX:TieredStopAtLevel=1",
+        "-Xss512k",
+        "-Xmx1g",
+    ),
+    # Many concurrent processes on a small machine (e.g. the REST server in a container).
+    "low-memory": (
+        "-XX:+UseSerialGC",
+        "-XX:TieredStopAtLevel=1",
+        "-Xss256k",
+        "-Xmx256m",
+        "-XX:MaxMetaspaceSize=128m",
+    ),
+}
+"""JVM flags of the launch profiles."""
+
+CDS_TRAINING_SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "CDS training", "version": "1.0.0"},
+    "paths": {
+        "/pets/{petId}": {
+            "get": {
+                "operationId": "getPet",
+                "parameters": [
+                    {"name": "petId", "in": "path", "required": True, "schema": {"type": "string"}}
+                ],
+                "responses": {
+                    "200": {
+                        "description": "A pet",
+                        "content": {
+                            "application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "properties": {"id": {"type": "string"}, "tags": {"type": "array"}},
+            }
+        }
+    },
+}
+"""Small spec converted to record the loaded classes when creating the CDS archive."""
+
+
+class StartupMeasurement(NamedTuple):
+    """Startup time of a launch profile, see :func:`measure_startup`."""
+
+    profile: JvmProfiles
+    cds: bool
+    """Whether the CDS archive was used."""
+    durations: list[float]
+    """Wall time in seconds of each run."""
+
+    @property
+    def median(self) -> float:
+        """Median wall time in seconds."""
+        return statistics.median(self.durations)
+
+
+def get_cds_archive_path(jar_path: Path) -> Path:
+    """Get path of the CDS archive belonging to a cached ``openapi-to-plantuml`` jar.
+
+    Parameters
+    ----------
+    jar_path : Path
+        Path to the jar with dependencies.
+
+    Returns
+    -------
+    Path
+    """
+    return jar_path.with_suffix(".jsa")
+
+
+def jvm_options(
+    jar_path: Path, profile: JvmProfiles = "default", *, cds: bool = True
+) -> list[str]:
+    """JVM options for a one-shot ``java -jar`` run.
+
+    Parameters
+    ----------
+    jar_path : Path
+        Path to the jar with dependencies.
+    profile : JvmProfiles
+        Launch profile to use. Defaults to "default"
+    cds : bool
+        Whether to use the CDS archive if it exists. Defaults to True
+
+    Returns
+    -------
+    list[str]
+    """
+    options = list(JVM_LAUNCH_PROFILES[profile])
+    cds_archive = get_cds_archive_path(jar_path)
+    if cds is True and cds_archive.is_file() is True:
+        # '-Xshare:auto' (the default) silently ignores archives of other JVM versions
+        options.append(f"-XX:SharedArchiveFile={cds_archive.resolve().as_posix()}")
+    return options
+
+
+def _convert_training_spec(java_command: list[str], jar_path: Path) -> None:
+    """Convert :data:`CDS_TRAINING_SPEC` with ``java_command`` in ``split`` mode.
+
+    Parameters
+    ----------
+    java_command : list[str]
+        Java executable and JVM options.
+    jar_path : Path
+        Path to the jar with dependencies.
+    """
+    with TemporaryDirectory() as tmp_dir:
+        spec_file = Path(tmp_dir) / "openapi_spec.json"
+        spec_file.write_text(json.dumps(CDS_TRAINING_SPEC))
+        subprocess.run(
+            [
+                *java_command,
+                "-jar",
+                jar_path.resolve().as_posix(),
+                "split",
+                spec_file.as_posix(),
+                "SVG",
+                (Path(tmp_dir) / "output").as_posix(),
+            ],
+            check=True,
+            capture_output=True,
+        )
+
+
+def create_cds_archive(java_executable: Path, jar_path: Path) -> Path:
+    """Create AppCDS archive for ``jar_path`` by converting a small training spec.
+
+    Dynamic archives (``-XX:ArchiveClassesAtExit``) require Java 13 or newer.
+
+    Parameters
+    ----------
+    java_executable : Path
+        Path to the java executable the archive is created for.
+    jar_path : Path
+        Path to the jar with dependencies.
+
+    Returns
+    -------
+    Path
+        Path to the created archive.
+
+    Raises
+    ------
+    RuntimeError
+        If the JVM did not create the archive (e.g. because it is too old).
+    """
+    cds_archive = get_cds_archive_path(jar_path)
+    tmp_archive = cds_archive.with_suffix(".jsa.tmp")
+    tmp_archive.unlink(missing_ok=True)
+    try:
+        _convert_training_spec(
+            [
+                java_executable.resolve().as_posix(),
+                f"-XX:ArchiveClassesAtExit={tmp_archive.resolve().as_posix()}",
+            ],
+            jar_path,
+        )
+    except subprocess.CalledProcessError as error:
+        output = error.stderr.decode(errors="replace").strip() if error.stderr else ""
+        msg = f"Could not create CDS archive for {jar_path.name!r}: {output}"
+        raise RuntimeError(msg) from error
+    if tmp_archive.is_file() is False:
+        msg = f"JVM did not create a CDS archive for {jar_path.name!r}."
+        raise RuntimeError(msg)
+    tmp_archive.replace(cds_archive)
+    return cds_archive
+
+
+def measure_startup(
+    java_executable: Path,
+    jar_path: Path,
+    profiles: list[JvmProfiles] | None = None,
+    repeat: int = 3,
+) -> list[StartupMeasurement]:
+    """Measure wall time of converting a small spec with each launch profile.
+
+    Each profile is measured with and, if an archive exists, without the CDS archive.
+
+    Parameters
+    ----------
+    java_executable : Path
+        Path to the java executable.
+    jar_path : Path
+        Path to the jar with dependencies.
+    profiles : list[JvmProfiles] | None
+        Profiles to measure. Defaults to None which measures all profiles.
+    repeat : int
+        Number of runs per profile. Defaults to 3
+
+    Returns
+    -------
+    list[StartupMeasurement]
+    """
+    profiles = list(JVM_LAUNCH_PROFILES) if profiles is None else profiles
+    cds_variants = [True, False] if get_cds_archive_path(jar_path).is_file() else [False]
+    measurements = []
+    for profile in profiles:
+        for cds in cds_variants:
+            java_command = [
+                java_executable.resolve().as_posix(),
+                *jvm_options(jar_path, profile, cds=cds),
+            ]
+            durations = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                _convert_training_spec(java_command, jar_path)
+                durations.append(time.perf_counter() - start)
+            measurements.append(StartupMeasurement(profile, cds, durations))
+    return measurements
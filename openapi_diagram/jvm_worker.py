@@ -0,0 +1,541 @@
+"""Pool of long-lived JVM processes running ``openapi-to-plantuml`` conversions.
+
+Each worker is a ``java`` process running ``java/OpenapiDiagramWorker.java`` with the
+``openapi-to-plantuml`` jar on the classpath, which keeps the JVM (and its JIT) warm across
+conversions. Requests and responses are exchanged as single lines over stdin/stdout.
+
+Since the worker is started via the java source launcher, a JDK (not only a JRE) is required.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty
+from queue import Queue
+from threading import Lock
+from threading import Thread
+from typing import IO
+from typing import TYPE_CHECKING
+
+from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram.openapi_to_plantuml import JvmWorkerConversionError
+from openapi_diagram.openapi_to_plantuml import JvmWorkerError
+from openapi_diagram.openapi_to_plantuml import _find_java_executable
+from openapi_diagram.openapi_to_plantuml import download_openapi_to_plantuml
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from types import TracebackType
+
+WORKER_SOURCE = Path(__file__).parent / "java/OpenapiDiagramWorker.java"
+SPAWN_RETRY_DELAY = 60.0
+"""Seconds to wait before starting a worker again after a failed start."""
+
+
+def _read_lines(stream: IO[str], lines: Queue[str | None]) -> None:
+    """Forward lines from ``stream`` to ``lines`` and signal the end of the stream with None.
+
+    Parameters
+    ----------
+    stream : IO[str]
+        Text stream to read from (stdout of the worker process).
+    lines : Queue[str | None]
+        Queue to put the lines into.
+    """
+    with stream:
+        for line in stream:
+            lines.put(line.rstrip("\r\n"))
+    lines.put(None)
+
+
+class JvmWorker:
+    """Single long-lived JVM process running ``openapi-to-plantuml`` conversions."""
+
+    def __init__(
+        self,
+        java_executable: Path,
+        jar_path: Path,
+        *,
+        startup_timeout: float = 60.0,
+        response_timeout: float = 600.0,
+    ) -> None:
+        """Start the JVM process and wait for it to be ready.
+
+        Parameters
+        ----------
+        java_executable : Path
+            Path to the java executable.
+        jar_path : Path
+            Path to the ``openapi-to-plantuml`` jar with dependencies.
+        startup_timeout : float
+            Seconds to wait for the worker to be ready. Defaults to 60.0
+        response_timeout : float
+            Seconds to wait for a conversion to finish. Defaults to 600.0
+        """
+        self.jobs_done = 0
+        self.last_used = time.monotonic()
+        self._response_timeout = response_timeout
+        self._responses: Queue[str | None] = Queue()
+        self._process = subprocess.Popen(
+            [
+                java_executable.resolve().as_posix(),
+                "-cp",
+                jar_path.resolve().as_posix(),
+                WORKER_SOURCE.resolve().as_posix(),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        Thread(
+            target=_read_lines, args=(self._process.stdout, self._responses), daemon=True
+        ).start()
+        self._expect("READY", startup_timeout)
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the JVM process is still running."""
+        return self._process.poll() is None
+
+    def _request(self, request: str, timeout: float) -> str:
+        """Send ``request`` to the worker and wait for the response line.
+
+        Parameters
+        ----------
+        request : str
+            Single line request.
+        timeout : float
+            Seconds to wait for the response.
+
+        Returns
+        -------
+        str
+            Response line.
+
+        Raises
+        ------
+        JvmWorkerError
+            If the worker is dead, does not answer in time or exits.
+        """
+        if self._process.stdin is None or self.is_alive is False:
+            msg = "JVM worker is not running."
+            raise JvmWorkerError(msg)
+        try:
+            self._process.stdin.write(f"{request}\n")
+            self._process.stdin.flush()
+        except OSError as error:
+            self.close()
+            msg = f"Could not send request to JVM worker: {error}"
+            raise JvmWorkerError(msg) from error
+        return self._receive(timeout)
+
+    def _receive(self, timeout: float) -> str:
+        """Wait for the next response line of the worker.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait for the response.
+
+        Returns
+        -------
+        str
+            Response line.
+
+        Raises
+        ------
+        JvmWorkerError
+            If the worker does not answer in time or exits.
+        """
+        try:
+            response = self._responses.get(timeout=timeout)
+        except Empty as error:
+            self.close()
+            msg = f"JVM worker did not respond within {timeout}s."
+            raise JvmWorkerError(msg) from error
+        if response is None:
+            self.close()
+            msg = "JVM worker exited unexpectedly."
+            raise JvmWorkerError(msg)
+        return response
+
+    def _expect(self, expected: str, timeout: float) -> None:
+        """Wait for a specific response line.
+
+        Parameters
+        ----------
+        expected : str
+            Expected response line.
+        timeout : float
+            Seconds to wait for the response.
+
+        Raises
+        ------
+        JvmWorkerError
+            If the worker answers with something else.
+        """
+        response = self._receive(timeout)
+        if response != expected:
+            self.close()
+            msg = f"Unexpected response from JVM worker: {response!r}"
+            raise JvmWorkerError(msg)
+
+    def ping(self, timeout: float = 5.0) -> bool:
+        """Check that the worker is alive and responsive.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait for the answer. Defaults to 5.0
+
+        Returns
+        -------
+        bool
+        """
+        try:
+            return self._request("PING", timeout) == "PONG"
+        except JvmWorkerError:
+            return False
+
+    def convert(self, converter_args: list[str]) -> None:
+        """Run a single conversion.
+
+        Parameters
+        ----------
+        converter_args : list[str]
+            Arguments passed to the ``openapi-to-plantuml`` converter main class.
+
+        Raises
+        ------
+        JvmWorkerError
+            If an argument can not be transferred using the line protocol.
+        JvmWorkerConversionError
+            If the converter failed.
+        """
+        if any(("\t" in arg or "\n" in arg or "\r" in arg) for arg in converter_args):
+            msg = f"Arguments can not be sent to JVM worker: {converter_args!r}"
+            raise JvmWorkerError(msg)
+        response = self._request("\t".join(converter_args), self._response_timeout)
+        self.jobs_done += 1
+        self.last_used = time.monotonic()
+        if response != "OK":
+            msg = response.removeprefix("ERR ")
+            raise JvmWorkerConversionError(msg)
+
+    def close(self) -> None:
+        """Stop the JVM process."""
+        if self.is_alive is False:
+            return
+        try:
+            if self._process.stdin is not None:
+                self._process.stdin.write("QUIT\n")
+                self._process.stdin.close()
+            self._process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+
+    def kill(self) -> None:
+        """Kill the JVM process at once, aborting a running conversion."""
+        if self.is_alive is False:
+            return
+        self._process.kill()
+        self._process.wait()
+
+
+class JvmWorkerPool:
+    """Thread safe pool of warm :class:`JvmWorker` instances.
+
+    Workers are started on demand (or all at once via :meth:`start`), health checked when they
+    were idle for longer than ``health_check_interval`` and recycled after ``max_jobs``
+    conversions to bound memory growth of the JVMs.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+        *,
+        max_jobs: int = 200,
+        health_check_interval: float = 30.0,
+        startup_timeout: float = 60.0,
+        response_timeout: float = 600.0,
+    ) -> None:
+        """Create pool without starting any workers.
+
+        Parameters
+        ----------
+        size : int
+            Maximum number of concurrently running workers. Defaults to 2
+        version : str
+            Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+        max_jobs : int
+            Number of conversions after which a worker is replaced. Defaults to 200
+        health_check_interval : float
+            Idle seconds after which a worker is pinged before it is reused. Defaults to 30.0
+        startup_timeout : float
+            Seconds to wait for a worker to be ready. Defaults to 60.0
+        response_timeout : float
+            Seconds to wait for a conversion to finish. Defaults to 600.0
+
+        Raises
+        ------
+        ValueError
+            If ``size`` or ``max_jobs`` is smaller than 1.
+        """
+        if size < 1 or max_jobs < 1:
+            msg = "Worker pool 'size' and 'max_jobs' need to be at least 1."
+            raise ValueError(msg)
+        self.size = size
+        self.version = version
+        self.max_jobs = max_jobs
+        self.health_check_interval = health_check_interval
+        self._startup_timeout = startup_timeout
+        self._response_timeout = response_timeout
+        self._idle: Queue[JvmWorker] = Queue()
+        self._worker_count = 0
+        self._lock = Lock()
+        self._closed = False
+        self._spawn_failed_at: float | None = None
+
+    def _spawn(self) -> JvmWorker:
+        """Start a new worker, the caller needs to have reserved a slot.
+
+        Returns
+        -------
+        JvmWorker
+
+        Raises
+        ------
+        JvmWorkerError
+            If the worker could not be started.
+        """
+        if (
+            self._spawn_failed_at is not None
+            and time.monotonic() - self._spawn_failed_at < SPAWN_RETRY_DELAY
+        ):
+            self._release_slot()
+            msg = "Not retrying to start a JVM worker, the previous attempt failed."
+            raise JvmWorkerError(msg)
+        worker = None
+        try:
+            worker = JvmWorker(
+                _find_java_executable(),
+                download_openapi_to_plantuml(self.version),
+                startup_timeout=self._startup_timeout,
+                response_timeout=self._response_timeout,
+            )
+        except (OSError, JvmWorkerError) as error:
+            self._spawn_failed_at = time.monotonic()
+            msg = f"Could not start JVM worker: {error}"
+            raise JvmWorkerError(msg) from error
+        finally:
+            if worker is None:
+                self._release_slot()
+        self._spawn_failed_at = None
+        return worker
+
+    def _release_slot(self) -> None:
+        """Free the slot of a worker that was stopped or failed to start."""
+        with self._lock:
+            self._worker_count -= 1
+
+    def _discard(self, worker: JvmWorker) -> None:
+        """Stop ``worker`` and free its slot.
+
+        Parameters
+        ----------
+        worker : JvmWorker
+            Worker to remove from the pool.
+        """
+        worker.close()
+        self._release_slot()
+
+    def _is_healthy(self, worker: JvmWorker) -> bool:
+        """Check ``worker`` health, pinging it if it was idle for too long.
+
+        Parameters
+        ----------
+        worker : JvmWorker
+            Worker to check.
+
+        Returns
+        -------
+        bool
+        """
+        if worker.is_alive is False:
+            return False
+        if time.monotonic() - worker.last_used < self.health_check_interval:
+            return True
+        return worker.ping()
+
+    def _take(self) -> JvmWorker:
+        """Get an idle worker, start a new one or wait until a worker is released.
+
+        Returns
+        -------
+        JvmWorker
+
+        Raises
+        ------
+        JvmWorkerError
+            If the pool was closed.
+        """
+        while True:
+            if self._closed is True:
+                msg = "JVM worker pool is closed."
+                raise JvmWorkerError(msg)
+            try:
+                worker = self._idle.get_nowait()
+            except Empty:
+                with self._lock:
+                    can_spawn = self._worker_count < self.size
+                    if can_spawn is True:
+                        self._worker_count += 1
+                if can_spawn is True:
+                    return self._spawn()
+                try:
+                    # Poll so waiters notice slots freed by discarded workers.
+                    worker = self._idle.get(timeout=0.1)
+                except Empty:
+                    continue
+            if self._is_healthy(worker) is True:
+                return worker
+            self._discard(worker)
+
+    def _give_back(self, worker: JvmWorker) -> None:
+        """Return ``worker`` to the pool or recycle it if it is used up or dead.
+
+        Parameters
+        ----------
+        worker : JvmWorker
+            Worker that finished a job.
+        """
+        if self._closed is True or worker.is_alive is False or worker.jobs_done >= self.max_jobs:
+            self._discard(worker)
+        else:
+            self._idle.put(worker)
+
+    def _give_back_lease(self, lease: asyncio.Future[JvmWorker]) -> None:
+        """Return the worker of a lease whose requester was cancelled.
+
+        Parameters
+        ----------
+        lease : asyncio.Future[JvmWorker]
+            Finished lease of a worker.
+        """
+        if lease.cancelled() is False and lease.exception() is None:
+            self._give_back(lease.result())
+
+    @contextmanager
+    def worker(self) -> Generator[JvmWorker, None, None]:
+        """Context manager to borrow a worker from the pool.
+
+        Yields
+        ------
+        JvmWorker
+            Healthy worker, exclusively used by the caller until the context exits.
+        """
+        worker = self._take()
+        try:
+            yield worker
+        finally:
+            self._give_back(worker)
+
+    def start(self) -> None:
+        """Pre-start all workers so the first conversions do not pay the JVM startup."""
+        while True:
+            with self._lock:
+                if self._worker_count >= self.size:
+                    return
+                self._worker_count += 1
+            self._idle.put(self._spawn())
+
+    def convert(self, converter_args: list[str]) -> None:
+        """Run a single conversion on a pooled worker.
+
+        Parameters
+        ----------
+        converter_args : list[str]
+            Arguments passed to the ``openapi-to-plantuml`` converter main class.
+        """
+        with self.worker() as worker:
+            worker.convert(converter_args)
+
+    async def aconvert(self, converter_args: list[str]) -> None:
+        """Run a single conversion on a pooled worker without blocking.
+
+        If the awaiting task is cancelled (e.g. by the render timeout of the server), the
+        worker is killed and dropped from the pool instead of finishing the conversion in
+        the background.
+
+        Parameters
+        ----------
+        converter_args : list[str]
+            Arguments passed to the ``openapi-to-plantuml`` converter main class.
+
+        Raises
+        ------
+        CancelledError
+            If the awaiting task was cancelled, after the leased worker was killed.
+        """
+        lease = asyncio.ensure_future(asyncio.to_thread(self._take))
+        try:
+            worker = await asyncio.shield(lease)
+        except asyncio.CancelledError:
+            # Waiting for a worker can't be interrupted, give it back once it was taken
+            lease.add_done_callback(self._give_back_lease)
+            raise
+        try:
+            await asyncio.to_thread(worker.convert, converter_args)
+        except asyncio.CancelledError:
+            # The conversion thread fails as soon as the JVM is gone
+            worker.kill()
+            raise
+        finally:
+            self._give_back(worker)
+
+    def close(self) -> None:
+        """Stop all idle workers, busy workers are stopped once they are returned."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(worker)
+
+    def __enter__(self) -> JvmWorkerPool:
+        """Start all workers when used as context manager.
+
+        Returns
+        -------
+        JvmWorkerPool
+        """
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop all workers when leaving the context.
+
+        Parameters
+        ----------
+        exc_type : type[BaseException] | None
+            Exception type.
+        exc_value : BaseException | None
+            Exception instance.
+        traceback : TracebackType | None
+            Traceback of the exception.
+        """
+        self.close()
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 import subprocess
+from hashlib import file_digest
 from hashlib import md5
 from pathlib import Path
 from shutil import which
+from typing import TYPE_CHECKING
 from typing import Literal
+from typing import NamedTuple
 from typing import TypeAlias
 from typing import cast
 from warnings import warn
@@ -18,7 +22,30 @@ from pydantic import TypeAdapter
 
 from openapi_diagram import CACHE_DIR
 from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram.bundle import bundle_openapi_spec
+from openapi_diagram.bundle import check_self_contained
+from openapi_diagram.bundle import references_spec_files
+from openapi_diagram.jvm_launch import jvm_options
+from openapi_diagram.process_limits import ProcessLimits
+from openapi_diagram.process_limits import arun_limited
+from openapi_diagram.process_limits import run_limited
+from openapi_diagram.utils import Json
+from openapi_diagram.utils import canonical_spec_hash
+from openapi_diagram.utils import has_preprocessing
+from openapi_diagram.utils import is_passthrough_spec
+from openapi_diagram.utils import is_streamable_spec
 from openapi_diagram.utils import openapi_3_dot_1_compat
+from openapi_diagram.utils import parse_openapi_spec
+from openapi_diagram.utils import preprocess_spec
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from openapi_diagram.bundle import SpecParseCache
+    from openapi_diagram.filters import OperationFilter
+    from openapi_diagram.jvm_launch import JvmProfiles
+    from openapi_diagram.jvm_worker import JvmWorkerPool
+    from openapi_diagram.render_cache import RenderCache
 
 OPENAPI_TO_PLANTUML_MAVEN_URL = (
     "https://repo1.maven.org/maven2/com/github/davidmoten/openapi-to-plantuml"
@@ -58,6 +85,14 @@ OpenapiToPlantumlFormats: TypeAlias = Literal[
 ]
 
 
+class RenderTarget(NamedTuple):
+    """Mode, format and output file (``single``) or folder (``split``) of a render."""
+
+    mode: OpenapiToPlantumlModes
+    diagram_format: OpenapiToPlantumlFormats
+    output_path: Path
+
+
 class DownloadVerificationError(Exception):
     """Error thrown if download does not match hash."""
 
@@ -70,6 +105,18 @@ class MissingDependecyWarning(UserWarning):
     """Warn when a non essential dependency is missing."""
 
 
+class JvmWorkerError(RuntimeError):
+    """Error thrown when a long-lived JVM worker fails or can not be started."""
+
+
+class JvmWorkerConversionError(JvmWorkerError):
+    """Error thrown when the converter inside of a JVM worker reports a failure."""
+
+
+class JvmWorkerFallbackWarning(UserWarning):
+    """Warn when a conversion falls back from a JVM worker to a one-shot subprocess."""
+
+
 def _get_latest_openapi_to_plantuml_version() -> str:
     """Get latest `openapi-to-plantuml` version on maven repo.
 
@@ -198,12 +245,566 @@ def _find_java_executable() -> Path:
     raise MissingDependecyError(msg)
 
 
+def _converter_args(
+    mode: OpenapiToPlantumlModes,
+    spec_file: Path,
+    diagram_format: OpenapiToPlantumlFormats,
+    output_path: Path,
+) -> list[str]:
+    """Arguments passed to the ``openapi-to-plantuml`` converter main class.
+
+    Parameters
+    ----------
+    mode : OpenapiToPlantumlModes
+        Mode to run
+    spec_file : Path
+        OpenAPI 3.0 spec file in JSON format.
+    diagram_format : OpenapiToPlantumlFormats
+        Format the diagram/-s should be in.
+    output_path : Path
+        File (``mode='single'``) or folder (``mode='split'``) to write the output to.
+
+    Returns
+    -------
+    list[str]
+    """
+    return [
+        mode,
+        spec_file.resolve().as_posix(),
+        diagram_format.upper(),
+        output_path.resolve().as_posix(),
+    ]
+
+
+def _output_files(
+    output_path: Path, mode: OpenapiToPlantumlModes, diagram_format: OpenapiToPlantumlFormats
+) -> list[Path]:
+    """Files of ``diagram_format`` in the output location.
+
+    Parameters
+    ----------
+    output_path : Path
+        File (``mode='single'``) or folder (``mode='split'``) the output was written to.
+    mode : OpenapiToPlantumlModes
+        Mode ``openapi-to-plantuml`` ran in.
+    diagram_format : OpenapiToPlantumlFormats
+        Format of the diagram/-s.
+
+    Returns
+    -------
+    list[Path]
+    """
+    if mode == "single":
+        return list(output_path.parent.glob(f"*.{diagram_format}"))
+    return list(output_path.glob(f"*.{diagram_format}"))
+
+
+def _convert_in_worker_pool(worker_pool: JvmWorkerPool, converter_args: list[str]) -> bool:
+    """Run a conversion in ``worker_pool`` and warn if it needs to fall back.
+
+    Only failures of the worker itself fall back to a one-shot subprocess.
+
+    Parameters
+    ----------
+    worker_pool : JvmWorkerPool
+        Pool of warm JVM workers.
+    converter_args : list[str]
+        Arguments passed to the ``openapi-to-plantuml`` converter main class.
+
+    Returns
+    -------
+    bool
+        Whether the conversion succeeded inside of the worker pool.
+
+    Raises
+    ------
+    CalledProcessError
+        If the converter rejected the spec, a one-shot subprocess would fail the same way.
+    """
+    try:
+        worker_pool.convert(converter_args)
+    except JvmWorkerConversionError as error:
+        raise subprocess.CalledProcessError(1, converter_args, stderr=str(error)) from error
+    except JvmWorkerError as error:
+        msg = f"JVM worker failed ({error}), falling back to one-shot subprocess."
+        warn(JvmWorkerFallbackWarning(msg), stacklevel=3)
+        return False
+    return True
+
+
+async def _aconvert_in_worker_pool(worker_pool: JvmWorkerPool, converter_args: list[str]) -> bool:
+    """Async version of :func:`_convert_in_worker_pool`, cancelling it kills the worker.
+
+    Parameters
+    ----------
+    worker_pool : JvmWorkerPool
+        Pool of warm JVM workers.
+    converter_args : list[str]
+        Arguments passed to the ``openapi-to-plantuml`` converter main class.
+
+    Returns
+    -------
+    bool
+        Whether the conversion succeeded inside of the worker pool.
+
+    Raises
+    ------
+    CalledProcessError
+        If the converter rejected the spec, a one-shot subprocess would fail the same way.
+    """
+    try:
+        await worker_pool.aconvert(converter_args)
+    except JvmWorkerConversionError as error:
+        raise subprocess.CalledProcessError(1, converter_args, stderr=str(error)) from error
+    except JvmWorkerError as error:
+        msg = f"JVM worker failed ({error}), falling back to one-shot subprocess."
+        warn(JvmWorkerFallbackWarning(msg), stacklevel=2)
+        return False
+    return True
+
+
+def validate_arguments(
+    modes: Iterable[OpenapiToPlantumlModes],
+    diagram_formats: Iterable[OpenapiToPlantumlFormats],
+    version: str,
+    worker_pool: JvmWorkerPool | None,
+) -> tuple[list[OpenapiToPlantumlModes], list[OpenapiToPlantumlFormats]]:
+    """Validate arguments of the ``run_openapi_to_plantuml*`` functions.
+
+    Parameters
+    ----------
+    modes : Iterable[OpenapiToPlantumlModes]
+        Modes to run
+    diagram_formats : Iterable[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use.
+    worker_pool : JvmWorkerPool | None
+        Pool of warm JVM workers to run the conversion in.
+
+    Returns
+    -------
+    tuple[list[OpenapiToPlantumlModes], list[OpenapiToPlantumlFormats]]
+        Validated modes and diagram formats without duplicates.
+
+    Raises
+    ------
+    ValueError
+        If no mode or format is given or the version of ``worker_pool`` does not match
+        ``version``.
+    """
+    validated_modes = cast(
+        list[OpenapiToPlantumlModes],
+        TypeAdapter(list[OpenapiToPlantumlModes]).validate_python(list(modes)),
+    )
+    validated_formats = cast(
+        list[OpenapiToPlantumlFormats],
+        TypeAdapter(list[OpenapiToPlantumlFormats]).validate_python(list(diagram_formats)),
+    )
+    if len(validated_modes) == 0 or len(validated_formats) == 0:
+        msg = "At least one mode and one diagram format are required."
+        raise ValueError(msg)
+    if worker_pool is not None and worker_pool.version != version:
+        msg = (
+            f"Worker pool uses openapi-to-plantuml version {worker_pool.version!r} "
+            f"but version {version!r} was requested."
+        )
+        raise ValueError(msg)
+    return list(dict.fromkeys(validated_modes)), list(dict.fromkeys(validated_formats))
+
+
+def render_targets(
+    openapi_spec: Path,
+    output_path: Path,
+    modes: list[OpenapiToPlantumlModes],
+    diagram_formats: list[OpenapiToPlantumlFormats],
+) -> list[RenderTarget]:
+    """Output location of each mode and format combination.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use.
+    output_path : Path
+        Output location, see :func:`run_openapi_to_plantuml_multi`.
+    modes : list[OpenapiToPlantumlModes]
+        Modes to run
+    diagram_formats : list[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+
+    Returns
+    -------
+    list[RenderTarget]
+    """
+    targets = []
+    for mode in modes:
+        mode_output_path = output_path if len(modes) == 1 else output_path / mode
+        for diagram_format in diagram_formats:
+            if mode == "split":
+                target_path = mode_output_path
+            elif len(modes) > 1:
+                target_path = mode_output_path / f"{openapi_spec.stem}.{diagram_format}"
+            elif len(diagram_formats) > 1:
+                target_path = output_path.with_suffix(f".{diagram_format}")
+            else:
+                target_path = output_path
+            targets.append(RenderTarget(mode, diagram_format, target_path))
+    return targets
+
+
+def _load_spec_data(
+    openapi_spec: Path,
+    render_cache: RenderCache | None,
+    *,
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+    parse_cache: SpecParseCache | None,
+    bundle_references: bool,
+) -> tuple[dict[str, Json] | None, bool]:
+    """Parse, bundle and preprocess the spec if the render cache or the rendered spec need it.
+
+    Specs which are streamed through the downgrade are not parsed for the render cache, their
+    renders are cached by the hash of the file content instead.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use (only JSON and YAML) are supported.
+    render_cache : RenderCache | None
+        Cache of previous renders.
+    prune_unused : bool
+        Whether to drop unused components.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
+    parse_cache : SpecParseCache | None
+        Cache of parsed files referenced by the spec.
+    bundle_references : bool
+        Whether to bundle files the spec references, else such references are rejected.
+
+    Returns
+    -------
+    tuple[dict[str, Json] | None, bool]
+        Spec or None if it does not need to be parsed up front and whether it differs from
+        the content of ``openapi_spec``.
+
+    Raises
+    ------
+    BundleError
+        If the spec references other files and ``bundle_references`` is False.
+    """
+    references = references_spec_files(openapi_spec)
+    bundled = references and bundle_references
+    rewritten = bundled or has_preprocessing(
+        prune_unused=prune_unused, operation_filter=operation_filter
+    )
+    if (
+        rewritten is False
+        and references is False
+        and (render_cache is None or is_streamable_spec(openapi_spec))
+    ):
+        return None, False
+    if bundled is True:
+        spec_data = bundle_openapi_spec(openapi_spec, parse_cache=parse_cache)
+    else:
+        spec_data = parse_openapi_spec(openapi_spec.read_bytes(), openapi_spec.suffix)
+        if references is True:
+            check_self_contained(spec_data, openapi_spec.name)
+    return (
+        preprocess_spec(spec_data, prune_unused=prune_unused, operation_filter=operation_filter),
+        rewritten,
+    )
+
+
+def _restore_renders(
+    openapi_spec: Path,
+    spec_data: dict[str, Json] | None,
+    targets: list[RenderTarget],
+    version: str,
+    render_cache: RenderCache,
+) -> tuple[dict[RenderTarget, str], dict[RenderTarget, list[Path]]]:
+    """Restore renders of ``targets`` from ``render_cache`` if they are cached.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use.
+    spec_data : dict[str, Json] | None
+        Parsed and preprocessed spec or None if the spec is rendered as it is.
+    targets : list[RenderTarget]
+        Renders to restore.
+    version : str
+        Version of ``openapi-to-plantuml`` to use.
+    render_cache : RenderCache
+        Cache of previous renders.
+
+    Returns
+    -------
+    tuple[dict[RenderTarget, str], dict[RenderTarget, list[Path]]]
+        Cache key and restored files of the cached targets.
+    """
+    if spec_data is None:
+        with openapi_spec.open("rb") as spec_file:
+            spec_hash = f"raw-{file_digest(spec_file, 'sha256').hexdigest()}"
+    else:
+        # Hashing the preprocessed spec keeps renders with different preprocessing apart
+        spec_hash = canonical_spec_hash(spec_data)
+    cache_keys = {}
+    restored = {}
+    for target in targets:
+        cache_keys[target] = render_cache.key(
+            spec_hash, target.mode, target.diagram_format, version
+        )
+        if render_cache.restore(cache_keys[target], target.output_path, target.mode) is True:
+            restored[target] = _output_files(
+                target.output_path, target.mode, target.diagram_format
+            )
+    return cache_keys, restored
+
+
+def _cache_render(
+    render_cache: RenderCache | None,
+    cache_keys: dict[RenderTarget, str],
+    target: RenderTarget,
+    files: list[Path],
+) -> None:
+    """Store rendered ``files`` of ``target`` in ``render_cache`` if it is used.
+
+    Parameters
+    ----------
+    render_cache : RenderCache | None
+        Cache of previous renders.
+    cache_keys : dict[RenderTarget, str]
+        Cache keys of the targets.
+    target : RenderTarget
+        Rendered target.
+    files : list[Path]
+        Rendered files.
+    """
+    if render_cache is not None and target in cache_keys:
+        render_cache.put(
+            cache_keys[target], [target.output_path] if target.mode == "single" else files
+        )
+
+
+def _compat_source(
+    openapi_spec: Path, spec_data: dict[str, Json] | None, *, rewritten: bool
+) -> Path | dict[str, Json]:
+    """Spec to pass to ``openapi_3_dot_1_compat``, preferring files it does not need to parse.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use.
+    spec_data : dict[str, Json] | None
+        Spec parsed for the render cache or preprocessing.
+    rewritten : bool
+        Whether ``spec_data`` was bundled or preprocessed and differs from ``openapi_spec``.
+
+    Returns
+    -------
+    Path | dict[str, Json]
+    """
+    if spec_data is None or (
+        rewritten is False
+        and (is_passthrough_spec(openapi_spec) or is_streamable_spec(openapi_spec))
+    ):
+        return openapi_spec
+    return spec_data
+
+
+def _warn_if_graphviz_missing() -> None:
+    """Warn if the graphviz ``dot`` executable can not be found."""
+    if which("dot") is None:
+        msg = "Graphviz installation not found, some output formats might not be available."
+        warn(MissingDependecyWarning(msg), stacklevel=3)
+
+
+def _java_command(
+    java_executable: Path,
+    jar_path: Path,
+    converter_args: list[str],
+    jvm_profile: JvmProfiles,
+    limits: ProcessLimits,
+) -> list[str]:
+    """Command running ``openapi-to-plantuml`` in a one-shot JVM.
+
+    Parameters
+    ----------
+    java_executable : Path
+        Path to the java executable.
+    jar_path : Path
+        Path to the ``openapi-to-plantuml`` jar.
+    converter_args : list[str]
+        Arguments passed to the ``openapi-to-plantuml`` converter main class.
+    jvm_profile : JvmProfiles
+        Launch profile of the JVM, the CDS archive of the jar is used if it exists.
+    limits : ProcessLimits
+        Resource limits of the process, the heap limit overrides the one of the profile.
+
+    Returns
+    -------
+    list[str]
+    """
+    return [
+        java_executable.resolve().as_posix(),
+        *jvm_options(jar_path, jvm_profile),
+        *limits.jvm_options(),
+        "-jar",
+        jar_path.resolve().as_posix(),
+        *converter_args,
+    ]
+
+
+def run_openapi_to_plantuml_multi(
+    openapi_spec: Path,
+    output_path: Path,
+    modes: Iterable[OpenapiToPlantumlModes],
+    diagram_formats: Iterable[OpenapiToPlantumlFormats],
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    worker_pool: JvmWorkerPool | None = None,
+    render_cache: RenderCache | None = None,
+    jvm_profile: JvmProfiles = "default",
+    limits: ProcessLimits | None = None,
+    *,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+    parse_cache: SpecParseCache | None = None,
+    bundle_references: bool = True,
+) -> dict[RenderTarget, list[Path]]:
+    """Run ``openapi-to-plantuml`` for multiple modes and formats, parsing the spec only once.
+
+    With a single mode ``output_path`` is used as in :func:`run_openapi_to_plantuml`, where
+    the suffix of the output file in ``single`` mode is replaced by each format if multiple
+    formats are requested. With both modes ``output_path`` is a folder which contains
+    ``single/<spec name>.<format>`` and the ``split/`` folder.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use (only JSON and YAML) are supported.
+    output_path : Path
+        File or folder to write the output to.
+    modes : Iterable[OpenapiToPlantumlModes]
+        Modes to run
+    diagram_formats : Iterable[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    worker_pool : JvmWorkerPool | None
+        Pool of warm JVM workers to run the conversions in. If the pool fails, conversions
+        fall back to one-shot ``java -jar`` subprocesses. Defaults to None which starts a
+        single worker for the duration of the call if more than one render is needed.
+    render_cache : RenderCache | None
+        Cache to look up previous renders of the same spec in and store the results to.
+        Defaults to None which always renders.
+    jvm_profile : JvmProfiles
+        Launch profile of one-shot JVMs, see ``JVM_LAUNCH_PROFILES``. Defaults to "default"
+    limits : ProcessLimits | None
+        Resource limits of one-shot JVMs, conversions in ``worker_pool`` are only bound by
+        the response timeout of the pool. Defaults to None which sets no limits.
+    prune_unused : bool
+        Whether to drop components which are not referenced from the rest of the spec before
+        rendering. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render, together with the components they
+        reference. Defaults to None which renders all operations.
+    parse_cache : SpecParseCache | None
+        Cache of parsed files the spec references via ``$ref``, which are bundled into the
+        rendered spec. Defaults to None which parses them for this call only.
+    bundle_references : bool
+        Whether to bundle files the spec references from the local file system. Pass False
+        for specs which were not read from their original location (e.g. uploads written to
+        a scratch folder), their references to other files raise ``BundleError``.
+        Defaults to True
+
+    Returns
+    -------
+    dict[RenderTarget, list[Path]]
+        Created output files per mode and format.
+
+    Raises
+    ------
+    MissingDependecyError
+        If the java installation can not be found.
+    ValueError
+        If the version of ``worker_pool`` does not match ``version``.
+    CalledProcessError
+        If the converter failed.
+    BundleError
+        If referenced files can not be bundled.
+    """
+    modes, diagram_formats = validate_arguments(modes, diagram_formats, version, worker_pool)
+    limits = ProcessLimits() if limits is None else limits
+    targets = render_targets(openapi_spec, output_path, modes, diagram_formats)
+    spec_data, rewritten = _load_spec_data(
+        openapi_spec,
+        render_cache,
+        prune_unused=prune_unused,
+        operation_filter=operation_filter,
+        parse_cache=parse_cache,
+        bundle_references=bundle_references,
+    )
+    cache_keys: dict[RenderTarget, str] = {}
+    results: dict[RenderTarget, list[Path]] = {}
+    if render_cache is not None:
+        cache_keys, results = _restore_renders(
+            openapi_spec, spec_data, targets, version, render_cache
+        )
+    pending = [target for target in targets if target not in results]
+    if len(pending) == 0:
+        return results
+
+    _warn_if_graphviz_missing()
+
+    java_executable = _find_java_executable()
+
+    jar_path = download_openapi_to_plantuml(version)
+    own_pool = worker_pool is None and len(pending) > 1
+    # Imported here since the worker module depends on this module
+    from openapi_diagram.jvm_worker import JvmWorkerPool
+
+    pool = JvmWorkerPool(size=1, version=version) if own_pool is True else worker_pool
+    try:
+        with openapi_3_dot_1_compat(
+            _compat_source(openapi_spec, spec_data, rewritten=rewritten)
+        ) as spec_file:
+            for target in pending:
+                if target.mode == "single":
+                    target.output_path.parent.mkdir(parents=True, exist_ok=True)
+                converter_args = _converter_args(
+                    target.mode, spec_file, target.diagram_format, target.output_path
+                )
+                if pool is None or not _convert_in_worker_pool(pool, converter_args):
+                    run_limited(
+                        _java_command(
+                            java_executable, jar_path, converter_args, jvm_profile, limits
+                        ),
+                        limits,
+                        target.output_path,
+                    )
+                files = _output_files(target.output_path, target.mode, target.diagram_format)
+                _cache_render(render_cache, cache_keys, target, files)
+                results[target] = files
+    finally:
+        if own_pool is True and pool is not None:
+            pool.close()
+    return {target: results[target] for target in targets}
+
+
 def run_openapi_to_plantuml(
     openapi_spec: Path,
     output_path: Path,
     mode: OpenapiToPlantumlModes,
     diagram_format: OpenapiToPlantumlFormats,
     version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    worker_pool: JvmWorkerPool | None = None,
+    render_cache: RenderCache | None = None,
+    jvm_profile: JvmProfiles = "default",
+    limits: ProcessLimits | None = None,
+    *,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+    parse_cache: SpecParseCache | None = None,
 ) -> list[Path]:
     """Run ``openapi-to-plantuml``.
 
@@ -219,44 +820,280 @@ def run_openapi_to_plantuml(
         Format the diagram/-s should be in.
     version : str
         Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    worker_pool : JvmWorkerPool | None
+        Pool of warm JVM workers to run the conversion in. If the pool fails, the conversion
+        falls back to a one-shot ``java -jar`` subprocess. Defaults to None which always uses
+        a one-shot subprocess.
+    render_cache : RenderCache | None
+        Cache to look up previous renders of the same spec in and store the result to.
+        Defaults to None which always renders.
+    jvm_profile : JvmProfiles
+        Launch profile of one-shot JVMs, see ``JVM_LAUNCH_PROFILES``. Defaults to "default"
+    limits : ProcessLimits | None
+        Resource limits of one-shot JVMs, conversions in ``worker_pool`` are only bound by
+        the response timeout of the pool. Defaults to None which sets no limits.
+    prune_unused : bool
+        Whether to drop components which are not referenced from the rest of the spec before
+        rendering. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render, together with the components they
+        reference. Defaults to None which renders all operations.
+    parse_cache : SpecParseCache | None
+        Cache of parsed files the spec references via ``$ref``, which are bundled into the
+        rendered spec. Defaults to None which parses them for this call only.
 
     Returns
     -------
     list[Path]
         List of created output files.
+    """
+    results = run_openapi_to_plantuml_multi(
+        openapi_spec,
+        output_path,
+        [mode],
+        [diagram_format],
+        version,
+        worker_pool,
+        render_cache,
+        jvm_profile,
+        limits,
+        prune_unused=prune_unused,
+        operation_filter=operation_filter,
+        parse_cache=parse_cache,
+    )
+    return next(iter(results.values()))
 
-    Raises
-    ------
-    MissingDependecyError
-        If the java installation can not be found.
+
+async def _arun_java(
+    java_executable: Path,
+    jar_path: Path,
+    converter_args: list[str],
+    jvm_profile: JvmProfiles,
+    limits: ProcessLimits,
+    output_path: Path,
+) -> None:
+    """Run ``openapi-to-plantuml`` in a one-shot JVM as asyncio subprocess.
+
+    Parameters
+    ----------
+    java_executable : Path
+        Path to the java executable.
+    jar_path : Path
+        Path to the ``openapi-to-plantuml`` jar.
+    converter_args : list[str]
+        Arguments passed to the ``openapi-to-plantuml`` converter main class.
+    jvm_profile : JvmProfiles
+        Launch profile of the JVM.
+    limits : ProcessLimits
+        Resource limits of the process.
+    output_path : Path
+        Output file or folder of the conversion.
     """
-    mode = cast(OpenapiToPlantumlModes, TypeAdapter(OpenapiToPlantumlModes).validate_python(mode))
-    diagram_format = cast(
-        OpenapiToPlantumlFormats,
-        TypeAdapter(OpenapiToPlantumlFormats).validate_python(diagram_format),
+    command = _java_command(java_executable, jar_path, converter_args, jvm_profile, limits)
+    await arun_limited(command, limits, output_path)
+
+
+async def arun_openapi_to_plantuml_multi(
+    openapi_spec: Path,
+    output_path: Path,
+    modes: Iterable[OpenapiToPlantumlModes],
+    diagram_formats: Iterable[OpenapiToPlantumlFormats],
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    worker_pool: JvmWorkerPool | None = None,
+    render_cache: RenderCache | None = None,
+    jvm_profile: JvmProfiles = "default",
+    limits: ProcessLimits | None = None,
+    *,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+    parse_cache: SpecParseCache | None = None,
+    bundle_references: bool = True,
+) -> dict[RenderTarget, list[Path]]:
+    """Run ``openapi-to-plantuml`` for multiple modes and formats without blocking.
+
+    Async version of :func:`run_openapi_to_plantuml_multi`, the JVM runs as asyncio
+    subprocess and file system work (spec parsing, cache access, download of the jar) runs
+    in worker threads.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use (only JSON and YAML) are supported.
+    output_path : Path
+        File or folder to write the output to, see :func:`run_openapi_to_plantuml_multi`.
+    modes : Iterable[OpenapiToPlantumlModes]
+        Modes to run
+    diagram_formats : Iterable[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    worker_pool : JvmWorkerPool | None
+        Pool of warm JVM workers to run the conversions in. If the pool fails, conversions
+        fall back to one-shot ``java -jar`` subprocesses. Defaults to None which always uses
+        one-shot subprocesses. Cancelling the render kills the worker running the conversion.
+    render_cache : RenderCache | None
+        Cache to look up previous renders of the same spec in and store the results to.
+        Defaults to None which always renders.
+    jvm_profile : JvmProfiles
+        Launch profile of one-shot JVMs, see ``JVM_LAUNCH_PROFILES``. Defaults to "default"
+    limits : ProcessLimits | None
+        Resource limits of one-shot JVMs, conversions in ``worker_pool`` are only bound by
+        the response timeout of the pool. Defaults to None which sets no limits.
+    prune_unused : bool
+        Whether to drop components which are not referenced from the rest of the spec before
+        rendering. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render, together with the components they
+        reference. Defaults to None which renders all operations.
+    parse_cache : SpecParseCache | None
+        Cache of parsed files the spec references via ``$ref``, which are bundled into the
+        rendered spec. Defaults to None which parses them for this call only.
+    bundle_references : bool
+        Whether to bundle files the spec references from the local file system. Pass False
+        for specs which were not read from their original location (e.g. uploads written to
+        a scratch folder), their references to other files raise ``BundleError``.
+        Defaults to True
+
+    Returns
+    -------
+    dict[RenderTarget, list[Path]]
+        Created output files per mode and format.
+    """
+    modes, diagram_formats = validate_arguments(modes, diagram_formats, version, worker_pool)
+    limits = ProcessLimits() if limits is None else limits
+    targets = render_targets(openapi_spec, output_path, modes, diagram_formats)
+    spec_data, rewritten = await asyncio.to_thread(
+        _load_spec_data,
+        openapi_spec,
+        render_cache,
+        prune_unused=prune_unused,
+        operation_filter=operation_filter,
+        parse_cache=parse_cache,
+        bundle_references=bundle_references,
     )
-    if which("dot") is None:
-        msg = "Graphviz installation not found, some output formats might not be available."
-        warn(MissingDependecyWarning(msg), stacklevel=2)
+    cache_keys: dict[RenderTarget, str] = {}
+    results: dict[RenderTarget, list[Path]] = {}
+    if render_cache is not None:
+        cache_keys, results = await asyncio.to_thread(
+            _restore_renders,
+            openapi_spec,
+            spec_data,
+            targets,
+            version,
+            render_cache,
+        )
+    pending = [target for target in targets if target not in results]
+    if len(pending) == 0:
+        return results
+
+    _warn_if_graphviz_missing()
 
     java_executable = _find_java_executable()
 
-    jar_path = download_openapi_to_plantuml(version)
-    if mode == "single":
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-    with openapi_3_dot_1_compat(openapi_spec) as spec_file:
-        subprocess.run(
-            [
-                java_executable.resolve().as_posix(),
-                "-jar",
-                jar_path.resolve().as_posix(),
-                mode,
-                spec_file.resolve().as_posix(),
-                diagram_format.upper(),
-                output_path.resolve().as_posix(),
-            ],
-            check=True,
-        )
-    if mode == "single":
-        return list(output_path.parent.glob(f"*.{diagram_format}"))
-    return list(output_path.glob(f"*.{diagram_format}"))
+    jar_path = await asyncio.to_thread(download_openapi_to_plantuml, version)
+    compat = openapi_3_dot_1_compat(_compat_source(openapi_spec, spec_data, rewritten=rewritten))
+    spec_file = await asyncio.to_thread(compat.__enter__)
+    try:
+        for target in pending:
+            if target.mode == "single":
+                await asyncio.to_thread(
+                    target.output_path.parent.mkdir, parents=True, exist_ok=True
+                )
+            converter_args = _converter_args(
+                target.mode, spec_file, target.diagram_format, target.output_path
+            )
+            if worker_pool is None or not await _aconvert_in_worker_pool(
+                worker_pool, converter_args
+            ):
+                await _arun_java(
+                    java_executable,
+                    jar_path,
+                    converter_args,
+                    jvm_profile,
+                    limits,
+                    target.output_path,
+                )
+            files = await asyncio.to_thread(
+                _output_files, target.output_path, target.mode, target.diagram_format
+            )
+            await asyncio.to_thread(_cache_render, render_cache, cache_keys, target, files)
+            results[target] = files
+    finally:
+        await asyncio.to_thread(compat.__exit__, None, None, None)
+    return {target: results[target] for target in targets}
+
+
+async def arun_openapi_to_plantuml(
+    openapi_spec: Path,
+    output_path: Path,
+    mode: OpenapiToPlantumlModes,
+    diagram_format: OpenapiToPlantumlFormats,
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    worker_pool: JvmWorkerPool | None = None,
+    render_cache: RenderCache | None = None,
+    jvm_profile: JvmProfiles = "default",
+    limits: ProcessLimits | None = None,
+    *,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+    parse_cache: SpecParseCache | None = None,
+) -> list[Path]:
+    """Run ``openapi-to-plantuml`` without blocking the event loop.
+
+    Async version of :func:`run_openapi_to_plantuml`, the JVM runs as asyncio subprocess and
+    file system work (spec parsing, cache access, download of the jar) runs in worker threads.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use (only JSON and YAML) are supported.
+    output_path : Path
+        File (``mode='single'``) or folder (``mode='split'``) to write the output to.
+    mode : OpenapiToPlantumlModes
+        Mode to run
+    diagram_format : OpenapiToPlantumlFormats
+        Format the diagram/-s should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    worker_pool : JvmWorkerPool | None
+        Pool of warm JVM workers to run the conversion in. If the pool fails, the conversion
+        falls back to a one-shot ``java -jar`` subprocess. Defaults to None which always uses
+        a one-shot subprocess.
+    render_cache : RenderCache | None
+        Cache to look up previous renders of the same spec in and store the result to.
+        Defaults to None which always renders.
+    jvm_profile : JvmProfiles
+        Launch profile of one-shot JVMs, see ``JVM_LAUNCH_PROFILES``. Defaults to "default"
+    limits : ProcessLimits | None
+        Resource limits of one-shot JVMs, conversions in ``worker_pool`` are only bound by
+        the response timeout of the pool. Defaults to None which sets no limits.
+    prune_unused : bool
+        Whether to drop components which are not referenced from the rest of the spec before
+        rendering. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render, together with the components they
+        reference. Defaults to None which renders all operations.
+    parse_cache : SpecParseCache | None
+        Cache of parsed files the spec references via ``$ref``, which are bundled into the
+        rendered spec. Defaults to None which parses them for this call only.
+
+    Returns
+    -------
+    list[Path]
+        List of created output files.
+    """
+    results = await arun_openapi_to_plantuml_multi(
+        openapi_spec,
+        output_path,
+        [mode],
+        [diagram_format],
+        version,
+        worker_pool,
+        render_cache,
+        jvm_profile,
+        limits,
+        prune_unused=prune_unused,
+        operation_filter=operation_filter,
+        parse_cache=parse_cache,
+    )
+    return next(iter(results.values()))
@@ -0,0 +1,409 @@
+"""In-memory rendering: spec content in, diagram contents out.
+
+:func:`render_openapi_to_plantuml` accepts the content of a spec file, an already parsed spec
+or a (spooled) spec file and returns the rendered diagrams as a mapping of relative file names
+to bytes. The spec is parsed and converted at most once and written once to a scratch folder
+for the JVM, and the outputs are read back once. The scratch folder defaults to the memory
+backed ``/dev/shm`` if it is available, so none of these files touch the disk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from tempfile import mkdtemp
+from typing import TYPE_CHECKING
+from typing import Literal
+from typing import TypeAlias
+
+from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram.bundle import bundle_openapi_archive
+from openapi_diagram.openapi_to_plantuml import arun_openapi_to_plantuml_multi
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml_multi
+from openapi_diagram.serialization import loads_json
+from openapi_diagram.serialization import loads_yaml
+from openapi_diagram.utils import STREAMING_MIN_SIZE
+from openapi_diagram.utils import dumps_openapi_3_dot_0_json
+from openapi_diagram.utils import has_preprocessing
+from openapi_diagram.utils import is_passthrough_spec
+from openapi_diagram.utils import preprocess_spec
+from openapi_diagram.utils import sniff_openapi_version
+from openapi_diagram.utils import stream_openapi_3_dot_0_json
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from openapi_diagram.filters import OperationFilter
+    from openapi_diagram.jvm_launch import JvmProfiles
+    from openapi_diagram.jvm_worker import JvmWorkerPool
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
+    from openapi_diagram.openapi_to_plantuml import RenderTarget
+    from openapi_diagram.process_limits import ProcessLimits
+    from openapi_diagram.render_cache import RenderCache
+    from openapi_diagram.utils import Json
+
+SpecFormats: TypeAlias = Literal["json", "yaml", "zip"]
+
+MEMORY_SCRATCH_DIR = Path("/dev/shm")
+"""Memory backed folder used as scratch space for the JVM files if it is available."""
+
+
+def default_scratch_dir() -> Path | None:
+    """Get the default folder for the files the JVM reads and writes.
+
+    Returns
+    -------
+    Path | None
+        ``MEMORY_SCRATCH_DIR`` if it is a writable folder, else None which uses the default
+        temporary folder.
+    """
+    if MEMORY_SCRATCH_DIR.is_dir() and os.access(MEMORY_SCRATCH_DIR, os.W_OK | os.X_OK):
+        return MEMORY_SCRATCH_DIR
+    return None
+
+
+def _spec_file_content(
+    spec: bytes | str | dict[str, Json],
+    spec_format: SpecFormats,
+    *,
+    entry: str | None,
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+) -> bytes:
+    """Content of the preprocessed OpenAPI 3.0 JSON file handed to the JVM.
+
+    Parameters
+    ----------
+    spec : bytes | str | dict[str, Json]
+        Content of the spec file or parsed spec.
+    spec_format : SpecFormats
+        Format of the spec content.
+    entry : str | None
+        Path of the root spec inside of a zip archive.
+    prune_unused : bool
+        Whether to drop unused components.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
+
+    Returns
+    -------
+    bytes
+    """
+    preprocessed = has_preprocessing(prune_unused=prune_unused, operation_filter=operation_filter)
+    if isinstance(spec, dict):
+        spec_data = spec
+    else:
+        content = spec.encode() if isinstance(spec, str) else spec
+        if spec_format == "json" and preprocessed is False and is_passthrough_spec(content):
+            return content
+        if spec_format == "zip":
+            spec_data = bundle_openapi_archive(content, entry)
+        elif spec_format == "json":
+            spec_data = loads_json(content)
+        else:
+            spec_data = loads_yaml(content)
+    return dumps_openapi_3_dot_0_json(
+        preprocess_spec(spec_data, prune_unused=prune_unused, operation_filter=operation_filter)
+    )
+
+
+def _write_spec_file(
+    spec: bytes | str | Path | dict[str, Json],
+    spec_format: SpecFormats,
+    spec_file: Path,
+    *,
+    entry: str | None,
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+) -> None:
+    """Write the preprocessed OpenAPI 3.0 JSON file handed to the JVM.
+
+    JSON spec files which need no preprocessing are copied (OpenAPI 3.0) or, if they are
+    large, downgraded as a stream (OpenAPI 3.1) instead of being read into memory.
+
+    Parameters
+    ----------
+    spec : bytes | str | Path | dict[str, Json]
+        Content of the spec file, parsed spec or spec file.
+    spec_format : SpecFormats
+        Format of the spec content.
+    spec_file : Path
+        File to write.
+    entry : str | None
+        Path of the root spec inside of a zip archive.
+    prune_unused : bool
+        Whether to drop unused components.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
+    """
+    if isinstance(spec, Path):
+        unchanged = spec_format == "json" and not has_preprocessing(
+            prune_unused=prune_unused, operation_filter=operation_filter
+        )
+        version = (sniff_openapi_version(spec) if unchanged else None) or ""
+        if version.startswith("3.0"):
+            shutil.copyfile(spec, spec_file)
+            return
+        if version.startswith("3.1") and spec.stat().st_size >= STREAMING_MIN_SIZE:
+            stream_openapi_3_dot_0_json(spec, spec_file)
+            return
+        spec = spec.read_bytes()
+    spec_file.write_bytes(
+        _spec_file_content(
+            spec,
+            spec_format,
+            entry=entry,
+            prune_unused=prune_unused,
+            operation_filter=operation_filter,
+        )
+    )
+
+
+def _output_path(
+    output_dir: Path,
+    name: str,
+    modes: list[OpenapiToPlantumlModes],
+    diagram_formats: list[OpenapiToPlantumlFormats],
+) -> Path:
+    """Output location inside of ``output_dir`` for the requested modes and formats.
+
+    Parameters
+    ----------
+    output_dir : Path
+        Folder to write the diagrams to.
+    name : str
+        Name of the spec, used as file name in ``single`` mode.
+    modes : list[OpenapiToPlantumlModes]
+        Requested modes.
+    diagram_formats : list[OpenapiToPlantumlFormats]
+        Requested diagram formats.
+
+    Returns
+    -------
+    Path
+        File if only ``single`` mode is requested, else ``output_dir``.
+    """
+    if modes == ["single"] and len(diagram_formats) > 0:
+        return output_dir / f"{name}.{diagram_formats[0]}"
+    return output_dir
+
+
+def _read_outputs(results: dict[RenderTarget, list[Path]], output_dir: Path) -> dict[str, bytes]:
+    """Read rendered files into memory.
+
+    Parameters
+    ----------
+    results : dict[RenderTarget, list[Path]]
+        Created output files per mode and format.
+    output_dir : Path
+        Folder the returned names are relative to.
+
+    Returns
+    -------
+    dict[str, bytes]
+        Content of the files by their posix path relative to ``output_dir``.
+    """
+    return {
+        file.relative_to(output_dir).as_posix(): file.read_bytes()
+        for files in results.values()
+        for file in files
+    }
+
+
+def render_openapi_to_plantuml(
+    spec: bytes | str | Path | dict[str, Json],
+    modes: Iterable[OpenapiToPlantumlModes],
+    diagram_formats: Iterable[OpenapiToPlantumlFormats],
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    *,
+    spec_format: SpecFormats = "json",
+    entry: str | None = None,
+    name: str = "openapi_spec",
+    worker_pool: JvmWorkerPool | None = None,
+    render_cache: RenderCache | None = None,
+    jvm_profile: JvmProfiles = "default",
+    limits: ProcessLimits | None = None,
+    scratch_dir: Path | None = None,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+) -> dict[str, bytes]:
+    """Render diagrams of a spec held in memory.
+
+    The returned names follow the layout of :func:`run_openapi_to_plantuml_multi`, e.g.
+    ``<name>.<format>`` for ``single`` mode and ``single/<name>.<format>`` plus ``split/...``
+    with both modes.
+
+    Parameters
+    ----------
+    spec : bytes | str | Path | dict[str, Json]
+        Content of a JSON or YAML spec file, zip archive of a spec split over several files,
+        already parsed spec or file containing one of the former. Parsed openapi 3.1 specs are
+        downgraded in place.
+    modes : Iterable[OpenapiToPlantumlModes]
+        Modes to run
+    diagram_formats : Iterable[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    spec_format : SpecFormats
+        Format of the spec content, ignored for parsed specs. Defaults to "json"
+    entry : str | None
+        Path of the root spec inside of a zip archive, see :func:`bundle_openapi_archive`.
+        Defaults to None which uses the only spec file with an ``openapi`` key.
+    name : str
+        Name of the spec without suffix, used for the file names of ``single`` mode.
+        Defaults to "openapi_spec"
+    worker_pool : JvmWorkerPool | None
+        Pool of warm JVM workers to run the conversions in. Defaults to None
+    render_cache : RenderCache | None
+        Cache to look up previous renders of the same spec in. Defaults to None
+    jvm_profile : JvmProfiles
+        Launch profile of one-shot JVMs, see ``JVM_LAUNCH_PROFILES``. Defaults to "default"
+    limits : ProcessLimits | None
+        Resource limits of one-shot JVMs. Defaults to None which sets no limits.
+    scratch_dir : Path | None
+        Folder for the files the JVM reads and writes. Defaults to None which uses
+        :func:`default_scratch_dir`.
+    prune_unused : bool
+        Whether to drop components which are not referenced from the rest of the spec before
+        rendering. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render, together with the components they
+        reference. Defaults to None which renders all operations.
+
+    Returns
+    -------
+    dict[str, bytes]
+        Content of the rendered files by their relative posix path.
+    """
+    modes = list(dict.fromkeys(modes))
+    diagram_formats = list(dict.fromkeys(diagram_formats))
+    scratch_dir = default_scratch_dir() if scratch_dir is None else scratch_dir
+    with TemporaryDirectory(dir=scratch_dir, prefix="openapi-diagram-") as tmp_dir:
+        spec_file = Path(tmp_dir) / f"{name}.json"
+        _write_spec_file(
+            spec,
+            spec_format,
+            spec_file,
+            entry=entry,
+            prune_unused=prune_unused,
+            operation_filter=operation_filter,
+        )
+        output_dir = Path(tmp_dir) / "output"
+        results = run_openapi_to_plantuml_multi(
+            spec_file,
+            _output_path(output_dir, name, modes, diagram_formats),
+            modes,
+            diagram_formats,
+            version,
+            worker_pool=worker_pool,
+            render_cache=render_cache,
+            jvm_profile=jvm_profile,
+            limits=limits,
+            # The spec content has no location to resolve references to other files against
+            bundle_references=False,
+        )
+        return _read_outputs(results, output_dir)
+
+
+async def arender_openapi_to_plantuml(
+    spec: bytes | str | Path | dict[str, Json],
+    modes: Iterable[OpenapiToPlantumlModes],
+    diagram_formats: Iterable[OpenapiToPlantumlFormats],
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    *,
+    spec_format: SpecFormats = "json",
+    entry: str | None = None,
+    name: str = "openapi_spec",
+    worker_pool: JvmWorkerPool | None = None,
+    render_cache: RenderCache | None = None,
+    jvm_profile: JvmProfiles = "default",
+    limits: ProcessLimits | None = None,
+    scratch_dir: Path | None = None,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+) -> dict[str, bytes]:
+    """Render diagrams of a spec held in memory without blocking.
+
+    Async version of :func:`render_openapi_to_plantuml`, using
+    :func:`arun_openapi_to_plantuml_multi` and running file system work in worker threads.
+
+    Parameters
+    ----------
+    spec : bytes | str | Path | dict[str, Json]
+        Content of a JSON or YAML spec file, zip archive of a spec split over several files,
+        already parsed spec or file containing one of the former. Parsed openapi 3.1 specs are
+        downgraded in place.
+    modes : Iterable[OpenapiToPlantumlModes]
+        Modes to run
+    diagram_formats : Iterable[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    spec_format : SpecFormats
+        Format of the spec content, ignored for parsed specs. Defaults to "json"
+    entry : str | None
+        Path of the root spec inside of a zip archive, see :func:`bundle_openapi_archive`.
+        Defaults to None which uses the only spec file with an ``openapi`` key.
+    name : str
+        Name of the spec without suffix, used for the file names of ``single`` mode.
+        Defaults to "openapi_spec"
+    worker_pool : JvmWorkerPool | None
+        Pool of warm JVM workers to run the conversions in. Defaults to None
+    render_cache : RenderCache | None
+        Cache to look up previous renders of the same spec in. Defaults to None
+    jvm_profile : JvmProfiles
+        Launch profile of one-shot JVMs, see ``JVM_LAUNCH_PROFILES``. Defaults to "default"
+    limits : ProcessLimits | None
+        Resource limits of one-shot JVMs. Defaults to None which sets no limits.
+    scratch_dir : Path | None
+        Folder for the files the JVM reads and writes. Defaults to None which uses
+        :func:`default_scratch_dir`.
+    prune_unused : bool
+        Whether to drop components which are not referenced from the rest of the spec before
+        rendering. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render, together with the components they
+        reference. Defaults to None which renders all operations.
+
+    Returns
+    -------
+    dict[str, bytes]
+        Content of the rendered files by their relative posix path.
+    """
+    modes = list(dict.fromkeys(modes))
+    diagram_formats = list(dict.fromkeys(diagram_formats))
+    scratch_dir = default_scratch_dir() if scratch_dir is None else scratch_dir
+    tmp_dir = Path(await asyncio.to_thread(mkdtemp, dir=scratch_dir, prefix="openapi-diagram-"))
+    try:
+        spec_file = tmp_dir / f"{name}.json"
+        await asyncio.to_thread(
+            _write_spec_file,
+            spec,
+            spec_format,
+            spec_file,
+            entry=entry,
+            prune_unused=prune_unused,
+            operation_filter=operation_filter,
+        )
+        output_dir = tmp_dir / "output"
+        results = await arun_openapi_to_plantuml_multi(
+            spec_file,
+            _output_path(output_dir, name, modes, diagram_formats),
+            modes,
+            diagram_formats,
+            version,
+            worker_pool=worker_pool,
+            render_cache=render_cache,
+            jvm_profile=jvm_profile,
+            limits=limits,
+            # The spec content has no location to resolve references to other files against
+            bundle_references=False,
+        )
+        return await asyncio.to_thread(_read_outputs, results, output_dir)
+    finally:
+        await asyncio.to_thread(shutil.rmtree, tmp_dir, ignore_errors=True)
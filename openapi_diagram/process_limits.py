@@ -0,0 +1,305 @@
+"""Resource limits for one-shot ``openapi-to-plantuml`` processes.
+
+A pathological spec can keep the converter busy for a long time and grow the JVM heap
+without bounds. :class:`ProcessLimits` bounds wall-clock time, heap size (``-Xmx``), CPU
+time (``RLIMIT_CPU``) and the size of the written output. Processes run in their own session,
+so the whole process tree (e.g. ``dot`` processes started by PlantUML) is killed once a limit
+is exceeded, and a :class:`ProcessLimitError` subclass is raised.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic import Field
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+POSIX = sys.platform != "win32"
+LIMIT_POLL_INTERVAL = 0.1
+"""Seconds between checks of the wall-clock time and output size of a running process."""
+JVM_OUT_OF_MEMORY_EXIT_CODE = 3
+"""Exit code of the JVM with ``-XX:+ExitOnOutOfMemoryError``."""
+
+
+class ProcessLimitError(RuntimeError):
+    """Error thrown when a process exceeded one of its :class:`ProcessLimits`."""
+
+
+class ProcessTimeoutError(ProcessLimitError):
+    """Error thrown when a process exceeded its wall-clock time limit."""
+
+
+class CpuTimeLimitError(ProcessLimitError):
+    """Error thrown when a process exceeded its CPU time limit."""
+
+
+class HeapLimitError(ProcessLimitError):
+    """Error thrown when the JVM ran out of its maximum heap."""
+
+
+class OutputSizeLimitError(ProcessLimitError):
+    """Error thrown when a process wrote more output than allowed."""
+
+
+class ProcessLimits(BaseModel):
+    """Limits of a one-shot ``openapi-to-plantuml`` process, None disables a limit."""
+
+    timeout: float | None = Field(default=None, gt=0)
+    """Wall-clock seconds the process may run."""
+    max_heap: str | None = Field(default=None, pattern=r"^\d+[kKmMgG]?$")
+    """Maximum JVM heap size in ``-Xmx`` notation (e.g. ``'512m'``)."""
+    cpu_time: int | None = Field(default=None, gt=0)
+    """CPU seconds the process may use, only enforced on POSIX systems."""
+    max_output_size: int | None = Field(default=None, gt=0)
+    """Bytes the process may write to its output file or folder."""
+
+    def jvm_options(self) -> list[str]:
+        """JVM options enforcing the heap limit.
+
+        Returns
+        -------
+        list[str]
+        """
+        if self.max_heap is None:
+            return []
+        # Fail fast with a known exit code instead of thrashing the GC
+        return [f"-Xmx{self.max_heap}", "-XX:+ExitOnOutOfMemoryError"]
+
+
+def _limited_command(command: list[str], limits: ProcessLimits) -> list[str]:
+    """Command starting ``command`` with ``RLIMIT_CPU`` set.
+
+    The limit is set by a shell which replaces itself with ``command``, since setting it in a
+    ``preexec_fn`` is not safe in processes with threads (e.g. the server).
+
+    Parameters
+    ----------
+    command : list[str]
+        Command to run.
+    limits : ProcessLimits
+        Limits of the process.
+
+    Returns
+    -------
+    list[str]
+        ``command`` itself if there is no CPU time limit or it can not be enforced on this
+        platform.
+    """
+    if limits.cpu_time is None or POSIX is False:
+        return command
+    # SIGXCPU at the soft limit, SIGKILL at the hard limit if SIGXCPU is handled
+    # The soft limit is lowered first, dash refuses a hard limit below the soft limit
+    soft, hard = limits.cpu_time, limits.cpu_time + 5
+    script = f'ulimit -St {soft} && ulimit -Ht {hard} && exec "$@"'
+    return ["/bin/sh", "-c", script, "sh", *command]
+
+
+def _popen_kwargs() -> dict[str, Any]:
+    """Keyword arguments to start a process in its own session.
+
+    Returns
+    -------
+    dict[str, Any]
+    """
+    if POSIX is False:
+        return {}
+    return {"start_new_session": True}
+
+
+def _kill_process_tree(pid: int) -> None:
+    """Kill process ``pid`` and all processes of its session.
+
+    Parameters
+    ----------
+    pid : int
+        Process id of the session leader started with ``start_new_session=True``.
+    """
+    try:
+        if POSIX is True:
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+def output_size(output_path: Path) -> int:
+    """Size in bytes of the output file or all files inside of the output folder.
+
+    Parameters
+    ----------
+    output_path : Path
+        Output file or folder.
+
+    Returns
+    -------
+    int
+    """
+    try:
+        if output_path.is_dir():
+            return sum(file.stat().st_size for file in output_path.rglob("*") if file.is_file())
+        if output_path.is_file():
+            return output_path.stat().st_size
+    # Files can be replaced while the converter is writing them
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def _check_running(
+    limits: ProcessLimits, output_path: Path, start: float, command: list[str]
+) -> ProcessLimitError | None:
+    """Check wall-clock time and output size of a running process.
+
+    Parameters
+    ----------
+    limits : ProcessLimits
+        Limits of the process.
+    output_path : Path
+        Output file or folder of the process.
+    start : float
+        ``time.monotonic()`` when the process was started.
+    command : list[str]
+        Command of the process.
+
+    Returns
+    -------
+    ProcessLimitError | None
+        Error for the exceeded limit or None.
+    """
+    if limits.timeout is not None and time.monotonic() - start > limits.timeout:
+        msg = f"Process {command[0]!r} exceeded its time limit of {limits.timeout}s."
+        return ProcessTimeoutError(msg)
+    if limits.max_output_size is not None and output_size(output_path) > limits.max_output_size:
+        msg = (
+            f"Process {command[0]!r} exceeded its output size limit of "
+            f"{limits.max_output_size} bytes."
+        )
+        return OutputSizeLimitError(msg)
+    return None
+
+
+def _check_exited(
+    return_code: int, limits: ProcessLimits, command: list[str]
+) -> ProcessLimitError | subprocess.CalledProcessError | None:
+    """Map the exit code of a process to the limit it exceeded.
+
+    Parameters
+    ----------
+    return_code : int
+        Exit code of the process.
+    limits : ProcessLimits
+        Limits of the process.
+    command : list[str]
+        Command of the process.
+
+    Returns
+    -------
+    ProcessLimitError | subprocess.CalledProcessError | None
+        Error for the exit code or None if the process succeeded.
+    """
+    if return_code == 0:
+        return None
+    if limits.cpu_time is not None and POSIX is True:
+        cpu_signals = (-signal.SIGXCPU, -signal.SIGKILL)
+        if return_code in cpu_signals:
+            msg = f"Process {command[0]!r} exceeded its CPU time limit of {limits.cpu_time}s."
+            return CpuTimeLimitError(msg)
+    if limits.max_heap is not None and return_code == JVM_OUT_OF_MEMORY_EXIT_CODE:
+        msg = f"Process {command[0]!r} exceeded its heap limit of {limits.max_heap}."
+        return HeapLimitError(msg)
+    return subprocess.CalledProcessError(return_code, command)
+
+
+def run_limited(command: list[str], limits: ProcessLimits, output_path: Path) -> None:
+    """Run ``command`` and kill its process tree once it exceeds ``limits``.
+
+    Parameters
+    ----------
+    command : list[str]
+        Command to run.
+    limits : ProcessLimits
+        Limits of the process.
+    output_path : Path
+        Output file or folder the process writes to.
+
+    Raises
+    ------
+    ProcessLimitError
+        If the process exceeded one of its limits.
+    CalledProcessError
+        If the process failed for any other reason.
+    """
+    process = subprocess.Popen(_limited_command(command, limits), **_popen_kwargs())
+    start = time.monotonic()
+    try:
+        while True:
+            try:
+                return_code = process.wait(timeout=LIMIT_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                error = _check_running(limits, output_path, start, command)
+                if error is not None:
+                    raise error from None
+    except BaseException:
+        # Also covers KeyboardInterrupt, since the session does not receive the SIGINT
+        _kill_process_tree(process.pid)
+        process.wait()
+        raise
+    exit_error = _check_exited(return_code, limits, command)
+    if exit_error is not None:
+        raise exit_error
+
+
+async def arun_limited(command: list[str], limits: ProcessLimits, output_path: Path) -> None:
+    """Run ``command`` as asyncio subprocess and kill its process tree once it exceeds ``limits``.
+
+    Parameters
+    ----------
+    command : list[str]
+        Command to run.
+    limits : ProcessLimits
+        Limits of the process.
+    output_path : Path
+        Output file or folder the process writes to.
+
+    Raises
+    ------
+    ProcessLimitError
+        If the process exceeded one of its limits.
+    CalledProcessError
+        If the process failed for any other reason.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *_limited_command(command, limits), **_popen_kwargs()
+    )
+    start = time.monotonic()
+    try:
+        while True:
+            try:
+                return_code = await asyncio.wait_for(process.wait(), LIMIT_POLL_INTERVAL)
+                break
+            except TimeoutError:
+                error = await asyncio.to_thread(
+                    _check_running, limits, output_path, start, command
+                )
+                if error is not None:
+                    raise error from None
+    except BaseException:
+        # Also covers cancellation, e.g. by the render timeout of the server
+        _kill_process_tree(process.pid)
+        await process.wait()
+        raise
+    exit_error = _check_exited(return_code, limits, command)
+    if exit_error is not None:
+        raise exit_error
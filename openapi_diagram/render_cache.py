@@ -0,0 +1,241 @@
+"""Content addressed cache of rendered diagrams inside of ``CACHE_DIR``.
+
+Cache entries are folders named after the canonical spec hash (see
+:func:`openapi_diagram.utils.canonical_spec_hash`), mode, diagram format and
+``openapi-to-plantuml`` version, containing the rendered files. The modification time of an
+entry folder is updated on each hit and used for least recently used eviction once the total
+size of the cache exceeds ``max_size``.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+
+from openapi_diagram import CACHE_DIR
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+RENDER_CACHE_DEFAULT_MAX_SIZE = 512 * 1024**2
+"""Default maximum size of the render cache in bytes (512 MiB)."""
+
+
+def default_render_cache_dir() -> Path:
+    """Get default folder of the render cache.
+
+    Returns
+    -------
+    Path
+    """
+    return CACHE_DIR / "renders"
+
+
+class RenderCacheEntry(NamedTuple):
+    """Information about a single render cache entry."""
+
+    key: str
+    path: Path
+    size: int
+    last_used: float
+
+
+def _folder_size(folder: Path) -> int:
+    """Total size of all files in ``folder``.
+
+    Parameters
+    ----------
+    folder : Path
+        Folder to get the size of.
+
+    Returns
+    -------
+    int
+        Size in bytes.
+    """
+    return sum(file.stat().st_size for file in folder.rglob("*") if file.is_file())
+
+
+class RenderCache:
+    """Size bounded LRU cache of rendered diagrams."""
+
+    def __init__(
+        self, cache_dir: Path | None = None, max_size: int = RENDER_CACHE_DEFAULT_MAX_SIZE
+    ) -> None:
+        """Create cache, the folder is created on first write.
+
+        Parameters
+        ----------
+        cache_dir : Path | None
+            Folder to store the rendered files in. Defaults to None which uses
+            ``CACHE_DIR / "renders"``.
+        max_size : int
+            Maximum total size of all cached files in bytes. Defaults to 512 MiB
+        """
+        self.cache_dir = default_render_cache_dir() if cache_dir is None else cache_dir
+        self.max_size = max_size
+
+    @staticmethod
+    def key(spec_hash: str, mode: str, diagram_format: str, version: str) -> str:
+        """Create cache key for a render.
+
+        Parameters
+        ----------
+        spec_hash : str
+            Canonical hash of the parsed spec.
+        mode : str
+            Mode ``openapi-to-plantuml`` runs in.
+        diagram_format : str
+            Format of the diagram/-s.
+        version : str
+            Version of ``openapi-to-plantuml``.
+
+        Returns
+        -------
+        str
+        """
+        return f"{spec_hash}_{mode}_{diagram_format}_{version}"
+
+    def get(self, key: str) -> list[Path] | None:
+        """Get cached files and mark the entry as recently used.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        list[Path] | None
+            Cached files or None if ``key`` is not cached.
+        """
+        entry_dir = self.cache_dir / key
+        try:
+            os.utime(entry_dir)
+        except FileNotFoundError:
+            return None
+        return sorted(file for file in entry_dir.iterdir() if file.is_file())
+
+    def restore(self, key: str, output_path: Path, mode: str) -> bool:
+        """Copy cached files to ``output_path``.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        output_path : Path
+            File (``mode='single'``) or folder (``mode='split'``) to write the output to.
+        mode : str
+            Mode ``openapi-to-plantuml`` runs in.
+
+        Returns
+        -------
+        bool
+            Whether ``key`` was cached.
+        """
+        cached_files = self.get(key)
+        if not cached_files:
+            return False
+        if mode == "single":
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cached_files[0], output_path)
+        else:
+            output_path.mkdir(parents=True, exist_ok=True)
+            for cached_file in cached_files:
+                shutil.copyfile(cached_file, output_path / cached_file.name)
+        return True
+
+    def put(self, key: str, files: Iterable[Path]) -> None:
+        """Add rendered files to the cache and evict least recently used entries.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        files : Iterable[Path]
+            Rendered files.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(mkdtemp(prefix=".tmp-", dir=self.cache_dir))
+        for file in files:
+            shutil.copyfile(file, tmp_dir / file.name)
+        try:
+            # Atomic so concurrent readers never see partially written entries.
+            tmp_dir.rename(self.cache_dir / key)
+        except OSError:
+            # Another process cached the same render in the meantime.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+
+    def entries(self) -> list[RenderCacheEntry]:
+        """All cache entries, least recently used first.
+
+        Returns
+        -------
+        list[RenderCacheEntry]
+        """
+        if self.cache_dir.is_dir() is False:
+            return []
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.is_dir() is False or entry_dir.name.startswith(".tmp-"):
+                continue
+            try:
+                entries.append(
+                    RenderCacheEntry(
+                        key=entry_dir.name,
+                        path=entry_dir,
+                        size=_folder_size(entry_dir),
+                        last_used=entry_dir.stat().st_mtime,
+                    )
+                )
+            except FileNotFoundError:
+                # Entry was evicted concurrently
+                continue
+        return sorted(entries, key=lambda entry: entry.last_used)
+
+    def size(self) -> int:
+        """Total size of all cached files.
+
+        Returns
+        -------
+        int
+            Size in bytes.
+        """
+        return sum(entry.size for entry in self.entries())
+
+    def evict(self) -> list[RenderCacheEntry]:
+        """Remove least recently used entries until the cache fits into ``max_size``.
+
+        Returns
+        -------
+        list[RenderCacheEntry]
+            Removed entries.
+        """
+        entries = self.entries()
+        total_size = sum(entry.size for entry in entries)
+        evicted = []
+        for entry in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry.path, ignore_errors=True)
+            total_size -= entry.size
+            evicted.append(entry)
+        return evicted
+
+    def clear(self) -> list[RenderCacheEntry]:
+        """Remove all entries.
+
+        Returns
+        -------
+        list[RenderCacheEntry]
+            Removed entries.
+        """
+        entries = self.entries()
+        for entry in entries:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        return entries
@@ -0,0 +1,258 @@
+"""Pluggable JSON and YAML backends used to load and write specs.
+
+The fastest available backend is used automatically: ``orjson`` (``pip install
+openapi-diagram[fast]``) for JSON and ``CSafeLoader`` if PyYAML was built with libyaml. The
+pure Python implementations are the fallback. Backends can be forced with the
+``OPENAPI_DIAGRAM__JSON_BACKEND`` and ``OPENAPI_DIAGRAM__YAML_BACKEND`` environment
+variables or replaced with :func:`register_json_backend` and :func:`register_yaml_backend`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import date
+from datetime import datetime
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import NamedTuple
+
+import yaml
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+JSON_BACKEND_ENV_VAR = "OPENAPI_DIAGRAM__JSON_BACKEND"
+YAML_BACKEND_ENV_VAR = "OPENAPI_DIAGRAM__YAML_BACKEND"
+
+
+class JsonBackend(NamedTuple):
+    """Functions to parse and serialize JSON."""
+
+    name: str
+    loads: Callable[[bytes | str], Any]
+    dumps: Callable[[Any], bytes]
+    """Serialize to compact UTF-8 encoded JSON."""
+
+
+class YamlBackend(NamedTuple):
+    """Function to parse YAML."""
+
+    name: str
+    loads: Callable[[bytes | str], Any]
+
+
+def json_default(value: object) -> str:
+    """Serialize values YAML parses, but JSON does not support (e.g. dates).
+
+    Parameters
+    ----------
+    value : object
+        Value the JSON encoder could not serialize.
+
+    Returns
+    -------
+    str
+
+    Raises
+    ------
+    TypeError
+        If the value is not supported either.
+    """
+    if isinstance(value, date | datetime):
+        return value.isoformat()
+    msg = f"Object of type {type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+def _stdlib_json_dumps(data: Any) -> bytes:
+    """Serialize ``data`` with the stdlib ``json`` module.
+
+    Parameters
+    ----------
+    data : Any
+        Data to serialize.
+
+    Returns
+    -------
+    bytes
+    """
+    return json.dumps(
+        data, separators=(",", ":"), ensure_ascii=False, default=json_default
+    ).encode()
+
+
+def _available_json_backends() -> dict[str, JsonBackend]:
+    """JSON backends which can be imported, fastest first.
+
+    Returns
+    -------
+    dict[str, JsonBackend]
+    """
+    backends = {}
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        # YAML specs often have integer keys (e.g. unquoted response codes)
+        options = orjson.OPT_NON_STR_KEYS
+
+        def orjson_dumps(data: Any) -> bytes:
+            return orjson.dumps(data, option=options)
+
+        backends["orjson"] = JsonBackend("orjson", orjson.loads, orjson_dumps)
+    backends["json"] = JsonBackend("json", json.loads, _stdlib_json_dumps)
+    return backends
+
+
+def _available_yaml_backends() -> dict[str, YamlBackend]:
+    """YAML backends which can be imported, fastest first.
+
+    Returns
+    -------
+    dict[str, YamlBackend]
+    """
+    backends = {}
+    if yaml.__with_libyaml__ is True:
+        backends["libyaml"] = YamlBackend(
+            "libyaml", lambda data: yaml.load(data, Loader=yaml.CSafeLoader)
+        )
+    backends["pyyaml"] = YamlBackend("pyyaml", yaml.safe_load)
+    return backends
+
+
+JSON_BACKENDS = _available_json_backends()
+"""Available JSON backends by name, in order of preference."""
+YAML_BACKENDS = _available_yaml_backends()
+"""Available YAML backends by name, in order of preference."""
+
+
+def register_json_backend(
+    name: str, loads: Callable[[bytes | str], Any], dumps: Callable[[Any], bytes]
+) -> None:
+    """Register a JSON backend and prefer it over the existing ones.
+
+    Parameters
+    ----------
+    name : str
+        Name of the backend, used to select it via ``OPENAPI_DIAGRAM__JSON_BACKEND``.
+    loads : Callable[[bytes | str], Any]
+        Function parsing JSON.
+    dumps : Callable[[Any], bytes]
+        Function serializing to compact UTF-8 encoded JSON.
+    """
+    JSON_BACKENDS.pop(name, None)
+    backends = {name: JsonBackend(name, loads, dumps), **JSON_BACKENDS}
+    JSON_BACKENDS.clear()
+    JSON_BACKENDS.update(backends)
+
+
+def register_yaml_backend(name: str, loads: Callable[[bytes | str], Any]) -> None:
+    """Register a YAML backend and prefer it over the existing ones.
+
+    Parameters
+    ----------
+    name : str
+        Name of the backend, used to select it via ``OPENAPI_DIAGRAM__YAML_BACKEND``.
+    loads : Callable[[bytes | str], Any]
+        Function parsing YAML.
+    """
+    YAML_BACKENDS.pop(name, None)
+    backends = {name: YamlBackend(name, loads), **YAML_BACKENDS}
+    YAML_BACKENDS.clear()
+    YAML_BACKENDS.update(backends)
+
+
+def _select_backend(backends: dict[str, Any], env_var: str) -> Any:
+    """Select backend named in ``env_var`` or the preferred one.
+
+    Parameters
+    ----------
+    backends : dict[str, Any]
+        Available backends, in order of preference.
+    env_var : str
+        Environment variable to read the backend name from.
+
+    Returns
+    -------
+    Any
+        Selected backend.
+
+    Raises
+    ------
+    ValueError
+        If the backend named in ``env_var`` is not available.
+    """
+    name = os.getenv(env_var)
+    if not name:
+        return next(iter(backends.values()))
+    if name not in backends:
+        msg = f"{env_var}={name!r} is not available, available backends: {list(backends)}."
+        raise ValueError(msg)
+    return backends[name]
+
+
+def get_json_backend() -> JsonBackend:
+    """Get the JSON backend to use.
+
+    Returns
+    -------
+    JsonBackend
+    """
+    return _select_backend(JSON_BACKENDS, JSON_BACKEND_ENV_VAR)
+
+
+def get_yaml_backend() -> YamlBackend:
+    """Get the YAML backend to use.
+
+    Returns
+    -------
+    YamlBackend
+    """
+    return _select_backend(YAML_BACKENDS, YAML_BACKEND_ENV_VAR)
+
+
+def loads_json(data: bytes | str) -> Any:
+    """Parse JSON with the selected backend.
+
+    Parameters
+    ----------
+    data : bytes | str
+        JSON document.
+
+    Returns
+    -------
+    Any
+    """
+    return get_json_backend().loads(data)
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize ``data`` to compact UTF-8 encoded JSON with the selected backend.
+
+    Parameters
+    ----------
+    data : Any
+        Data to serialize.
+
+    Returns
+    -------
+    bytes
+    """
+    return get_json_backend().dumps(data)
+
+
+def loads_yaml(data: bytes | str) -> Any:
+    """Parse YAML with the selected backend.
+
+    Parameters
+    ----------
+    data : bytes | str
+        YAML document.
+
+    Returns
+    -------
+    Any
+    """
+    return get_yaml_backend().loads(data)
@@ -2,51 +2,693 @@
 
 from __future__ import annotations
 
-from io import BytesIO
+import asyncio
+import hashlib
+import secrets
+from contextlib import asynccontextmanager
+from datetime import UTC
+from datetime import datetime
+from functools import cache
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from zipfile import ZIP_DEFLATED
-from zipfile import ZipFile
+from typing import TYPE_CHECKING
+from typing import Annotated
 
+from fastapi import Depends
 from fastapi import FastAPI
+from fastapi import Header
+from fastapi import HTTPException
+from fastapi import Query
+from fastapi import Request
+from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from fastapi.responses import StreamingResponse
 
-from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
-from openapi_diagram.server.models.request_models import CreateDiagram  # noqa: TCH001
+from openapi_diagram.bundle import BundleError
+from openapi_diagram.jvm_worker import JvmWorkerPool
+from openapi_diagram.pipeline import arender_openapi_to_plantuml
+from openapi_diagram.process_limits import ProcessLimitError
+from openapi_diagram.process_limits import ProcessLimits
+from openapi_diagram.process_limits import ProcessTimeoutError
+from openapi_diagram.render_cache import RenderCache
+from openapi_diagram.server.archive import iter_zip
+from openapi_diagram.server.conditional import DIAGRAM_MEDIA_TYPES
+from openapi_diagram.server.conditional import ZIP_MEDIA_TYPE
+from openapi_diagram.server.conditional import RangeNotSatisfiableError
+from openapi_diagram.server.conditional import diagram_etag
+from openapi_diagram.server.conditional import etag_matches
+from openapi_diagram.server.conditional import requested_range
+from openapi_diagram.server.jobs import JobManager
+from openapi_diagram.server.models.request_models import CreateDiagram
+from openapi_diagram.server.models.request_models import UploadQuery
+from openapi_diagram.server.models.request_models import spec_file_format
+from openapi_diagram.server.models.request_models import validate_spec_file_name
+from openapi_diagram.server.models.response_models import JobInfo
+from openapi_diagram.server.models.response_models import PurgeInfo
+from openapi_diagram.server.models.response_models import ResultCacheEntryInfo
+from openapi_diagram.server.models.response_models import ResultCacheInfo
+from openapi_diagram.server.result_cache import ResultCache
+from openapi_diagram.server.result_cache import result_spec_hash
+from openapi_diagram.server.scheduler import RenderScheduler
+from openapi_diagram.server.scheduler import SchedulerError
+from openapi_diagram.server.settings import get_settings
+from openapi_diagram.server.uploads import SpooledUpload
+from openapi_diagram.server.uploads import UploadError
+from openapi_diagram.server.uploads import receive_upload
 
-app = FastAPI()
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
 
+    from openapi_diagram.filters import OperationFilter
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
 
-@app.post("/api/v1/create-diagrams")
-async def create_diagrams(create_data: CreateDiagram):
-    """Create openapi diagram/-s and return a zip file."""
-    buffer = BytesIO()
-    with (
-        ZipFile(buffer, "a", ZIP_DEFLATED) as zipfile,
-        TemporaryDirectory(prefix="openapi-diagram") as tmp_dir,
-    ):
-        output_path = Path(tmp_dir) / "output"
-        if create_data.mode == "single":
-            output_path = (
-                output_path / f"{create_data.file_name.stem}.{create_data.diagram_format}"
-            )
-        spec_file = Path(tmp_dir) / create_data.file_name
-        spec_file.write_text(create_data.file_content)
-        files = run_openapi_to_plantuml(
-            openapi_spec=spec_file,
-            output_path=output_path,
-            mode=create_data.mode,
-            diagram_format=create_data.diagram_format,
+_worker_pool: JvmWorkerPool | None = None
+_job_manager: JobManager | None = None
+
+
+def get_worker_pool() -> JvmWorkerPool | None:
+    """Get the shared JVM worker pool, creating it on first use.
+
+    Returns
+    -------
+    JvmWorkerPool | None
+        Worker pool or None if workers are disabled (``worker_pool_size=0``).
+    """
+    global _worker_pool
+    settings = get_settings()
+    if _worker_pool is None and settings.worker_pool_size > 0:
+        _worker_pool = JvmWorkerPool(
+            settings.worker_pool_size,
+            max_jobs=settings.worker_max_jobs,
+            health_check_interval=settings.worker_health_check_interval,
+        )
+    return _worker_pool
+
+
+def get_render_cache() -> RenderCache | None:
+    """Get the render cache if it is enabled.
+
+    Returns
+    -------
+    RenderCache | None
+    """
+    settings = get_settings()
+    if settings.render_cache is False:
+        return None
+    return RenderCache(max_size=settings.render_cache_max_size)
+
+
+@cache
+def get_result_cache() -> ResultCache | None:
+    """Get the shared result cache if it is enabled.
+
+    Returns
+    -------
+    ResultCache | None
+    """
+    settings = get_settings()
+    if settings.result_cache is False:
+        return None
+    return ResultCache(
+        settings.result_cache_dir,
+        memory_max_size=settings.result_cache_memory_size,
+        disk_max_size=settings.result_cache_disk_size,
+        ttl=settings.result_cache_ttl,
+    )
+
+
+@cache
+def get_process_limits() -> ProcessLimits:
+    """Get resource limits of one-shot JVMs.
+
+    Returns
+    -------
+    ProcessLimits
+    """
+    settings = get_settings()
+    return ProcessLimits(
+        timeout=settings.render_timeout,
+        max_heap=settings.render_max_heap,
+        cpu_time=settings.render_cpu_time,
+        max_output_size=settings.render_max_output_size,
+    )
+
+
+def get_job_manager() -> JobManager:
+    """Get the shared manager of asynchronous render jobs, creating it on first use.
+
+    Returns
+    -------
+    JobManager
+    """
+    global _job_manager
+    if _job_manager is None:
+        settings = get_settings()
+        _job_manager = JobManager(
+            jobs_dir=settings.jobs_dir,
+            max_workers=settings.job_workers,
+            max_queued=settings.max_queued_jobs,
+            result_ttl=settings.job_result_ttl,
+            worker_pool=get_worker_pool(),
+            render_cache=get_render_cache(),
+            jvm_profile=settings.jvm_profile,
+            limits=get_process_limits(),
+        )
+    return _job_manager
+
+
+@cache
+def get_render_scheduler() -> RenderScheduler:
+    """Get the shared scheduler limiting concurrent and queued renders.
+
+    Returns
+    -------
+    RenderScheduler
+    """
+    settings = get_settings()
+    return RenderScheduler(
+        max_concurrency=settings.max_concurrent_renders,
+        max_queue_size=settings.max_queued_renders,
+        queue_timeout=settings.render_queue_timeout,
+        run_timeout=settings.render_timeout,
+    )
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
+    """Stop asynchronous jobs and JVM workers on shutdown.
+
+    Parameters
+    ----------
+    _app : FastAPI
+        Application instance.
+
+    Yields
+    ------
+    None
+    """
+    global _worker_pool, _job_manager
+    yield
+    if _job_manager is not None:
+        _job_manager.shutdown()
+        _job_manager = None
+    if _worker_pool is not None:
+        _worker_pool.close()
+        _worker_pool = None
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.exception_handler(SchedulerError)
+async def scheduler_error_handler(_request: Request, error: SchedulerError) -> JSONResponse:
+    """Reject requests the scheduler can not handle in time, telling clients when to retry.
+
+    Parameters
+    ----------
+    _request : Request
+        Rejected request.
+    error : SchedulerError
+        Error raised by the scheduler.
+
+    Returns
+    -------
+    JSONResponse
+    """
+    return JSONResponse(
+        {"detail": str(error)},
+        status_code=error.status_code,
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+@app.exception_handler(ProcessLimitError)
+async def process_limit_error_handler(_request: Request, error: ProcessLimitError) -> JSONResponse:
+    """Reject specs whose render exceeded the resource limits of the JVM.
+
+    Parameters
+    ----------
+    _request : Request
+        Rejected request.
+    error : ProcessLimitError
+        Exceeded limit.
+
+    Returns
+    -------
+    JSONResponse
+    """
+    # Timeouts can be caused by load, other limits will be exceeded again by the same spec
+    status_code = 503 if isinstance(error, ProcessTimeoutError) else 422
+    return JSONResponse(
+        {"detail": str(error), "limit": type(error).__name__}, status_code=status_code
+    )
+
+
+@app.exception_handler(BundleError)
+async def bundle_error_handler(_request: Request, error: BundleError) -> JSONResponse:
+    """Reject specs whose references to other files can not be resolved.
+
+    Parameters
+    ----------
+    _request : Request
+        Rejected request.
+    error : BundleError
+        Error raised while bundling the spec.
+
+    Returns
+    -------
+    JSONResponse
+    """
+    return JSONResponse({"detail": str(error)}, status_code=422)
+
+
+@app.exception_handler(UploadError)
+async def upload_error_handler(_request: Request, error: UploadError) -> JSONResponse:
+    """Reject uploads which are too large, can not be decompressed or lack the spec.
+
+    Parameters
+    ----------
+    _request : Request
+        Rejected request.
+    error : UploadError
+        Error raised while receiving the upload.
+
+    Returns
+    -------
+    JSONResponse
+    """
+    return JSONResponse({"detail": str(error)}, status_code=error.status_code)
+
+
+def _diagram_response(
+    request: Request, name: str, content: bytes, media_type: str, etag: str
+) -> Response:
+    """Response with a single diagram, answering ``Range`` requests from ``content``.
+
+    Parameters
+    ----------
+    request : Request
+        Request of the diagram.
+    name : str
+        File name of the diagram.
+    content : bytes
+        Rendered diagram.
+    media_type : str
+        Media type of the diagram.
+    etag : str
+        Entity tag of the diagram.
+
+    Returns
+    -------
+    Response
+    """
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{name}"',
+        "ETag": etag,
+    }
+    try:
+        byte_range = requested_range(
+            request.headers.get("range"), request.headers.get("if-range"), etag, len(content)
         )
-        for file in files:
-            zipfile.writestr(file.name, file.read_text())
+    except RangeNotSatisfiableError as error:
+        headers["Content-Range"] = f"bytes */{len(content)}"
+        return Response(status_code=error.status_code, headers=headers)
+    if byte_range is None:
+        return Response(content, media_type=media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(content)}"
+    return Response(
+        content[start : end + 1], status_code=206, headers=headers, media_type=media_type
+    )
+
+
+async def _cached_render(
+    spec: bytes | Path,
+    spec_hash: str,
+    file_name: Path,
+    *,
+    modes: list[OpenapiToPlantumlModes],
+    diagram_formats: list[OpenapiToPlantumlFormats],
+    entry: str | None,
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+) -> dict[str, bytes]:
+    """Render diagram/-s of ``spec`` or get them from the result cache.
 
-    buffer.seek(0)
+    Parameters
+    ----------
+    spec : bytes | Path
+        Content of the uploaded file or file it was spooled to.
+    spec_hash : str
+        SHA-256 hex digest of the uploaded file.
+    file_name : Path
+        Name of the uploaded file.
+    modes : list[OpenapiToPlantumlModes]
+        Modes to run.
+    diagram_formats : list[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+    entry : str | None
+        Path of the root spec inside of a zip archive.
+    prune_unused : bool
+        Whether to drop unused components.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
 
+    Returns
+    -------
+    dict[str, bytes]
+        Content of the rendered files by their relative posix path.
+    """
+    settings = get_settings()
+    spec_format = spec_file_format(file_name)
+    result_cache = get_result_cache()
+    cache_key = None
+    if result_cache is not None:
+        cache_key = ResultCache.key(
+            await asyncio.to_thread(result_spec_hash, spec, spec_format, entry, spec_hash),
+            file_name,
+            modes=modes,
+            diagram_formats=diagram_formats,
+            entry=entry,
+            prune_unused=prune_unused,
+            operation_filter=operation_filter,
+        )
+        # Hits neither take a render slot nor touch the scratch folder or the JVM
+        contents = await asyncio.to_thread(result_cache.get, cache_key)
+        if contents is not None:
+            return contents
+
+    # All blocking work runs in threads or subprocesses so other requests are not stalled and
+    # the spec and outputs only pass through the (memory backed) scratch folder.
+    contents = await get_render_scheduler().run(
+        lambda: arender_openapi_to_plantuml(
+            spec=spec,
+            modes=modes,
+            diagram_formats=diagram_formats,
+            spec_format=spec_format,
+            entry=entry,
+            name=file_name.stem,
+            worker_pool=get_worker_pool(),
+            render_cache=get_render_cache(),
+            jvm_profile=settings.jvm_profile,
+            limits=get_process_limits(),
+            scratch_dir=settings.scratch_dir,
+            prune_unused=prune_unused,
+            operation_filter=operation_filter,
+        )
+    )
+    if result_cache is not None and cache_key is not None:
+        await asyncio.to_thread(result_cache.put, cache_key, contents)
+    return contents
+
+
+async def _render_response(
+    request: Request,
+    spec: bytes | Path,
+    spec_hash: str,
+    file_name: Path,
+    *,
+    modes: list[OpenapiToPlantumlModes],
+    diagram_formats: list[OpenapiToPlantumlFormats],
+    entry: str | None,
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+    single_file: bool,
+) -> Response:
+    """Render diagram/-s of ``spec`` and stream them as zip file or single diagram.
+
+    Requests whose ``If-None-Match`` header matches the ``ETag`` of the diagrams are answered
+    with ``304 Not Modified`` before rendering.
+
+    Parameters
+    ----------
+    request : Request
+        Request to render the diagrams for.
+    spec : bytes | Path
+        Content of the uploaded file or file it was spooled to.
+    spec_hash : str
+        SHA-256 hex digest of the uploaded file.
+    file_name : Path
+        Name of the uploaded file.
+    modes : list[OpenapiToPlantumlModes]
+        Modes to run.
+    diagram_formats : list[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+    entry : str | None
+        Path of the root spec inside of a zip archive.
+    prune_unused : bool
+        Whether to drop unused components.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
+    single_file : bool
+        Whether to return the diagram as it is instead of inside of a zip file.
+
+    Returns
+    -------
+    Response
+    """
+    etag = diagram_etag(
+        spec_hash,
+        file_name,
+        modes=modes,
+        diagram_formats=diagram_formats,
+        entry=entry,
+        prune_unused=prune_unused,
+        operation_filter=operation_filter,
+        single_file=single_file,
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    contents = await _cached_render(
+        spec,
+        spec_hash,
+        file_name,
+        modes=modes,
+        diagram_formats=diagram_formats,
+        entry=entry,
+        prune_unused=prune_unused,
+        operation_filter=operation_filter,
+    )
+
+    if single_file:
+        name, content = next(iter(contents.items()))
+        return _diagram_response(
+            request, name, content, DIAGRAM_MEDIA_TYPES[diagram_formats[0]], etag
+        )
+    # Sync iterators are consumed in a thread, so compressing does not block the event loop
     return StreamingResponse(
-        buffer,
-        media_type="application/x-zip-compressed",
+        iter_zip(contents.items()),
+        media_type=ZIP_MEDIA_TYPE,
         headers={
-            "Content-Disposition": f'attachment; filename="{create_data.file_name.stem}.zip"'
+            "Content-Disposition": f'attachment; filename="{file_name.stem}.zip"',
+            "ETag": etag,
         },
     )
+
+
+@app.post("/api/v1/create-diagrams")
+async def create_diagrams(request: Request, create_data: CreateDiagram):
+    """Create openapi diagram/-s and return a zip file or (``singleFile``) the diagram."""
+    spec_content = create_data.spec_content
+    return await _render_response(
+        request,
+        spec_content,
+        hashlib.sha256(spec_content).hexdigest(),
+        create_data.file_name,
+        modes=create_data.modes,
+        diagram_formats=create_data.diagram_formats,
+        entry=create_data.entry_file,
+        prune_unused=create_data.prune_unused,
+        operation_filter=create_data.operation_filter,
+        single_file=create_data.single_file,
+    )
+
+
+def _upload_file_name(query: UploadQuery, upload: SpooledUpload) -> Path:
+    """Name of an uploaded spec, from the query or the multipart file name.
+
+    Parameters
+    ----------
+    query : UploadQuery
+        Query parameters of the upload.
+    upload : SpooledUpload
+        Received upload.
+
+    Returns
+    -------
+    Path
+
+    Raises
+    ------
+    UploadError
+        If no or an unsupported file name was given.
+    """
+    if query.file_name is not None:
+        return query.file_name
+    if not upload.file_name:
+        msg = "The 'fileName' query parameter is required for raw uploads."
+        raise UploadError(msg)
+    try:
+        # Only the name of the client side path is used
+        return validate_spec_file_name(Path(Path(upload.file_name).name))
+    except ValueError as error:
+        raise UploadError(str(error)) from None
+
+
+@app.post("/api/v1/create-diagrams/upload")
+async def create_diagrams_upload(request: Request, query: Annotated[UploadQuery, Query()]):
+    """Create openapi diagram/-s of a spec sent as raw or multipart body.
+
+    Returns a zip file or (``singleFile``) the diagram, like ``/api/v1/create-diagrams``.
+    The body may be compressed with ``Content-Encoding: gzip`` (or ``zstd``), modes, formats
+    and the operation filter are passed as query parameters.
+    """
+    settings = get_settings()
+    upload = await receive_upload(
+        request, settings.max_upload_size, settings.upload_spool_size, settings.upload_dir
+    )
+    try:
+        return await _render_response(
+            request,
+            upload.content,
+            upload.sha256,
+            _upload_file_name(query, upload),
+            modes=query.mode,
+            diagram_formats=query.diagram_format,
+            entry=query.entry_file,
+            prune_unused=query.prune_unused,
+            operation_filter=query.operation_filter,
+            single_file=query.single_file,
+        )
+    finally:
+        upload.close()
+
+
+@app.post("/api/v1/jobs", status_code=202)
+async def create_job(create_data: CreateDiagram) -> JobInfo:
+    """Queue rendering of openapi diagram/-s, poll the returned job for its status."""
+    return await asyncio.to_thread(get_job_manager().submit, create_data)
+
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_job(job_id: str) -> JobInfo:
+    """Get status of a render job."""
+    job = await asyncio.to_thread(get_job_manager().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id!r} not found.")
+    return job
+
+
+@app.get("/api/v1/jobs/{job_id}/result")
+async def get_job_result(job_id: str) -> FileResponse:
+    """Download zip file of a finished render job."""
+    job_manager = get_job_manager()
+    job = await asyncio.to_thread(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id!r} not found.")
+    result_file = await asyncio.to_thread(job_manager.result_file, job_id)
+    if result_file is None:
+        raise HTTPException(
+            status_code=409, detail=f"Job {job_id!r} has status {job.status!r}, no result."
+        )
+    return FileResponse(
+        result_file,
+        media_type=ZIP_MEDIA_TYPE,
+        filename=f"{job.file_name.stem}.zip",
+    )
+
+
+def require_admin(authorization: Annotated[str | None, Header()] = None) -> None:
+    """Check the bearer token of admin requests.
+
+    The admin endpoints are disabled unless ``admin_token`` is set.
+
+    Parameters
+    ----------
+    authorization : str | None
+        Value of the ``Authorization`` header.
+
+    Raises
+    ------
+    HTTPException
+        If no admin token is configured or the token is missing or wrong.
+    """
+    admin_token = get_settings().admin_token
+    if admin_token is None:
+        raise HTTPException(
+            status_code=404,
+            detail=(
+                "Admin endpoints are disabled, set OPENAPI_DIAGRAM__ADMIN_TOKEN to enable them."
+            ),
+        )
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, admin_token):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or missing admin token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def _get_enabled_result_cache() -> ResultCache:
+    """Get the result cache for admin requests.
+
+    Returns
+    -------
+    ResultCache
+
+    Raises
+    ------
+    HTTPException
+        If the result cache is disabled.
+    """
+    result_cache = get_result_cache()
+    if result_cache is None:
+        raise HTTPException(status_code=404, detail="The result cache is disabled.")
+    return result_cache
+
+
+@app.get("/api/v1/admin/result-cache", dependencies=[Depends(require_admin)])
+async def get_result_cache_info() -> ResultCacheInfo:
+    """Get usage, hit counters and entries of the result cache."""
+    result_cache = _get_enabled_result_cache()
+    entries = await asyncio.to_thread(result_cache.entries)
+    return ResultCacheInfo(
+        memory_size=result_cache.memory_size,
+        memory_max_size=result_cache.memory_max_size,
+        disk_size=sum(entry.size for entry in entries if entry.tier == "disk"),
+        disk_max_size=result_cache.disk_max_size,
+        ttl=result_cache.ttl,
+        memory_hits=result_cache.memory_hits,
+        disk_hits=result_cache.disk_hits,
+        misses=result_cache.misses,
+        entries=[
+            ResultCacheEntryInfo(
+                key=entry.key,
+                tier=entry.tier,
+                size=entry.size,
+                created_at=datetime.fromtimestamp(entry.created, tz=UTC),
+            )
+            for entry in entries
+        ],
+    )
+
+
+@app.delete("/api/v1/admin/result-cache", dependencies=[Depends(require_admin)])
+async def purge_result_cache() -> PurgeInfo:
+    """Remove all entries of the result cache and reset its hit counters."""
+    result_cache = _get_enabled_result_cache()
+    return PurgeInfo(removed=await asyncio.to_thread(result_cache.purge))
+
+
+@app.delete("/api/v1/admin/result-cache/{key}", dependencies=[Depends(require_admin)])
+async def purge_result_cache_entry(key: str) -> PurgeInfo:
+    """Remove one entry of the result cache."""
+    result_cache = _get_enabled_result_cache()
+    removed = await asyncio.to_thread(result_cache.purge, key)
+    if removed == 0:
+        raise HTTPException(status_code=404, detail=f"Result {key!r} is not cached.")
+    return PurgeInfo(removed=removed)
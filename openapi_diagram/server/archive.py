@@ -0,0 +1,210 @@
+"""Zip archives of rendered diagrams returned by the REST API.
+
+Entries of formats which are compressed already (e.g. ``png``) are stored, all other entries
+(e.g. ``svg`` or ``puml``) are deflated. Archives are reproducible: entries are sorted by name
+and have fixed timestamps and permissions, so the same diagrams always give the same bytes.
+"""
+
+from __future__ import annotations
+
+import shutil
+from operator import itemgetter
+from pathlib import Path
+from typing import IO
+from typing import TYPE_CHECKING
+from typing import cast
+from zipfile import ZIP_DEFLATED
+from zipfile import ZIP_STORED
+from zipfile import ZipFile
+from zipfile import ZipInfo
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from collections.abc import Mapping
+
+PRECOMPRESSED_SUFFIXES = frozenset({".png", ".braille_png", ".mjpeg", ".animated_gif", ".zip"})
+"""Suffixes of diagram files which deflate would not make smaller."""
+ZIP_STREAM_CHUNK_SIZE = 64 * 1024
+"""Bytes of an entry compressed at once by :func:`iter_zip`."""
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+"""Timestamp of all entries, the earliest one zip files can hold."""
+
+
+def zip_compression(name: str) -> int:
+    """Compression method of a zip entry.
+
+    Parameters
+    ----------
+    name : str
+        Name of the entry.
+
+    Returns
+    -------
+    int
+        ``ZIP_STORED`` for already compressed formats, ``ZIP_DEFLATED`` otherwise.
+    """
+    return ZIP_STORED if Path(name).suffix.lower() in PRECOMPRESSED_SUFFIXES else ZIP_DEFLATED
+
+
+def write_zip(files: Iterable[Path], target: Path | IO[bytes], root: Path | None = None) -> None:
+    """Write zip file containing ``files`` to ``target``.
+
+    Parameters
+    ----------
+    files : Iterable[Path]
+        Files to add to the zip file.
+    target : Path | IO[bytes]
+        File path or binary file object to write the zip file to.
+    root : Path | None
+        Folder the names inside of the zip file are relative to. Defaults to None which uses
+        the plain file names.
+    """
+    entries = [
+        (file.name if root is None else file.relative_to(root).as_posix(), file) for file in files
+    ]
+    with ZipFile(target, "w", ZIP_DEFLATED) as zipfile:
+        for name, file in sorted(entries, key=itemgetter(0)):
+            with file.open("rb") as source, zipfile.open(_zip_info(name, file), "w") as entry:
+                shutil.copyfileobj(source, entry, ZIP_STREAM_CHUNK_SIZE)
+
+
+def write_zip_contents(contents: Mapping[str, bytes], target: Path | IO[bytes]) -> None:
+    """Write zip file containing in memory ``contents`` to ``target``.
+
+    Parameters
+    ----------
+    contents : Mapping[str, bytes]
+        File contents by their name inside of the zip file.
+    target : Path | IO[bytes]
+        File path or binary file object to write the zip file to.
+    """
+    with ZipFile(target, "w", ZIP_DEFLATED) as zipfile:
+        for name, content in sorted(contents.items()):
+            zipfile.writestr(_zip_info(name, content), content)
+
+
+class _ChunkSink:
+    """Write-only file object collecting what ``ZipFile`` writes until it is drained."""
+
+    def __init__(self) -> None:
+        """Create empty sink."""
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        """Collect ``data``.
+
+        Parameters
+        ----------
+        data : bytes
+            Data to write, copied since ``ZipFile`` may pass reused buffers.
+
+        Returns
+        -------
+        int
+            Number of bytes written.
+        """
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        """Do nothing, the collected data is only handed out by :meth:`drain`."""
+
+    def drain(self) -> bytes:
+        """Get the data written since the last call and forget it.
+
+        Returns
+        -------
+        bytes
+        """
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(name: str, content: bytes | Path) -> ZipInfo:
+    """Reproducible zip entry header for ``content``, sized up front so zip64 is used when needed.
+
+    Parameters
+    ----------
+    name : str
+        Name of the entry.
+    content : bytes | Path
+        Content or file to read it from.
+
+    Returns
+    -------
+    ZipInfo
+    """
+    zip_info = ZipInfo(name, date_time=ZIP_DATE_TIME)
+    zip_info.external_attr = 0o644 << 16
+    zip_info.file_size = content.stat().st_size if isinstance(content, Path) else len(content)
+    zip_info.compress_type = zip_compression(name)
+    return zip_info
+
+
+def _write_entries(
+    zipfile: ZipFile, entries: Iterable[tuple[str, bytes | Path]], chunk_size: int
+) -> Iterator[None]:
+    """Add ``entries`` to ``zipfile`` pausing after every chunk.
+
+    Parameters
+    ----------
+    zipfile : ZipFile
+        Zip file opened for writing.
+    entries : Iterable[tuple[str, bytes | Path]]
+        Names of the entries and their content or the file to read it from.
+    chunk_size : int
+        Bytes of an entry to write at once.
+
+    Yields
+    ------
+    None
+        After each chunk and each completed entry.
+    """
+    for name, content in entries:
+        with zipfile.open(_zip_info(name, content), "w") as entry:
+            if isinstance(content, Path):
+                with content.open("rb") as file:
+                    while chunk := file.read(chunk_size):
+                        entry.write(chunk)
+                        yield
+            else:
+                for start in range(0, len(content), chunk_size):
+                    entry.write(content[start : start + chunk_size])
+                    yield
+        yield
+
+
+def iter_zip(
+    entries: Iterable[tuple[str, bytes | Path]], chunk_size: int = ZIP_STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Create a zip file piece by piece, e.g. to stream it as response body.
+
+    Only about ``chunk_size`` bytes of compressed data are buffered at a time, neither the
+    zip file nor (for files) the content of an entry is held in memory completely. Entries are
+    written sorted by name.
+
+    Parameters
+    ----------
+    entries : Iterable[tuple[str, bytes | Path]]
+        Names of the entries inside of the zip file and their content or the file to read it
+        from.
+    chunk_size : int
+        Bytes of an entry to compress at once. Defaults to ``ZIP_STREAM_CHUNK_SIZE``
+
+    Yields
+    ------
+    bytes
+        Consecutive parts of the zip file.
+    """
+    sink = _ChunkSink()
+    # ZipFile only writes and flushes, it falls back to tracking positions itself when the
+    # file object can not tell them
+    with ZipFile(cast(IO[bytes], sink), "w") as zipfile:
+        for _ in _write_entries(zipfile, sorted(entries, key=itemgetter(0)), chunk_size):
+            if data := sink.drain():
+                yield data
+    # Closing the zip file writes the central directory
+    if data := sink.drain():
+        yield data
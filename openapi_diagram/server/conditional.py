@@ -0,0 +1,229 @@
+"""Conditional requests of rendered diagrams.
+
+Rendered diagrams only depend on the uploaded spec, the render options and the version of
+``openapi-to-plantuml``, so a strong ``ETag`` can be derived from them before rendering.
+Requests whose ``If-None-Match`` header contains it are answered with ``304 Not Modified``
+without rendering anything. ``Range`` requests of single diagrams are answered from the
+rendered bytes, as long as an ``If-Range`` header matches the ``ETag``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from openapi_diagram.filters import OperationFilter
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
+
+ZIP_MEDIA_TYPE = "application/x-zip-compressed"
+DIAGRAM_MEDIA_TYPES: dict[str, str] = {
+    "puml": "text/plain; charset=utf-8",
+    "eps": "application/postscript",
+    "eps_text": "application/postscript",
+    "atxt": "text/plain; charset=utf-8",
+    "utxt": "text/plain; charset=utf-8",
+    "xmi_standard": "application/xml",
+    "xmi_star": "application/xml",
+    "xmi_argo": "application/xml",
+    "vdx": "application/vnd.visio",
+    "latex": "application/x-latex",
+    "latex_no_preamble": "application/x-latex",
+    "braille_png": "image/png",
+    "debug": "text/plain; charset=utf-8",
+    "png": "image/png",
+    "raw": "application/octet-stream",
+    "svg": "image/svg+xml",
+}
+"""Media type of single diagram responses by diagram format."""
+
+
+class RangeNotSatisfiableError(Exception):
+    """Error raised when a requested byte range lies outside of the diagram."""
+
+    status_code = 416
+
+
+def render_options_digest(
+    file_name: Path,
+    *,
+    modes: list[OpenapiToPlantumlModes],
+    diagram_formats: list[OpenapiToPlantumlFormats],
+    entry: str | None,
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+) -> str:
+    """Digest of the options the rendered diagram/-s of a spec depend on.
+
+    Parameters
+    ----------
+    file_name : Path
+        Name of the uploaded file, used for the names of the diagrams.
+    modes : list[OpenapiToPlantumlModes]
+        Requested modes.
+    diagram_formats : list[OpenapiToPlantumlFormats]
+        Requested diagram formats.
+    entry : str | None
+        Path of the root spec inside of a zip archive.
+    prune_unused : bool
+        Whether unused components are dropped.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
+    version : str
+        Version of ``openapi-to-plantuml``. Defaults to "0.1.28"
+
+    Returns
+    -------
+    str
+        SHA-256 hex digest.
+    """
+    options = json.dumps(
+        {
+            "name": file_name.name,
+            "modes": sorted(set(modes)),
+            "formats": sorted(set(diagram_formats)),
+            "entry": entry,
+            "prune_unused": prune_unused,
+            "operation_filter": (
+                None if operation_filter is None else operation_filter.model_dump(mode="json")
+            ),
+            "version": version,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(options.encode()).hexdigest()
+
+
+def diagram_etag(
+    spec_hash: str,
+    file_name: Path,
+    *,
+    modes: list[OpenapiToPlantumlModes],
+    diagram_formats: list[OpenapiToPlantumlFormats],
+    entry: str | None,
+    prune_unused: bool,
+    operation_filter: OperationFilter | None,
+    single_file: bool,
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+) -> str:
+    """Strong ``ETag`` of the diagram/-s rendered for a request.
+
+    Parameters
+    ----------
+    spec_hash : str
+        SHA-256 hex digest of the uploaded file.
+    file_name : Path
+        Name of the uploaded file, used for the names of the diagrams.
+    modes : list[OpenapiToPlantumlModes]
+        Requested modes.
+    diagram_formats : list[OpenapiToPlantumlFormats]
+        Requested diagram formats.
+    entry : str | None
+        Path of the root spec inside of a zip archive.
+    prune_unused : bool
+        Whether unused components are dropped.
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render.
+    single_file : bool
+        Whether the diagram is returned as it is instead of inside of a zip file.
+    version : str
+        Version of ``openapi-to-plantuml``. Defaults to "0.1.28"
+
+    Returns
+    -------
+    str
+        Quoted entity tag.
+    """
+    options_digest = render_options_digest(
+        file_name,
+        modes=modes,
+        diagram_formats=diagram_formats,
+        entry=entry,
+        prune_unused=prune_unused,
+        operation_filter=operation_filter,
+        version=version,
+    )
+    tag = f"{spec_hash}:{options_digest}:{'file' if single_file else 'zip'}"
+    return f'"{hashlib.sha256(tag.encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check if an ``If-None-Match`` header matches ``etag``.
+
+    Uses the weak comparison required for ``If-None-Match``, i.e. ``W/`` prefixes are ignored.
+
+    Parameters
+    ----------
+    if_none_match : str | None
+        Value of the ``If-None-Match`` header.
+    etag : str
+        Current entity tag.
+
+    Returns
+    -------
+    bool
+    """
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def requested_range(
+    range_header: str | None, if_range: str | None, etag: str, size: int
+) -> tuple[int, int] | None:
+    """Byte range of a single diagram requested by a ``Range`` header.
+
+    Only single ``bytes`` ranges are supported, other and invalid ``Range`` headers are
+    ignored as allowed by RFC 9110, as are ranges whose ``If-Range`` header does not match
+    ``etag`` (strong comparison).
+
+    Parameters
+    ----------
+    range_header : str | None
+        Value of the ``Range`` header.
+    if_range : str | None
+        Value of the ``If-Range`` header.
+    etag : str
+        Current entity tag.
+    size : int
+        Size of the diagram in bytes.
+
+    Returns
+    -------
+    tuple[int, int] | None
+        First and last (inclusive) byte position, None for the whole diagram.
+
+    Raises
+    ------
+    RangeNotSatisfiableError
+        If the range starts after the end of the diagram.
+    """
+    if range_header is None or (if_range is not None and if_range.strip() != etag):
+        return None
+    unit, _, byte_range = range_header.partition("=")
+    first, separator, last = byte_range.strip().partition("-")
+    if unit.strip().lower() != "bytes" or separator == "":
+        return None
+    if first == "" and last.isdecimal():
+        if int(last) == 0 or size == 0:
+            msg = f"Range {range_header!r} is empty."
+            raise RangeNotSatisfiableError(msg)
+        return max(size - int(last), 0), size - 1
+    if not first.isdecimal() or (last != "" and not last.isdecimal()):
+        return None
+    start = int(first)
+    end = size - 1 if last == "" else min(int(last), size - 1)
+    if last != "" and int(last) < start:
+        return None
+    if start >= size:
+        msg = f"Range {range_header!r} starts after the end of the diagram ({size} bytes)."
+        raise RangeNotSatisfiableError(msg)
+    return start, end
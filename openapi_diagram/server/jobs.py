@@ -0,0 +1,310 @@
+"""Asynchronous render jobs, run by an in-process thread pool with results stored on disk.
+
+Each job gets a folder inside of ``jobs_dir`` containing the uploaded spec, the rendered
+``output`` and the final ``result.zip``. Finished jobs and their folders are removed once they
+are older than ``result_ttl``.
+"""
+
+from __future__ import annotations
+
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import TYPE_CHECKING
+
+from openapi_diagram.bundle import bundle_openapi_archive
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml_multi
+from openapi_diagram.serialization import dumps_json
+from openapi_diagram.server.archive import write_zip
+from openapi_diagram.server.models.response_models import JobInfo
+from openapi_diagram.server.scheduler import QueueFullError
+
+if TYPE_CHECKING:
+    from openapi_diagram.jvm_launch import JvmProfiles
+    from openapi_diagram.jvm_worker import JvmWorkerPool
+    from openapi_diagram.process_limits import ProcessLimits
+    from openapi_diagram.render_cache import RenderCache
+    from openapi_diagram.server.models.request_models import CreateDiagram
+
+RESULT_FILE_NAME = "result.zip"
+
+
+class JobManager:
+    """Submit render jobs and keep track of their status and results."""
+
+    def __init__(
+        self,
+        jobs_dir: Path | None = None,
+        max_workers: int = 2,
+        max_queued: int = 100,
+        result_ttl: float = 3600,
+        worker_pool: JvmWorkerPool | None = None,
+        render_cache: RenderCache | None = None,
+        jvm_profile: JvmProfiles = "default",
+        limits: ProcessLimits | None = None,
+    ) -> None:
+        """Create job manager.
+
+        Parameters
+        ----------
+        jobs_dir : Path | None
+            Folder to store job files and results in. Defaults to None which creates a
+            temporary folder.
+        max_workers : int
+            Number of jobs rendered at the same time. Defaults to 2
+        max_queued : int
+            Number of jobs waiting to be rendered before new jobs are rejected. Defaults to 100
+        result_ttl : float
+            Seconds finished jobs and their results are kept. Defaults to 3600
+        worker_pool : JvmWorkerPool | None
+            Pool of warm JVM workers to render in. Defaults to None
+        render_cache : RenderCache | None
+            Cache for rendered diagrams. Defaults to None
+        jvm_profile : JvmProfiles
+            Launch profile of one-shot JVMs. Defaults to "default"
+        limits : ProcessLimits | None
+            Resource limits of one-shot JVMs. Defaults to None
+        """
+        self.jobs_dir = (
+            Path(mkdtemp(prefix="openapi-diagram-jobs")) if jobs_dir is None else jobs_dir
+        )
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.worker_pool = worker_pool
+        self.render_cache = render_cache
+        self.jvm_profile = jvm_profile
+        self.limits = limits
+        self._jobs: dict[str, JobInfo] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="openapi-diagram-job"
+        )
+
+    def _job_dir(self, job_id: str) -> Path:
+        """Folder of the spec and results of a job.
+
+        Parameters
+        ----------
+        job_id : str
+            Id of the job.
+
+        Returns
+        -------
+        Path
+        """
+        return self.jobs_dir / job_id
+
+    def _output_dir(self, job_id: str) -> Path:
+        """Folder the diagrams of a job are rendered to.
+
+        Parameters
+        ----------
+        job_id : str
+            Id of the job.
+
+        Returns
+        -------
+        Path
+        """
+        return self._job_dir(job_id) / "output"
+
+    def _update(self, job_id: str, **changes: object) -> None:
+        """Replace fields of the status of a job.
+
+        Parameters
+        ----------
+        job_id : str
+            Id of the job.
+        **changes : object
+            New values by field name.
+        """
+        with self._lock:
+            self._jobs[job_id] = self._jobs[job_id].model_copy(update=changes)
+
+    def submit(self, create_data: CreateDiagram) -> JobInfo:
+        """Store the spec of a new job and queue it for rendering.
+
+        Parameters
+        ----------
+        create_data : CreateDiagram
+            Spec and render options.
+
+        Returns
+        -------
+        JobInfo
+            Status of the queued job.
+
+        Raises
+        ------
+        QueueFullError
+            If ``max_queued`` jobs are already waiting.
+        """
+        self.cleanup()
+        with self._lock:
+            queued = sum(job.status == "queued" for job in self._jobs.values())
+            if queued >= self.max_queued:
+                msg = "Too many jobs queued, try again later."
+                raise QueueFullError(msg, retry_after=60)
+            job = JobInfo(
+                job_id=uuid.uuid4().hex,
+                status="queued",
+                file_name=Path(create_data.file_name.name),
+                mode=create_data.mode,
+                diagram_format=create_data.diagram_format,
+                created_at=datetime.now(UTC),
+            )
+            self._jobs[job.job_id] = job
+        job_dir = self._job_dir(job.job_id)
+        job_dir.mkdir(parents=True)
+        (job_dir / job.file_name).write_bytes(create_data.spec_content)
+        # The spec content is on disk already, no need to keep it in memory until the job runs
+        self._executor.submit(self._run, job, create_data.model_copy(update={"file_content": ""}))
+        return job
+
+    def _run(self, job: JobInfo, create_data: CreateDiagram) -> None:
+        """Render job and write the result zip file, recording failures in the job status.
+
+        Parameters
+        ----------
+        job : JobInfo
+            Job to render.
+        create_data : CreateDiagram
+            Render options of the job.
+        """
+        self._update(job.job_id, status="running", started_at=datetime.now(UTC))
+        job_dir = self._job_dir(job.job_id)
+        output_dir = self._output_dir(job.job_id)
+        try:
+            spec_file = job_dir / job.file_name
+            if create_data.spec_format == "zip":
+                bundled_file = spec_file.with_suffix(".json")
+                bundled_file.write_bytes(
+                    dumps_json(
+                        bundle_openapi_archive(spec_file.read_bytes(), create_data.entry_file)
+                    )
+                )
+                spec_file = bundled_file
+            results = run_openapi_to_plantuml_multi(
+                spec_file,
+                create_data.output_path(output_dir),
+                create_data.modes,
+                create_data.diagram_formats,
+                worker_pool=self.worker_pool,
+                render_cache=self.render_cache,
+                jvm_profile=self.jvm_profile,
+                limits=self.limits,
+                prune_unused=create_data.prune_unused,
+                operation_filter=create_data.operation_filter,
+                # Uploaded specs must not be resolved against the file system of the server
+                bundle_references=False,
+            )
+            files = [file for target_files in results.values() for file in target_files]
+            write_zip(files, job_dir / RESULT_FILE_NAME, output_dir)
+        # Errors are reported to the client polling the job status
+        except Exception as error:  # noqa: BLE001
+            self._update(
+                job.job_id,
+                status="failed",
+                finished_at=datetime.now(UTC),
+                error=f"{type(error).__name__}: {error}",
+            )
+        else:
+            self._update(
+                job.job_id,
+                status="done",
+                finished_at=datetime.now(UTC),
+                files_rendered=len(files),
+            )
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    def get(self, job_id: str) -> JobInfo | None:
+        """Get current status of a job.
+
+        Parameters
+        ----------
+        job_id : str
+            Id of the job.
+
+        Returns
+        -------
+        JobInfo | None
+            Job status or None if there is no such job (anymore).
+        """
+        self.cleanup()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None and job.status == "running":
+            # Split mode writes one file per diagram, which gives a cheap progress indicator.
+            output_dir = self._output_dir(job_id)
+            if output_dir.is_dir():
+                files_rendered = sum(1 for file in output_dir.rglob("*") if file.is_file())
+                job = job.model_copy(update={"files_rendered": files_rendered})
+        return job
+
+    def result_file(self, job_id: str) -> Path | None:
+        """Get the result zip file of a finished job.
+
+        Parameters
+        ----------
+        job_id : str
+            Id of the job.
+
+        Returns
+        -------
+        Path | None
+            Result zip file or None if the job does not exist or has not finished successfully.
+        """
+        job = self.get(job_id)
+        if job is None or job.status != "done":
+            return None
+        return self._job_dir(job_id) / RESULT_FILE_NAME
+
+    def cleanup(self) -> list[str]:
+        """Remove finished jobs older than ``result_ttl`` together with their files.
+
+        Returns
+        -------
+        list[str]
+            Ids of the removed jobs.
+        """
+        expired_before = datetime.now(UTC) - timedelta(seconds=self.result_ttl)
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at <= expired_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            known = set(self._jobs)
+        if self.jobs_dir.is_dir():
+            # Leftovers of previous server processes sharing ``jobs_dir``
+            for job_dir in self.jobs_dir.iterdir():
+                if job_dir.name in known:
+                    continue
+                try:
+                    modified = job_dir.stat().st_mtime
+                except FileNotFoundError:
+                    # Job was removed concurrently
+                    continue
+                if modified <= expired_before.timestamp():
+                    expired.append(job_dir.name)
+        for job_id in expired:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        return expired
+
+    def shutdown(self) -> None:
+        """Cancel queued jobs, wait for running ones and remove the files of all jobs."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            job_ids = list(self._jobs)
+            self._jobs.clear()
+        for job_id in job_ids:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
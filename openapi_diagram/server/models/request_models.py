@@ -2,17 +2,98 @@
 
 from __future__ import annotations
 
+import base64
+import binascii
 from pathlib import Path  # noqa: TCH003
+from typing import TYPE_CHECKING
 
 from pydantic import BaseModel
 from pydantic import ConfigDict
+from pydantic import Field
 from pydantic import field_validator
+from pydantic import model_validator
 from pydantic.alias_generators import to_camel
 
+from openapi_diagram import SUPPORTED_ARCHIVE_FILE_FORMATS
 from openapi_diagram import SUPPORTED_SPEC_FILE_FORMATS
+from openapi_diagram.filters import OperationFilter
 from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats  # noqa: TCH001
 from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes  # noqa: TCH001
 
+if TYPE_CHECKING:
+    from openapi_diagram.pipeline import SpecFormats
+
+
+def validate_spec_file_name(file_name: Path) -> Path:
+    """Validate that the file has the correct format by checking its extension.
+
+    Parameters
+    ----------
+    file_name : Path
+        Name of the uploaded file.
+
+    Returns
+    -------
+    Path
+
+    Raises
+    ------
+    ValueError
+        If the extension is not supported.
+    """
+    supported_formats = SUPPORTED_SPEC_FILE_FORMATS + SUPPORTED_ARCHIVE_FILE_FORMATS
+    if file_name.suffix not in supported_formats:
+        msg = (
+            "Only the following formats/extension are supported: "
+            f"{', '.join(supported_formats)!r} but got {file_name.name!r}."
+        )
+        raise ValueError(msg)
+    return file_name
+
+
+def spec_file_format(file_name: Path) -> SpecFormats:
+    """Format of an uploaded file.
+
+    Parameters
+    ----------
+    file_name : Path
+        Name of the uploaded file.
+
+    Returns
+    -------
+    SpecFormats
+    """
+    if file_name.suffix in SUPPORTED_ARCHIVE_FILE_FORMATS:
+        return "zip"
+    return "json" if file_name.suffix == ".json" else "yaml"
+
+
+def validate_single_file(
+    modes: list[OpenapiToPlantumlModes],
+    diagram_formats: list[OpenapiToPlantumlFormats],
+    *,
+    single_file: bool,
+) -> None:
+    """Validate that a diagram returned as it is was requested for exactly one file.
+
+    Parameters
+    ----------
+    modes : list[OpenapiToPlantumlModes]
+        Requested modes.
+    diagram_formats : list[OpenapiToPlantumlFormats]
+        Requested diagram formats.
+    single_file : bool
+        Whether the diagram should be returned instead of a zip file.
+
+    Raises
+    ------
+    ValueError
+        If ``single_file`` is set for other modes than ``single`` or several formats.
+    """
+    if single_file and (set(modes) != {"single"} or len(set(diagram_formats)) != 1):
+        msg = "'singleFile' requires mode 'single' and exactly one diagram format."
+        raise ValueError(msg)
+
 
 class CreateDiagram(BaseModel):
     """Request data to create diagrams."""
@@ -21,17 +102,180 @@ class CreateDiagram(BaseModel):
 
     file_name: Path
     file_content: str
-    mode: OpenapiToPlantumlModes
-    diagram_format: OpenapiToPlantumlFormats
+    """Content of the spec file or base64 encoded content of a zip archive (``*.zip``)
+    containing a spec split over several files."""
+    entry_file: str | None = None
+    """Path of the root spec inside of a zip archive, defaults to the only spec file with an
+    ``openapi`` key."""
+    mode: OpenapiToPlantumlModes | list[OpenapiToPlantumlModes]
+    diagram_format: OpenapiToPlantumlFormats | list[OpenapiToPlantumlFormats]
+    prune_unused: bool = False
+    """Whether to drop components which are not referenced from the rest of the spec."""
+    operation_filter: OperationFilter | None = None
+    """Only render the selected operations and the components they reference."""
+    single_file: bool = False
+    """Whether to return the diagram as it is instead of inside of a zip file, requires mode
+    ``single`` and one diagram format. Asynchronous jobs always create zip files."""
 
     @field_validator("file_name")
     @classmethod
     def validate_file_format(cls, value: Path) -> Path:  # noqa: DOC
         """Validate that the file has the correct format by checking its extension."""
-        if value.suffix not in SUPPORTED_SPEC_FILE_FORMATS:
-            msg = (
-                "Only the following formats/extension are supported: "
-                f"{', '.join(SUPPORTED_SPEC_FILE_FORMATS)!r} but got {value.name!r}."
-            )
+        return validate_spec_file_name(value)
+
+    @model_validator(mode="after")
+    def validate_archive_content(self) -> CreateDiagram:
+        """Validate that the content of zip archives is base64 encoded.
+
+        Returns
+        -------
+        CreateDiagram
+
+        Raises
+        ------
+        ValueError
+            If the content of a zip archive can not be decoded.
+        """
+        if self.spec_format == "zip":
+            try:
+                base64.b64decode(self.file_content, validate=True)
+            except binascii.Error:
+                msg = "The 'fileContent' of zip archives has to be base64 encoded."
+                raise ValueError(msg) from None
+        return self
+
+    @model_validator(mode="after")
+    def validate_single_file(self) -> CreateDiagram:
+        """Validate that ``single_file`` is only requested for a single diagram.
+
+        Returns
+        -------
+        CreateDiagram
+        """
+        validate_single_file(self.modes, self.diagram_formats, single_file=self.single_file)
+        return self
+
+    @field_validator("mode", "diagram_format")
+    @classmethod
+    def validate_not_empty(cls, value: str | list[str]) -> str | list[str]:
+        """Validate that at least one mode and format is requested.
+
+        Parameters
+        ----------
+        value : str | list[str]
+            Mode/-s or diagram format/-s.
+
+        Returns
+        -------
+        str | list[str]
+
+        Raises
+        ------
+        ValueError
+            If an empty list was passed.
+        """
+        if len(value) == 0:
+            msg = "At least one value is required."
             raise ValueError(msg)
         return value
+
+    @property
+    def spec_format(self) -> SpecFormats:
+        """Format of the uploaded file."""
+        return spec_file_format(self.file_name)
+
+    @property
+    def spec_content(self) -> bytes:
+        """Content of the uploaded file, decoded for zip archives."""
+        if self.spec_format == "zip":
+            return base64.b64decode(self.file_content)
+        return self.file_content.encode()
+
+    @property
+    def modes(self) -> list[OpenapiToPlantumlModes]:
+        """Requested modes as list."""
+        return [self.mode] if isinstance(self.mode, str) else self.mode
+
+    @property
+    def diagram_formats(self) -> list[OpenapiToPlantumlFormats]:
+        """Requested diagram formats as list."""
+        return (
+            [self.diagram_format] if isinstance(self.diagram_format, str) else self.diagram_format
+        )
+
+    def output_path(self, output_dir: Path) -> Path:
+        """Output location inside of ``output_dir`` for the requested modes and formats.
+
+        Parameters
+        ----------
+        output_dir : Path
+            Folder to write the diagrams to.
+
+        Returns
+        -------
+        Path
+            File if only ``single`` mode is requested, else ``output_dir``.
+        """
+        if self.modes == ["single"]:
+            return output_dir / f"{self.file_name.stem}.{self.diagram_formats[0]}"
+        return output_dir
+
+
+class UploadQuery(OperationFilter):
+    """Query parameters of raw and multipart spec uploads.
+
+    The criteria of the operation filter are passed as flat query parameters, e.g.
+    ``?mode=split&diagramFormat=svg&includeTags=pet&includeTags=store``.
+    """
+
+    model_config = ConfigDict(
+        alias_generator=to_camel, populate_by_name=True, frozen=True, extra="forbid"
+    )
+
+    file_name: Path | None = None
+    """Name of the spec file, defaults to the file name of multipart uploads."""
+    entry_file: str | None = None
+    """Path of the root spec inside of a zip archive, defaults to the only spec file with an
+    ``openapi`` key."""
+    mode: list[OpenapiToPlantumlModes] = Field(min_length=1)
+    diagram_format: list[OpenapiToPlantumlFormats] = Field(min_length=1)
+    prune_unused: bool = False
+    """Whether to drop components which are not referenced from the rest of the spec."""
+    single_file: bool = False
+    """Whether to return the diagram as it is instead of inside of a zip file, requires mode
+    ``single`` and one diagram format."""
+
+    @field_validator("file_name")
+    @classmethod
+    def validate_file_format(cls, value: Path | None) -> Path | None:
+        """Validate that the file has the correct format by checking its extension.
+
+        Parameters
+        ----------
+        value : Path | None
+            Name of the uploaded file.
+
+        Returns
+        -------
+        Path | None
+        """
+        return value if value is None else validate_spec_file_name(value)
+
+    @model_validator(mode="after")
+    def validate_single_file(self) -> UploadQuery:
+        """Validate that ``single_file`` is only requested for a single diagram.
+
+        Returns
+        -------
+        UploadQuery
+        """
+        validate_single_file(self.mode, self.diagram_format, single_file=self.single_file)
+        return self
+
+    @property
+    def operation_filter(self) -> OperationFilter | None:
+        """Criteria selecting the operations to render, None if no criterion is set."""
+        operation_filter = OperationFilter(
+            **{name: getattr(self, name) for name in OperationFilter.model_fields}
+        )
+        return None if operation_filter.is_empty() else operation_filter
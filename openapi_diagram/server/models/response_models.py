@@ -0,0 +1,71 @@
+"""Response models for the REST API."""
+
+from __future__ import annotations
+
+from datetime import datetime  # noqa: TCH003
+from pathlib import Path  # noqa: TCH003
+from typing import Literal
+
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic.alias_generators import to_camel
+
+from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats  # noqa: TCH001
+from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes  # noqa: TCH001
+
+JobStatus = Literal["queued", "running", "done", "failed"]
+
+
+class JobInfo(BaseModel):
+    """Status of an asynchronous render job."""
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    job_id: str
+    status: JobStatus
+    file_name: Path
+    mode: OpenapiToPlantumlModes | list[OpenapiToPlantumlModes]
+    diagram_format: OpenapiToPlantumlFormats | list[OpenapiToPlantumlFormats]
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    files_rendered: int = 0
+    """Number of diagram files rendered so far."""
+    error: str | None = None
+
+
+class ResultCacheEntryInfo(BaseModel):
+    """Entry of the result cache."""
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    key: str
+    tier: Literal["memory", "disk"]
+    size: int
+    """Size in bytes, compressed for the disk tier."""
+    created_at: datetime
+
+
+class ResultCacheInfo(BaseModel):
+    """Usage and entries of the result cache."""
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    memory_size: int
+    memory_max_size: int
+    disk_size: int
+    disk_max_size: int
+    ttl: float | None
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    entries: list[ResultCacheEntryInfo]
+
+
+class PurgeInfo(BaseModel):
+    """Result of purging a cache."""
+
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    removed: int
+    """Number of removed entries, results cached in memory and on disk count twice."""
@@ -0,0 +1,459 @@
+"""Two-tier cache of rendered results of the REST API.
+
+Results (the rendered files of a request by their name) are cached under a key derived from
+the canonical spec hash, the render options and the ``openapi-to-plantuml`` version. Hot
+results are kept in a least recently used in-memory tier bounded by bytes, all results are
+also stored as zip file in a disk tier inside of ``CACHE_DIR`` which survives restarts and
+refills the memory tier on hits. Entries expire ``ttl`` seconds after they were rendered.
+Hits are served without scheduling a render, writing scratch files or starting a JVM.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from tempfile import mkstemp
+from typing import TYPE_CHECKING
+from typing import Literal
+from typing import NamedTuple
+from typing import TypeAlias
+from zipfile import BadZipFile
+from zipfile import ZipFile
+
+from openapi_diagram import CACHE_DIR
+from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram.bundle import bundle_openapi_archive
+from openapi_diagram.serialization import loads_json
+from openapi_diagram.serialization import loads_yaml
+from openapi_diagram.server.archive import write_zip_contents
+from openapi_diagram.server.conditional import render_options_digest
+from openapi_diagram.utils import canonical_spec_hash
+
+if TYPE_CHECKING:
+    from openapi_diagram.filters import OperationFilter
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
+    from openapi_diagram.pipeline import SpecFormats
+
+ResultCacheTiers: TypeAlias = Literal["memory", "disk"]
+
+RESULT_CACHE_DEFAULT_MEMORY_SIZE = 64 * 1024**2
+"""Default maximum size of the in-memory tier in bytes (64 MiB)."""
+RESULT_CACHE_DEFAULT_DISK_SIZE = 512 * 1024**2
+"""Default maximum size of the disk tier in bytes (512 MiB)."""
+RESULT_CACHE_DEFAULT_TTL = 24 * 3600.0
+"""Default seconds after which cached results expire (one day)."""
+RESULT_CACHE_KEY_PATTERN = re.compile(r"(raw-)?[0-9a-f]{64}_[0-9a-f]{64}")
+"""Pattern of the keys created by :meth:`ResultCache.key`."""
+
+
+def default_result_cache_dir() -> Path:
+    """Get default folder of the disk tier.
+
+    Returns
+    -------
+    Path
+    """
+    return CACHE_DIR / "results"
+
+
+def result_spec_hash(
+    spec: bytes | Path, spec_format: SpecFormats, entry: str | None, content_hash: str
+) -> str:
+    """Hash of an uploaded spec used in result cache keys.
+
+    In-memory uploads are parsed to use their canonical hash, so the same spec in another
+    format or key order shares cache entries. Spooled (large) uploads and uploads which can
+    not be parsed or hashed are keyed by the hash of their content instead, the render
+    reports the actual error of invalid specs.
+
+    Parameters
+    ----------
+    spec : bytes | Path
+        Content of the uploaded file or file it was spooled to.
+    spec_format : SpecFormats
+        Format of the uploaded file.
+    entry : str | None
+        Path of the root spec inside of a zip archive.
+    content_hash : str
+        SHA-256 hex digest of the uploaded file.
+
+    Returns
+    -------
+    str
+    """
+    raw_hash = f"raw-{content_hash}"
+    if isinstance(spec, Path):
+        return raw_hash
+    try:
+        if spec_format == "zip":
+            spec_data = bundle_openapi_archive(spec, entry)
+        elif spec_format == "json":
+            spec_data = loads_json(spec)
+        else:
+            spec_data = loads_yaml(spec)
+        return canonical_spec_hash(spec_data)
+    # A cache miss must not fail requests the render can handle or report properly
+    except Exception:  # noqa: BLE001
+        return raw_hash
+
+
+class ResultCacheEntry(NamedTuple):
+    """Information about a single result cache entry."""
+
+    key: str
+    tier: ResultCacheTiers
+    size: int
+    created: float
+
+
+class _MemoryEntry(NamedTuple):
+    """Result held in the memory tier."""
+
+    contents: dict[str, bytes]
+    size: int
+    created: float
+
+
+class ResultCache:
+    """Size bounded two-tier cache of rendered results with expiry and hit counters."""
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        memory_max_size: int = RESULT_CACHE_DEFAULT_MEMORY_SIZE,
+        disk_max_size: int = RESULT_CACHE_DEFAULT_DISK_SIZE,
+        ttl: float | None = RESULT_CACHE_DEFAULT_TTL,
+    ) -> None:
+        """Create empty cache, the folder of the disk tier is created on first write.
+
+        Parameters
+        ----------
+        cache_dir : Path | None
+            Folder of the disk tier. Defaults to None which uses ``CACHE_DIR / "results"``.
+        memory_max_size : int
+            Maximum total size of the results in memory in bytes. Defaults to 64 MiB
+        disk_max_size : int
+            Maximum total size of the results on disk in bytes, ``0`` disables the disk
+            tier. Defaults to 512 MiB
+        ttl : float | None
+            Seconds after which results expire. Defaults to one day, None keeps them until
+            they are evicted.
+        """
+        self.cache_dir = default_result_cache_dir() if cache_dir is None else cache_dir
+        self.memory_max_size = memory_max_size
+        self.disk_max_size = disk_max_size
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, _MemoryEntry] = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        spec_hash: str,
+        file_name: Path,
+        *,
+        modes: list[OpenapiToPlantumlModes],
+        diagram_formats: list[OpenapiToPlantumlFormats],
+        entry: str | None,
+        prune_unused: bool,
+        operation_filter: OperationFilter | None,
+        version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    ) -> str:
+        """Create cache key for the result of a request.
+
+        Parameters
+        ----------
+        spec_hash : str
+            Hash of the spec, see :func:`result_spec_hash`.
+        file_name : Path
+            Name of the uploaded file, used for the names of the diagrams.
+        modes : list[OpenapiToPlantumlModes]
+            Requested modes.
+        diagram_formats : list[OpenapiToPlantumlFormats]
+            Requested diagram formats.
+        entry : str | None
+            Path of the root spec inside of a zip archive.
+        prune_unused : bool
+            Whether unused components are dropped.
+        operation_filter : OperationFilter | None
+            Criteria selecting the operations to render.
+        version : str
+            Version of ``openapi-to-plantuml``. Defaults to "0.1.28"
+
+        Returns
+        -------
+        str
+        """
+        options_digest = render_options_digest(
+            file_name,
+            modes=modes,
+            diagram_formats=diagram_formats,
+            entry=entry,
+            prune_unused=prune_unused,
+            operation_filter=operation_filter,
+            version=version,
+        )
+        return f"{spec_hash}_{options_digest}"
+
+    def _expired(self, created: float) -> bool:
+        """Check if an entry created at ``created`` outlived the ``ttl``.
+
+        Parameters
+        ----------
+        created : float
+            Creation time of the entry as unix timestamp.
+
+        Returns
+        -------
+        bool
+        """
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _entry_file(self, key: str) -> Path:
+        """Zip file of an entry in the disk tier.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        Path
+        """
+        return self.cache_dir / f"{key}.zip"
+
+    def get(self, key: str) -> dict[str, bytes] | None:
+        """Get cached result, looking at the memory tier first.
+
+        Disk hits are added to the memory tier.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        dict[str, bytes] | None
+            Content of the rendered files by their name or None if ``key`` is not cached.
+        """
+        with self._lock:
+            memory_entry = self._memory.get(key)
+            if memory_entry is not None and self._expired(memory_entry.created):
+                self._remove_memory(key)
+                memory_entry = None
+            if memory_entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return memory_entry.contents
+        contents, created = self._read_disk(key)
+        with self._lock:
+            if contents is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, contents, created)
+        return contents
+
+    def put(self, key: str, contents: dict[str, bytes]) -> None:
+        """Add result to both tiers and evict entries exceeding the size limits.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        contents : dict[str, bytes]
+            Content of the rendered files by their name.
+        """
+        with self._lock:
+            self._put_memory(key, contents, time.time())
+        if self.disk_max_size > 0:
+            self._write_disk(key, contents)
+
+    def _put_memory(self, key: str, contents: dict[str, bytes], created: float) -> None:
+        """Add result to the memory tier, the caller has to hold the lock.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        contents : dict[str, bytes]
+            Content of the rendered files by their name.
+        created : float
+            Timestamp the result was rendered at.
+        """
+        size = sum(len(content) for content in contents.values())
+        self._remove_memory(key)
+        if size > self.memory_max_size:
+            # Would evict all other entries, only the disk tier holds it
+            return
+        self._memory[key] = _MemoryEntry(contents, size, created)
+        self._memory_size += size
+        while self._memory_size > self.memory_max_size:
+            self._remove_memory(next(iter(self._memory)))
+
+    def _remove_memory(self, key: str) -> bool:
+        """Remove ``key`` from the memory tier, the caller has to hold the lock.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        bool
+            Whether ``key`` was in the memory tier.
+        """
+        memory_entry = self._memory.pop(key, None)
+        if memory_entry is None:
+            return False
+        self._memory_size -= memory_entry.size
+        return True
+
+    def _read_disk(self, key: str) -> tuple[dict[str, bytes] | None, float]:
+        """Read result from the disk tier, removing it if it expired.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        tuple[dict[str, bytes] | None, float]
+            Content of the rendered files or None and the timestamp the result was rendered at.
+        """
+        entry_file = self._entry_file(key)
+        try:
+            created = entry_file.stat().st_mtime
+            if self._expired(created):
+                entry_file.unlink(missing_ok=True)
+                return None, created
+            data = entry_file.read_bytes()
+            with ZipFile(BytesIO(data)) as zip_file:
+                return {name: zip_file.read(name) for name in zip_file.namelist()}, created
+        except FileNotFoundError:
+            return None, 0.0
+        except BadZipFile:
+            entry_file.unlink(missing_ok=True)
+            return None, 0.0
+
+    def _write_disk(self, key: str, contents: dict[str, bytes]) -> None:
+        """Add result to the disk tier and evict the oldest entries exceeding the limit.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        contents : dict[str, bytes]
+            Content of the rendered files by their name.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = mkstemp(prefix=".tmp-", suffix=".zip", dir=self.cache_dir)
+        with os.fdopen(fd, "wb") as tmp_file:
+            write_zip_contents(contents, tmp_file)
+        # Atomic so concurrent readers never see partially written entries.
+        Path(tmp_name).replace(self._entry_file(key))
+        disk_entries = self._disk_entries()
+        total_size = sum(disk_entry.size for disk_entry in disk_entries)
+        for disk_entry in disk_entries:
+            if total_size <= self.disk_max_size:
+                break
+            self._entry_file(disk_entry.key).unlink(missing_ok=True)
+            total_size -= disk_entry.size
+
+    def _disk_entries(self) -> list[ResultCacheEntry]:
+        """Entries of the disk tier, oldest first.
+
+        Returns
+        -------
+        list[ResultCacheEntry]
+        """
+        if self.cache_dir.is_dir() is False:
+            return []
+        disk_entries = []
+        for entry_file in self.cache_dir.glob("*.zip"):
+            # Skips partially written entries and foreign files
+            if RESULT_CACHE_KEY_PATTERN.fullmatch(entry_file.stem) is None:
+                continue
+            try:
+                stat_result = entry_file.stat()
+            except FileNotFoundError:
+                # Entry was evicted concurrently
+                continue
+            disk_entries.append(
+                ResultCacheEntry(
+                    entry_file.stem, "disk", stat_result.st_size, stat_result.st_mtime
+                )
+            )
+        return sorted(disk_entries, key=lambda disk_entry: disk_entry.created)
+
+    def entries(self) -> list[ResultCacheEntry]:
+        """All unexpired entries, memory tier (least recently used first) before disk tier.
+
+        Returns
+        -------
+        list[ResultCacheEntry]
+        """
+        with self._lock:
+            memory_entries = [
+                ResultCacheEntry(key, "memory", memory_entry.size, memory_entry.created)
+                for key, memory_entry in self._memory.items()
+                if not self._expired(memory_entry.created)
+            ]
+        disk_entries = [
+            disk_entry
+            for disk_entry in self._disk_entries()
+            if not self._expired(disk_entry.created)
+        ]
+        return memory_entries + disk_entries
+
+    def purge(self, key: str | None = None) -> int:
+        """Remove one or all entries from both tiers and reset the counters for all.
+
+        Parameters
+        ----------
+        key : str | None
+            Cache key to remove. Defaults to None which removes all entries.
+
+        Returns
+        -------
+        int
+            Number of removed entries per tier, i.e. a result cached in both counts twice.
+        """
+        if key is not None and RESULT_CACHE_KEY_PATTERN.fullmatch(key) is None:
+            # Keys become file names, never touch anything but cache entries
+            return 0
+        with self._lock:
+            if key is None:
+                removed = len(self._memory)
+                self._memory.clear()
+                self._memory_size = 0
+                self.memory_hits = self.disk_hits = self.misses = 0
+            else:
+                removed = int(self._remove_memory(key))
+        entry_files = (
+            [disk_entry.key for disk_entry in self._disk_entries()] if key is None else [key]
+        )
+        for entry_key in entry_files:
+            entry_file = self._entry_file(entry_key)
+            if entry_file.is_file():
+                entry_file.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    @property
+    def memory_size(self) -> int:
+        """Total size of the results in the memory tier in bytes."""
+        return self._memory_size
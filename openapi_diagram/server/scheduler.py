@@ -0,0 +1,159 @@
+"""Bounded scheduler for renders, providing backpressure for the REST API."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import TYPE_CHECKING
+from typing import TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from collections.abc import Callable
+
+T = TypeVar("T")
+
+
+class SchedulerError(Exception):
+    """Base error of the render scheduler, mapped to an HTTP error response."""
+
+    status_code = 503
+
+    def __init__(self, msg: str, retry_after: int) -> None:
+        """Create error with a hint when to retry.
+
+        Parameters
+        ----------
+        msg : str
+            Error message.
+        retry_after : int
+            Seconds after which the client should retry.
+        """
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+
+class QueueFullError(SchedulerError):
+    """Error raised when the wait queue of the scheduler is full."""
+
+    status_code = 429
+
+
+class QueueTimeoutError(SchedulerError):
+    """Error raised when a render waited too long for a free slot."""
+
+    status_code = 503
+
+
+class RenderTimeoutError(SchedulerError):
+    """Error raised when a render took longer than the run time deadline."""
+
+    status_code = 503
+
+
+class RenderScheduler:
+    """Limit concurrently running renders and the number of renders waiting for a slot."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue_size: int,
+        queue_timeout: float,
+        run_timeout: float,
+    ) -> None:
+        """Create scheduler.
+
+        Parameters
+        ----------
+        max_concurrency : int
+            Maximum number of renders running at the same time.
+        max_queue_size : int
+            Maximum number of renders waiting for a free slot.
+        queue_timeout : float
+            Seconds a render may wait for a free slot.
+        run_timeout : float
+            Seconds a render may run.
+
+        Raises
+        ------
+        ValueError
+            If ``max_concurrency`` is smaller than 1 or ``max_queue_size`` is negative.
+        """
+        if max_concurrency < 1 or max_queue_size < 0:
+            msg = "'max_concurrency' needs to be at least 1 and 'max_queue_size' non-negative."
+            raise ValueError(msg)
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        self.run_timeout = run_timeout
+        self.running = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._average_run_time = 1.0
+
+    @property
+    def retry_after(self) -> int:
+        """Estimated seconds until a new render would get a slot."""
+        estimate = self._average_run_time * (self.waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(estimate))
+
+    async def _acquire_slot(self) -> None:
+        """Wait for a free slot.
+
+        Raises
+        ------
+        QueueFullError
+            If no slot is free and the wait queue is full.
+        QueueTimeoutError
+            If no slot became free within ``queue_timeout``.
+        """
+        if self._slots.locked() is False:
+            # Does not suspend, so the slot is taken before any other render is scheduled
+            await self._slots.acquire()
+            return
+        if self.waiting >= self.max_queue_size:
+            msg = "Too many renders in progress, try again later."
+            raise QueueFullError(msg, self.retry_after)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except TimeoutError as error:
+            msg = f"Render did not start within {self.queue_timeout}s, try again later."
+            raise QueueTimeoutError(msg, self.retry_after) from error
+        finally:
+            self.waiting -= 1
+
+    async def run(self, render: Callable[[], Awaitable[T]]) -> T:
+        """Run ``render`` once a slot is free, enforcing the queue and run time limits.
+
+        Parameters
+        ----------
+        render : Callable[[], Awaitable[T]]
+            Factory of the awaitable doing the actual render.
+
+        Returns
+        -------
+        T
+            Result of the render.
+
+        Raises
+        ------
+        RenderTimeoutError
+            If the render did not finish within ``run_timeout``.
+        """
+        await self._acquire_slot()
+        self.running += 1
+        start = time.monotonic()
+        try:
+            return await asyncio.wait_for(render(), self.run_timeout)
+        except TimeoutError as error:
+            msg = f"Render did not finish within {self.run_timeout}s."
+            raise RenderTimeoutError(msg, self.retry_after) from error
+        finally:
+            # Exponential moving average used to estimate 'Retry-After'
+            self._average_run_time = 0.8 * self._average_run_time + 0.2 * (
+                time.monotonic() - start
+            )
+            self.running -= 1
+            self._slots.release()
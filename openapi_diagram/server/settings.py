@@ -0,0 +1,90 @@
+"""Settings of the REST API server, read from ``OPENAPI_DIAGRAM__*`` environment variables."""
+
+from __future__ import annotations
+
+import os
+from functools import cache
+from pathlib import Path  # noqa: TCH003
+
+from pydantic_settings import BaseSettings
+from pydantic_settings import SettingsConfigDict
+
+from openapi_diagram.jvm_launch import JvmProfiles  # noqa: TCH001
+from openapi_diagram.render_cache import RENDER_CACHE_DEFAULT_MAX_SIZE
+from openapi_diagram.server.result_cache import RESULT_CACHE_DEFAULT_DISK_SIZE
+from openapi_diagram.server.result_cache import RESULT_CACHE_DEFAULT_MEMORY_SIZE
+from openapi_diagram.server.result_cache import RESULT_CACHE_DEFAULT_TTL
+
+
+class ServerSettings(BaseSettings):
+    """REST API server settings."""
+
+    model_config = SettingsConfigDict(env_prefix="OPENAPI_DIAGRAM__")
+
+    worker_pool_size: int = 0
+    """Number of warm JVM workers, ``0`` runs a one-shot subprocess per conversion."""
+    worker_max_jobs: int = 200
+    """Number of conversions after which a JVM worker is replaced."""
+    worker_health_check_interval: float = 30.0
+    """Idle seconds after which a JVM worker is pinged before it is reused."""
+    render_cache: bool = True
+    """Whether to reuse rendered diagrams of previous requests from the render cache."""
+    render_cache_max_size: int = RENDER_CACHE_DEFAULT_MAX_SIZE
+    """Maximum size of the render cache in bytes."""
+    result_cache: bool = True
+    """Whether to serve repeated requests from the in-memory and disk result cache."""
+    result_cache_memory_size: int = RESULT_CACHE_DEFAULT_MEMORY_SIZE
+    """Maximum size of the in-memory tier of the result cache in bytes."""
+    result_cache_disk_size: int = RESULT_CACHE_DEFAULT_DISK_SIZE
+    """Maximum size of the disk tier of the result cache in bytes, ``0`` disables it."""
+    result_cache_ttl: float | None = RESULT_CACHE_DEFAULT_TTL
+    """Seconds after which cached results expire, unset keeps them until they are evicted."""
+    result_cache_dir: Path | None = None
+    """Folder of the disk tier of the result cache, defaults to ``CACHE_DIR / 'results'``."""
+    admin_token: str | None = None
+    """Bearer token required by the ``/api/v1/admin`` endpoints, which are disabled if unset."""
+    max_concurrent_renders: int = os.cpu_count() or 1
+    """Number of renders running at the same time."""
+    max_queued_renders: int = 32
+    """Number of renders waiting for a free slot before requests are rejected with ``429``."""
+    render_queue_timeout: float = 30.0
+    """Seconds a render may wait for a free slot before the request fails with ``503``."""
+    render_timeout: float = 300.0
+    """Seconds a render may run before the request fails with ``503``."""
+    render_max_heap: str | None = None
+    """Maximum heap of one-shot JVMs in ``-Xmx`` notation (e.g. ``'512m'``)."""
+    render_cpu_time: int | None = None
+    """CPU seconds a one-shot JVM may use before the request fails with ``422``."""
+    render_max_output_size: int | None = None
+    """Bytes a one-shot JVM may write before the request fails with ``422``."""
+    job_workers: int = 2
+    """Number of asynchronous jobs rendered at the same time."""
+    max_queued_jobs: int = 100
+    """Number of asynchronous jobs waiting to be rendered before new jobs are rejected."""
+    job_result_ttl: float = 3600.0
+    """Seconds finished asynchronous jobs and their results are kept."""
+    jobs_dir: Path | None = None
+    """Folder to store asynchronous job results in, defaults to a temporary folder."""
+    scratch_dir: Path | None = None
+    """Folder for the spec and output files of synchronous renders, defaults to the memory
+    backed ``/dev/shm`` if available. Point it to a disk folder if ``/dev/shm`` is too small
+    for the rendered diagrams."""
+    max_upload_size: int = 256 * 1024 * 1024
+    """Bytes a (decompressed) spec upload may have before it is rejected with ``413``."""
+    upload_spool_size: int = 8 * 1024 * 1024
+    """Bytes of a spec upload kept in memory, larger uploads are spooled to a file."""
+    upload_dir: Path | None = None
+    """Folder large spec uploads are spooled to, defaults to the temporary folder."""
+    jvm_profile: JvmProfiles = "default"
+    """Launch profile of one-shot JVMs, ``low-memory`` suits many concurrent renders."""
+
+
+@cache
+def get_settings() -> ServerSettings:
+    """Get cached server settings.
+
+    Returns
+    -------
+    ServerSettings
+    """
+    return ServerSettings()
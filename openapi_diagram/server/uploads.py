@@ -0,0 +1,522 @@
+"""Spec uploads sent as raw or multipart request body instead of text embedded in JSON.
+
+Compressed bodies (``Content-Encoding: gzip`` or ``zstd``) are decompressed while they are
+received. Bodies up to ``spool_size`` bytes are kept in memory, larger ones are spooled to a
+temporary file and bodies larger than ``max_size`` after decompression are rejected, so
+compressed uploads can not expand without bounds. :func:`iter_compressed` creates such
+bodies on the client side.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import zlib
+from pathlib import Path
+from tempfile import mkstemp
+from typing import TYPE_CHECKING
+from typing import Literal
+from typing import Protocol
+from typing import TypeAlias
+
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException
+from starlette.formparsers import MultiPartParser
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+    from collections.abc import Iterator
+    from types import ModuleType
+
+    from starlette.requests import Request
+
+UploadCompressions: TypeAlias = Literal["gzip", "zstd", "none"]
+
+UPLOAD_FILE_FIELD = "file"
+"""Name of the form field containing the spec in multipart uploads."""
+UPLOAD_READ_SIZE = 64 * 1024
+"""Bytes decompressed or copied at once."""
+
+
+class UploadError(Exception):
+    """Invalid upload, mapped to an HTTP error response."""
+
+    status_code = 400
+
+
+class UploadTooLargeError(UploadError):
+    """Error raised when the (decompressed) upload exceeds the size limit."""
+
+    status_code = 413
+
+
+class UnsupportedContentEncodingError(UploadError):
+    """Error raised for a ``Content-Encoding`` which can not be decoded."""
+
+    status_code = 415
+
+
+class _Compressor(Protocol):
+    """Incremental compressor, e.g. the ones of ``zlib.compressobj``."""
+
+    def compress(self, data: bytes) -> bytes:  # pragma: no cover
+        """Compress the next chunk.
+
+        Parameters
+        ----------
+        data : bytes
+            Chunk to compress.
+
+        Returns
+        -------
+        bytes
+            Compressed data, may be empty.
+        """
+        ...
+
+    def flush(self) -> bytes:  # pragma: no cover
+        """Finish compressing.
+
+        Returns
+        -------
+        bytes
+            Remaining compressed data.
+        """
+        ...
+
+
+class _Decompressor(Protocol):
+    """Incremental decompressor of a request body."""
+
+    def decompress(self, data: bytes) -> bytes:  # pragma: no cover
+        """Decompress the next chunk.
+
+        Parameters
+        ----------
+        data : bytes
+            Compressed chunk.
+
+        Returns
+        -------
+        bytes
+            Decompressed data, may be empty.
+        """
+        ...
+
+
+def _zstandard() -> ModuleType:
+    """Import the optional ``zstandard`` package.
+
+    Returns
+    -------
+    ModuleType
+
+    Raises
+    ------
+    UnsupportedContentEncodingError
+        If ``zstandard`` is not installed.
+    """
+    try:
+        import zstandard
+    except ImportError:
+        msg = "zstd compression requires 'openapi-diagram[zstd]' to be installed."
+        raise UnsupportedContentEncodingError(msg) from None
+    return zstandard
+
+
+def _iter_chunks(
+    content: bytes, compressor: _Compressor | None, chunk_size: int
+) -> Iterator[bytes]:
+    """Compressed ``content``, chunk by chunk.
+
+    Parameters
+    ----------
+    content : bytes
+        Body to compress.
+    compressor : _Compressor | None
+        Compressor to use, None to pass ``content`` through unchanged.
+    chunk_size : int
+        Bytes to compress at once.
+
+    Yields
+    ------
+    bytes
+        Consecutive parts of the compressed body.
+    """
+    for start in range(0, len(content), chunk_size):
+        chunk = content[start : start + chunk_size]
+        if compressor is None:
+            yield chunk
+        elif data := compressor.compress(chunk):
+            yield data
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def iter_compressed(
+    content: bytes, compression: UploadCompressions, chunk_size: int = UPLOAD_READ_SIZE
+) -> Iterator[bytes]:
+    """Compress an upload body piece by piece, e.g. to stream it as request body.
+
+    Parameters
+    ----------
+    content : bytes
+        Body to compress.
+    compression : UploadCompressions
+        Compression to use, matching the ``Content-Encoding`` header of the request.
+    chunk_size : int
+        Bytes to compress at once. Defaults to ``UPLOAD_READ_SIZE``
+
+    Returns
+    -------
+    Iterator[bytes]
+        Consecutive parts of the compressed body.
+    """
+    compressor: _Compressor | None = None
+    if compression == "gzip":
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    elif compression == "zstd":
+        # Imported before iterating, so a missing package fails before the request is sent
+        compressor = _zstandard().ZstdCompressor().compressobj()
+    return _iter_chunks(content, compressor, chunk_size)
+
+
+class _IdentityDecompressor:
+    """Pass the body through unchanged."""
+
+    def decompress(self, data: bytes) -> bytes:
+        """Return ``data`` unchanged.
+
+        Parameters
+        ----------
+        data : bytes
+            Chunk of the body.
+
+        Returns
+        -------
+        bytes
+        """
+        return data
+
+
+class _GzipDecompressor:
+    """Decompress gzip bodies, including ones with several members, in bounded steps."""
+
+    def __init__(self) -> None:
+        """Create decompressor for the first member."""
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress the next chunk of the body.
+
+        Parameters
+        ----------
+        data : bytes
+            Compressed chunk.
+
+        Returns
+        -------
+        bytes
+            Decompressed data, may be empty.
+        """
+        parts = []
+        while data:
+            # Limiting the output lets the caller check the size before a bomb expands
+            parts.append(self._decompressor.decompress(data, UPLOAD_READ_SIZE))
+            data = self._decompressor.unconsumed_tail
+            if self._decompressor.eof and not data:
+                data = self._decompressor.unused_data
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return b"".join(parts)
+
+
+class _ZstdDecompressor:
+    """Decompress zstd bodies, stopping as soon as the output exceeds the size limit.
+
+    The output of zstd frames is not bounded by their size, so it is checked piece by piece
+    while a chunk is decompressed instead of once the whole chunk is decompressed.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Create decompressor.
+
+        Parameters
+        ----------
+        max_size : int
+            Maximum number of decompressed bytes.
+        """
+        self.max_size = max_size
+        self._size = 0
+        self._parts: list[bytes] = []
+        self._writer = (
+            _zstandard().ZstdDecompressor().stream_writer(self, write_size=UPLOAD_READ_SIZE)
+        )
+
+    def write(self, data: bytes) -> int:
+        """Collect a decompressed piece of at most ``UPLOAD_READ_SIZE`` bytes.
+
+        Parameters
+        ----------
+        data : bytes
+            Decompressed data, written by the zstd stream writer.
+
+        Returns
+        -------
+        int
+            Number of bytes written.
+
+        Raises
+        ------
+        UploadTooLargeError
+            If the decompressed body exceeds ``max_size``.
+        """
+        self._size += len(data)
+        if self._size > self.max_size:
+            msg = f"Upload exceeds the maximum size of {self.max_size} bytes."
+            raise UploadTooLargeError(msg)
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress the next chunk of the body.
+
+        Parameters
+        ----------
+        data : bytes
+            Compressed chunk.
+
+        Returns
+        -------
+        bytes
+            Decompressed data, may be empty.
+        """
+        self._writer.write(data)
+        output = b"".join(self._parts)
+        self._parts.clear()
+        return output
+
+
+def _decompressor(content_encoding: str | None, max_size: int) -> _Decompressor:
+    """Decompressor for the ``Content-Encoding`` of a request.
+
+    Parameters
+    ----------
+    content_encoding : str | None
+        Value of the ``Content-Encoding`` header.
+    max_size : int
+        Maximum number of decompressed bytes.
+
+    Returns
+    -------
+    _Decompressor
+
+    Raises
+    ------
+    UnsupportedContentEncodingError
+        If the encoding is unknown or the optional ``zstandard`` package is not installed.
+    """
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return _IdentityDecompressor()
+    if encoding in ("gzip", "x-gzip"):
+        return _GzipDecompressor()
+    if encoding == "zstd":
+        return _ZstdDecompressor(max_size)
+    msg = f"Unsupported 'Content-Encoding': {content_encoding!r}, use gzip or zstd."
+    raise UnsupportedContentEncodingError(msg)
+
+
+async def _decoded_body(request: Request, max_size: int) -> AsyncGenerator[bytes, None]:
+    """Decompressed request body, chunk by chunk.
+
+    Parameters
+    ----------
+    request : Request
+        Request to read the body of.
+    max_size : int
+        Maximum number of decompressed bytes.
+
+    Yields
+    ------
+    bytes
+        Decompressed chunk.
+
+    Raises
+    ------
+    UploadError
+        If the body can not be decompressed.
+    UploadTooLargeError
+        If the decompressed body exceeds ``max_size``.
+    """
+    decompressor = _decompressor(request.headers.get("content-encoding"), max_size)
+    size = 0
+    async for chunk in request.stream():
+        try:
+            data = decompressor.decompress(chunk)
+        except UploadTooLargeError:
+            raise
+        except Exception as error:  # noqa: BLE001
+            # zlib and zstandard raise different errors for corrupt data
+            msg = f"Can not decompress the request body: {error}"
+            raise UploadError(msg) from None
+        size += len(data)
+        if size > max_size:
+            msg = f"Upload exceeds the maximum size of {max_size} bytes."
+            raise UploadTooLargeError(msg)
+        if data:
+            yield data
+
+
+class SpooledUpload:
+    """Spec content of an upload, in memory or spooled to a temporary file."""
+
+    def __init__(self, max_size: int, spool_size: int, spool_dir: Path | None) -> None:
+        """Create empty upload.
+
+        Parameters
+        ----------
+        max_size : int
+            Maximum number of bytes.
+        spool_size : int
+            Number of bytes from which on the content is written to a temporary file.
+        spool_dir : Path | None
+            Folder for the temporary file, None uses the default temporary folder.
+        """
+        self.max_size = max_size
+        self.spool_size = spool_size
+        self.spool_dir = spool_dir
+        self.file_name: str | None = None
+        """File name given in a multipart upload."""
+        self._parts: list[bytes] = []
+        self._size = 0
+        self._hash = hashlib.sha256()
+        self._file: Path | None = None
+        self._fd: int | None = None
+
+    def write(self, data: bytes) -> None:
+        """Append ``data``, switching to a temporary file once ``spool_size`` is exceeded.
+
+        Parameters
+        ----------
+        data : bytes
+            Data to append.
+
+        Raises
+        ------
+        UploadTooLargeError
+            If the upload exceeds ``max_size``.
+        """
+        self._size += len(data)
+        if self._size > self.max_size:
+            msg = f"Upload exceeds the maximum size of {self.max_size} bytes."
+            raise UploadTooLargeError(msg)
+        self._hash.update(data)
+        if self._fd is None and self._size > self.spool_size:
+            self._fd, name = mkstemp(dir=self.spool_dir, prefix="openapi-diagram-upload-")
+            self._file = Path(name)
+            os.write(self._fd, b"".join(self._parts))
+            self._parts.clear()
+        if self._fd is None:
+            self._parts.append(data)
+        else:
+            os.write(self._fd, data)
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 hex digest of the content, computed while it was received."""
+        return self._hash.hexdigest()
+
+    @property
+    def content(self) -> bytes | Path:
+        """Content of small uploads or the file large uploads were spooled to."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        return b"".join(self._parts) if self._file is None else self._file
+
+    def close(self) -> None:
+        """Remove the temporary file of a spooled upload."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._file is not None:
+            self._file.unlink(missing_ok=True)
+
+
+async def receive_upload(
+    request: Request, max_size: int, spool_size: int, spool_dir: Path | None = None
+) -> SpooledUpload:
+    """Receive the spec of a raw or ``multipart/form-data`` request body.
+
+    Multipart uploads contain the spec in the :data:`UPLOAD_FILE_FIELD` field.
+
+    Parameters
+    ----------
+    request : Request
+        Upload request.
+    max_size : int
+        Maximum number of bytes of the decompressed body.
+    spool_size : int
+        Number of bytes from which on the spec is spooled to a temporary file.
+    spool_dir : Path | None
+        Folder for spooled uploads. Defaults to None which uses the default temporary folder.
+
+    Returns
+    -------
+    SpooledUpload
+        Received spec, the caller has to close it.
+
+    Raises
+    ------
+    UploadError
+        If the body is not a valid upload.
+    """
+    upload = SpooledUpload(max_size, spool_size, spool_dir)
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            await _receive_multipart(request, upload)
+        else:
+            async for chunk in _decoded_body(request, max_size):
+                upload.write(chunk)
+    except BaseException:
+        upload.close()
+        raise
+    return upload
+
+
+async def _receive_multipart(request: Request, upload: SpooledUpload) -> None:
+    """Copy the spec file of a multipart body into ``upload``.
+
+    Parameters
+    ----------
+    request : Request
+        Upload request.
+    upload : SpooledUpload
+        Upload to write the spec to.
+
+    Raises
+    ------
+    UploadError
+        If the body is no valid multipart body or the spec file is missing.
+    """
+    parser = MultiPartParser(
+        request.headers,
+        _decoded_body(request, upload.max_size),
+        max_files=1,
+        max_fields=10,
+        max_part_size=UPLOAD_READ_SIZE,
+    )
+    try:
+        form = await parser.parse()
+    except MultiPartException as error:
+        raise UploadError(error.message) from None
+    try:
+        spec_file = form.get(UPLOAD_FILE_FIELD)
+        if not isinstance(spec_file, UploadFile):
+            msg = f"Multipart uploads need the spec in a file field named {UPLOAD_FILE_FIELD!r}."
+            raise UploadError(msg)
+        upload.file_name = spec_file.filename
+        while chunk := await spec_file.read(UPLOAD_READ_SIZE):
+            upload.write(chunk)
+    finally:
+        await form.close()
@@ -0,0 +1,402 @@
+"""Sharded rendering, which splits one large spec to render it in several JVMs in parallel.
+
+The operations are grouped by their first tag or the first segment of their path and the
+groups are distributed over the shards so that each shard has about the same number of
+operations. Each shard is a self-contained spec with the operations of its groups and only
+the components they reference. In ``split`` mode the diagrams of all shards are merged into
+the output folder, in ``single`` mode each shard becomes a diagram of its own
+(e.g. ``api.01-pets.puml`` for ``api.puml``) listed in an index (``api.index.md``).
+"""
+
+from __future__ import annotations
+
+import re
+import shutil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING
+from typing import Literal
+from typing import NamedTuple
+from typing import TypeAlias
+
+from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram.batch import BatchJob
+from openapi_diagram.batch import run_openapi_to_plantuml_batch
+from openapi_diagram.bundle import bundle_openapi_spec
+from openapi_diagram.bundle import references_spec_files
+from openapi_diagram.filters import HTTP_METHODS
+from openapi_diagram.openapi_to_plantuml import RenderTarget
+from openapi_diagram.openapi_to_plantuml import render_targets
+from openapi_diagram.openapi_to_plantuml import validate_arguments
+from openapi_diagram.serialization import dumps_json
+from openapi_diagram.utils import load_openapi_spec
+from openapi_diagram.utils import preprocess_spec
+from openapi_diagram.utils import prune_unused_components
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from openapi_diagram.bundle import SpecParseCache
+    from openapi_diagram.filters import OperationFilter
+    from openapi_diagram.jvm_worker import JvmWorkerPool
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
+    from openapi_diagram.render_cache import RenderCache
+    from openapi_diagram.utils import Json
+
+ShardStrategies: TypeAlias = Literal["tag", "path"]
+
+UNTAGGED_GROUP = "default"
+ROOT_PATH_GROUP = "root"
+
+
+class SpecShard(NamedTuple):
+    """Self-contained part of a spec."""
+
+    name: str
+    groups: list[str]
+    """Tags or first path segments of the operations in the shard."""
+    operation_count: int
+    spec_data: dict[str, Json]
+
+
+class ShardRenderError(RuntimeError):
+    """Rendering at least one shard failed."""
+
+
+def _group_key(path: str, operation: dict[str, Json], shard_by: ShardStrategies) -> str:
+    """Group an operation belongs to.
+
+    Parameters
+    ----------
+    path : str
+        Path of the operation.
+    operation : dict[str, Json]
+        Operation object.
+    shard_by : ShardStrategies
+        Whether to group by the first tag or the first path segment.
+
+    Returns
+    -------
+    str
+    """
+    if shard_by == "path":
+        segments = [segment for segment in path.split("/") if segment != ""]
+        return segments[0] if len(segments) > 0 else ROOT_PATH_GROUP
+    tags = operation.get("tags")
+    if isinstance(tags, list) and len(tags) > 0:
+        return str(tags[0])
+    return UNTAGGED_GROUP
+
+
+def _shard_name(index: int, shard_count: int, groups: list[str]) -> str:
+    """File name safe and unique name of a shard.
+
+    Parameters
+    ----------
+    index : int
+        Position of the shard.
+    shard_count : int
+        Number of shards.
+    groups : list[str]
+        Groups in the shard, the first one is used in the name.
+
+    Returns
+    -------
+    str
+    """
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", groups[0]).strip("-") if len(groups) > 0 else ""
+    prefix = f"{index + 1:0{len(str(shard_count))}d}"
+    return prefix if slug == "" else f"{prefix}-{slug}"
+
+
+def _group_operations(
+    spec_data: dict[str, Json], shard_by: ShardStrategies
+) -> dict[str, list[tuple[str, str]]]:
+    """Path and method of the operations in each group.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+    shard_by : ShardStrategies
+        Whether to group by the first tag or the first path segment.
+
+    Returns
+    -------
+    dict[str, list[tuple[str, str]]]
+    """
+    groups: dict[str, list[tuple[str, str]]] = {}
+    for path, path_item in (spec_data.get("paths") or {}).items():  # type:ignore[union-attr]
+        if not isinstance(path_item, dict):
+            continue
+        for method in HTTP_METHODS:
+            operation = path_item.get(method)
+            if isinstance(operation, dict):
+                key = _group_key(path, operation, shard_by)
+                groups.setdefault(key, []).append((path, method))
+    return groups
+
+
+def shard_openapi_spec(
+    spec_data: dict[str, Json], shards: int, shard_by: ShardStrategies = "tag"
+) -> list[SpecShard]:
+    """Split a spec into at most ``shards`` self-contained specs.
+
+    Groups are assigned largest first to the shard with the fewest operations, operations of
+    the same group always end up in the same shard.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+    shards : int
+        Maximum number of shards, there are never more shards than groups.
+    shard_by : ShardStrategies
+        Whether to group the operations by their first tag or the first segment of their
+        path. Defaults to "tag"
+
+    Returns
+    -------
+    list[SpecShard]
+
+    Raises
+    ------
+    ValueError
+        If ``shards`` is smaller than 1.
+    """
+    if shards < 1:
+        msg = f"The number of shards must be at least 1, got {shards}."
+        raise ValueError(msg)
+    groups = _group_operations(spec_data, shard_by)
+    if len(groups) == 0:
+        return [SpecShard(_shard_name(0, 1, []), [], 0, prune_unused_components(spec_data))]
+
+    bins: list[list[str]] = [[] for _ in range(min(shards, len(groups)))]
+    loads = [0] * len(bins)
+    for key in sorted(groups, key=lambda key: (-len(groups[key]), key)):
+        index = loads.index(min(loads))
+        bins[index].append(key)
+        loads[index] += len(groups[key])
+
+    spec_shards = []
+    for index, bin_groups in enumerate(bins):
+        selected = {operation for key in bin_groups for operation in groups[key]}
+        paths: dict[str, Json] = {}
+        for path, path_item in spec_data["paths"].items():  # type:ignore[union-attr]
+            methods = {method for method in HTTP_METHODS if (path, method) in selected}
+            if len(methods) > 0:
+                paths[path] = {
+                    key: value
+                    for key, value in path_item.items()  # type:ignore[union-attr]
+                    if key not in HTTP_METHODS or key in methods
+                }
+        spec_shards.append(
+            SpecShard(
+                _shard_name(index, len(bins), bin_groups),
+                bin_groups,
+                loads[index],
+                prune_unused_components({**spec_data, "paths": paths}),
+            )
+        )
+    return spec_shards
+
+
+def _shard_file(target: RenderTarget, shard: SpecShard) -> Path:
+    """Diagram file of ``shard`` for a ``single`` mode target.
+
+    Parameters
+    ----------
+    target : RenderTarget
+        Target the diagram is rendered for.
+    shard : SpecShard
+        Shard the diagram shows.
+
+    Returns
+    -------
+    Path
+    """
+    return target.output_path.with_name(
+        f"{target.output_path.stem}.{shard.name}{target.output_path.suffix}"
+    )
+
+
+def _write_index(
+    index_file: Path,
+    title: str,
+    shard_by: ShardStrategies,
+    shard_files: list[tuple[SpecShard, list[Path]]],
+) -> None:
+    """Write a markdown index of the ``single`` mode diagrams of the shards.
+
+    Parameters
+    ----------
+    index_file : Path
+        File to write the index to.
+    title : str
+        Title of the spec.
+    shard_by : ShardStrategies
+        Whether the operations were grouped by tag or path.
+    shard_files : list[tuple[SpecShard, list[Path]]]
+        Shards and their diagram files.
+    """
+    lines = [
+        f"# {title}",
+        "",
+        f"| Shard | {'Tags' if shard_by == 'tag' else 'Paths'} | Operations | Diagrams |",
+        "| --- | --- | --- | --- |",
+    ]
+    for shard, files in shard_files:
+        diagrams = ", ".join(f"[{file.suffix[1:]}]({file.name})" for file in files)
+        lines.append(
+            f"| {shard.name} | {', '.join(shard.groups)} | {shard.operation_count} "
+            f"| {diagrams} |"
+        )
+    index_file.write_text("\n".join(lines) + "\n", encoding="utf8")
+
+
+def run_openapi_to_plantuml_sharded(
+    openapi_spec: Path,
+    output_path: Path,
+    modes: Iterable[OpenapiToPlantumlModes],
+    diagram_formats: Iterable[OpenapiToPlantumlFormats],
+    version: str = OPENAPI_TO_PLANTUML_DEFAULT_VERSION,
+    worker_pool: JvmWorkerPool | None = None,
+    render_cache: RenderCache | None = None,
+    *,
+    shards: int,
+    max_workers: int = 1,
+    shard_by: ShardStrategies = "tag",
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+    parse_cache: SpecParseCache | None = None,
+) -> dict[RenderTarget, list[Path]]:
+    """Split ``openapi_spec`` into shards and render them in parallel JVMs.
+
+    The output locations are the same as for
+    :func:`openapi_diagram.openapi_to_plantuml.run_openapi_to_plantuml_multi`, except that
+    ``single`` mode writes one diagram per shard next to the target file and an index
+    (``<stem>.index.md``) linking them.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to use.
+    output_path : Path
+        Output location, see
+        :func:`openapi_diagram.openapi_to_plantuml.run_openapi_to_plantuml_multi`.
+    modes : Iterable[OpenapiToPlantumlModes]
+        Modes to run
+    diagram_formats : Iterable[OpenapiToPlantumlFormats]
+        Formats the diagram/-s should be in.
+    version : str
+        Version of ``openapi-to-plantuml`` to use. Defaults to "0.1.28"
+    worker_pool : JvmWorkerPool | None
+        Worker pool to run the shards in. Defaults to None which starts ``max_workers``
+        workers that are stopped afterwards.
+    render_cache : RenderCache | None
+        Cache for rendered diagrams. Defaults to None which always renders.
+    shards : int
+        Maximum number of shards.
+    max_workers : int
+        Number of shards to render concurrently. Defaults to 1
+    shard_by : ShardStrategies
+        Whether to group the operations by their first tag or the first segment of their
+        path. Defaults to "tag"
+    prune_unused : bool
+        Whether to drop components which are not referenced before rendering.
+        Shards only contain the components they reference either way. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render. Defaults to None
+    parse_cache : SpecParseCache | None
+        Cache of parsed files referenced by the spec. Defaults to None
+
+    Returns
+    -------
+    dict[RenderTarget, list[Path]]
+        Diagram files of each mode and format combination.
+
+    Raises
+    ------
+    ShardRenderError
+        If rendering any shard failed.
+    """
+    valid_modes, valid_formats = validate_arguments(modes, diagram_formats, version, worker_pool)
+    spec_data = (
+        bundle_openapi_spec(openapi_spec, parse_cache=parse_cache)
+        if references_spec_files(openapi_spec)
+        else load_openapi_spec(openapi_spec)
+    )
+    spec_data = preprocess_spec(
+        spec_data, prune_unused=prune_unused, operation_filter=operation_filter
+    )
+    spec_shards = shard_openapi_spec(spec_data, shards, shard_by)
+    targets = render_targets(openapi_spec, output_path, valid_modes, valid_formats)
+
+    scratch_dir = output_path if output_path.is_dir() else output_path.parent
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    with TemporaryDirectory(dir=scratch_dir, prefix=".shards-") as tmp_dir:
+        jobs = []
+        for shard in spec_shards:
+            shard_spec_file = Path(tmp_dir) / "specs" / f"{shard.name}.json"
+            shard_spec_file.parent.mkdir(parents=True, exist_ok=True)
+            shard_spec_file.write_bytes(dumps_json(shard.spec_data))
+            for target in targets:
+                shard_output = (
+                    Path(tmp_dir) / "output" / target.mode / target.diagram_format / shard.name
+                )
+                jobs.append(
+                    BatchJob(
+                        openapi_spec=shard_spec_file,
+                        output_path=shard_output
+                        if target.mode == "split"
+                        else shard_output / f"{shard.name}.{target.diagram_format}",
+                        mode=target.mode,
+                        diagram_format=target.diagram_format,
+                    )
+                )
+        batch_results = run_openapi_to_plantuml_batch(
+            jobs, version, worker_pool, render_cache, max_workers=max_workers
+        )
+        errors = [
+            f"{result.job.openapi_spec.stem} ({result.job.mode}, "
+            f"{result.job.diagram_format}): {result.error}"
+            for result in batch_results
+            if result.ok is False
+        ]
+        if len(errors) > 0:
+            msg = "Rendering shards failed:\n" + "\n".join(errors)
+            raise ShardRenderError(msg)
+
+        results: dict[RenderTarget, list[Path]] = {target: [] for target in targets}
+        batch_iter = iter(batch_results)
+        for shard in spec_shards:
+            for target in targets:
+                rendered = next(batch_iter)
+                if target.mode == "split":
+                    target.output_path.mkdir(parents=True, exist_ok=True)
+                    destinations = [target.output_path / file.name for file in rendered.files]
+                else:
+                    target.output_path.parent.mkdir(parents=True, exist_ok=True)
+                    # The single diagram of the shard, if the converter wrote one
+                    destinations = [_shard_file(target, shard) for _ in rendered.files[:1]]
+                for file, destination in zip(rendered.files, destinations, strict=False):
+                    shutil.move(file, destination)
+                results[target].extend(destinations)
+
+    single_targets = [target for target in targets if target.mode == "single"]
+    if len(single_targets) > 0:
+        shard_files = [
+            (shard, [_shard_file(target, shard) for target in single_targets])
+            for shard in spec_shards
+        ]
+        index_path = single_targets[0].output_path
+        info = spec_data.get("info")
+        title = info.get("title") if isinstance(info, dict) else None
+        _write_index(
+            index_path.with_name(f"{index_path.stem}.index.md"),
+            str(title or openapi_spec.stem),
+            shard_by,
+            shard_files,
+        )
+    return {target: sorted(files) for target, files in results.items()}
@@ -2,17 +2,29 @@
 
 from __future__ import annotations
 
+import codecs
 import json
+import re
 from contextlib import contextmanager
+from hashlib import sha256
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import TYPE_CHECKING
+from typing import BinaryIO
 from typing import Literal
+from typing import TypeAlias
 
-import yaml
+from openapi_diagram.filters import filter_operations
+from openapi_diagram.serialization import dumps_json
+from openapi_diagram.serialization import json_default
+from openapi_diagram.serialization import loads_json
+from openapi_diagram.serialization import loads_yaml
 
 if TYPE_CHECKING:
     from collections.abc import Generator
+    from collections.abc import Iterable
+
+    from openapi_diagram.filters import OperationFilter
 
 Json = dict[str | Literal["anyOf", "type"], "Json"] | list["Json"] | str | bool
 
@@ -21,11 +33,157 @@ class UnsopportFileTypeError(ValueError):
     """Error raised when a file type isn't supported."""
 
 
-def convert_3_dot_1_to_3_dot_0(json: dict[str, Json]):  # noqa: C901, DOC101, DOC109, DOC103
+SCHEMA_MAP_KEYS = frozenset(
+    {
+        "$defs",
+        "callbacks",
+        "content",
+        "definitions",
+        "dependentSchemas",
+        "encoding",
+        "headers",
+        "links",
+        "parameters",
+        "pathItems",
+        "paths",
+        "patternProperties",
+        "properties",
+        "requestBodies",
+        "responses",
+        "schemas",
+        "securitySchemes",
+        "webhooks",
+    }
+)
+"""Keys whose values map arbitrary names to objects (e.g. ``properties``), when they are dicts.
+
+Names in these maps are never treated as keywords, so a property called ``const`` or
+``examples`` stays untouched.
+"""
+DATA_KEYS = frozenset({"const", "default", "enum", "example", "examples", "security", "value"})
+"""Keys whose values are user data (e.g. example values) which are never converted."""
+CONVERTED_KEYWORDS = frozenset(
+    {"anyOf", "oneOf", "const", "exclusiveMinimum", "exclusiveMaximum", "examples"}
+)
+"""Keywords besides ``type`` arrays which need to be converted."""
+OPENAPI_VERSION_SNIFF_SIZE = 64 * 1024
+"""Bytes read from the start of a JSON spec to find its ``openapi`` version."""
+STREAMING_CHUNK_SIZE = 1024 * 1024
+"""Bytes read at once by :func:`stream_openapi_3_dot_0_json`."""
+STREAMING_MIN_SIZE = 32 * 1024 * 1024
+"""Size of openapi 3.1 JSON spec files from which on they are downgraded as a stream."""
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+SPECIAL_KEYS = DATA_KEYS | SCHEMA_MAP_KEYS
+
+
+def _is_null_schema(schema: Json) -> bool:
+    """Check if ``schema`` only allows ``null``.
+
+    Parameters
+    ----------
+    schema : Json
+        Schema to check.
+
+    Returns
+    -------
+    bool
+    """
+    return isinstance(schema, dict) and schema.get("type") in ("null", ["null"])
+
+
+def _convert_schema_keywords(node: dict[str, Json]) -> None:  # noqa: C901
+    """Replace 3.1 only keywords of a single object by their 3.0 equivalent in place.
+
+    Parameters
+    ----------
+    node : dict[str, Json]
+        Object to convert, its children are not touched.
+    """
+    for key in ("anyOf", "oneOf"):
+        subschemas = node.get(key)
+        if isinstance(subschemas, list) and any(_is_null_schema(item) for item in subschemas):
+            # Filtering instead of popping while iterating keeps adjacent null entries in check
+            node[key] = [item for item in subschemas if not _is_null_schema(item)]
+            node["nullable"] = True
+    types = node.get("type")
+    if isinstance(types, list) and all(isinstance(item, str) for item in types):
+        non_null_types = [item for item in types if item != "null"]
+        if len(non_null_types) != len(types):
+            node["nullable"] = True
+        if len(non_null_types) == 1:
+            node["type"] = non_null_types[0]
+        else:
+            del node["type"]
+        if len(non_null_types) > 1:
+            type_schemas: Json = [{"type": item} for item in non_null_types]
+            if "anyOf" in node:
+                all_of = node.get("allOf")
+                all_of_items = all_of if isinstance(all_of, list) else []
+                node["allOf"] = [*all_of_items, {"anyOf": type_schemas}]
+            else:
+                node["anyOf"] = type_schemas
+    if "const" in node:
+        const = node.pop("const")
+        node["enum"] = [const]
+        if const is None:
+            node["nullable"] = True
+    for exclusive_key, limit_key in (
+        ("exclusiveMinimum", "minimum"),
+        ("exclusiveMaximum", "maximum"),
+    ):
+        limit = node.get(exclusive_key)
+        if isinstance(limit, int | float) and not isinstance(limit, bool):
+            node[limit_key] = limit
+            node[exclusive_key] = True
+    if "examples" in node and isinstance(node["examples"], list):
+        examples = node.pop("examples")
+        if len(examples) > 0:  # type:ignore[arg-type]
+            node["example"] = examples[0]  # type:ignore[index]
+
+
+def _converted_children(node: dict[str, Json]) -> list[Json]:
+    """Children of ``node`` which need to be converted.
+
+    Values of :data:`DATA_KEYS` are skipped and maps of :data:`SCHEMA_MAP_KEYS` are replaced
+    by the objects they map to.
+
+    Parameters
+    ----------
+    node : dict[str, Json]
+        Object to get the children of.
+
+    Returns
+    -------
+    list[Json]
+    """
+    children: list[Json] = []
+    for key, value in node.items():
+        if key in DATA_KEYS:
+            continue
+        if key in SCHEMA_MAP_KEYS and isinstance(value, dict):
+            children.extend(value.values())
+        else:
+            children.append(value)
+    return children
+
+
+def convert_3_dot_1_to_3_dot_0(json: dict[str, Json]):  # noqa: DOC101, DOC109, DOC103
     """Attempt to convert version 3.1.0 of some openAPI json into 3.0.3.
 
     Ref.: https://github.com/tiangolo/fastapi/discussions/9789#discussioncomment-8629746
 
+    The document is converted in place in a single pass with an explicit stack, so arbitrarily
+    deep and wide documents are converted in linear time. Converted 3.1 features:
+
+    * ``null`` in ``anyOf``/``oneOf`` and ``type`` arrays become ``nullable: true``
+    * ``type`` arrays with multiple types become ``anyOf``
+    * ``const`` becomes a single value ``enum``
+    * numeric ``exclusiveMinimum``/``exclusiveMaximum`` become ``minimum``/``maximum`` with
+      the boolean flag
+    * schema ``examples`` arrays become ``example`` with the first value
+
     Usage:
 
         >>> from pprint import pprint
@@ -43,57 +201,701 @@ def convert_3_dot_1_to_3_dot_0(json: dict[str, Json]):  # noqa: C901, DOC101, DO
          'some_irrelevant_keys': {Ellipsis}}
     """
     json["openapi"] = "3.0.3"
+    convert_3_dot_1_subtree(json)
 
-    def inner(yaml_dict: Json):
-        if isinstance(yaml_dict, dict):
-            if "anyOf" in yaml_dict and isinstance((anyOf := yaml_dict["anyOf"]), list):  # noqa: N806
-                for i, item in enumerate(anyOf):
-                    if isinstance(item, dict) and item.get("type") == "null":
-                        anyOf.pop(i)
-                        yaml_dict["nullable"] = True
-            if "examples" in yaml_dict:
-                examples = yaml_dict["examples"]
-                del yaml_dict["examples"]
-                if isinstance(examples, list) and len(examples):
-                    yaml_dict["example"] = examples[0]
-            for value in yaml_dict.values():
-                inner(value)
-        elif isinstance(yaml_dict, list):
-            for item in yaml_dict:
-                inner(item)
-
-    inner(json)
 
+def convert_3_dot_1_subtree(root: Json) -> None:
+    """Convert 3.1 keywords of ``root`` and all its descendants in place.
 
-@contextmanager
-def openapi_3_dot_1_compat(spec_file: Path) -> Generator[Path, None, None]:
-    """Context manager to downgrade openapi 3.1 specs to 3.0 specs.
+    Same rules as :func:`convert_3_dot_1_to_3_dot_0`, but the ``openapi`` version is not
+    touched, so parts of a spec (e.g. a single schema) can be converted on their own.
 
     Parameters
     ----------
-    spec_file : Path
-        Path to original spec file.
+    root : Json
+        Object or array to convert.
+    """
+    stack: list[Json] = [root]
+    while stack:
+        node = stack.pop()
+        children: Iterable[Json]
+        if isinstance(node, list):
+            children = node
+        elif isinstance(node, dict):
+            # Most objects contain none of the keywords, skip them with C level checks
+            if not CONVERTED_KEYWORDS.isdisjoint(node) or type(node.get("type")) is list:
+                _convert_schema_keywords(node)
+            if SPECIAL_KEYS.isdisjoint(node):
+                children = node.values()
+            else:
+                children = _converted_children(node)
+        else:
+            continue
+        # Only containers are pushed and parsed JSON/YAML only contains exact dicts and
+        # lists, so 'is' checks suffice and are faster than isinstance.
+        for child in children:
+            child_type = type(child)
+            if child_type is dict or child_type is list:
+                stack.append(child)
 
-    Yields
+
+def parse_openapi_spec(content: bytes, suffix: str) -> dict[str, Json]:
+    """Parse the content of a JSON or YAML spec file.
+
+    Parameters
+    ----------
+    content : bytes
+        Content of the spec file.
+    suffix : str
+        Suffix of the spec file (e.g. ``'.yaml'``), which determines the format.
+
+    Returns
+    -------
+    dict[str, Json]
+        Parsed spec.
+
+    Raises
     ------
-    Path
-        Path to temporary compat file.
+    UnsopportFileTypeError
+        If file format is not supported.
+    """
+    if suffix == ".json":
+        return loads_json(content)
+    if suffix in (".yaml", ".yml"):
+        return loads_yaml(content)
+    msg = f"File type: *{suffix} is not supported."
+    raise UnsopportFileTypeError(msg)
+
+
+def load_openapi_spec(spec_file: Path) -> dict[str, Json]:
+    """Load an openapi spec from a JSON or YAML file.
+
+    Parameters
+    ----------
+    spec_file : Path
+        Path to the spec file.
+
+    Returns
+    -------
+    dict[str, Json]
+        Parsed spec.
 
     Raises
     ------
-    ValueError
+    UnsopportFileTypeError
         If file format is not supported.
     """
     if spec_file.suffix == ".json":
-        spec_data = json.loads(spec_file.read_text())
-    elif spec_file.suffix in (".yaml", ".yml"):
-        spec_data = yaml.safe_load(spec_file.read_text())
+        return loads_json(spec_file.read_bytes())
+    if spec_file.suffix in (".yaml", ".yml"):
+        return loads_yaml(spec_file.read_bytes())
+    msg = f"File type: *{spec_file.suffix} is not supported."
+    raise UnsopportFileTypeError(msg)
+
+
+def _skip_json_whitespace(text: str, index: int) -> int:
+    """Index of the first non whitespace character in ``text`` at or after ``index``.
+
+    Parameters
+    ----------
+    text : str
+        JSON document.
+    index : int
+        Index to start at.
+
+    Returns
+    -------
+    int
+    """
+    return _JSON_WHITESPACE.match(text, index).end()  # type:ignore[union-attr]
+
+
+def sniff_openapi_version(
+    spec: Path | bytes, max_bytes: int = OPENAPI_VERSION_SNIFF_SIZE
+) -> str | None:
+    """Read the ``openapi`` version of a JSON spec without parsing the whole document.
+
+    Only the top level keys before ``openapi`` in the first ``max_bytes`` are decoded, which
+    is cheap since generators put ``openapi`` first.
+
+    Parameters
+    ----------
+    spec : Path | bytes
+        Path to the spec file or content of a JSON spec.
+    max_bytes : int
+        Bytes to read from the start of the spec. Defaults to ``OPENAPI_VERSION_SNIFF_SIZE``
+
+    Returns
+    -------
+    str | None
+        Version or None if the file is no JSON file or the version is not found in
+        ``max_bytes``.
+    """
+    if isinstance(spec, bytes):
+        head = spec[:max_bytes]
+    elif spec.suffix != ".json":
+        return None
     else:
-        msg = f"File type: *{spec_file.suffix} is not supported."
-        raise UnsopportFileTypeError(msg)
+        with spec.open("rb") as file:
+            head = file.read(max_bytes)
+    # A multi byte character might be cut off at the end
+    text = head.decode(errors="ignore")
+    index = _skip_json_whitespace(text, 0)
+    if text[index : index + 1] != "{":
+        return None
+    index += 1
+    while True:
+        try:
+            key, index = _JSON_DECODER.raw_decode(text, _skip_json_whitespace(text, index))
+            index = _skip_json_whitespace(text, index)
+            if not isinstance(key, str) or text[index : index + 1] != ":":
+                return None
+            value, index = _JSON_DECODER.raw_decode(text, _skip_json_whitespace(text, index + 1))
+        except json.JSONDecodeError:
+            return None
+        if key == "openapi":
+            return value if isinstance(value, str) else None
+        index = _skip_json_whitespace(text, index)
+        # Anything but another key (e.g. the end of the object or the read bytes) ends the search
+        if text[index : index + 1] != ",":
+            return None
+        index += 1
+
+
+def is_passthrough_spec(spec: Path | bytes) -> bool:
+    """Check if a spec can be handed to ``openapi-to-plantuml`` as it is.
+
+    This is the case for OpenAPI 3.0 JSON specs, which need no downgrade or conversion.
+
+    Parameters
+    ----------
+    spec : Path | bytes
+        Path to the spec file or content of a JSON spec.
+
+    Returns
+    -------
+    bool
+    """
+    version = sniff_openapi_version(spec)
+    return version is not None and version.startswith("3.0")
+
+
+def _resolve_ref(spec_data: dict[str, Json], ref: str) -> Json | None:
+    """Resolve local JSON pointer ``ref`` (e.g. ``'#/components/schemas/Pet'``).
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+    ref : str
+        Value of a ``$ref``.
+
+    Returns
+    -------
+    Json | None
+        Referenced value or None for external or not resolvable references.
+    """
+    if not ref.startswith("#/"):
+        return None
+    value: Json = spec_data
+    for part in ref[2:].split("/"):
+        key = part.replace("~1", "/").replace("~0", "~")
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+    return value
+
+
+def referenced_components(spec_data: dict[str, Json], value: Json) -> dict[str, Json]:
+    """All local references of ``value`` and their targets, following references transitively.
+
+    Discriminator mappings count as references of the mapped schemas.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec the references point into.
+    value : Json
+        Part of the spec to collect the references of.
+
+    Returns
+    -------
+    dict[str, Json]
+        Referenced values by ``$ref``.
+    """
+    references: dict[str, Json] = {}
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            mapping = item.get("mapping")
+            if "propertyName" in item and isinstance(mapping, dict):
+                # Discriminator mappings reference schemas by '$ref' or by plain name
+                stack.extend(
+                    {
+                        "$ref": target
+                        if target.startswith("#")
+                        else f"#/components/schemas/{target}"
+                    }
+                    for target in mapping.values()
+                    if isinstance(target, str)
+                )
+            ref = item.get("$ref")
+            # Already visited references are skipped, which makes cyclic schemas safe.
+            if isinstance(ref, str) and ref not in references:
+                target = _resolve_ref(spec_data, ref)
+                references[ref] = target  # type:ignore[assignment]
+                if target is not None:
+                    stack.append(target)
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return references
+
+
+def prune_unused_components(spec_data: dict[str, Json]) -> dict[str, Json]:
+    """Copy of ``spec_data`` without components which are not referenced outside of them.
+
+    References are followed transitively from everything but ``components`` (e.g. ``paths``
+    and ``webhooks``), so components only used by other unused components are dropped as
+    well. Security schemes are kept, since they are referenced by name instead of ``$ref``.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+
+    Returns
+    -------
+    dict[str, Json]
+        Spec with only the used components, sections without used components are dropped.
+    """
+    components = spec_data.get("components")
+    if not isinstance(components, dict):
+        return spec_data
+    roots = {key: value for key, value in spec_data.items() if key != "components"}
+    used: set[tuple[str, str]] = set()
+    for ref in referenced_components(spec_data, roots):
+        parts = ref[2:].split("/")
+        if ref.startswith("#/components/") and len(parts) >= 3:
+            used.add((parts[1], parts[2].replace("~1", "/").replace("~0", "~")))
+    pruned: dict[str, Json] = {}
+    for section, entries in components.items():
+        if section == "securitySchemes" or not isinstance(entries, dict):
+            pruned[section] = entries
+            continue
+        used_entries = {name: entry for name, entry in entries.items() if (section, name) in used}
+        if len(used_entries) > 0:
+            pruned[section] = used_entries
+    return {**spec_data, "components": pruned}
+
+
+def has_preprocessing(
+    *, prune_unused: bool = False, operation_filter: OperationFilter | None = None
+) -> bool:
+    """Check if :func:`preprocess_spec` changes a spec with these options.
+
+    Parameters
+    ----------
+    prune_unused : bool
+        Whether to drop components which are not referenced. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render. Defaults to None
+
+    Returns
+    -------
+    bool
+    """
+    return prune_unused is True or (
+        operation_filter is not None and not operation_filter.is_empty()
+    )
+
+
+def preprocess_spec(
+    spec_data: dict[str, Json],
+    *,
+    prune_unused: bool = False,
+    operation_filter: OperationFilter | None = None,
+) -> dict[str, Json]:
+    """Apply the optional preprocessing stages to a parsed spec before it is rendered.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+    prune_unused : bool
+        Whether to drop components which are not referenced, see
+        :func:`prune_unused_components`. Defaults to False
+    operation_filter : OperationFilter | None
+        Criteria selecting the operations to render, see :func:`filter_operations`. Only the
+        components the selected operations reference are kept. Defaults to None
+
+    Returns
+    -------
+    dict[str, Json]
+        Preprocessed spec, ``spec_data`` itself if no stage is enabled.
+    """
+    if operation_filter is not None and not operation_filter.is_empty():
+        spec_data = filter_operations(spec_data, operation_filter)
+        prune_unused = True
+    if prune_unused is True:
+        spec_data = prune_unused_components(spec_data)
+    return spec_data
+
+
+def canonical_spec_hash(spec_data: dict[str, Json]) -> str:
+    """Hash of a parsed spec which is independent of key order and source file format.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec.
+
+    Returns
+    -------
+    str
+        Hex digest of the sha256 hash of the canonical JSON serialization.
+    """
+    canonical_json = json.dumps(
+        _string_keys(spec_data),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=json_default,
+    )
+    return sha256(canonical_json.encode()).hexdigest()
+
+
+def _string_keys(node: Json) -> Json:
+    """Copy of ``node`` with all mapping keys converted to strings.
+
+    YAML parses unquoted keys like response codes (``200:``) to other types, which can not
+    be sorted together with string keys (e.g. ``default:``).
+
+    Parameters
+    ----------
+    node : Json
+        Parsed JSON or YAML node.
+
+    Returns
+    -------
+    Json
+    """
+    if isinstance(node, dict):
+        return {str(key): _string_keys(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_string_keys(item) for item in node]
+    return node
+
+
+def dumps_openapi_3_dot_0_json(spec_data: dict[str, Json]) -> bytes:
+    """Serialize a parsed spec to the JSON ``openapi-to-plantuml`` reads.
+
+    Parameters
+    ----------
+    spec_data : dict[str, Json]
+        Parsed spec, openapi 3.1 specs are downgraded to 3.0 in place.
+
+    Returns
+    -------
+    bytes
+    """
+    if spec_data["openapi"].startswith("3.1"):  # type:ignore[union-attr]
+        convert_3_dot_1_to_3_dot_0(spec_data)
+    return dumps_json(spec_data)
+
+
+class _JsonChunkReader:
+    """Read JSON values one at a time from a file which is decoded chunk by chunk.
+
+    Only the text of the value which is currently read is kept in the buffer.
+    """
+
+    def __init__(self, file: BinaryIO, chunk_size: int) -> None:
+        """Create reader.
+
+        Parameters
+        ----------
+        file : BinaryIO
+            File opened in binary mode.
+        chunk_size : int
+            Bytes to read at once.
+        """
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._index = 0
+        self._eof = False
+
+    def _read_more(self, size: int) -> bool:
+        """Drop the consumed text and append at least ``size`` characters to the buffer.
+
+        Parameters
+        ----------
+        size : int
+            Characters to append, less are appended at the end of the file.
+
+        Returns
+        -------
+        bool
+            Whether the file was not read completely before.
+        """
+        if self._eof is True:
+            return False
+        parts = [self._buffer[self._index :]]
+        read = 0
+        while read < size:
+            chunk = self._file.read(self._chunk_size)
+            if len(chunk) == 0:
+                parts.append(self._decoder.decode(b"", final=True))
+                self._eof = True
+                break
+            parts.append(self._decoder.decode(chunk))
+            read += len(parts[-1])
+        self._buffer = "".join(parts)
+        self._index = 0
+        return True
+
+    def next_char(self) -> str:
+        """Next non whitespace character without consuming it.
+
+        Returns
+        -------
+        str
+            Character or empty string at the end of the file.
+        """
+        while True:
+            self._index = _skip_json_whitespace(self._buffer, self._index)
+            if self._index < len(self._buffer) or self._read_more(self._chunk_size) is False:
+                return self._buffer[self._index : self._index + 1]
+
+    def consume(self, expected: str) -> None:
+        """Consume the next non whitespace character.
+
+        Parameters
+        ----------
+        expected : str
+            Character which has to come next.
+
+        Raises
+        ------
+        JSONDecodeError
+            If the next character is a different one.
+        """
+        if self.next_char() != expected:
+            msg = f"Expecting {expected!r}"
+            raise json.JSONDecodeError(msg, self._buffer, self._index)
+        self._index += 1
+
+    def read_value(self) -> Json:
+        """Read and parse the next value.
+
+        Returns
+        -------
+        Json
+
+        Raises
+        ------
+        JSONDecodeError
+            If the value is invalid.
+        """
+        self.next_char()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self._buffer, self._index)
+            except json.JSONDecodeError:
+                if self._eof is True:
+                    raise
+                # Doubling the buffer keeps re-parsing of incomplete values linear
+                self._read_more(max(self._chunk_size, len(self._buffer) - self._index))
+                continue
+            # A number at the end of the buffer might continue in the next chunk
+            if end < len(self._buffer) or self._read_more(self._chunk_size) is False:
+                self._index = end
+                return value
+
+    def read_key(self) -> str:
+        """Read the next key of an object and the following colon.
+
+        Returns
+        -------
+        str
+
+        Raises
+        ------
+        JSONDecodeError
+            If there is no string key.
+        """
+        key = self.read_value()
+        if not isinstance(key, str):
+            msg = "Expecting property name enclosed in double quotes"
+            raise json.JSONDecodeError(msg, self._buffer, self._index)
+        self.consume(":")
+        return key
+
+
+_StreamLayout: TypeAlias = "dict[str, _StreamLayout | None]"
+STREAMED_COMPONENTS: _StreamLayout = dict.fromkeys(SCHEMA_MAP_KEYS)
+STREAMED_ROOT: _StreamLayout = {"paths": None, "webhooks": None, "components": STREAMED_COMPONENTS}
+"""Objects of a spec which are streamed key by key, ``None`` marks maps (e.g. ``paths``)
+whose entries are read, converted and written one at a time."""
+
+
+def _convert_streamed_value(key: str, value: Json) -> None:
+    """Convert the value of ``key`` in place, like its parent object would convert it.
+
+    Parameters
+    ----------
+    key : str
+        Key of the value in its parent object.
+    value : Json
+        Value to convert.
+    """
+    if key in DATA_KEYS:
+        return
+    if key in SCHEMA_MAP_KEYS and type(value) is dict:
+        for child in value.values():
+            if type(child) is dict or type(child) is list:
+                convert_3_dot_1_subtree(child)
+    elif type(value) is dict or type(value) is list:
+        convert_3_dot_1_subtree(value)
+
+
+def _stream_object(
+    reader: _JsonChunkReader, output: BinaryIO, layout: _StreamLayout | None, *, root: bool
+) -> None:
+    """Convert an object key by key from ``reader`` to ``output``.
+
+    Parameters
+    ----------
+    reader : _JsonChunkReader
+        Reader positioned before the object.
+    output : BinaryIO
+        File to write the converted object to.
+    layout : _StreamLayout | None
+        Nested objects to stream as well, ``None`` if the values are the entries of a map.
+    root : bool
+        Whether the object is the spec itself, whose ``openapi`` version is replaced.
+    """
+    reader.consume("{")
+    output.write(b"{")
+    separator = b""
+    while reader.next_char() != "}":
+        if separator == b",":
+            reader.consume(",")
+        key = reader.read_key()
+        output.write(separator + dumps_json(key) + b":")
+        separator = b","
+        if layout is not None and key in layout and reader.next_char() == "{":
+            _stream_object(reader, output, layout[key], root=False)
+            continue
+        value = reader.read_value()
+        if root is True and key == "openapi":
+            value = "3.0.3"
+        elif layout is None:
+            # Entries of a map are converted as a whole (e.g. a path item or a schema)
+            _convert_streamed_value("", value)
+        else:
+            _convert_streamed_value(key, value)
+        output.write(dumps_json(value))
+    reader.consume("}")
+    output.write(b"}")
+
+
+def stream_openapi_3_dot_0_json(
+    spec_file: Path, output_file: Path, chunk_size: int = STREAMING_CHUNK_SIZE
+) -> None:
+    """Downgrade an openapi 3.1 JSON spec file to 3.0 without loading it into memory at once.
+
+    The spec, ``components`` and the maps in :data:`STREAMED_ROOT` (e.g. ``paths`` and
+    ``components/schemas``) are streamed entry by entry, so only a single path item or
+    component is parsed and converted at a time. Peak memory is bounded by the size of the
+    largest such entry instead of the size of the spec, roughly::
+
+        chunk_size + 2 * largest entry (text) + largest entry (parsed) + largest entry (JSON)
+
+    The output is the same as :func:`dumps_openapi_3_dot_0_json` of the parsed spec, except
+    that duplicate keys in streamed objects are kept instead of the last one winning.
+
+    Parameters
+    ----------
+    spec_file : Path
+        OpenAPI 3.1 JSON spec file.
+    output_file : Path
+        File to write the OpenAPI 3.0 JSON spec to.
+    chunk_size : int
+        Bytes to read at once. Defaults to ``STREAMING_CHUNK_SIZE``
+
+    Raises
+    ------
+    JSONDecodeError
+        If ``spec_file`` is not a valid JSON object.
+    """
+    with spec_file.open("rb") as source, output_file.open("wb", buffering=chunk_size) as output:
+        reader = _JsonChunkReader(source, chunk_size)
+        _stream_object(reader, output, STREAMED_ROOT, root=True)
+        if reader.next_char() != "":
+            msg = "Extra data"
+            raise json.JSONDecodeError(msg, "", 0)
+
+
+def is_streamable_spec(spec: Path, min_size: int | None = None) -> bool:
+    """Check if ``spec`` is downgraded by :func:`stream_openapi_3_dot_0_json`.
+
+    This is the case for openapi 3.1 JSON spec files with at least ``min_size`` bytes, for
+    smaller files parsing them at once is faster.
+
+    Parameters
+    ----------
+    spec : Path
+        Path to the spec file.
+    min_size : int | None
+        Minimum file size in bytes. Defaults to None which uses ``STREAMING_MIN_SIZE``
+
+    Returns
+    -------
+    bool
+    """
+    min_size = STREAMING_MIN_SIZE if min_size is None else min_size
+    if spec.suffix != ".json" or spec.stat().st_size < min_size:
+        return False
+    version = sniff_openapi_version(spec)
+    return version is not None and version.startswith("3.1")
+
+
+@contextmanager
+def openapi_3_dot_1_compat(spec: Path | dict[str, Json]) -> Generator[Path, None, None]:
+    """Context manager to downgrade openapi 3.1 specs to 3.0 specs.
+
+    OpenAPI 3.0 JSON spec files are yielded as they are, without parsing and rewriting them.
+    Large openapi 3.1 JSON spec files (see :func:`is_streamable_spec`) are converted with
+    bounded memory by :func:`stream_openapi_3_dot_0_json`.
+
+    Parameters
+    ----------
+    spec : Path | dict[str, Json]
+        Path to original spec file or already parsed spec. Parsed specs are modified in place.
+
+    Yields
+    ------
+    Path
+        Path to temporary compat file or ``spec`` itself if it needs no conversion.
+    """
+    if isinstance(spec, Path) and is_passthrough_spec(spec):
+        yield spec
+        return
+    if isinstance(spec, Path) and is_streamable_spec(spec):
+        with TemporaryDirectory() as tmp_dir:
+            tmp_file = Path(tmp_dir) / "openapi_spec.json"
+            stream_openapi_3_dot_0_json(spec, tmp_file)
+            yield tmp_file
+        return
+    spec_data = load_openapi_spec(spec) if isinstance(spec, Path) else spec
     with TemporaryDirectory() as tmp_dir:
         tmp_file = Path(tmp_dir) / "openapi_spec.json"
-        if spec_data["openapi"].startswith("3.1"):
-            convert_3_dot_1_to_3_dot_0(spec_data)
-        tmp_file.write_text(json.dumps(spec_data))
+        tmp_file.write_bytes(dumps_openapi_3_dot_0_json(spec_data))
         yield tmp_file
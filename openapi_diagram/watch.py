@@ -0,0 +1,200 @@
+"""Watch a spec file and locally referenced files and re-render on content changes."""
+
+from __future__ import annotations
+
+import time
+from hashlib import sha256
+from typing import TYPE_CHECKING
+from typing import NamedTuple
+
+from openapi_diagram import SUPPORTED_SPEC_FILE_FORMATS
+from openapi_diagram.bundle import local_file_references
+from openapi_diagram.utils import canonical_spec_hash
+from openapi_diagram.utils import load_openapi_spec
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Generator
+    from collections.abc import Iterable
+    from pathlib import Path
+
+WATCH_DEFAULT_DEBOUNCE = 0.3
+"""Seconds files need to be unchanged before a render starts."""
+WATCH_DEFAULT_POLL_INTERVAL = 0.2
+"""Seconds between checks of the watched files for changes."""
+
+
+class WatchIteration(NamedTuple):
+    """Outcome of a single watch iteration."""
+
+    iteration: int
+    changed_files: list[Path]
+    """Watched files that changed since the previous iteration."""
+    rendered: bool
+    """Whether the diagrams were rendered, False if the parsed content did not change."""
+    duration: float
+    """Seconds from detecting the change until the render finished."""
+    files: list[Path]
+    error: str | None = None
+
+
+def _content_state(openapi_spec: Path) -> tuple[str, list[Path]]:
+    """Hash of the parsed spec and all locally referenced files it depends on.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to watch.
+
+    Returns
+    -------
+    tuple[str, list[Path]]
+        Content hash and the referenced files (transitively).
+    """
+    spec_data = load_openapi_spec(openapi_spec)
+    content_hash = sha256(canonical_spec_hash(spec_data).encode())
+    reference_files: list[Path] = []
+    stack = [(openapi_spec, spec_data)]
+    seen = {openapi_spec.resolve()}
+    while stack:
+        source_file, data = stack.pop()
+        for reference in sorted(local_file_references(data)):
+            reference_file = (source_file.parent / reference).resolve()
+            if reference_file in seen or reference_file.is_file() is False:
+                continue
+            seen.add(reference_file)
+            reference_files.append(reference_file)
+            if reference_file.suffix in SUPPORTED_SPEC_FILE_FORMATS:
+                reference_data = load_openapi_spec(reference_file)
+                content_hash.update(canonical_spec_hash(reference_data).encode())
+                stack.append((reference_file, reference_data))
+            else:
+                content_hash.update(reference_file.read_bytes())
+    return content_hash.hexdigest(), reference_files
+
+
+def _file_states(files: Iterable[Path]) -> dict[Path, tuple[int, int] | None]:
+    """Modification time and size of ``files``.
+
+    Parameters
+    ----------
+    files : Iterable[Path]
+        Files to check.
+
+    Returns
+    -------
+    dict[Path, tuple[int, int] | None]
+        ``(mtime_ns, size)`` per file, None for missing files.
+    """
+    states: dict[Path, tuple[int, int] | None] = {}
+    for file in files:
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            states[file] = None
+        else:
+            states[file] = (stat.st_mtime_ns, stat.st_size)
+    return states
+
+
+def _wait_for_change(
+    states: dict[Path, tuple[int, int] | None], debounce: float, poll_interval: float
+) -> list[Path]:
+    """Block until any of the files changed and the files were stable for ``debounce``.
+
+    Parameters
+    ----------
+    states : dict[Path, tuple[int, int] | None]
+        File states to compare to.
+    debounce : float
+        Seconds the files need to be unchanged after the first change.
+    poll_interval : float
+        Seconds between checks.
+
+    Returns
+    -------
+    list[Path]
+        Changed files.
+    """
+    current = states
+    while current == states:
+        time.sleep(poll_interval)
+        current = _file_states(states)
+    # Editors often write files in multiple steps, wait until they are done.
+    while True:
+        time.sleep(debounce)
+        newer = _file_states(states)
+        if newer == current:
+            break
+        current = newer
+    return [file for file, state in current.items() if state != states[file]]
+
+
+def watch_openapi_spec(
+    openapi_spec: Path,
+    render: Callable[[], list[Path]],
+    debounce: float = WATCH_DEFAULT_DEBOUNCE,
+    poll_interval: float = WATCH_DEFAULT_POLL_INTERVAL,
+) -> Generator[WatchIteration, None, None]:
+    """Render ``openapi_spec`` and render again each time its parsed content changes.
+
+    The spec file and all files it references locally via ``$ref`` are watched by polling.
+    Changes which do not affect the parsed content (e.g. formatting) do not trigger a
+    render. Parse and render errors are reported and watching continues.
+
+    Parameters
+    ----------
+    openapi_spec : Path
+        Spec file to watch.
+    render : Callable[[], list[Path]]
+        Function rendering the spec and returning the created files. Keep expensive state
+        (e.g. a ``JvmWorkerPool``) outside of it, so it stays warm between iterations.
+    debounce : float
+        Seconds files need to be unchanged before a render starts. Defaults to 0.3
+    poll_interval : float
+        Seconds between checks of the watched files. Defaults to 0.2
+
+    Yields
+    ------
+    WatchIteration
+        Outcome of each iteration, starting with the initial render.
+    """
+    iteration = 0
+    watched_files = [openapi_spec]
+    changed_files = [openapi_spec]
+    last_hash = None
+    while True:
+        states = _file_states(watched_files)
+        start = time.perf_counter()
+        try:
+            content_hash, reference_files = _content_state(openapi_spec)
+            watched_files = [openapi_spec, *reference_files]
+            # States taken before parsing win, so edits during the render are not missed
+            states = {**_file_states(reference_files), **states}
+            if content_hash == last_hash:
+                result = WatchIteration(
+                    iteration, changed_files, rendered=False, duration=0, files=[]
+                )
+            else:
+                files = render()
+                last_hash = content_hash
+                result = WatchIteration(
+                    iteration,
+                    changed_files,
+                    rendered=True,
+                    duration=time.perf_counter() - start,
+                    files=files,
+                )
+        # Broken intermediate states while editing must not stop watching
+        except Exception as error:  # noqa: BLE001
+            result = WatchIteration(
+                iteration,
+                changed_files,
+                rendered=False,
+                duration=time.perf_counter() - start,
+                files=[],
+                error=f"{type(error).__name__}: {error}",
+            )
+        yield result
+        iteration += 1
+        changed_files = _wait_for_change(states, debounce, poll_interval)
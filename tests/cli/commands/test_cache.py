@@ -9,6 +9,9 @@ from typer.testing import CliRunner
 
 from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
 from openapi_diagram import cli
+from openapi_diagram.cli.commands import cache
+from openapi_diagram.jvm_launch import StartupMeasurement
+from openapi_diagram.render_cache import RenderCache
 from tests import RUN_SLOW_TEST
 
 if TYPE_CHECKING:
@@ -111,3 +114,92 @@ def test_cli_cache_get_cache_miss(empty_cache_dir: Path):
     )
     assert cached_openapi_to_plantuml.is_file() is True
     assert cached_openapi_to_plantuml.as_posix() in result.output
+
+
+def test_cli_cache_show_renders(tmp_path: Path):
+    """Show cached renders and total size."""
+    rendered = tmp_path / "rendered.svg"
+    rendered.write_bytes(b"x" * 2048)
+    RenderCache().put("some-key", [rendered])
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["cache", "show-renders"])
+    assert result.exit_code == 0, result.output
+    assert "some-key  2.0 KiB" in result.output
+    assert "1 cached render(s) using 0.0 MiB of 512.0 MiB" in result.output
+
+
+def test_cli_cache_clear_renders(tmp_path: Path):
+    """All cached renders are removed."""
+    rendered = tmp_path / "rendered.svg"
+    rendered.touch()
+    render_cache = RenderCache()
+    render_cache.put("first", [rendered])
+    render_cache.put("second", [rendered])
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["cache", "clear-renders"])
+    assert result.exit_code == 0, result.output
+    assert "Removed 2 cached render(s)." in result.output
+    assert render_cache.entries() == []
+
+
+def test_cli_cache_remove_cds_archive(empty_cache_dir: Path):
+    """The CDS archive is removed together with its jar."""
+    jar_file = empty_cache_dir / "openapi-to-plantuml-0.0.0.jar"
+    jar_file.touch()
+    cds_archive = empty_cache_dir / "openapi-to-plantuml-0.0.0.jsa"
+    cds_archive.touch()
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["cache", "remove", "--version", "0.0.0"])
+
+    assert result.exit_code == 0, result.output
+    assert cds_archive.is_file() is False
+    assert "Removed 'openapi-to-plantuml-0.0.0.jsa' from cache." in result.output
+
+
+def test_cli_cache_get_cds_archive(monkeypatch: pytest.MonkeyPatch, empty_cache_dir: Path):
+    """A CDS archive is created for cached jars, failures only cause a warning."""
+    jar_file = empty_cache_dir / "openapi-to-plantuml-0.0.0.jar"
+    jar_file.touch()
+
+    def failing_create_cds_archive(_java_executable: Path, _jar_path: Path):
+        msg = "JVM did not create a CDS archive."
+        raise RuntimeError(msg)
+
+    monkeypatch.setattr(cache, "_find_java_executable", lambda: empty_cache_dir / "java")
+    monkeypatch.setattr(cache, "create_cds_archive", failing_create_cds_archive)
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["cache", "get", "--version", "0.0.0"])
+    assert result.exit_code == 0, result.output
+    assert "WARNING: Could not create CDS archive: JVM did not" in result.output
+
+    cds_archive = empty_cache_dir / "openapi-to-plantuml-0.0.0.jsa"
+    monkeypatch.setattr(cache, "create_cds_archive", lambda *_args: cds_archive)
+    result = runner.invoke(cli.app, ["cache", "get", "--version", "0.0.0"])
+    assert result.exit_code == 0, result.output
+    assert cds_archive.as_posix() in result.output
+
+    result = runner.invoke(cli.app, ["cache", "get", "--version", "0.0.0", "--no-cds"])
+    assert result.exit_code == 0, result.output
+    assert "CDS archive" not in result.output
+
+
+def test_cli_cache_measure_startup_time(monkeypatch: pytest.MonkeyPatch, empty_cache_dir: Path):
+    """Print a line with timings per measured profile."""
+    (empty_cache_dir / "openapi-to-plantuml-0.0.0.jar").touch()
+    monkeypatch.setattr(cache, "_find_java_executable", lambda: empty_cache_dir / "java")
+    monkeypatch.setattr(
+        cache,
+        "measure_startup",
+        lambda _java, _jar, profiles, repeat: [
+            StartupMeasurement(profile, cds=False, durations=[0.5] * repeat)
+            for profile in profiles
+        ],
+    )
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        ["cache", "measure-startup-time", "--version", "0.0.0", "--profile", "short-lived"],
+    )
+    assert result.exit_code == 0, result.output
+    assert "short-lived  no     0.500s" in result.output
@@ -4,9 +4,15 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+import pytest
+import yaml
 from typer.testing import CliRunner
 
 from openapi_diagram import cli
+from openapi_diagram.cli.commands import create
+from openapi_diagram.filters import OperationFilter
+from openapi_diagram.process_limits import ProcessLimits
+from openapi_diagram.process_limits import ProcessTimeoutError
 from tests import TEST_DATA
 
 if TYPE_CHECKING:
@@ -35,3 +41,458 @@ def test_cli_create(tmp_path: Path):
     assert result.exit_code == 0, result.output
     assert output_path.is_file() is True
     assert output_path.read_text().rstrip() == (TEST_DATA / "petstore.puml").read_text().rstrip()
+
+
+def test_cli_create_multiple_formats(tmp_path: Path):
+    """Repeated '--diagram-format' renders all formats in one call."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            (tmp_path / "petstore.puml").as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--diagram-format",
+            "svg",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "petstore.puml").is_file() is True
+    assert (tmp_path / "petstore.svg").is_file() is True
+
+
+def test_cli_create_incremental(tmp_path: Path):
+    """Second incremental run does not render anything."""
+    runner = CliRunner()
+    args = [
+        "create",
+        "--openapi-spec",
+        (TEST_DATA / "petstore-3-0.json").as_posix(),
+        "--output-path",
+        tmp_path.as_posix(),
+        "--mode",
+        "split",
+        "--diagram-format",
+        "puml",
+        "--incremental",
+    ]
+    result = runner.invoke(cli.app, args)
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(cli.app, args)
+    assert result.exit_code == 0, result.output
+    assert "Rendered 0, deleted 0 and kept 19 diagram(s)." in result.output
+
+
+def test_cli_create_incremental_single_mode(tmp_path: Path):
+    """Incremental rendering is only supported for split mode."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            tmp_path.as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--incremental",
+        ],
+    )
+    assert result.exit_code == 2, result.output
+    assert "Incremental rendering requires" in result.output
+
+
+def test_cli_create_shards(tmp_path: Path):
+    """Sharded single mode writes a diagram per shard and an index."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            (tmp_path / "petstore.puml").as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--shards",
+            "2",
+            "--shard-by",
+            "path",
+            "--jobs",
+            "2",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(file.name for file in tmp_path.glob("petstore*")) == [
+        "petstore.1-pet.puml",
+        "petstore.2-user.puml",
+        "petstore.index.md",
+    ]
+
+
+def test_cli_create_shards_incremental(tmp_path: Path):
+    """Sharding can not be combined with incremental rendering."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            tmp_path.as_posix(),
+            "--mode",
+            "split",
+            "--diagram-format",
+            "puml",
+            "--incremental",
+            "--shards",
+            "2",
+        ],
+    )
+    assert result.exit_code == 2, result.output
+    assert "can not be combined" in result.output
+
+
+@pytest.mark.parametrize("jvm_option", [["--timeout", "5"], ["--jvm-profile", "short-lived"]])
+def test_cli_create_shards_jvm_options(tmp_path: Path, jvm_option: list[str]):
+    """Shards are rendered in JVM workers, which ignore the options of one-shot JVMs."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            tmp_path.as_posix(),
+            "--mode",
+            "split",
+            "--diagram-format",
+            "puml",
+            "--shards",
+            "2",
+            *jvm_option,
+        ],
+    )
+    assert result.exit_code == 2, result.output
+    assert "only apply to one-shot JVMs" in result.output
+
+
+def test_cli_create_invalid_max_heap(tmp_path: Path):
+    """Heap limits need to be in ``-Xmx`` notation."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            (tmp_path / "diagram.puml").as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--max-heap",
+            "lots",
+        ],
+    )
+    assert result.exit_code == 2, result.output
+    assert "Invalid value 'lots'" in result.output
+
+
+def test_cli_create_process_limit_exceeded(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Exceeded process limits are reported without a traceback."""
+
+    def exceeding_render(*_args, **kwargs):
+        assert kwargs["limits"] == ProcessLimits(timeout=5)
+        msg = "Process 'java' exceeded its time limit of 5.0s."
+        raise ProcessTimeoutError(msg)
+
+    monkeypatch.setattr(create, "run_openapi_to_plantuml_multi", exceeding_render)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            (tmp_path / "diagram.puml").as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--timeout",
+            "5",
+        ],
+    )
+    assert result.exit_code == 1
+    assert "ERROR: Process 'java' exceeded its time limit of 5.0s." in result.output
+
+
+def test_cli_create_prune_unused(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """``--prune-unused`` is passed on to the render."""
+    render_kwargs = {}
+
+    def recording_render(*_args, **kwargs):
+        render_kwargs.update(kwargs)
+        return {}
+
+    monkeypatch.setattr(create, "run_openapi_to_plantuml_multi", recording_render)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            (tmp_path / "diagram.puml").as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--prune-unused",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert render_kwargs["prune_unused"] is True
+
+
+def test_cli_create_operation_filter(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Operation filter options are combined into one filter."""
+    render_kwargs = {}
+
+    def recording_render(*_args, **kwargs):
+        render_kwargs.update(kwargs)
+        return {}
+
+    monkeypatch.setattr(create, "run_openapi_to_plantuml_multi", recording_render)
+    runner = CliRunner()
+    base_args = [
+        "create",
+        "--openapi-spec",
+        (TEST_DATA / "petstore-3-0.json").as_posix(),
+        "--output-path",
+        (tmp_path / "diagram.puml").as_posix(),
+        "--mode",
+        "single",
+        "--diagram-format",
+        "puml",
+    ]
+    result = runner.invoke(
+        cli.app,
+        [
+            *base_args,
+            "--include-tag",
+            "pet",
+            "--include-tag",
+            "store",
+            "--exclude-path",
+            "/pet/*",
+            "--exclude-method",
+            "DELETE",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert render_kwargs["operation_filter"] == OperationFilter(
+        include_tags=["pet", "store"], exclude_paths=["/pet/*"], exclude_methods=["delete"]
+    )
+
+    result = runner.invoke(cli.app, base_args)
+    assert result.exit_code == 0, result.output
+    assert render_kwargs["operation_filter"] is None
+
+
+def test_cli_create_watch_folder(tmp_path: Path):
+    """Watching is only supported for single spec files."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            TEST_DATA.as_posix(),
+            "--output-path",
+            tmp_path.as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--watch",
+        ],
+    )
+    assert result.exit_code == 2, result.output
+    assert "require a single spec file" in result.output
+
+
+def test_cli_create_watch_limits(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """JVM profile and process limits are passed on to the renders while watching."""
+    render_kwargs = {}
+
+    def recording_render(*_args, **kwargs):
+        render_kwargs.update(kwargs)
+        return {}
+
+    def single_iteration(_openapi_spec, render):
+        render()
+        raise KeyboardInterrupt
+        yield
+
+    monkeypatch.setattr(create, "run_openapi_to_plantuml_multi", recording_render)
+    monkeypatch.setattr(create, "watch_openapi_spec", single_iteration)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            (tmp_path / "diagram.puml").as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--watch",
+            "--jvm-profile",
+            "short-lived",
+            "--timeout",
+            "5",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert render_kwargs["jvm_profile"] == "short-lived"
+    assert render_kwargs["limits"] == ProcessLimits(timeout=5)
+
+
+def test_cli_create_batch(tmp_path: Path):
+    """Run all jobs of a manifest and report failing ones."""
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(
+        yaml.safe_dump(
+            [
+                {
+                    "openapi_spec": (TEST_DATA / "petstore-3-0.json").as_posix(),
+                    "output_path": "petstore.puml",
+                    "mode": "single",
+                    "diagram_format": "puml",
+                },
+                {
+                    "openapi_spec": "not-existing.json",
+                    "output_path": "not-existing.puml",
+                    "mode": "single",
+                    "diagram_format": "puml",
+                },
+            ]
+        )
+    )
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["create", "--batch", manifest.as_posix()])
+    assert result.exit_code == 1, result.output
+    assert "1 succeeded, 1 failed in" in result.output
+    assert (tmp_path / "petstore.puml").read_text().rstrip() == (
+        (TEST_DATA / "petstore.puml").read_text().rstrip()
+    )
+
+
+def test_cli_create_missing_options():
+    """Require either a batch manifest or all single spec options."""
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["create", "--mode", "single"])
+    assert result.exit_code == 2, result.output
+    assert "Either '--batch' or all of '--openapi-spec'" in result.output
+
+
+def test_cli_create_folder(tmp_path: Path):
+    """Spec files in a folder are rendered concurrently into a mirrored output tree."""
+    spec_root = tmp_path / "specs"
+    (spec_root / "nested").mkdir(parents=True)
+    (spec_root / "petstore.json").write_text((TEST_DATA / "petstore-3-0.json").read_text())
+    (spec_root / "nested/petstore.yaml").write_text((TEST_DATA / "petstore-3-1.yaml").read_text())
+    output_path = tmp_path / "output"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            spec_root.as_posix(),
+            "--output-path",
+            output_path.as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+            "--jobs",
+            "2",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert "2 succeeded, 0 failed in" in result.output
+    assert "using 2 job(s)." in result.output
+    for output_file in ("petstore.puml", "nested/petstore.puml"):
+        assert (output_path / output_file).read_text().rstrip() == (
+            (TEST_DATA / "petstore.puml").read_text().rstrip()
+        )
+
+
+def test_cli_create_glob_no_match(tmp_path: Path):
+    """Show usage error if a glob pattern matches no spec files."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            (tmp_path / "*.yaml").as_posix(),
+            "--output-path",
+            tmp_path.as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+        ],
+    )
+    assert result.exit_code == 2, result.output
+    assert "No spec files found for" in result.output
+
+
+def test_cli_create_folder_duplicate_output(tmp_path: Path):
+    """Show usage error if two spec files would be rendered to the same output."""
+    spec_root = tmp_path / "specs"
+    spec_root.mkdir()
+    (spec_root / "petstore.json").write_text((TEST_DATA / "petstore-3-0.json").read_text())
+    (spec_root / "petstore.yaml").write_text((TEST_DATA / "petstore-3-1.yaml").read_text())
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "create",
+            "--openapi-spec",
+            spec_root.as_posix(),
+            "--output-path",
+            (tmp_path / "output").as_posix(),
+            "--mode",
+            "single",
+            "--diagram-format",
+            "puml",
+        ],
+    )
+    assert result.exit_code == 2, result.output
+    assert "would both be rendered to" in result.output
+    assert not (tmp_path / "output").exists()
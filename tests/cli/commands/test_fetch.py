@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import sys
 from typing import TYPE_CHECKING
 
+import pytest
 from typer.testing import CliRunner
 
 from openapi_diagram import cli
+from openapi_diagram.server import app as app_module
+from openapi_diagram.server.settings import ServerSettings
 from tests import TEST_DATA
 
 if TYPE_CHECKING:
@@ -66,3 +70,92 @@ def test_cli_fetch_multiple_files(tmp_path: Path, app_client: TestClient):
     )
     assert result.exit_code == 0, result.output
     assert len(list(output_path.glob("*.puml"))) == 19
+
+
+def test_cli_fetch_bundles_file_references(tmp_path: Path, app_client: TestClient):
+    """Specs referencing other local files are bundled before the upload."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "fetch",
+            "--openapi-spec",
+            (TEST_DATA / "multi-file" / "openapi.yaml").as_posix(),
+            "--output-path",
+            tmp_path.as_posix(),
+            "--mode",
+            "split",
+            "--diagram-format",
+            "puml",
+            "--base-url",
+            str(app_client.base_url),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(file.name for file in tmp_path.glob("*.puml")) == [
+        "addPet.puml",
+        "getPet.puml",
+        "listPets.puml",
+    ]
+
+
+@pytest.mark.parametrize("compression", ["gzip", "none"])
+def test_cli_fetch_compression(tmp_path: Path, app_client: TestClient, compression: str):
+    """Specs are uploaded compressed or as is, together with the operation filter."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        [
+            "fetch",
+            "--openapi-spec",
+            (TEST_DATA / "petstore-3-0.json").as_posix(),
+            "--output-path",
+            tmp_path.as_posix(),
+            "--mode",
+            "split",
+            "--diagram-format",
+            "puml",
+            "--base-url",
+            str(app_client.base_url),
+            "--compression",
+            compression,
+            "--include-tag",
+            "store",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(file.name for file in tmp_path.glob("*.puml")) == [
+        "deleteOrder.puml",
+        "getInventory.puml",
+        "getOrderById.puml",
+        "placeOrder.puml",
+    ]
+
+
+def test_cli_fetch_errors(tmp_path: Path, app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Missing zstd support and server errors fail the command."""
+    runner = CliRunner()
+    args = [
+        "fetch",
+        "--openapi-spec",
+        (TEST_DATA / "petstore-3-0.json").as_posix(),
+        "--output-path",
+        tmp_path.as_posix(),
+        "--mode",
+        "split",
+        "--diagram-format",
+        "puml",
+        "--base-url",
+        str(app_client.base_url),
+    ]
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+    result = runner.invoke(cli.app, [*args, "--compression", "zstd"])
+    assert result.exit_code == 2
+    assert "openapi-diagram[zstd]" in result.output
+
+    settings = ServerSettings(max_upload_size=100)
+    monkeypatch.setattr(app_module, "get_settings", lambda: settings)
+    result = runner.invoke(cli.app, args)
+    assert result.exit_code == 1
+    assert "ERROR: Server responded with 413" in result.output
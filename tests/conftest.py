@@ -10,11 +10,15 @@ from typing import Any
 import pytest
 from fastapi.testclient import TestClient
 
+from openapi_diagram import render_cache
 from openapi_diagram.openapi_to_plantuml import download_openapi_to_plantuml
+from openapi_diagram.server import result_cache
 from openapi_diagram.server.app import app
+from openapi_diagram.server.app import get_result_cache
 from tests import TEST_DATA
 
 if TYPE_CHECKING:
+    from collections.abc import Generator
     from pathlib import Path
 
 
@@ -56,6 +60,26 @@ def cached_openapi_to_plantuml(monkeypatch: pytest.MonkeyPatch):
         yield cached_jar_file
 
 
+@pytest.fixture(autouse=True)
+def render_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Use an empty render cache inside of ``tmp_path``, so tests don't share renders."""
+    cache_dir = tmp_path / ".render-cache"
+    monkeypatch.setattr(render_cache, "default_render_cache_dir", lambda: cache_dir)
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def result_cache_dir(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Generator[Path, None, None]:
+    """Use an empty result cache inside of ``tmp_path``, so tests don't share results."""
+    cache_dir = tmp_path / ".result-cache"
+    monkeypatch.setattr(result_cache, "default_result_cache_dir", lambda: cache_dir)
+    get_result_cache.cache_clear()
+    yield cache_dir
+    get_result_cache.cache_clear()
+
+
 @pytest.fixture
 def app_client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
     """REST app test client."""
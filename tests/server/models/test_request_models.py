@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import pytest
 from pydantic import ValidationError
 
 from openapi_diagram.server.models.request_models import CreateDiagram
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
 
 @pytest.mark.parametrize("file_extension", ["json", "yml", "yaml"])
 def test_validate_file_name(file_extension: str):
@@ -34,5 +39,35 @@ def test_validate_file_name_error():
         )
     assert (
         "Only the following formats/extension are supported: "
-        "'.json, .yaml, .yml' but got 'spec_file.not_supported'."
+        "'.json, .yaml, .yml, .zip' but got 'spec_file.not_supported'."
     ) in str(execinfo.value)
+
+
+def test_create_diagram_multiple_modes_and_formats(tmp_path: Path):
+    """Modes and formats can be given as single value or list."""
+    create_data = CreateDiagram.model_validate(
+        {
+            "fileName": "spec_file.json",
+            "fileContent": "",
+            "mode": "single",
+            "diagramFormat": ["svg", "png"],
+        }
+    )
+    assert create_data.modes == ["single"]
+    assert create_data.diagram_formats == ["svg", "png"]
+    assert create_data.output_path(tmp_path) == tmp_path / "spec_file.svg"
+    create_data = create_data.model_copy(update={"mode": ["single", "split"]})
+    assert create_data.output_path(tmp_path) == tmp_path
+
+
+def test_create_diagram_empty_formats():
+    """Raise validation error if no format is requested."""
+    with pytest.raises(ValidationError, match="At least one value is required."):
+        CreateDiagram.model_validate(
+            {
+                "fileName": "spec_file.json",
+                "fileContent": "",
+                "mode": "single",
+                "diagramFormat": [],
+            }
+        )
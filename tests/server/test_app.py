@@ -2,13 +2,31 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import gzip
+import json
+import time
 from io import BytesIO
 from typing import TYPE_CHECKING
+from zipfile import ZIP_DEFLATED
+from zipfile import ZIP_STORED
 from zipfile import ZipFile
 
+import httpx
+
+from openapi_diagram.filters import OperationFilter
+from openapi_diagram.process_limits import OutputSizeLimitError
+from openapi_diagram.server import app as app_module
+from openapi_diagram.server.jobs import JobManager
+from openapi_diagram.server.scheduler import RenderScheduler
+from openapi_diagram.server.settings import ServerSettings
 from tests import TEST_DATA
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
     from fastapi.testclient import TestClient
 
 
@@ -47,3 +65,613 @@ def test_create_multiple_diagrams(app_client: TestClient):
     assert resp.status_code == 200
     with ZipFile(BytesIO(resp.content)) as zip_resp:
         assert len(zip_resp.namelist()) == 19, zip_resp.namelist()
+
+
+def test_create_diagrams_multiple_modes_and_formats(app_client: TestClient):
+    """Render both modes in multiple formats with one request."""
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": ["single", "split"],
+            "diagramFormat": ["puml", "svg"],
+        },
+    )
+    assert resp.status_code == 200
+    with ZipFile(BytesIO(resp.content)) as zip_resp:
+        names = zip_resp.namelist()
+    assert "single/petstore-3-0.puml" in names
+    assert "single/petstore-3-0.svg" in names
+    assert len([name for name in names if name.startswith("split/")]) == 38
+
+
+def test_create_diagrams_png_stored(app_client: TestClient):
+    """Already compressed formats are stored in the streamed zip file."""
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": "single",
+            "diagramFormat": ["png", "svg"],
+        },
+    )
+    assert resp.status_code == 200
+    with ZipFile(BytesIO(resp.content)) as zip_resp:
+        assert zip_resp.getinfo("petstore-3-0.png").compress_type == ZIP_STORED
+        assert zip_resp.getinfo("petstore-3-0.svg").compress_type == ZIP_DEFLATED
+
+
+def test_create_diagrams_scratch_dir(
+    app_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """Specs and outputs pass through the configured scratch folder only."""
+    scratch_dir = tmp_path / "scratch"
+    scratch_dir.mkdir()
+    settings = ServerSettings(scratch_dir=scratch_dir, render_cache=False)
+    monkeypatch.setattr(app_module, "get_settings", lambda: settings)
+    openapi_spec = TEST_DATA / "petstore-3-1.yaml"
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": "single",
+            "diagramFormat": "puml",
+        },
+    )
+    assert resp.status_code == 200
+    with ZipFile(BytesIO(resp.content)) as zip_resp:
+        assert zip_resp.namelist() == ["petstore-3-1.puml"]
+    assert list(scratch_dir.iterdir()) == []
+
+
+def test_create_diagrams_prune_unused(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """The ``pruneUnused`` field is passed on to the render."""
+    render_kwargs = {}
+
+    async def recording_render(**kwargs) -> dict[str, bytes]:
+        render_kwargs.update(kwargs)
+        return {}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", recording_render)
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": "single",
+            "diagramFormat": "puml",
+            "pruneUnused": True,
+        },
+    )
+    assert resp.status_code == 200
+    assert render_kwargs["prune_unused"] is True
+
+
+def test_create_diagrams_operation_filter(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """The ``operationFilter`` field is passed on to the render."""
+    render_kwargs = {}
+
+    async def recording_render(**kwargs) -> dict[str, bytes]:
+        render_kwargs.update(kwargs)
+        return {}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", recording_render)
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": "single",
+            "diagramFormat": "puml",
+            "operationFilter": {"includeTags": ["pet"], "excludeMethods": ["delete"]},
+        },
+    )
+    assert resp.status_code == 200
+    assert render_kwargs["operation_filter"] == OperationFilter(
+        include_tags=["pet"], exclude_methods=["delete"]
+    )
+
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": "single",
+            "diagramFormat": "puml",
+            "operationFilter": {"includeMethods": ["fetch"]},
+        },
+    )
+    assert resp.status_code == 422
+
+
+def test_create_diagrams_archive(app_client: TestClient):
+    """Specs split over several files are uploaded as base64 encoded zip archive."""
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as zip_file:
+        for file in (TEST_DATA / "multi-file").rglob("*.yaml"):
+            zip_file.writestr(file.relative_to(TEST_DATA).as_posix(), file.read_bytes())
+    create_data = {
+        "fileName": "petstore.zip",
+        "fileContent": base64.b64encode(buffer.getvalue()).decode(),
+        "mode": "split",
+        "diagramFormat": "puml",
+    }
+    resp = app_client.post("/api/v1/create-diagrams", json=create_data)
+    assert resp.status_code == 200
+    with ZipFile(BytesIO(resp.content)) as zip_resp:
+        assert sorted(zip_resp.namelist()) == ["addPet.puml", "getPet.puml", "listPets.puml"]
+
+    resp = app_client.post(
+        "/api/v1/create-diagrams", json={**create_data, "entryFile": "multi-file/common.yaml"}
+    )
+    assert resp.status_code == 422
+
+    resp = app_client.post(
+        "/api/v1/create-diagrams", json={**create_data, "fileContent": "not base64!"}
+    )
+    assert resp.status_code == 422
+    assert "base64" in resp.text
+
+
+def test_create_diagrams_file_references(app_client: TestClient, tmp_path: Path):
+    """References of uploaded specs to files on the server are rejected, not bundled."""
+    secret = tmp_path / "secret.yaml"
+    secret.write_text("password: hunter2\n")
+    for ref in (secret.as_posix(), "../../../../../../../../../../../../" + secret.as_posix()):
+        spec_data = json.loads((TEST_DATA / "petstore-3-0.json").read_text())
+        spec_data["components"]["schemas"]["Secret"] = {"$ref": ref}
+        resp = app_client.post(
+            "/api/v1/create-diagrams",
+            json={
+                "fileName": "petstore.json",
+                "fileContent": json.dumps(spec_data),
+                "mode": "split",
+                "diagramFormat": "puml",
+            },
+        )
+        assert resp.status_code == 422, ref
+        assert "hunter2" not in resp.text
+
+        resp = app_client.post(
+            "/api/v1/create-diagrams/upload",
+            params={"fileName": "petstore.json", "mode": "split", "diagramFormat": "puml"},
+            content=json.dumps(spec_data).encode(),
+        )
+        assert resp.status_code == 422, ref
+        assert "zip archives" in resp.json()["detail"]
+
+
+def test_create_diagrams_upload(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Raw and multipart uploads pass the spec and query parameters on to the render."""
+    render_kwargs = {}
+
+    async def recording_render(**kwargs) -> dict[str, bytes]:
+        render_kwargs.update(kwargs)
+        return {"petstore.puml": b"@startuml"}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", recording_render)
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/create-diagrams/upload",
+        params={
+            "fileName": "petstore.json",
+            "mode": ["single", "split"],
+            "diagramFormat": "svg",
+            "includeTags": ["pet", "store"],
+            "pruneUnused": True,
+        },
+        content=gzip.compress(openapi_spec.read_bytes()),
+        headers={"Content-Encoding": "gzip"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-disposition"] == 'attachment; filename="petstore.zip"'
+    assert render_kwargs["spec"] == openapi_spec.read_bytes()
+    assert render_kwargs["name"] == "petstore"
+    assert render_kwargs["modes"] == ["single", "split"]
+    assert render_kwargs["diagram_formats"] == ["svg"]
+    assert render_kwargs["prune_unused"] is True
+    assert render_kwargs["operation_filter"] == OperationFilter(include_tags=["pet", "store"])
+
+    resp = app_client.post(
+        "/api/v1/create-diagrams/upload",
+        params={"mode": "single", "diagramFormat": "puml"},
+        files={"file": ("specs/petstore-3-1.yaml", b"openapi: 3.1.0")},
+    )
+    assert resp.status_code == 200
+    assert render_kwargs["spec"] == b"openapi: 3.1.0"
+    assert render_kwargs["spec_format"] == "yaml"
+    assert render_kwargs["name"] == "petstore-3-1"
+    assert render_kwargs["operation_filter"] is None
+
+
+def test_create_diagrams_upload_yaml_types(
+    app_client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    """YAML uploads with integer response codes and dates are cached and rendered."""
+    render_count = 0
+
+    async def counting_render(**_kwargs) -> dict[str, bytes]:
+        nonlocal render_count
+        render_count += 1
+        return {"petstore.puml": b"@startuml"}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", counting_render)
+    spec = (
+        b"openapi: 3.0.3\ninfo:\n  title: Pets\n  version: 2024-01-01\n"
+        b"paths:\n  /pets:\n    get:\n      responses:\n        200: {}\n        default: {}\n"
+    )
+    for _ in range(2):
+        resp = app_client.post(
+            "/api/v1/create-diagrams/upload",
+            params={"fileName": "petstore.yaml", "mode": "single", "diagramFormat": "puml"},
+            content=spec,
+        )
+        assert resp.status_code == 200, resp.text
+    assert render_count == 1
+
+
+def test_create_diagrams_upload_spooled(
+    app_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """Large uploads are rendered from a spooled file which is removed afterwards."""
+    settings = ServerSettings(upload_spool_size=1024, upload_dir=tmp_path, render_cache=False)
+    monkeypatch.setattr(app_module, "get_settings", lambda: settings)
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/create-diagrams/upload",
+        params={"fileName": openapi_spec.name, "mode": "split", "diagramFormat": "puml"},
+        content=openapi_spec.read_bytes(),
+    )
+    assert resp.status_code == 200
+    with ZipFile(BytesIO(resp.content)) as zip_resp:
+        assert len(zip_resp.namelist()) == 19
+    assert list(tmp_path.glob("openapi-diagram-upload-*")) == []
+
+
+def test_create_diagrams_upload_errors(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Invalid uploads are rejected before rendering."""
+    settings = ServerSettings(max_upload_size=1000)
+    monkeypatch.setattr(app_module, "get_settings", lambda: settings)
+    url = "/api/v1/create-diagrams/upload"
+    params = {"fileName": "petstore.json", "mode": "single", "diagramFormat": "puml"}
+
+    resp = app_client.post(
+        url,
+        params=params,
+        content=gzip.compress(b" " * 10_000),
+        headers={"Content-Encoding": "gzip"},
+    )
+    assert resp.status_code == 413
+
+    resp = app_client.post(url, params=params, content=b"{}", headers={"Content-Encoding": "br"})
+    assert resp.status_code == 415
+
+    resp = app_client.post(url, params=params, content=b"{}", headers={"Content-Encoding": "gzip"})
+    assert resp.status_code == 400
+    assert "decompress" in resp.json()["detail"]
+
+    resp = app_client.post(url, params={"mode": "single", "diagramFormat": "puml"}, content=b"{}")
+    assert resp.status_code == 400
+    assert "'fileName'" in resp.json()["detail"]
+
+    resp = app_client.post(url, params={**params, "fileName": "petstore.txt"}, content=b"{}")
+    assert resp.status_code == 422
+
+    resp = app_client.post(url, params={**params, "diagramFormat": []}, content=b"{}")
+    assert resp.status_code == 422
+
+
+def test_create_diagrams_conditional(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Matching ``If-None-Match`` headers are answered with 304 without rendering."""
+    render_count = 0
+
+    async def counting_render(**_) -> dict[str, bytes]:
+        nonlocal render_count
+        render_count += 1
+        return {"b/petstore.puml": b"@startuml", "a/petstore.puml": b"@startuml"}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", counting_render)
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    create_data = {
+        "fileName": openapi_spec.name,
+        "fileContent": openapi_spec.read_text(),
+        "mode": "split",
+        "diagramFormat": "puml",
+    }
+    first = app_client.post("/api/v1/create-diagrams", json=create_data)
+    result_cache = app_module.get_result_cache()
+    assert result_cache is not None
+    result_cache.purge()
+    second = app_client.post("/api/v1/create-diagrams", json=create_data)
+    assert first.status_code == 200
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.content == second.content
+
+    etag = first.headers["etag"]
+    resp = app_client.post(
+        "/api/v1/create-diagrams", json=create_data, headers={"If-None-Match": etag}
+    )
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.content == b""
+    assert render_count == 2
+
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={**create_data, "pruneUnused": True},
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+
+    resp = app_client.post(
+        "/api/v1/create-diagrams/upload",
+        params={"fileName": openapi_spec.name, "mode": "split", "diagramFormat": "puml"},
+        content=gzip.compress(openapi_spec.read_bytes()),
+        headers={"Content-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert resp.status_code == 304
+    assert render_count == 3
+
+
+def test_create_diagrams_single_file(
+    app_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """Single diagrams are returned as they are, supporting range requests."""
+    scratch_dir = tmp_path / "scratch"
+    scratch_dir.mkdir()
+    settings = ServerSettings(scratch_dir=scratch_dir, render_cache=False)
+    monkeypatch.setattr(app_module, "get_settings", lambda: settings)
+
+    async def render(**_) -> dict[str, bytes]:
+        return {"petstore.svg": b"<svg>diagram</svg>"}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", render)
+    params = {
+        "fileName": "petstore.json",
+        "mode": "single",
+        "diagramFormat": "svg",
+        "singleFile": True,
+    }
+    url = "/api/v1/create-diagrams/upload"
+    resp = app_client.post(url, params=params, content=b"{}")
+    assert resp.status_code == 200
+    assert resp.content == b"<svg>diagram</svg>"
+    assert resp.headers["content-type"] == "image/svg+xml"
+    assert resp.headers["content-disposition"] == 'attachment; filename="petstore.svg"'
+    assert resp.headers["accept-ranges"] == "bytes"
+    etag = resp.headers["etag"]
+
+    resp = app_client.post(
+        url,
+        params=params,
+        content=b"{}",
+        headers={"Range": "bytes=5-11", "If-Range": etag},
+    )
+    assert resp.status_code == 206
+    assert resp.content == b"diagram"
+    assert resp.headers["content-range"] == "bytes 5-11/18"
+    assert resp.headers["etag"] == etag
+    assert list(scratch_dir.iterdir()) == []
+
+    resp = app_client.post(
+        url, params=params, content=b"{}", headers={"Range": "bytes=5-11", "If-Range": '"old"'}
+    )
+    assert resp.status_code == 200
+    assert resp.content == b"<svg>diagram</svg>"
+    resp = app_client.post(url, params=params, content=b"{}", headers={"Range": "bytes=18-"})
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == "bytes */18"
+
+    resp = app_client.post(url, params={**params, "mode": "split"}, content=b"{}")
+    assert resp.status_code == 422
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": "petstore.json",
+            "fileContent": "{}",
+            "mode": "single",
+            "diagramFormat": ["svg", "png"],
+            "singleFile": True,
+        },
+    )
+    assert resp.status_code == 422
+    assert "'singleFile' requires" in resp.text
+
+
+def test_create_diagrams_result_cache(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Repeated requests for the same canonical spec are served from the result cache."""
+    render_count = 0
+
+    async def counting_render(**_) -> dict[str, bytes]:
+        nonlocal render_count
+        render_count += 1
+        return {"petstore.puml": b"@startuml"}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", counting_render)
+    create_data = {
+        "fileName": "petstore.json",
+        "fileContent": '{"openapi": "3.0.3", "paths": {}}',
+        "mode": "single",
+        "diagramFormat": "puml",
+    }
+    first = app_client.post("/api/v1/create-diagrams", json=create_data)
+    second = app_client.post(
+        "/api/v1/create-diagrams",
+        json={**create_data, "fileContent": '{"paths": {}, "openapi": "3.0.3"}'},
+    )
+    third = app_client.post("/api/v1/create-diagrams", json={**create_data, "pruneUnused": True})
+
+    assert first.content == second.content
+    assert third.status_code == 200
+    assert render_count == 2
+
+    settings = ServerSettings(admin_token="secret")
+    monkeypatch.setattr(app_module, "get_settings", lambda: settings)
+    admin_headers = {"Authorization": "Bearer secret"}
+    url = "/api/v1/admin/result-cache"
+    info = app_client.get(url, headers=admin_headers).json()
+    assert (info["memoryHits"], info["diskHits"], info["misses"]) == (1, 0, 2)
+    assert [entry["tier"] for entry in info["entries"]] == ["memory"] * 2 + ["disk"] * 2
+    assert info["memorySize"] == 2 * len(b"@startuml")
+
+    key = info["entries"][0]["key"]
+    assert app_client.delete(f"{url}/{key}", headers=admin_headers).json() == {"removed": 2}
+    assert app_client.delete(f"{url}/{key}", headers=admin_headers).status_code == 404
+    assert app_client.delete(url, headers=admin_headers).json() == {"removed": 2}
+    app_client.post("/api/v1/create-diagrams", json=create_data)
+    assert render_count == 3
+
+
+def test_admin_result_cache_settings(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Admin endpoints require the configured token and an enabled result cache."""
+    settings = ServerSettings()
+    monkeypatch.setattr(app_module, "get_settings", lambda: settings)
+    url = "/api/v1/admin/result-cache"
+    assert app_client.get(url).status_code == 404
+    assert app_client.delete(url, headers={"Authorization": "Bearer "}).status_code == 404
+
+    settings.admin_token = "secret"
+    resp = app_client.get(url)
+    assert resp.status_code == 401
+    assert resp.headers["www-authenticate"] == "Bearer"
+    assert app_client.get(url, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    resp = app_client.get(url, headers={"Authorization": "Bearer secret"})
+    assert resp.status_code == 200
+    assert resp.json()["entries"] == []
+
+    app_module.get_result_cache.cache_clear()
+    settings.result_cache = False
+    resp = app_client.delete(url, headers={"Authorization": "Bearer secret"})
+    assert resp.status_code == 404
+
+
+def test_create_diagrams_backpressure(monkeypatch: pytest.MonkeyPatch):
+    """Reject requests exceeding the render queue with ``429`` and ``Retry-After``."""
+    scheduler = RenderScheduler(
+        max_concurrency=1, max_queue_size=0, queue_timeout=5, run_timeout=5
+    )
+    monkeypatch.setattr(app_module, "get_render_scheduler", lambda: scheduler)
+
+    async def slow_render(**_kwargs) -> dict[str, bytes]:
+        await asyncio.sleep(0.1)
+        return {}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", slow_render)
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    payload = {
+        "fileName": openapi_spec.name,
+        "fileContent": openapi_spec.read_text(),
+        "mode": "single",
+        "diagramFormat": "puml",
+    }
+
+    async def main() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(client.post("/api/v1/create-diagrams", json=payload) for _ in range(2))
+            )
+
+    responses = asyncio.run(main())
+    assert sorted(resp.status_code for resp in responses) == [200, 429]
+    rejected = next(resp for resp in responses if resp.status_code == 429)
+    assert int(rejected.headers["Retry-After"]) >= 1
+
+
+def test_create_diagrams_render_timeout(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Fail renders exceeding the run time deadline with ``503``."""
+    scheduler = RenderScheduler(
+        max_concurrency=1, max_queue_size=0, queue_timeout=5, run_timeout=0.01
+    )
+    monkeypatch.setattr(app_module, "get_render_scheduler", lambda: scheduler)
+
+    async def slow_render(**_kwargs) -> dict[str, bytes]:
+        await asyncio.sleep(1)
+        return {}
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", slow_render)
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": "single",
+            "diagramFormat": "puml",
+        },
+    )
+    assert resp.status_code == 503
+    assert "Retry-After" in resp.headers
+
+
+def test_create_diagrams_process_limit(app_client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Renders exceeding resource limits fail with ``422``."""
+
+    async def huge_render(**kwargs) -> dict[str, bytes]:
+        assert kwargs["limits"] == app_module.get_process_limits()
+        msg = "Process 'java' exceeded its output size limit of 10 bytes."
+        raise OutputSizeLimitError(msg)
+
+    monkeypatch.setattr(app_module, "arender_openapi_to_plantuml", huge_render)
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/create-diagrams",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": "single",
+            "diagramFormat": "puml",
+        },
+    )
+    assert resp.status_code == 422
+    assert resp.json() == {
+        "detail": "Process 'java' exceeded its output size limit of 10 bytes.",
+        "limit": "OutputSizeLimitError",
+    }
+
+
+def test_create_job(app_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Submit render job, poll its status and download the result."""
+    monkeypatch.setattr(app_module, "_job_manager", JobManager(tmp_path))
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    resp = app_client.post(
+        "/api/v1/jobs",
+        json={
+            "fileName": openapi_spec.name,
+            "fileContent": openapi_spec.read_text(),
+            "mode": "split",
+            "diagramFormat": "puml",
+        },
+    )
+    assert resp.status_code == 202
+    job_id = resp.json()["jobId"]
+    for _ in range(600):
+        job = app_client.get(f"/api/v1/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            break
+        assert app_client.get(f"/api/v1/jobs/{job_id}/result").status_code == 409
+        time.sleep(0.1)
+    assert job["status"] == "done", job["error"]
+    resp = app_client.get(f"/api/v1/jobs/{job_id}/result")
+    assert resp.status_code == 200
+    with ZipFile(BytesIO(resp.content)) as zip_resp:
+        assert len(zip_resp.namelist()) == 19
+    assert app_module._job_manager is not None
+    app_module._job_manager.shutdown()
+
+
+def test_get_job_not_found(
+    app_client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """Unknown jobs result in ``404``."""
+    monkeypatch.setattr(app_module, "_job_manager", JobManager(tmp_path))
+    assert app_client.get("/api/v1/jobs/unknown").status_code == 404
+    assert app_client.get("/api/v1/jobs/unknown/result").status_code == 404
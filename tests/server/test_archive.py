@@ -0,0 +1,92 @@
+"""Tests for ``openapi_diagram.server.archive``."""
+
+from __future__ import annotations
+
+import os
+from io import BytesIO
+from typing import TYPE_CHECKING
+from zipfile import ZIP_DEFLATED
+from zipfile import ZIP_STORED
+from zipfile import ZipFile
+
+from openapi_diagram.server.archive import ZIP_DATE_TIME
+from openapi_diagram.server.archive import iter_zip
+from openapi_diagram.server.archive import write_zip
+from openapi_diagram.server.archive import write_zip_contents
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Not valid UTF-8, so reading it as text would fail
+PNG_CONTENT = b"\x89PNG\r\n\x1a\n\xff\xfe"
+
+
+def test_iter_zip(tmp_path: Path):
+    """Entries are streamed in parts with compression depending on the format."""
+    large_file = tmp_path / "large.svg"
+    large_file.write_bytes(b"<svg/>" * 100_000)
+
+    parts = list(
+        iter_zip(
+            [
+                ("diagram.png", PNG_CONTENT),
+                ("sub/diagram.puml", b"@startuml"),
+                ("large.svg", large_file),
+            ],
+            chunk_size=1024,
+        )
+    )
+
+    assert len(parts) > 3
+    assert all(len(part) > 0 for part in parts)
+    with ZipFile(BytesIO(b"".join(parts))) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.read("diagram.png") == PNG_CONTENT
+        assert zip_file.read("sub/diagram.puml") == b"@startuml"
+        assert zip_file.read("large.svg") == large_file.read_bytes()
+        assert zip_file.getinfo("diagram.png").compress_type == ZIP_STORED
+        assert zip_file.getinfo("large.svg").compress_type == ZIP_DEFLATED
+        assert zip_file.getinfo("large.svg").compress_size < 10_000
+
+
+def test_iter_zip_empty():
+    """Without entries the result is an empty zip file."""
+    with ZipFile(BytesIO(b"".join(iter_zip([])))) as zip_file:
+        assert zip_file.namelist() == []
+
+
+def test_write_zip_binary(tmp_path: Path):
+    """Files are added as bytes."""
+    (tmp_path / "output").mkdir()
+    png_file = tmp_path / "output" / "diagram.png"
+    png_file.write_bytes(PNG_CONTENT)
+
+    write_zip([png_file], tmp_path / "result.zip", tmp_path)
+
+    with ZipFile(tmp_path / "result.zip") as zip_file:
+        assert zip_file.read("output/diagram.png") == PNG_CONTENT
+        assert zip_file.getinfo("output/diagram.png").compress_type == ZIP_STORED
+
+
+def test_zip_reproducible(tmp_path: Path):
+    """Zip files only depend on the entries, not on their order or file timestamps."""
+    puml_file = tmp_path / "a.puml"
+    puml_file.write_bytes(b"@startuml")
+    svg_file = tmp_path / "b.svg"
+    svg_file.write_bytes(b"<svg/>")
+    entries: list[tuple[str, bytes | Path]] = [("a.puml", b"@startuml"), ("b.svg", svg_file)]
+
+    first = b"".join(iter_zip(entries))
+    write_zip([puml_file, svg_file], tmp_path / "first.zip")
+    os.utime(svg_file, (0, 0))
+    second = b"".join(iter_zip(reversed(entries)))
+    write_zip([svg_file, puml_file], tmp_path / "second.zip")
+
+    assert first == second
+    with ZipFile(BytesIO(first)) as zip_file:
+        assert zip_file.namelist() == ["a.puml", "b.svg"]
+        assert {info.date_time for info in zip_file.infolist()} == {ZIP_DATE_TIME}
+    assert (tmp_path / "first.zip").read_bytes() == (tmp_path / "second.zip").read_bytes()
+    contents = BytesIO()
+    write_zip_contents({"b.svg": b"<svg/>", "a.puml": b"@startuml"}, contents)
+    assert contents.getvalue() == (tmp_path / "first.zip").read_bytes()
@@ -0,0 +1,99 @@
+"""Tests for ``openapi_diagram.server.conditional``."""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pytest
+
+from openapi_diagram.filters import OperationFilter
+from openapi_diagram.server.conditional import RangeNotSatisfiableError
+from openapi_diagram.server.conditional import diagram_etag
+from openapi_diagram.server.conditional import etag_matches
+from openapi_diagram.server.conditional import requested_range
+
+
+def _etag(**kwargs) -> str:
+    options = {
+        "spec_hash": "abc",
+        "file_name": Path("petstore.json"),
+        "modes": ["single"],
+        "diagram_formats": ["svg"],
+        "entry": None,
+        "prune_unused": False,
+        "operation_filter": None,
+        "single_file": False,
+    }
+    return diagram_etag(**{**options, **kwargs})
+
+
+def test_diagram_etag():
+    """The tag changes with everything the diagrams depend on, but not with option order."""
+    etag = _etag()
+
+    assert re.fullmatch(r'"[0-9a-f]{64}"', etag)
+    assert _etag(modes=["single", "split"], diagram_formats=["svg", "png"]) == _etag(
+        modes=["split", "single"], diagram_formats=["png", "svg"]
+    )
+    assert (
+        len(
+            {
+                etag,
+                _etag(spec_hash="abd"),
+                _etag(file_name=Path("api.json")),
+                _etag(diagram_formats=["png"]),
+                _etag(prune_unused=True),
+                _etag(operation_filter=OperationFilter(include_tags=["pet"])),
+                _etag(single_file=True),
+                _etag(version="0.1.29"),
+            }
+        )
+        == 8
+    )
+
+
+@pytest.mark.parametrize("if_none_match", ['"a"', 'W/"a"', '"b", "a"', "*"])
+def test_etag_matches(if_none_match: str):
+    """``If-None-Match`` lists, wildcards and weak tags are supported."""
+    assert etag_matches(if_none_match, '"a"') is True
+
+
+@pytest.mark.parametrize("if_none_match", [None, '"b"', "a"])
+def test_etag_not_matches(if_none_match: str | None):
+    """Other tags, unquoted tags and missing headers do not match."""
+    assert etag_matches(if_none_match, '"a"') is False
+
+
+@pytest.mark.parametrize(
+    ("range_header", "if_range", "expected"),
+    [
+        ("bytes=5-11", None, (5, 11)),
+        ("bytes=5-", None, (5, 17)),
+        ("bytes=5-100", None, (5, 17)),
+        ("bytes=-7", None, (11, 17)),
+        ("bytes=-100", None, (0, 17)),
+        ("bytes=5-11", '"a"', (5, 11)),
+        ("bytes=5-11", '"b"', None),
+        ("bytes=5-11", 'W/"a"', None),
+        (None, None, None),
+        ("bytes=0-1,5-11", None, None),
+        ("bytes=11-5", None, None),
+        ("bytes=a-b", None, None),
+        ("lines=5-11", None, None),
+    ],
+)
+def test_requested_range(
+    range_header: str | None, if_range: str | None, expected: tuple[int, int] | None
+):
+    """Single byte ranges are supported, others and outdated ``If-Range`` are ignored."""
+    assert requested_range(range_header, if_range, '"a"', 18) == expected
+
+
+@pytest.mark.parametrize(
+    ("range_header", "size"), [("bytes=18-", 18), ("bytes=-0", 18), ("bytes=-5", 0)]
+)
+def test_requested_range_not_satisfiable(range_header: str, size: int):
+    """Ranges outside of the diagram can't be satisfied."""
+    with pytest.raises(RangeNotSatisfiableError):
+        requested_range(range_header, None, '"a"', size)
@@ -0,0 +1,127 @@
+"""Tests for ``openapi_diagram.server.jobs``."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+from zipfile import ZipFile
+
+import pytest
+
+from openapi_diagram.server.jobs import JobManager
+from openapi_diagram.server.models.request_models import CreateDiagram
+from openapi_diagram.server.scheduler import QueueFullError
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlModes
+    from openapi_diagram.server.models.response_models import JobInfo
+
+
+def _create_data(
+    mode: OpenapiToPlantumlModes = "split", file_content: str | None = None
+) -> CreateDiagram:
+    openapi_spec = TEST_DATA / "petstore-3-0.json"
+    return CreateDiagram(
+        file_name=Path(openapi_spec.name),
+        file_content=openapi_spec.read_text() if file_content is None else file_content,
+        mode=mode,
+        diagram_format="puml",
+    )
+
+
+def _wait_finished(job_manager: JobManager, job_id: str) -> JobInfo:
+    for _ in range(600):
+        job = job_manager.get(job_id)
+        assert job is not None
+        if job.status in ("done", "failed"):
+            return job
+        time.sleep(0.1)
+    pytest.fail(f"Job {job_id} did not finish.")
+
+
+def test_job_manager_render(tmp_path: Path):
+    """Jobs are rendered in the background and their result is stored as zip file."""
+    job_manager = JobManager(tmp_path)
+    job = job_manager.submit(_create_data())
+    assert job.status == "queued"
+    job = _wait_finished(job_manager, job.job_id)
+    assert job.status == "done", job.error
+    assert job.files_rendered == 19
+    result_file = job_manager.result_file(job.job_id)
+    assert result_file is not None
+    with ZipFile(result_file) as zipfile:
+        assert len(zipfile.namelist()) == 19
+    assert (tmp_path / job.job_id / "output").exists() is False
+    job_manager.shutdown()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_job_manager_failed_job(tmp_path: Path):
+    """Errors of a job are reported in its status and there is no result."""
+    job_manager = JobManager(tmp_path)
+    job = job_manager.submit(_create_data(file_content="{not json"))
+    job = _wait_finished(job_manager, job.job_id)
+    assert job.status == "failed"
+    assert job.error is not None
+    assert job_manager.result_file(job.job_id) is None
+    job_manager.shutdown()
+
+
+def test_job_manager_file_references(tmp_path: Path):
+    """References of uploaded specs to files next to them on the server are rejected."""
+    (tmp_path / "secret.yaml").write_text("password: hunter2\n")
+    job_manager = JobManager(tmp_path / "jobs")
+    file_content = json.dumps(
+        {"openapi": "3.0.0", "components": {"schemas": {"Secret": {"$ref": "../../secret.yaml"}}}}
+    )
+    job = job_manager.submit(_create_data(file_content=file_content))
+    job = _wait_finished(job_manager, job.job_id)
+    assert job.status == "failed"
+    assert job.error is not None
+    assert job.error.startswith("BundleError")
+    job_manager.shutdown()
+
+
+def test_job_manager_queue_full(tmp_path: Path):
+    """Reject jobs once ``max_queued`` jobs are waiting."""
+    job_manager = JobManager(tmp_path, max_queued=0)
+    with pytest.raises(QueueFullError, match="Too many jobs queued"):
+        job_manager.submit(_create_data())
+    job_manager.shutdown()
+
+
+def test_job_manager_cleanup(tmp_path: Path):
+    """Finished jobs and leftover job folders are removed after ``result_ttl``."""
+    leftover = tmp_path / "leftover"
+    leftover.mkdir()
+    os.utime(leftover, (0, 0))
+    job_manager = JobManager(tmp_path, result_ttl=0)
+    job = job_manager.submit(_create_data(file_content="{not json"))
+    assert leftover.exists() is False
+    for _ in range(600):
+        if job_manager.get(job.job_id) is None:
+            break
+        time.sleep(0.1)
+    assert job_manager.get(job.job_id) is None
+    assert (tmp_path / job.job_id).exists() is False
+    job_manager.shutdown()
+
+
+def test_job_manager_cleanup_concurrent_removal(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Job folders removed while cleaning up are skipped."""
+    (tmp_path / "removed").mkdir()
+    path_stat = Path.stat
+
+    def stat(path: Path, **kwargs: bool) -> os.stat_result:
+        if path.name == "removed":
+            raise FileNotFoundError(path)
+        return path_stat(path, **kwargs)
+
+    monkeypatch.setattr(Path, "stat", stat)
+    job_manager = JobManager(tmp_path, result_ttl=0)
+    assert job_manager.cleanup() == []
+    job_manager.shutdown()
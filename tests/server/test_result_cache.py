@@ -0,0 +1,122 @@
+"""Tests for ``openapi_diagram.server.result_cache``."""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from openapi_diagram.server.result_cache import ResultCache
+from openapi_diagram.server.result_cache import result_spec_hash
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+
+SPEC_HASH = "a" * 64
+
+
+def _key(diagram_format: OpenapiToPlantumlFormats = "svg") -> str:
+    return ResultCache.key(
+        SPEC_HASH,
+        Path("petstore.json"),
+        modes=["single"],
+        diagram_formats=[diagram_format],
+        entry=None,
+        prune_unused=False,
+        operation_filter=None,
+    )
+
+
+def test_result_spec_hash():
+    """In-memory specs use the canonical hash, spooled files the content hash."""
+    json_hash = result_spec_hash(b'{"openapi": "3.0.3", "info": {}}', "json", None, "c" * 64)
+    yaml_hash = result_spec_hash(b"info: {}\nopenapi: 3.0.3\n", "yaml", None, "d" * 64)
+
+    assert json_hash == yaml_hash
+    assert result_spec_hash(TEST_DATA / "petstore-3-0.json", "json", None, "c" * 64) == (
+        f"raw-{'c' * 64}"
+    )
+
+
+def test_result_spec_hash_fallback():
+    """Uploads which can not be parsed or hashed are keyed by their content hash."""
+    assert result_spec_hash(b"{not json", "json", None, "c" * 64) == f"raw-{'c' * 64}"
+    assert result_spec_hash(b"[1, 2", "yaml", None, "c" * 64) == f"raw-{'c' * 64}"
+
+
+def test_result_cache_tiers(tmp_path: Path):
+    """Misses, memory hits and disk hits refilling the memory tier are counted."""
+    result_cache = ResultCache(tmp_path)
+    contents = {"petstore.svg": b"<svg/>"}
+
+    assert result_cache.get(_key()) is None
+    result_cache.put(_key(), contents)
+    assert result_cache.get(_key()) == contents
+    assert (result_cache.memory_hits, result_cache.disk_hits, result_cache.misses) == (1, 0, 1)
+
+    restarted_cache = ResultCache(tmp_path)
+    assert restarted_cache.get(_key()) == contents
+    assert restarted_cache.get(_key()) == contents
+    assert (restarted_cache.memory_hits, restarted_cache.disk_hits) == (1, 1)
+    assert [entry.tier for entry in restarted_cache.entries()] == ["memory", "disk"]
+
+
+def test_result_cache_memory_lru(tmp_path: Path):
+    """The memory tier evicts least recently used results, too large ones only go to disk."""
+    result_cache = ResultCache(tmp_path, memory_max_size=10)
+
+    result_cache.put(_key("svg"), {"a.svg": b"12345"})
+    result_cache.put(_key("png"), {"a.png": b"12345"})
+    result_cache.get(_key("svg"))
+    result_cache.put(_key("puml"), {"a.puml": b"12345"})
+    result_cache.put(_key("eps"), {"a.eps": b"12345678901"})
+
+    memory_keys = [entry.key for entry in result_cache.entries() if entry.tier == "memory"]
+    assert memory_keys == [_key("svg"), _key("puml")]
+    assert result_cache.memory_size == 10
+    assert result_cache.get(_key("eps")) == {"a.eps": b"12345678901"}
+    assert result_cache.disk_hits == 1
+
+
+def test_result_cache_disk_limit(tmp_path: Path):
+    """The disk tier removes the oldest results once it exceeds its size."""
+    result_cache = ResultCache(tmp_path, memory_max_size=0, disk_max_size=300)
+
+    result_cache.put(_key("svg"), {"a.svg": b"1" * 100})
+    os.utime(tmp_path / f"{_key('svg')}.zip", (1, 1))
+    result_cache.put(_key("png"), {"a.png": b"2" * 100})
+
+    assert [entry.key for entry in result_cache.entries()] == [_key("png")]
+
+
+def test_result_cache_ttl(tmp_path: Path):
+    """Expired results are neither returned nor listed."""
+    result_cache = ResultCache(tmp_path, ttl=60)
+    result_cache.put(_key(), {"a.svg": b"<svg/>"})
+    past = time.time() - 120
+    os.utime(tmp_path / f"{_key()}.zip", (past, past))
+    result_cache._memory[_key()] = result_cache._memory[_key()]._replace(created=past)
+
+    assert result_cache.entries() == []
+    assert result_cache.get(_key()) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_result_cache_purge(tmp_path: Path):
+    """Purging removes one or all results, invalid keys never touch other files."""
+    result_cache = ResultCache(tmp_path)
+    result_cache.put(_key("svg"), {"a.svg": b"<svg/>"})
+    result_cache.put(_key("png"), {"a.png": b"png"})
+    result_cache.get(_key("svg"))
+    (tmp_path / "other.zip").write_bytes(b"")
+
+    assert result_cache.purge("../other") == 0
+    assert result_cache.purge("other") == 0
+    assert result_cache.purge(_key("svg")) == 2
+    assert result_cache.purge(_key("svg")) == 0
+    assert result_cache.purge() == 2
+    assert result_cache.entries() == []
+    assert result_cache.memory_hits == 0
+    assert list(tmp_path.iterdir()) == [tmp_path / "other.zip"]
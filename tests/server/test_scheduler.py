@@ -0,0 +1,90 @@
+"""Tests for ``openapi_diagram.server.scheduler``."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from openapi_diagram.server.scheduler import QueueFullError
+from openapi_diagram.server.scheduler import QueueTimeoutError
+from openapi_diagram.server.scheduler import RenderScheduler
+from openapi_diagram.server.scheduler import RenderTimeoutError
+
+
+async def _sleep(seconds: float) -> float:
+    await asyncio.sleep(seconds)
+    return seconds
+
+
+def test_render_scheduler_limits_concurrency():
+    """Not more than ``max_concurrency`` renders run at the same time."""
+    scheduler = RenderScheduler(
+        max_concurrency=2, max_queue_size=10, queue_timeout=5, run_timeout=5
+    )
+    max_running = 0
+
+    async def render() -> None:
+        nonlocal max_running
+        max_running = max(max_running, scheduler.running)
+        await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        await asyncio.gather(*(scheduler.run(render) for _ in range(6)))
+
+    asyncio.run(main())
+    assert max_running == 2
+    assert scheduler.running == 0
+    assert scheduler.waiting == 0
+
+
+def test_render_scheduler_queue_full():
+    """Reject renders with a retry hint once the queue is full."""
+    scheduler = RenderScheduler(
+        max_concurrency=1, max_queue_size=1, queue_timeout=5, run_timeout=5
+    )
+
+    async def main() -> list[float | BaseException]:
+        return await asyncio.gather(
+            *(scheduler.run(lambda: _sleep(0.05)) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert results[:2] == [0.05, 0.05]
+    assert isinstance(results[2], QueueFullError)
+    assert results[2].status_code == 429
+    assert results[2].retry_after >= 1
+
+
+def test_render_scheduler_queue_timeout():
+    """Fail renders waiting longer than ``queue_timeout`` for a slot."""
+    scheduler = RenderScheduler(
+        max_concurrency=1, max_queue_size=1, queue_timeout=0.01, run_timeout=5
+    )
+
+    async def main() -> list[float | BaseException]:
+        return await asyncio.gather(
+            *(scheduler.run(lambda: _sleep(0.1)) for _ in range(2)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert results[0] == 0.1
+    assert isinstance(results[1], QueueTimeoutError)
+    assert results[1].status_code == 503
+    assert scheduler.waiting == 0
+
+
+def test_render_scheduler_run_timeout():
+    """Cancel renders running longer than ``run_timeout`` and free their slot."""
+    scheduler = RenderScheduler(
+        max_concurrency=1, max_queue_size=0, queue_timeout=5, run_timeout=0.01
+    )
+    with pytest.raises(RenderTimeoutError, match="did not finish within 0.01s"):
+        asyncio.run(scheduler.run(lambda: _sleep(1)))
+    assert asyncio.run(scheduler.run(lambda: _sleep(0))) == 0
+
+
+def test_render_scheduler_invalid_arguments():
+    """Raise ``ValueError`` for schedulers that could never run anything."""
+    with pytest.raises(ValueError, match="'max_concurrency' needs to be at least 1"):
+        RenderScheduler(max_concurrency=0, max_queue_size=0, queue_timeout=1, run_timeout=1)
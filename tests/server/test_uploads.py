@@ -0,0 +1,152 @@
+"""Tests for ``openapi_diagram.server.uploads``."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import sys
+import tracemalloc
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from starlette.requests import Request
+
+from openapi_diagram.server.uploads import UnsupportedContentEncodingError
+from openapi_diagram.server.uploads import UploadError
+from openapi_diagram.server.uploads import UploadTooLargeError
+from openapi_diagram.server.uploads import iter_compressed
+from openapi_diagram.server.uploads import receive_upload
+
+if TYPE_CHECKING:
+    from openapi_diagram.server.uploads import SpooledUpload
+
+
+def _receive(
+    chunks: list[bytes],
+    headers: dict[str, str],
+    max_size: int = 1_000_000,
+    spool_size: int = 1_000_000,
+    spool_dir: Path | None = None,
+) -> SpooledUpload:
+    """Receive an upload of a request with body ``chunks``."""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive() -> dict:
+        return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()],
+    }
+    return asyncio.run(receive_upload(Request(scope, receive), max_size, spool_size, spool_dir))
+
+
+def test_receive_upload_gzip():
+    """Gzip bodies, also with several members, are decompressed across chunks."""
+    body = gzip.compress(b"openapi: ") + gzip.compress(b"3.1.0")
+
+    upload = _receive([body[:7], body[7:20], body[20:]], {"Content-Encoding": "gzip"})
+
+    assert upload.content == b"openapi: 3.1.0"
+    assert upload.file_name is None
+
+
+def test_receive_upload_spooled(tmp_path: Path):
+    """Bodies larger than ``spool_size`` are written to a file removed on close."""
+    upload = _receive([b"a" * 100, b"b" * 100], {}, spool_size=150, spool_dir=tmp_path)
+
+    spool_file = upload.content
+    assert isinstance(spool_file, Path)
+    assert spool_file.parent == tmp_path
+    assert spool_file.read_bytes() == b"a" * 100 + b"b" * 100
+    upload.close()
+    assert spool_file.exists() is False
+
+
+def test_receive_upload_multipart():
+    """The spec is taken from the ``file`` field of multipart bodies."""
+    body = (
+        b"--boundary\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="petstore.yaml"\r\n\r\n'
+        b"openapi: 3.0.3\r\n"
+        b"--boundary--\r\n"
+    )
+    headers = {"Content-Type": "multipart/form-data; boundary=boundary"}
+
+    upload = _receive([body], headers)
+
+    assert upload.content == b"openapi: 3.0.3"
+    assert upload.file_name == "petstore.yaml"
+
+    with pytest.raises(UploadError, match="file field named 'file'"):
+        _receive([body.replace(b'name="file"', b'name="spec"')], headers)
+
+
+def test_receive_upload_limits():
+    """Decompressed bodies are limited, unknown and broken encodings are rejected."""
+    bomb = gzip.compress(b"\0" * 10_000_000)
+    assert len(bomb) < 20_000
+
+    with pytest.raises(UploadTooLargeError, match="maximum size of 1000000 bytes"):
+        _receive([bomb], {"Content-Encoding": "gzip"})
+    with pytest.raises(UploadTooLargeError):
+        _receive([b"a" * 10], {}, max_size=5)
+    with pytest.raises(UnsupportedContentEncodingError, match="'br'"):
+        _receive([b"{}"], {"Content-Encoding": "br"})
+    with pytest.raises(UploadError, match="Can not decompress"):
+        _receive([b"{}"], {"Content-Encoding": "gzip"})
+
+
+def test_receive_upload_zstd():
+    """Zstd bodies, also with several frames, are decompressed across chunks."""
+    zstandard = pytest.importorskip("zstandard")
+    compressor = zstandard.ZstdCompressor()
+    body = compressor.compress(b"openapi: ") + compressor.compress(b"3.1.0")
+
+    upload = _receive([body[:7], body[7:20], body[20:]], {"Content-Encoding": "zstd"})
+
+    assert upload.content == b"openapi: 3.1.0"
+
+
+def test_receive_upload_zstd_bomb():
+    """Zstd bombs are rejected before a chunk is decompressed completely."""
+    zstandard = pytest.importorskip("zstandard")
+    bomb = zstandard.ZstdCompressor().compress(b"\0" * 200_000_000)
+    assert len(bomb) < 20_000
+
+    tracemalloc.start()
+    try:
+        with pytest.raises(UploadTooLargeError, match="maximum size of 1000000 bytes"):
+            _receive([bomb], {"Content-Encoding": "zstd"})
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 10_000_000
+    with pytest.raises(UploadError, match="Can not decompress"):
+        _receive([b"{}"], {"Content-Encoding": "zstd"})
+
+
+def test_iter_compressed():
+    """Compressed chunks decompress to the original content."""
+    content = b"openapi: 3.1.0\n" * 10_000
+
+    chunks = list(iter_compressed(content, "gzip", chunk_size=1024))
+
+    assert zlib.decompress(b"".join(chunks), 16 + zlib.MAX_WBITS) == content
+    assert b"".join(iter_compressed(content, "none", chunk_size=1024)) == content
+
+
+def test_zstd_missing(monkeypatch: pytest.MonkeyPatch):
+    """Without the optional ``zstandard`` package zstd fails with an install hint."""
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+    with pytest.raises(UnsupportedContentEncodingError, match=r"openapi-diagram\[zstd\]"):
+        iter_compressed(b"{}", "zstd")
+    with pytest.raises(UnsupportedContentEncodingError, match=r"openapi-diagram\[zstd\]"):
+        _receive([b"{}"], {"Content-Encoding": "zstd"})
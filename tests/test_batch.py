@@ -0,0 +1,168 @@
+"""Tests for ``openapi_diagram.batch``."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+import yaml
+
+from openapi_diagram.batch import BatchJob
+from openapi_diagram.batch import discover_spec_files
+from openapi_diagram.batch import load_batch_manifest
+from openapi_diagram.batch import run_openapi_to_plantuml_batch
+from openapi_diagram.batch import spec_tree_jobs
+from openapi_diagram.utils import UnsopportFileTypeError
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+MANIFEST_DATA = [
+    {
+        "openapi_spec": "specs/petstore.json",
+        "output_path": "output/petstore.puml",
+        "mode": "single",
+        "diagram_format": "puml",
+    },
+    {
+        "openapi_spec": "/absolute/petstore.yaml",
+        "output_path": "output/split",
+        "mode": "split",
+        "diagram_format": "svg",
+    },
+]
+
+
+@pytest.mark.parametrize("suffix", [".json", ".yaml", ".yml"])
+def test_load_batch_manifest(tmp_path: Path, suffix: str):
+    """Relative paths are resolved relative to the manifest."""
+    manifest = tmp_path / f"manifest{suffix}"
+    manifest.write_text(
+        json.dumps(MANIFEST_DATA) if suffix == ".json" else yaml.safe_dump(MANIFEST_DATA)
+    )
+    jobs = load_batch_manifest(manifest)
+
+    assert jobs[0].openapi_spec == tmp_path / "specs/petstore.json"
+    assert jobs[0].output_path == tmp_path / "output/petstore.puml"
+    assert jobs[0].mode == "single"
+    assert jobs[1].openapi_spec.as_posix() == "/absolute/petstore.yaml"
+    assert jobs[1].diagram_format == "svg"
+
+
+def test_load_batch_manifest_file_type_not_supported(tmp_path: Path):
+    """Raise error for unsupported manifest formats."""
+    with pytest.raises(UnsopportFileTypeError) as execinfo:
+        load_batch_manifest(tmp_path / "manifest.txt")
+    assert str(execinfo.value) == "File type: *.txt is not supported."
+
+
+@pytest.fixture
+def spec_tree(tmp_path: Path) -> Path:
+    """Folder with nested spec files and unrelated files."""
+    spec_root = tmp_path / "specs"
+    (spec_root / "team-a/nested").mkdir(parents=True)
+    (spec_root / "team-b").mkdir(parents=True)
+    (spec_root / "team-a/petstore.json").write_text("{}")
+    (spec_root / "team-a/nested/petstore.yaml").write_text("{}")
+    (spec_root / "team-b/petstore.yml").write_text("{}")
+    (spec_root / "team-b/readme.md").write_text("")
+    return spec_root
+
+
+def test_discover_spec_files_folder(spec_tree: Path):
+    """Folders are searched recursively for supported spec files."""
+    assert discover_spec_files(spec_tree) == (
+        spec_tree,
+        [
+            spec_tree / "team-a/nested/petstore.yaml",
+            spec_tree / "team-a/petstore.json",
+            spec_tree / "team-b/petstore.yml",
+        ],
+    )
+
+
+def test_discover_spec_files_glob(spec_tree: Path):
+    """Glob patterns are relative to their first non-magic parent folder."""
+    assert discover_spec_files(spec_tree / "team-*/**/*.y*ml") == (
+        spec_tree,
+        [spec_tree / "team-a/nested/petstore.yaml", spec_tree / "team-b/petstore.yml"],
+    )
+
+
+def test_discover_spec_files_single_file_and_not_existing(spec_tree: Path):
+    """Files are returned as is and not existing paths have no spec files."""
+    spec_file = spec_tree / "team-a/petstore.json"
+    assert discover_spec_files(spec_file) == (spec_file.parent, [spec_file])
+    assert discover_spec_files(spec_tree / "not-existing.json") == (spec_tree, [])
+
+
+@pytest.mark.parametrize(
+    ("mode", "expected_output"),
+    [("single", "output/team-a/nested/petstore.svg"), ("split", "output/team-a/nested/petstore")],
+)
+def test_spec_tree_jobs(spec_tree: Path, mode: str, expected_output: str):
+    """Spec tree is mirrored into the output folder."""
+    (job,) = spec_tree_jobs(
+        spec_tree,
+        [spec_tree / "team-a/nested/petstore.yaml"],
+        spec_tree.parent / "output",
+        mode,  # type:ignore[arg-type]
+        "svg",
+    )
+    assert job.openapi_spec == spec_tree / "team-a/nested/petstore.yaml"
+    assert job.output_path == spec_tree.parent / expected_output
+    assert job.mode == mode
+    assert job.diagram_format == "svg"
+
+
+@pytest.mark.parametrize("mode", ["single", "split"])
+def test_spec_tree_jobs_duplicate_output(spec_tree: Path, mode: str):
+    """Spec files which only differ in their suffix can't be mirrored into the same output."""
+    (spec_tree / "team-a/petstore.yaml").write_text("{}")
+    with pytest.raises(ValueError, match="would both be rendered to") as execinfo:
+        spec_tree_jobs(
+            spec_tree,
+            [spec_tree / "team-a/petstore.json", spec_tree / "team-a/petstore.yaml"],
+            spec_tree.parent / "output",
+            mode,  # type:ignore[arg-type]
+            "svg",
+        )
+    assert "team-a/petstore.json" in str(execinfo.value)
+    assert "team-a/petstore.yaml" in str(execinfo.value)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_openapi_to_plantuml_batch(tmp_path: Path, max_workers: int):
+    """Bad specs do not abort the batch and results keep the job order."""
+    jobs = [
+        BatchJob(
+            openapi_spec=TEST_DATA / "petstore-3-0.json",
+            output_path=tmp_path / "petstore.puml",
+            mode="single",
+            diagram_format="puml",
+        ),
+        BatchJob(
+            openapi_spec=TEST_DATA / "not-existing.json",
+            output_path=tmp_path / "not-existing.puml",
+            mode="single",
+            diagram_format="puml",
+        ),
+        BatchJob(
+            openapi_spec=TEST_DATA / "petstore-3-1.yaml",
+            output_path=tmp_path / "split",
+            mode="split",
+            diagram_format="puml",
+        ),
+    ]
+    results = run_openapi_to_plantuml_batch(jobs, max_workers=max_workers)
+
+    assert [result.job for result in results] == jobs
+    assert [result.ok for result in results] == [True, False, True]
+    assert all(result.duration > 0 for result in results)
+    assert results[0].files == [tmp_path / "petstore.puml"]
+    assert results[1].error is not None
+    assert results[1].error.startswith("FileNotFoundError")
+    assert len(results[2].files) == 19
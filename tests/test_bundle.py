@@ -0,0 +1,199 @@
+"""Tests for ``openapi_diagram.bundle``."""
+
+from __future__ import annotations
+
+from io import BytesIO
+from typing import TYPE_CHECKING
+from zipfile import ZipFile
+
+import pytest
+
+from openapi_diagram import bundle
+from openapi_diagram.bundle import BundleError
+from openapi_diagram.bundle import SpecParseCache
+from openapi_diagram.bundle import bundle_openapi_archive
+from openapi_diagram.bundle import bundle_openapi_spec
+from openapi_diagram.bundle import check_self_contained
+from openapi_diagram.bundle import local_file_references
+from openapi_diagram.bundle import references_spec_files
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from openapi_diagram.utils import Json
+
+MULTI_FILE_SPEC = TEST_DATA / "multi-file"
+
+
+def _archive(root: Path, prefix: str = "") -> bytes:
+    """Zip all files in ``root``."""
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as zip_file:
+        for file in sorted(root.rglob("*")):
+            if file.is_file():
+                zip_file.writestr(prefix + file.relative_to(root).as_posix(), file.read_bytes())
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (b'{"$ref": "#/components/schemas/Pet"}', False),
+        (b'{"$ref":"schemas/pet.json"}', True),
+        (b"$ref: '#/components/schemas/Pet'", False),
+        (b"$ref: schemas/pet.yaml", True),
+        (b"$ref: './pet.yaml#/Pet'", True),
+        (b'"$ref": "#/a", "x": {"$ref": "other.json#/b"}', True),
+        (b"openapi: 3.0.3", False),
+    ],
+)
+def test_references_spec_files(content: bytes, *, expected: bool):
+    """Scan the raw content for references to other files."""
+    assert references_spec_files(content) is expected
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (b'{"$ref":"schemas/pet.json"}', True),
+        (b'{"$ref":  "#/components/schemas/Pet"}', False),
+        (b"x: {$ref   : schemas/pet.yaml}", True),
+        (b"$re $ref  \t  ", False),
+    ],
+)
+def test_references_spec_files_chunks(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, content: bytes, *, expected: bool
+):
+    """References cut apart by the chunks of a scanned file are found."""
+    spec_file = tmp_path / "spec.yaml"
+    spec_file.write_bytes(content)
+    for chunk_size in range(1, len(content) + 1):
+        monkeypatch.setattr(bundle, "_REF_SCAN_SIZE", chunk_size)
+        assert references_spec_files(spec_file) is expected, chunk_size
+
+
+def test_local_file_references():
+    """Remote and local references are ignored."""
+    data = {
+        "a": {"$ref": "#/components/schemas/A"},
+        "b": [{"$ref": "schemas/b.yaml#/B"}, {"$ref": "https://example.com/c.yaml"}],
+    }
+
+    assert local_file_references(data) == {"schemas/b.yaml"}
+
+
+@pytest.mark.parametrize(
+    "ref", ["/etc/secret.yaml", "../secret.yaml", "common.yaml#/Error", "file:///etc/secret.yaml"]
+)
+def test_check_self_contained_file_references(ref: str):
+    """References to local files and ``file:`` URLs are rejected."""
+    spec_data: dict[str, Json] = {
+        "openapi": "3.0.0",
+        "components": {"schemas": {"Secret": {"$ref": ref}}},
+    }
+    with pytest.raises(BundleError, match="only resolved inside of zip archives"):
+        check_self_contained(spec_data, "spec.json")
+
+
+def test_check_self_contained():
+    """Local JSON pointers, remote URLs and example values are allowed."""
+    spec_data = {
+        "openapi": "3.0.0",
+        "components": {
+            "schemas": {
+                "Pet": {"$ref": "https://example.com/pet.yaml"},
+                "Cat": {"$ref": "#/components/schemas/Pet", "example": {"$ref": "cat.yaml"}},
+            }
+        },
+    }
+    check_self_contained(spec_data, "spec.json")
+
+
+def test_bundle_openapi_spec():
+    """Referenced values are added to the components and references rewritten."""
+    spec_data = bundle_openapi_spec(MULTI_FILE_SPEC / "openapi.yaml")
+
+    # The only remaining reference is part of an example value
+    assert local_file_references(spec_data) == {"not-a-reference"}
+    pets = spec_data["paths"]["/pets"]
+    assert pets["get"]["operationId"] == "listPets"
+    assert pets["get"]["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "type": "array",
+        "items": {"$ref": "#/components/schemas/pet"},
+    }
+    assert pets["post"]["requestBody"] == {"$ref": "#/components/requestBodies/NewPet"}
+    pet = spec_data["paths"]["/pets/{petId}"]["get"]
+    assert pet["parameters"] == [{"$ref": "#/components/parameters/PetId"}]
+    assert pet["responses"]["default"] == {"$ref": "#/components/responses/Error"}
+
+    components = spec_data["components"]
+    assert sorted(components["schemas"]) == ["Error", "Error_2", "owner", "pet"]
+    assert components["schemas"]["Error"] == {"type": "string"}
+    assert components["schemas"]["pet"]["properties"]["parent"] == {
+        "$ref": "#/components/schemas/pet"
+    }
+    assert components["schemas"]["pet"]["properties"]["name"]["example"] == {
+        "$ref": "not-a-reference"
+    }
+    error_schema = components["responses"]["Error"]["content"]["application/json"]["schema"]
+    assert error_schema == {"$ref": "#/components/schemas/Error_2"}
+    assert components["parameters"]["PetId"]["name"] == "petId"
+
+
+def test_bundle_openapi_spec_parse_cache():
+    """Files are parsed once per cache and bundles do not share values with the cache."""
+    parse_cache = SpecParseCache()
+
+    first = bundle_openapi_spec(MULTI_FILE_SPEC / "openapi.yaml", parse_cache=parse_cache)
+    misses = parse_cache.misses
+    first["components"]["schemas"]["pet"]["type"] = "changed"
+    second = bundle_openapi_spec(MULTI_FILE_SPEC / "openapi.yaml", parse_cache=parse_cache)
+
+    assert misses == 5
+    assert parse_cache.misses == misses
+    assert parse_cache.hits >= misses
+    assert second["components"]["schemas"]["pet"]["type"] == "object"
+
+
+def test_bundle_openapi_spec_errors(tmp_path: Path):
+    """Missing files and pointers raise a ``BundleError``."""
+    spec_file = tmp_path / "openapi.yaml"
+    spec_file.write_text("openapi: 3.0.3\npaths:\n  /a:\n    $ref: missing.yaml\n")
+
+    with pytest.raises(BundleError, match="missing.yaml' does not exist"):
+        bundle_openapi_spec(spec_file)
+
+    (tmp_path / "common.yaml").write_text("Pet:\n  type: object\n")
+    spec_file.write_text("openapi: 3.0.3\nx-schema:\n  $ref: common.yaml#/Dog\n")
+
+    with pytest.raises(BundleError, match="Can not resolve '#/Dog'"):
+        bundle_openapi_spec(spec_file)
+
+
+def test_bundle_openapi_archive():
+    """Archives are bundled like the file tree they contain."""
+    archive = _archive(MULTI_FILE_SPEC, prefix="spec/")
+
+    assert bundle_openapi_archive(archive) == bundle_openapi_spec(MULTI_FILE_SPEC / "openapi.yaml")
+    assert bundle_openapi_archive(archive, "spec/openapi.yaml")["info"]["version"] == "1.0.0"
+
+
+def test_bundle_openapi_archive_errors():
+    """Invalid archives and references outside of the archive are rejected."""
+    with pytest.raises(BundleError, match="Invalid zip archive"):
+        bundle_openapi_archive(b"not a zip")
+
+    with pytest.raises(BundleError, match="exceeds 10 bytes"):
+        bundle_openapi_archive(_archive(MULTI_FILE_SPEC), max_size=10)
+
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as zip_file:
+        zip_file.writestr("a.yaml", "openapi: 3.0.3\n")
+        zip_file.writestr("b.yaml", "openapi: 3.0.3\nx:\n  $ref: ../outside.yaml\n")
+
+    with pytest.raises(BundleError, match="Expected one spec file"):
+        bundle_openapi_archive(buffer.getvalue())
+
+    with pytest.raises(BundleError, match="outside of the archive"):
+        bundle_openapi_archive(buffer.getvalue(), "b.yaml")
@@ -0,0 +1,111 @@
+"""Tests for ``openapi_diagram.filters``."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from openapi_diagram.filters import OperationFilter
+from openapi_diagram.filters import filter_operations
+from openapi_diagram.utils import load_openapi_spec
+from openapi_diagram.utils import preprocess_spec
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from openapi_diagram.utils import Json
+
+OPERATION: dict[str, Json] = {"operationId": "listPets", "tags": ["pet", "public"]}
+
+
+@pytest.mark.parametrize(
+    ("operation_filter", "expected"),
+    [
+        (OperationFilter(), True),
+        (OperationFilter(include_tags=["public", "store"]), True),
+        (OperationFilter(include_tags=["store"]), False),
+        (OperationFilter(exclude_tags=["public"]), False),
+        (OperationFilter(include_paths=["/pets*"]), True),
+        (OperationFilter(include_paths=["/pet"]), False),
+        (OperationFilter(exclude_paths=["/pets/*"]), True),
+        (OperationFilter(include_operation_ids=["listPets"]), True),
+        (OperationFilter(exclude_operation_ids=["listPets"]), False),
+        (OperationFilter(include_methods=["get", "post"]), True),
+        (OperationFilter(exclude_methods=["get"]), False),
+        (OperationFilter(include_tags=["pet"], include_methods=["post"]), False),
+        (OperationFilter(include_tags=["pet"], exclude_operation_ids=["listPets"]), False),
+    ],
+)
+def test_operation_filter_matches(operation_filter: OperationFilter, *, expected: bool):
+    """Include criteria have to match all, exclude criteria any."""
+    assert operation_filter.matches("/pets", "get", OPERATION) is expected
+
+
+def test_operation_filter_invalid_tags():
+    """Tags which are no strings are ignored instead of failing to hash them."""
+    operation = {"tags": [{"name": "pet"}, ["pet"], "public"]}
+    assert OperationFilter(include_tags=["public"]).matches("/pets", "get", operation) is True
+    assert OperationFilter(include_tags=["pet"]).matches("/pets", "get", operation) is False
+
+
+def test_operation_filter_aliases():
+    """Filters are parsed from camelCase keys of the REST API and snake_case keys."""
+    operation_filter = OperationFilter.model_validate(
+        {"includeTags": ["pet"], "exclude_methods": ["delete"]}
+    )
+
+    assert operation_filter == OperationFilter(include_tags=["pet"], exclude_methods=["delete"])
+    assert operation_filter.is_empty() is False
+    assert OperationFilter().is_empty() is True
+
+
+def test_filter_operations():
+    """Path items keep shared fields and are dropped without selected operations."""
+    spec_data = {
+        "openapi": "3.0.3",
+        "paths": {
+            "/pets": {
+                "parameters": [{"name": "limit", "in": "query"}],
+                "get": {"operationId": "listPets"},
+                "post": {"operationId": "addPet"},
+            },
+            "/stores": {"get": {"operationId": "listStores"}},
+        },
+    }
+
+    result = filter_operations(spec_data, OperationFilter(include_paths=["/pets"]))
+
+    assert result["paths"] == {"/pets": spec_data["paths"]["/pets"]}
+
+    result = filter_operations(spec_data, OperationFilter(exclude_operation_ids=["addPet"]))
+
+    assert result["paths"]["/pets"] == {
+        "parameters": [{"name": "limit", "in": "query"}],
+        "get": {"operationId": "listPets"},
+    }
+    assert "/stores" in result["paths"]
+    assert "post" in spec_data["paths"]["/pets"]
+
+
+def test_preprocess_spec_operation_filter():
+    """Only the components referenced by the selected operations are kept."""
+    spec_data = load_openapi_spec(TEST_DATA / "petstore-3-0.json")
+
+    result = preprocess_spec(spec_data, operation_filter=OperationFilter(include_tags=["pet"]))
+
+    assert all(path.startswith("/pet") for path in result["paths"])
+    assert len(result["paths"]) == 5
+    assert sorted(result["components"]["schemas"]) == ["ApiResponse", "Category", "Pet", "Tag"]
+
+    result = preprocess_spec(
+        spec_data,
+        operation_filter=OperationFilter(include_paths=["/store/*"], exclude_methods=["delete"]),
+    )
+
+    assert {path: list(path_item) for path, path_item in result["paths"].items()} == {
+        "/store/inventory": ["get"],
+        "/store/order": ["post"],
+        "/store/order/{orderId}": ["get"],
+    }
+    assert list(result["components"]["schemas"]) == ["Order"]
+    assert preprocess_spec(spec_data, operation_filter=OperationFilter()) == spec_data
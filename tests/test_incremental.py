@@ -0,0 +1,104 @@
+"""Tests for ``openapi_diagram.incremental``."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from openapi_diagram.filters import OperationFilter
+from openapi_diagram.incremental import MANIFEST_FILE_NAME
+from openapi_diagram.incremental import _operation_ids
+from openapi_diagram.incremental import _reduced_spec
+from openapi_diagram.incremental import operation_fingerprints
+from openapi_diagram.incremental import run_openapi_to_plantuml_incremental
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _petstore() -> dict:
+    return json.loads((TEST_DATA / "petstore-3-0.json").read_text())
+
+
+def test_operation_fingerprints():
+    """Only operations depending on a changed schema get a new fingerprint."""
+    spec_data = _petstore()
+    fingerprints = operation_fingerprints(spec_data)
+    assert len(fingerprints) == 19
+    spec_data["components"]["schemas"]["Category"]["description"] = "changed"
+    changed = {
+        key
+        for key, fingerprint in operation_fingerprints(spec_data).items()
+        if fingerprints[key] != fingerprint
+    }
+    assert "put /pet" in changed
+    assert "get /pet/{petId}" in changed
+    assert "get /store/inventory" not in changed
+    assert "delete /store/order/{orderId}" not in changed
+
+
+def test_reduced_spec_invalid_path_item():
+    """Path items which are no objects are skipped instead of crashing."""
+    spec_data = _petstore()
+    spec_data["paths"]["/broken"] = "not a path item"
+    operation_keys = {"get /store/inventory", "get /broken"}
+    reduced = _reduced_spec(spec_data, operation_keys)
+    assert list(reduced["paths"]) == ["/store/inventory"]
+    assert _operation_ids(spec_data, operation_keys) == {"getInventory": "get /store/inventory"}
+
+
+def test_run_openapi_to_plantuml_incremental(tmp_path: Path):
+    """Only changed operations are rendered and diagrams of removed ones are deleted."""
+    spec_data = _petstore()
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(spec_data))
+    output = tmp_path / "output"
+
+    result = run_openapi_to_plantuml_incremental(spec_file, output, "puml")
+    assert len(result.files) == 19
+    assert len(result.rendered) == 19
+    assert (output / MANIFEST_FILE_NAME).is_file() is True
+
+    result = run_openapi_to_plantuml_incremental(spec_file, output, "puml")
+    assert len(result.files) == 19
+    assert result.rendered == []
+
+    spec_data["paths"]["/store/inventory"]["get"]["description"] = "changed"
+    del spec_data["paths"]["/store/order/{orderId}"]["delete"]
+    spec_file.write_text(json.dumps(spec_data))
+    result = run_openapi_to_plantuml_incremental(spec_file, output, "puml")
+    assert len(result.files) == 18
+    assert result.rendered == [output / "getInventory.puml"]
+    assert result.deleted == [output / "deleteOrder.puml"]
+    assert (output / "deleteOrder.puml").exists() is False
+
+
+def test_run_openapi_to_plantuml_incremental_operation_filter(tmp_path: Path):
+    """Diagrams of operations which are no longer selected are deleted."""
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(_petstore()))
+    output = tmp_path / "output"
+
+    result = run_openapi_to_plantuml_incremental(
+        spec_file, output, "puml", operation_filter=OperationFilter(include_tags=["store"])
+    )
+    assert len(result.rendered) == 4
+
+    result = run_openapi_to_plantuml_incremental(
+        spec_file,
+        output,
+        "puml",
+        operation_filter=OperationFilter(include_tags=["store"], exclude_methods=["delete"]),
+    )
+    assert result.rendered == []
+    assert result.deleted == [output / "deleteOrder.puml"]
+    assert len(result.files) == 3
+
+
+def test_run_openapi_to_plantuml_incremental_format_change(tmp_path: Path):
+    """A different diagram format renders everything again."""
+    output = tmp_path / "output"
+    run_openapi_to_plantuml_incremental(TEST_DATA / "petstore-3-0.json", output, "puml")
+    result = run_openapi_to_plantuml_incremental(TEST_DATA / "petstore-3-0.json", output, "svg")
+    assert len(result.rendered) == 19
@@ -0,0 +1,105 @@
+"""Tests for ``openapi_diagram.jvm_launch``."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from openapi_diagram import jvm_launch
+from openapi_diagram.jvm_launch import JVM_LAUNCH_PROFILES
+from openapi_diagram.jvm_launch import create_cds_archive
+from openapi_diagram.jvm_launch import get_cds_archive_path
+from openapi_diagram.jvm_launch import jvm_options
+from openapi_diagram.jvm_launch import measure_startup
+from openapi_diagram.openapi_to_plantuml import _java_command
+from openapi_diagram.process_limits import ProcessLimits
+
+
+def test_jvm_options(tmp_path: Path):
+    """Profile flags are used and the CDS archive once it exists."""
+    jar_path = tmp_path / "openapi-to-plantuml-0.0.0.jar"
+    assert jvm_options(jar_path) == []
+    assert jvm_options(jar_path, "short-lived") == list(JVM_LAUNCH_PROFILES["short-lived"])
+
+    cds_archive = get_cds_archive_path(jar_path)
+    assert cds_archive == tmp_path / "openapi-to-plantuml-0.0.0.jsa"
+    cds_archive.touch()
+    assert jvm_options(jar_path, "low-memory") == [
+        *JVM_LAUNCH_PROFILES["low-memory"],
+        f"-XX:SharedArchiveFile={cds_archive.as_posix()}",
+    ]
+    assert jvm_options(jar_path, "low-memory", cds=False) == list(
+        JVM_LAUNCH_PROFILES["low-memory"]
+    )
+
+
+def test_java_command_jvm_options(tmp_path: Path):
+    """JVM options are passed before the jar."""
+    jar_path = tmp_path / "openapi-to-plantuml-0.0.0.jar"
+    command = _java_command(
+        tmp_path / "java", jar_path, ["split"], "short-lived", ProcessLimits(max_heap="64m")
+    )
+    jar_index = command.index("-jar")
+    assert command[1:jar_index] == [
+        *JVM_LAUNCH_PROFILES["short-lived"],
+        "-Xmx64m",
+        "-XX:+ExitOnOutOfMemoryError",
+    ]
+    assert command[jar_index + 1 :] == [jar_path.as_posix(), "split"]
+
+
+def test_create_cds_archive(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Archive is written by the JVM to a temporary file and then moved next to the jar."""
+    jar_path = tmp_path / "openapi-to-plantuml-0.0.0.jar"
+
+    def fake_run(command: list[str], **_kwargs):
+        archive_option = next(arg for arg in command if arg.startswith("-XX:ArchiveClasses"))
+        Path(archive_option.split("=", 1)[1]).write_bytes(b"archive")
+        assert command[command.index("-jar") + 2] == "split"
+
+    monkeypatch.setattr(jvm_launch.subprocess, "run", fake_run)
+    cds_archive = create_cds_archive(tmp_path / "java", jar_path)
+
+    assert cds_archive == get_cds_archive_path(jar_path)
+    assert cds_archive.read_bytes() == b"archive"
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_create_cds_archive_error(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Failing or too old JVMs raise a RuntimeError."""
+    jar_path = tmp_path / "openapi-to-plantuml-0.0.0.jar"
+
+    monkeypatch.setattr(jvm_launch.subprocess, "run", lambda *_args, **_kwargs: None)
+    with pytest.raises(RuntimeError, match="JVM did not create a CDS archive"):
+        create_cds_archive(tmp_path / "java", jar_path)
+
+    def failing_run(command: list[str], **_kwargs):
+        raise subprocess.CalledProcessError(1, command, stderr=b"Unrecognized VM option")
+
+    monkeypatch.setattr(jvm_launch.subprocess, "run", failing_run)
+    with pytest.raises(RuntimeError, match="Unrecognized VM option"):
+        create_cds_archive(tmp_path / "java", jar_path)
+    assert get_cds_archive_path(jar_path).is_file() is False
+
+
+def test_measure_startup(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Each profile is measured with and without the CDS archive."""
+    jar_path = tmp_path / "openapi-to-plantuml-0.0.0.jar"
+    commands: list[list[str]] = []
+    monkeypatch.setattr(
+        jvm_launch, "_convert_training_spec", lambda command, _jar: commands.append(command)
+    )
+
+    measurements = measure_startup(tmp_path / "java", jar_path, ["short-lived"], repeat=2)
+    assert [(item.profile, item.cds) for item in measurements] == [("short-lived", False)]
+    assert len(measurements[0].durations) == 2
+    assert measurements[0].median >= 0
+
+    get_cds_archive_path(jar_path).touch()
+    measurements = measure_startup(tmp_path / "java", jar_path, repeat=1)
+    assert [(item.profile, item.cds) for item in measurements] == [
+        (profile, cds) for profile in JVM_LAUNCH_PROFILES for cds in (True, False)
+    ]
+    assert len(commands) == 2 + 2 * len(JVM_LAUNCH_PROFILES)
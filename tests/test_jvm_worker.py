@@ -0,0 +1,202 @@
+"""Tests for ``openapi_diagram.jvm_worker``."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import warnings
+from threading import Event
+from typing import TYPE_CHECKING
+
+import pytest
+
+from openapi_diagram import jvm_worker
+from openapi_diagram import openapi_to_plantuml
+from openapi_diagram.jvm_worker import JvmWorkerPool
+from openapi_diagram.openapi_to_plantuml import JvmWorkerError
+from openapi_diagram.openapi_to_plantuml import JvmWorkerFallbackWarning
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(
+    "spec_file", ["petstore-3-0.json", "petstore-3-0.yaml", "petstore-3-1.yaml"]
+)
+def test_run_openapi_to_plantuml_worker_pool(tmp_path: Path, spec_file: str):
+    """Worker pool creates the same result as the one-shot subprocess without falling back."""
+    output = tmp_path / "result.puml"
+    with JvmWorkerPool(size=1) as pool, warnings.catch_warnings():
+        warnings.simplefilter("error", JvmWorkerFallbackWarning)
+        result = run_openapi_to_plantuml(
+            TEST_DATA / spec_file, output, "single", "puml", worker_pool=pool
+        )
+    assert result == [output]
+    assert output.read_text().rstrip() == (TEST_DATA / "petstore.puml").read_text().rstrip()
+
+
+def test_run_openapi_to_plantuml_worker_pool_split(tmp_path: Path):
+    """Split mode works inside of a worker and the worker is reused."""
+    with JvmWorkerPool(size=1) as pool:
+        for index in range(2):
+            result = run_openapi_to_plantuml(
+                TEST_DATA / "petstore-3-0.json",
+                tmp_path / str(index),
+                "split",
+                "puml",
+                worker_pool=pool,
+            )
+            assert len(result) == 19
+        with pool.worker() as worker:
+            assert worker.jobs_done == 2
+
+
+def test_jvm_worker_pool_recycle():
+    """Workers are replaced after ``max_jobs`` conversions."""
+    with JvmWorkerPool(size=1, max_jobs=1) as pool:
+        with pool.worker() as first_worker:
+            first_worker.jobs_done = 1
+        assert first_worker.is_alive is False
+        with pool.worker() as second_worker:
+            assert second_worker is not first_worker
+            assert second_worker.is_alive is True
+
+
+def test_jvm_worker_pool_health_check():
+    """Dead workers are detected and replaced."""
+    with JvmWorkerPool(size=1, health_check_interval=0) as pool:
+        with pool.worker() as first_worker:
+            assert first_worker.ping() is True
+        first_worker._process.kill()
+        first_worker._process.wait()
+        with pool.worker() as second_worker:
+            assert second_worker is not first_worker
+            assert second_worker.ping() is True
+
+
+def test_run_openapi_to_plantuml_worker_fallback(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Fall back to one-shot subprocess if the worker can not be started."""
+    monkeypatch.setattr(jvm_worker, "WORKER_SOURCE", tmp_path / "NotExisting.java")
+    output = tmp_path / "result.puml"
+    # Not used as context manager, entering the pool starts its workers up front and fails
+    pool = JvmWorkerPool(size=1)
+    try:
+        with pytest.warns(JvmWorkerFallbackWarning, match="falling back to one-shot subprocess"):
+            run_openapi_to_plantuml(
+                TEST_DATA / "petstore-3-0.json", output, "single", "puml", worker_pool=pool
+            )
+    finally:
+        pool.close()
+    assert output.read_text().rstrip() == (TEST_DATA / "petstore.puml").read_text().rstrip()
+
+
+def test_run_openapi_to_plantuml_worker_conversion_error(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+):
+    """Specs rejected by the converter raise without rendering them again in a one-shot JVM."""
+
+    def run_limited(*_args: object) -> None:
+        pytest.fail("Conversion fell back to a one-shot subprocess.")
+
+    monkeypatch.setattr(openapi_to_plantuml, "run_limited", run_limited)
+    spec = tmp_path / "invalid.json"
+    spec.write_text('{"openapi": "3.0.0", "paths": []}')
+    with JvmWorkerPool(size=1) as pool, warnings.catch_warnings():
+        warnings.simplefilter("error", JvmWorkerFallbackWarning)
+        with pytest.raises(subprocess.CalledProcessError):
+            run_openapi_to_plantuml(spec, tmp_path / "out", "split", "puml", worker_pool=pool)
+
+
+@pytest.mark.parametrize(("size", "max_jobs"), [(0, 1), (1, 0)])
+def test_jvm_worker_pool_invalid_arguments(size: int, max_jobs: int):
+    """Raise ``ValueError`` for pools that could never run anything."""
+    with pytest.raises(ValueError, match="need to be at least 1"):
+        JvmWorkerPool(size=size, max_jobs=max_jobs)
+
+
+def test_run_openapi_to_plantuml_worker_pool_version_mismatch(tmp_path: Path):
+    """Raise ``ValueError`` if the pool runs a different jar version."""
+    with pytest.raises(ValueError, match="Worker pool uses openapi-to-plantuml version '0.0.0'"):
+        run_openapi_to_plantuml(
+            TEST_DATA / "petstore-3-0.json",
+            tmp_path,
+            "split",
+            "puml",
+            worker_pool=JvmWorkerPool(version="0.0.0"),
+        )
+
+
+class _BlockingWorker:
+    """Stand-in of a JVM worker whose conversion only ends once it is killed."""
+
+    def __init__(self) -> None:
+        self.jobs_done = 0
+        self.converting = Event()
+        self.killed = Event()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.killed.is_set() is False
+
+    def convert(self, _converter_args: list[str]) -> None:
+        self.converting.set()
+        self.killed.wait(5)
+        msg = "JVM worker exited unexpectedly."
+        raise JvmWorkerError(msg)
+
+    def kill(self) -> None:
+        self.killed.set()
+
+    def close(self) -> None:
+        pass
+
+
+def test_jvm_worker_pool_aconvert_cancelled(monkeypatch: pytest.MonkeyPatch):
+    """Cancelled conversions kill their worker instead of keeping it busy."""
+    pool = JvmWorkerPool(size=1)
+    worker = _BlockingWorker()
+    pool._worker_count = 1
+    monkeypatch.setattr(pool, "_take", lambda: worker)
+
+    async def main() -> None:
+        task = asyncio.create_task(pool.aconvert(["args"]))
+        await asyncio.to_thread(worker.converting.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert worker.killed.is_set() is True
+    assert pool._worker_count == 0
+
+
+def test_jvm_worker_pool_aconvert_cancelled_waiting(monkeypatch: pytest.MonkeyPatch):
+    """Workers taken after the conversion waiting for them was cancelled are given back."""
+    pool = JvmWorkerPool(size=1)
+    worker = _BlockingWorker()
+    released = Event()
+
+    def take() -> _BlockingWorker:
+        released.wait(5)
+        return worker
+
+    monkeypatch.setattr(pool, "_take", take)
+
+    async def main() -> None:
+        task = asyncio.create_task(pool.aconvert(["args"]))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        released.set()
+        for _ in range(100):
+            if pool._idle.qsize() > 0:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    idle_worker: object = pool._idle.get_nowait()
+    assert idle_worker is worker
+    assert worker.converting.is_set() is False
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 from pathlib import Path
 from shutil import which
 from typing import TYPE_CHECKING
@@ -10,18 +12,26 @@ from unittest.mock import MagicMock
 
 import httpx
 import pytest
+import yaml
 
 from openapi_diagram import OPENAPI_TO_PLANTUML_DEFAULT_VERSION
+from openapi_diagram import openapi_to_plantuml
+from openapi_diagram import utils
 from openapi_diagram.openapi_to_plantuml import OPENAPI_TO_PLANTUML_MAVEN_URL
 from openapi_diagram.openapi_to_plantuml import DownloadVerificationError
 from openapi_diagram.openapi_to_plantuml import MissingDependecyWarning
 from openapi_diagram.openapi_to_plantuml import OpenapiToPlantumlFormats
+from openapi_diagram.openapi_to_plantuml import RenderTarget
 from openapi_diagram.openapi_to_plantuml import _find_java_executable
 from openapi_diagram.openapi_to_plantuml import _get_latest_openapi_to_plantuml_version
 from openapi_diagram.openapi_to_plantuml import _get_openapi_to_plantuml_download_url
+from openapi_diagram.openapi_to_plantuml import arun_openapi_to_plantuml
+from openapi_diagram.openapi_to_plantuml import arun_openapi_to_plantuml_multi
 from openapi_diagram.openapi_to_plantuml import download_openapi_to_plantuml
 from openapi_diagram.openapi_to_plantuml import get_openapi_to_plantuml_path
 from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml_multi
+from openapi_diagram.render_cache import RenderCache
 from tests import RUN_SLOW_TEST
 from tests import TEST_DATA
 
@@ -93,6 +103,155 @@ def test_get_openapi_to_plantuml_path(empty_cache_dir: Path):
     assert jar_path == empty_cache_dir / "openapi-to-plantuml-0.0.0.jar"
 
 
+def test_run_openapi_to_plantuml_multi_formats(tmp_path: Path):
+    """Multiple formats in single mode replace the suffix of the output file."""
+    output = tmp_path / "result.puml"
+    results = run_openapi_to_plantuml_multi(
+        TEST_DATA / "petstore-3-1.yaml", output, ["single"], ["puml", "svg", "puml"]
+    )
+    assert list(results) == [
+        RenderTarget("single", "puml", output),
+        RenderTarget("single", "svg", tmp_path / "result.svg"),
+    ]
+    assert output.read_text().rstrip() == (TEST_DATA / "petstore.puml").read_text().rstrip()
+    assert (tmp_path / "result.svg").is_file() is True
+
+
+def test_run_openapi_to_plantuml_multi_modes(tmp_path: Path):
+    """With both modes the output path is a folder containing ``single`` and ``split``."""
+    results = run_openapi_to_plantuml_multi(
+        TEST_DATA / "petstore-3-0.json", tmp_path, ["single", "split"], ["puml"]
+    )
+    assert results[RenderTarget("single", "puml", tmp_path / "single/petstore-3-0.puml")] == [
+        tmp_path / "single/petstore-3-0.puml"
+    ]
+    assert len(results[RenderTarget("split", "puml", tmp_path / "split")]) == 19
+
+
+def test_run_openapi_to_plantuml_multi_parses_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """The spec is parsed and downgraded only once for all renders."""
+    load_mock = MagicMock(wraps=openapi_to_plantuml.parse_openapi_spec)
+    compat_mock = MagicMock(wraps=openapi_to_plantuml.openapi_3_dot_1_compat)
+    monkeypatch.setattr(openapi_to_plantuml, "parse_openapi_spec", load_mock)
+    monkeypatch.setattr(openapi_to_plantuml, "openapi_3_dot_1_compat", compat_mock)
+    run_openapi_to_plantuml_multi(
+        TEST_DATA / "petstore-3-1.yaml",
+        tmp_path,
+        ["single", "split"],
+        ["puml", "svg"],
+        render_cache=RenderCache(tmp_path / "cache"),
+    )
+    assert load_mock.call_count == 1
+    assert compat_mock.call_count == 1
+
+
+def test_run_openapi_to_plantuml_multi_streamable_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Streamed specs are cached by their content hash instead of being parsed for the key."""
+    spec_file = tmp_path / "openapi_spec.json"
+    spec_file.write_text(json.dumps(yaml.safe_load((TEST_DATA / "petstore-3-1.yaml").read_text())))
+    monkeypatch.setattr(utils, "STREAMING_MIN_SIZE", 0)
+    parse_mock = MagicMock(side_effect=AssertionError)
+    monkeypatch.setattr(openapi_to_plantuml, "parse_openapi_spec", parse_mock)
+    monkeypatch.setattr(utils, "load_openapi_spec", parse_mock)
+    render_cache = RenderCache(tmp_path / "cache")
+    output_path = tmp_path / "diagram.puml"
+    run_openapi_to_plantuml_multi(
+        spec_file, output_path, ["single"], ["puml"], render_cache=render_cache
+    )
+    assert [entry.name[:4] for entry in render_cache.cache_dir.iterdir()] == ["raw-"]
+
+    output_path.unlink()
+    converter_args_mock = MagicMock(side_effect=AssertionError)
+    monkeypatch.setattr(openapi_to_plantuml, "_converter_args", converter_args_mock)
+    run_openapi_to_plantuml_multi(
+        spec_file, output_path, ["single"], ["puml"], render_cache=render_cache
+    )
+    assert output_path.is_file() is True
+
+
+def test_run_openapi_to_plantuml_multi_passthrough(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """OpenAPI 3.0 JSON specs are handed to the converter without a rewrite."""
+    dumps_mock = MagicMock(wraps=utils.dumps_json)
+    monkeypatch.setattr(utils, "dumps_json", dumps_mock)
+    spec_file = TEST_DATA / "petstore-3-0.json"
+    converter_args_mock = MagicMock(wraps=openapi_to_plantuml._converter_args)
+    monkeypatch.setattr(openapi_to_plantuml, "_converter_args", converter_args_mock)
+    run_openapi_to_plantuml_multi(
+        spec_file,
+        tmp_path,
+        ["single", "split"],
+        ["puml"],
+        render_cache=RenderCache(tmp_path / "cache"),
+    )
+    assert dumps_mock.call_count == 0
+    assert {call.args[1] for call in converter_args_mock.call_args_list} == {spec_file}
+
+
+def test_run_openapi_to_plantuml_multi_prune_unused(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Pruned specs are rendered from the preprocessed spec and cached separately."""
+    compat_mock = MagicMock(wraps=openapi_to_plantuml.openapi_3_dot_1_compat)
+    monkeypatch.setattr(openapi_to_plantuml, "openapi_3_dot_1_compat", compat_mock)
+    render_cache = RenderCache(tmp_path / "cache")
+    spec_file = TEST_DATA / "petstore-3-0.json"
+    run_openapi_to_plantuml_multi(
+        spec_file, tmp_path / "full.puml", ["single"], ["puml"], render_cache=render_cache
+    )
+    run_openapi_to_plantuml_multi(
+        spec_file,
+        tmp_path / "pruned.puml",
+        ["single"],
+        ["puml"],
+        render_cache=render_cache,
+        prune_unused=True,
+    )
+    assert compat_mock.call_count == 2
+    assert compat_mock.call_args_list[0].args[0] == spec_file
+    pruned_spec = compat_mock.call_args_list[1].args[0]
+    assert "Customer" not in pruned_spec["components"]["schemas"]
+
+
+def test_run_openapi_to_plantuml_multi_bundles_file_references(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Specs referencing other files are rendered from the bundled spec."""
+    compat_mock = MagicMock(wraps=openapi_to_plantuml.openapi_3_dot_1_compat)
+    monkeypatch.setattr(openapi_to_plantuml, "openapi_3_dot_1_compat", compat_mock)
+    results = run_openapi_to_plantuml_multi(
+        TEST_DATA / "multi-file" / "openapi.yaml", tmp_path, ["split"], ["puml"]
+    )
+    assert sorted(file.name for files in results.values() for file in files) == [
+        "addPet.puml",
+        "getPet.puml",
+        "listPets.puml",
+    ]
+    bundled_spec = compat_mock.call_args.args[0]
+    assert sorted(bundled_spec["components"]["schemas"]) == ["Error", "Error_2", "owner", "pet"]
+
+
+def test_arun_openapi_to_plantuml_multi(tmp_path: Path):
+    """Async version creates the same outputs as the sync one."""
+    results = asyncio.run(
+        arun_openapi_to_plantuml_multi(
+            TEST_DATA / "petstore-3-0.json", tmp_path, ["single", "split"], ["puml", "svg"]
+        )
+    )
+    assert [len(files) for files in results.values()] == [1, 1, 19, 19]
+
+
+def test_run_openapi_to_plantuml_multi_empty(tmp_path: Path):
+    """Raise ``ValueError`` if no format is requested."""
+    with pytest.raises(ValueError, match="At least one mode and one diagram format"):
+        run_openapi_to_plantuml_multi(TEST_DATA / "petstore-3-0.json", tmp_path, ["single"], [])
+
+
 @pytest.mark.skipif(
     RUN_SLOW_TEST,
     reason="Since this tests if the download works there is no need to check it in all CI runs.",
@@ -169,6 +328,34 @@ def test_run_openapi_to_plantuml(tmp_path: Path, spec_file: str):
     assert output.read_text().rstrip() == (TEST_DATA / "petstore.puml").read_text().rstrip()
 
 
+@pytest.mark.parametrize(
+    "spec_file", ["petstore-3-0.json", "petstore-3-0.yaml", "petstore-3-1.yaml"]
+)
+def test_arun_openapi_to_plantuml(tmp_path: Path, spec_file: str):
+    """Async version creates the same result as the sync one."""
+    output = tmp_path / "result.puml"
+    result = asyncio.run(arun_openapi_to_plantuml(TEST_DATA / spec_file, output, "single", "puml"))
+    assert result == [output]
+    assert output.read_text().rstrip() == (TEST_DATA / "petstore.puml").read_text().rstrip()
+
+
+def test_arun_openapi_to_plantuml_concurrent(tmp_path: Path):
+    """Multiple conversions can run concurrently in one event loop."""
+
+    async def run_concurrently():
+        return await asyncio.gather(
+            *(
+                arun_openapi_to_plantuml(
+                    TEST_DATA / "petstore-3-0.json", tmp_path / str(index), "split", "svg"
+                )
+                for index in range(3)
+            )
+        )
+
+    results = asyncio.run(run_concurrently())
+    assert [len(result) for result in results] == [19, 19, 19]
+
+
 def test_run_openapi_to_plantuml_split(tmp_path: Path):
     """Using `split` generation creates multiple files."""
     openapi_spec = TEST_DATA / "petstore-3-0.json"
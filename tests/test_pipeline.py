@@ -0,0 +1,136 @@
+"""Tests for ``openapi_diagram.pipeline``."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from io import BytesIO
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock
+from zipfile import ZipFile
+
+import pytest
+import yaml
+
+from openapi_diagram import pipeline
+from openapi_diagram import utils
+from openapi_diagram.pipeline import arender_openapi_to_plantuml
+from openapi_diagram.pipeline import default_scratch_dir
+from openapi_diagram.pipeline import render_openapi_to_plantuml
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_render_openapi_to_plantuml_passthrough(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """OpenAPI 3.0 JSON content is handed to the JVM without parsing it."""
+    monkeypatch.setattr(pipeline, "loads_json", MagicMock(side_effect=AssertionError))
+    monkeypatch.setattr(utils, "load_openapi_spec", MagicMock(side_effect=AssertionError))
+    contents = render_openapi_to_plantuml(
+        (TEST_DATA / "petstore-3-0.json").read_bytes(),
+        ["single"],
+        ["puml"],
+        name="petstore",
+        scratch_dir=tmp_path,
+    )
+    assert list(contents) == ["petstore.puml"]
+    assert len(contents["petstore.puml"]) > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    ("spec", "spec_format"),
+    [
+        ((TEST_DATA / "petstore-3-1.yaml").read_text(), "yaml"),
+        (yaml.safe_load((TEST_DATA / "petstore-3-1.yaml").read_text()), "json"),
+    ],
+)
+def test_render_openapi_to_plantuml_converts(
+    tmp_path: Path, spec: str | dict, spec_format: pipeline.SpecFormats
+):
+    """YAML content and parsed specs are downgraded before they are handed to the JVM."""
+    spec_files: list[dict] = []
+    run_multi = pipeline.run_openapi_to_plantuml_multi
+
+    def record_spec(spec_file: Path, *args, **kwargs):
+        spec_files.append(json.loads(spec_file.read_bytes()))
+        return run_multi(spec_file, *args, **kwargs)
+
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(pipeline, "run_openapi_to_plantuml_multi", record_spec)
+        contents = render_openapi_to_plantuml(
+            spec, ["single", "split"], ["puml"], spec_format=spec_format, scratch_dir=tmp_path
+        )
+    assert spec_files[0]["openapi"] == "3.0.3"
+    assert "single/openapi_spec.puml" in contents
+    assert len([name for name in contents if name.startswith("split/")]) == 19
+
+
+def test_render_openapi_to_plantuml_prune_unused(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Unused components are dropped before the spec is handed to the JVM."""
+    spec_files: list[dict] = []
+    run_multi = pipeline.run_openapi_to_plantuml_multi
+
+    def record_spec(spec_file: Path, *args, **kwargs):
+        spec_files.append(json.loads(spec_file.read_bytes()))
+        return run_multi(spec_file, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "run_openapi_to_plantuml_multi", record_spec)
+    render_openapi_to_plantuml(
+        (TEST_DATA / "petstore-3-0.json").read_bytes(),
+        ["single"],
+        ["puml"],
+        scratch_dir=tmp_path,
+        prune_unused=True,
+    )
+    assert "Customer" not in spec_files[0]["components"]["schemas"]
+    assert "Pet" in spec_files[0]["components"]["schemas"]
+
+
+def test_render_openapi_to_plantuml_archive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Zip archives of specs split over several files are bundled."""
+    spec_files: list[dict] = []
+    run_multi = pipeline.run_openapi_to_plantuml_multi
+
+    def record_spec(spec_file: Path, *args, **kwargs):
+        spec_files.append(json.loads(spec_file.read_bytes()))
+        return run_multi(spec_file, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "run_openapi_to_plantuml_multi", record_spec)
+    buffer = BytesIO()
+    with ZipFile(buffer, "w") as zip_file:
+        for file in (TEST_DATA / "multi-file").rglob("*.yaml"):
+            zip_file.writestr(file.relative_to(TEST_DATA).as_posix(), file.read_bytes())
+    contents = render_openapi_to_plantuml(
+        buffer.getvalue(),
+        ["split"],
+        ["puml"],
+        spec_format="zip",
+        entry="multi-file/openapi.yaml",
+        name="petstore",
+        scratch_dir=tmp_path,
+    )
+    assert sorted(contents) == ["addPet.puml", "getPet.puml", "listPets.puml"]
+    assert "pet" in spec_files[0]["components"]["schemas"]
+
+
+def test_arender_openapi_to_plantuml(tmp_path: Path):
+    """Async version returns the same outputs as the sync one."""
+    spec = (TEST_DATA / "petstore-3-0.json").read_bytes()
+    contents = asyncio.run(
+        arender_openapi_to_plantuml(spec, ["single"], ["puml", "svg"], scratch_dir=tmp_path)
+    )
+    assert contents == render_openapi_to_plantuml(
+        spec, ["single"], ["puml", "svg"], scratch_dir=tmp_path
+    )
+    assert list(contents) == ["openapi_spec.puml", "openapi_spec.svg"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_default_scratch_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Use the memory backed folder if it exists."""
+    monkeypatch.setattr(pipeline, "MEMORY_SCRATCH_DIR", tmp_path)
+    assert default_scratch_dir() == tmp_path
+    monkeypatch.setattr(pipeline, "MEMORY_SCRATCH_DIR", tmp_path / "missing")
+    assert default_scratch_dir() is None
@@ -0,0 +1,120 @@
+"""Tests for ``openapi_diagram.process_limits``."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from openapi_diagram.process_limits import CpuTimeLimitError
+from openapi_diagram.process_limits import HeapLimitError
+from openapi_diagram.process_limits import OutputSizeLimitError
+from openapi_diagram.process_limits import ProcessLimits
+from openapi_diagram.process_limits import ProcessTimeoutError
+from openapi_diagram.process_limits import arun_limited
+from openapi_diagram.process_limits import output_size
+from openapi_diagram.process_limits import run_limited
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="Requires POSIX signals.")
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_process_limits_jvm_options():
+    """Heap limit is passed to the JVM, invalid sizes are rejected."""
+    assert ProcessLimits().jvm_options() == []
+    assert ProcessLimits(max_heap="512m").jvm_options() == [
+        "-Xmx512m",
+        "-XX:+ExitOnOutOfMemoryError",
+    ]
+    with pytest.raises(ValueError, match="max_heap"):
+        ProcessLimits(max_heap="lots")
+
+
+def test_run_limited(tmp_path: Path):
+    """Processes within their limits behave like ``subprocess.run(..., check=True)``."""
+    limits = ProcessLimits(timeout=30, cpu_time=30, max_output_size=1024)
+    output_file = tmp_path / "out.txt"
+    run_limited(_python(f"open({output_file.as_posix()!r}, 'w').write('ok')"), limits, output_file)
+    assert output_file.read_text() == "ok"
+
+    with pytest.raises(subprocess.CalledProcessError):
+        run_limited(_python("raise SystemExit(1)"), limits, output_file)
+
+
+@posix_only
+def test_run_limited_timeout_kills_process_tree(tmp_path: Path):
+    """The process and its children are killed once the time limit is exceeded."""
+    pid_file = tmp_path / "child.pid"
+    code = (
+        "import subprocess, sys, time;"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']);"
+        f"open({pid_file.as_posix()!r}, 'w').write(str(child.pid));"
+        "time.sleep(30)"
+    )
+    start = time.monotonic()
+    with pytest.raises(ProcessTimeoutError, match="time limit of 1.0s"):
+        run_limited(_python(code), ProcessLimits(timeout=1), tmp_path)
+    assert time.monotonic() - start < 10
+
+    child_pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            os.kill(child_pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("Child process was not killed.")
+
+
+def test_run_limited_output_size(tmp_path: Path):
+    """Processes writing too much output are killed."""
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    code = (
+        "import time\n"
+        f"with open({(output_dir / 'big.svg').as_posix()!r}, 'w') as f:\n"
+        "    while True:\n"
+        "        f.write('x' * 1024); f.flush(); time.sleep(0.001)\n"
+    )
+    with pytest.raises(OutputSizeLimitError, match="100000 bytes"):
+        run_limited(_python(code), ProcessLimits(timeout=30, max_output_size=100_000), output_dir)
+    assert output_size(output_dir) > 100_000
+
+
+@posix_only
+def test_run_limited_cpu_time(tmp_path: Path):
+    """Processes using too much CPU time are killed."""
+    with pytest.raises(CpuTimeLimitError, match="CPU time limit of 1s"):
+        run_limited(_python("while True: pass"), ProcessLimits(timeout=30, cpu_time=1), tmp_path)
+
+
+def test_run_limited_heap(tmp_path: Path):
+    """Exit code of ``-XX:+ExitOnOutOfMemoryError`` is reported as exceeded heap."""
+    with pytest.raises(HeapLimitError, match="heap limit of 64m"):
+        run_limited(_python("raise SystemExit(3)"), ProcessLimits(max_heap="64m"), tmp_path)
+    with pytest.raises(subprocess.CalledProcessError):
+        run_limited(_python("raise SystemExit(3)"), ProcessLimits(), tmp_path)
+
+
+def test_arun_limited(tmp_path: Path):
+    """Async version enforces the same limits."""
+    asyncio.run(arun_limited(_python("pass"), ProcessLimits(timeout=30), tmp_path))
+    with pytest.raises(ProcessTimeoutError):
+        asyncio.run(
+            arun_limited(
+                _python("import time; time.sleep(30)"), ProcessLimits(timeout=1), tmp_path
+            )
+        )
@@ -0,0 +1,145 @@
+"""Tests for ``openapi_diagram.render_cache``."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from openapi_diagram.openapi_to_plantuml import arun_openapi_to_plantuml
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
+from openapi_diagram.render_cache import RenderCache
+from openapi_diagram.utils import canonical_spec_hash
+from openapi_diagram.utils import load_openapi_spec
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def create_rendered_files(folder: Path, names: list[str], size: int = 10) -> list[Path]:
+    """Helper to create fake rendered files."""
+    folder.mkdir(parents=True, exist_ok=True)
+    files = []
+    for name in names:
+        file = folder / name
+        file.write_bytes(b"x" * size)
+        files.append(file)
+    return files
+
+
+def test_render_cache_default_dir(render_cache_dir: Path):
+    """Default cache folder is used when none is passed."""
+    assert RenderCache().cache_dir == render_cache_dir
+
+
+def test_render_cache_key():
+    """All parts of the render are reflected in the key."""
+    assert RenderCache.key("abc", "single", "svg", "0.1.28") == "abc_single_svg_0.1.28"
+
+
+def test_render_cache_put_restore_single(tmp_path: Path):
+    """Single file renders are restored to the requested output file."""
+    render_cache = RenderCache(tmp_path / "cache")
+    (rendered,) = create_rendered_files(tmp_path / "rendered", ["spec.svg"])
+    render_cache.put("key", [rendered])
+
+    output_path = tmp_path / "output/other-name.svg"
+    assert render_cache.restore("key", output_path, "single") is True
+    assert output_path.read_bytes() == rendered.read_bytes()
+    assert render_cache.restore("missing-key", output_path, "single") is False
+
+
+def test_render_cache_put_restore_split(tmp_path: Path):
+    """Split renders are restored into the output folder."""
+    render_cache = RenderCache(tmp_path / "cache")
+    rendered = create_rendered_files(tmp_path / "rendered", ["a.svg", "b.svg"])
+    render_cache.put("key", rendered)
+
+    output_path = tmp_path / "output"
+    assert render_cache.restore("key", output_path, "split") is True
+    assert sorted(file.name for file in output_path.iterdir()) == ["a.svg", "b.svg"]
+
+
+def test_render_cache_lru_eviction(tmp_path: Path):
+    """Least recently used entries are evicted first once the size limit is exceeded."""
+    render_cache = RenderCache(tmp_path / "cache", max_size=25)
+    render_cache.put("first", create_rendered_files(tmp_path / "first", ["a.svg"]))
+    render_cache.put("second", create_rendered_files(tmp_path / "second", ["a.svg"]))
+    os.utime(render_cache.cache_dir / "first", (1, 1))
+    os.utime(render_cache.cache_dir / "second", (2, 2))
+    # Hit makes "first" the most recently used entry
+    assert render_cache.get("first") is not None
+
+    render_cache.put("third", create_rendered_files(tmp_path / "third", ["a.svg"]))
+
+    assert [entry.key for entry in render_cache.entries()] == ["first", "third"]
+    assert render_cache.size() == 20
+
+
+def test_render_cache_clear(tmp_path: Path):
+    """All entries are removed."""
+    render_cache = RenderCache(tmp_path / "cache")
+    render_cache.put("first", create_rendered_files(tmp_path / "first", ["a.svg"]))
+    render_cache.put("second", create_rendered_files(tmp_path / "second", ["a.svg"]))
+
+    assert len(render_cache.clear()) == 2
+    assert render_cache.entries() == []
+
+
+@pytest.mark.usefixtures("_mock_empty_path")
+def test_run_openapi_to_plantuml_render_cache_hit(tmp_path: Path):
+    """Cached renders are returned without running java, independent of the spec format."""
+    render_cache = RenderCache(tmp_path / "cache")
+    spec_hash = canonical_spec_hash(load_openapi_spec(TEST_DATA / "petstore-3-0.json"))
+    render_cache.put(
+        RenderCache.key(spec_hash, "single", "puml", "0.1.28"), [TEST_DATA / "petstore.puml"]
+    )
+    output_path = tmp_path / "output/petstore.puml"
+
+    result = run_openapi_to_plantuml(
+        TEST_DATA / "petstore-3-0.yaml", output_path, "single", "puml", render_cache=render_cache
+    )
+
+    assert result == [output_path]
+    assert output_path.read_text() == (TEST_DATA / "petstore.puml").read_text()
+
+
+@pytest.mark.usefixtures("_mock_empty_path")
+def test_arun_openapi_to_plantuml_render_cache_hit(tmp_path: Path):
+    """Async version also returns cached renders without running java."""
+    render_cache = RenderCache(tmp_path / "cache")
+    spec_hash = canonical_spec_hash(load_openapi_spec(TEST_DATA / "petstore-3-0.json"))
+    render_cache.put(
+        RenderCache.key(spec_hash, "split", "puml", "0.1.28"), [TEST_DATA / "petstore.puml"]
+    )
+    output_path = tmp_path / "output"
+
+    result = asyncio.run(
+        arun_openapi_to_plantuml(
+            TEST_DATA / "petstore-3-0.json",
+            output_path,
+            "split",
+            "puml",
+            render_cache=render_cache,
+        )
+    )
+
+    assert result == [output_path / "petstore.puml"]
+
+
+def test_run_openapi_to_plantuml_render_cache_miss(tmp_path: Path):
+    """Renders are added to the cache."""
+    render_cache = RenderCache(tmp_path / "cache")
+    result = run_openapi_to_plantuml(
+        TEST_DATA / "petstore-3-0.json",
+        tmp_path / "split",
+        "split",
+        "puml",
+        render_cache=render_cache,
+    )
+    (entry,) = render_cache.entries()
+    assert entry.key.endswith("_split_puml_0.1.28")
+    assert len(result) == len(list(entry.path.iterdir())) == 19
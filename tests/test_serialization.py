@@ -0,0 +1,135 @@
+"""Tests for ``openapi_diagram.serialization``."""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from typing import TYPE_CHECKING
+
+import pytest
+import yaml
+
+from openapi_diagram import serialization
+from openapi_diagram.serialization import JSON_BACKEND_ENV_VAR
+from openapi_diagram.serialization import JSON_BACKENDS
+from openapi_diagram.serialization import YAML_BACKEND_ENV_VAR
+from openapi_diagram.serialization import YAML_BACKENDS
+from openapi_diagram.serialization import dumps_json
+from openapi_diagram.serialization import get_json_backend
+from openapi_diagram.serialization import get_yaml_backend
+from openapi_diagram.serialization import loads_json
+from openapi_diagram.serialization import loads_yaml
+from openapi_diagram.serialization import register_json_backend
+from openapi_diagram.serialization import register_yaml_backend
+from openapi_diagram.utils import load_openapi_spec
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+YAML_SPEC = """
+openapi: 3.0.3
+info:
+  title: Dates
+  version: 1.0.0
+  x-released: 2024-01-31
+paths:
+  /items:
+    get:
+      responses:
+        200:
+          description: OK
+"""
+
+
+@pytest.fixture
+def _restore_backends():
+    """Restore the registered backends after the test."""
+    json_backends = dict(JSON_BACKENDS)
+    yaml_backends = dict(YAML_BACKENDS)
+    yield
+    JSON_BACKENDS.clear()
+    JSON_BACKENDS.update(json_backends)
+    YAML_BACKENDS.clear()
+    YAML_BACKENDS.update(yaml_backends)
+
+
+def test_stdlib_backends_always_available():
+    """Pure python backends are the last fallback."""
+    assert list(JSON_BACKENDS)[-1] == "json"
+    assert list(YAML_BACKENDS)[-1] == "pyyaml"
+
+
+@pytest.mark.parametrize("json_backend", list(JSON_BACKENDS))
+@pytest.mark.parametrize("yaml_backend", list(YAML_BACKENDS))
+def test_backends_roundtrip(monkeypatch: pytest.MonkeyPatch, json_backend: str, yaml_backend: str):
+    """YAML only types (int keys and dates) are serialized the same by all backends."""
+    monkeypatch.setenv(JSON_BACKEND_ENV_VAR, json_backend)
+    monkeypatch.setenv(YAML_BACKEND_ENV_VAR, yaml_backend)
+
+    assert get_json_backend().name == json_backend
+    assert get_yaml_backend().name == yaml_backend
+
+    spec_data = loads_yaml(YAML_SPEC.encode())
+
+    assert spec_data == yaml.safe_load(YAML_SPEC)
+    assert spec_data["info"]["x-released"] == date(2024, 1, 31)
+
+    result = loads_json(dumps_json(spec_data))
+
+    assert result["info"]["x-released"] == "2024-01-31"
+    assert result["paths"]["/items"]["get"]["responses"] == {"200": {"description": "OK"}}
+
+
+@pytest.mark.parametrize("json_backend", list(JSON_BACKENDS))
+def test_load_openapi_spec_backends(
+    monkeypatch: pytest.MonkeyPatch, json_backend: str, tmp_path: Path
+):
+    """Loaded specs are independent of the backend."""
+    monkeypatch.setenv(JSON_BACKEND_ENV_VAR, json_backend)
+    spec_file = TEST_DATA / "petstore-3-0.json"
+    expected = json.loads(spec_file.read_text())
+
+    assert load_openapi_spec(spec_file) == expected
+
+    non_ascii_file = tmp_path / "openapi_spec.json"
+    non_ascii_file.write_bytes(dumps_json({"title": "Größe"}))
+
+    assert load_openapi_spec(non_ascii_file) == {"title": "Größe"}
+
+
+def test_unknown_backend(monkeypatch: pytest.MonkeyPatch):
+    """Selecting a backend which is not available raises an error."""
+    monkeypatch.setenv(JSON_BACKEND_ENV_VAR, "not-installed")
+    monkeypatch.setenv(YAML_BACKEND_ENV_VAR, "not-installed")
+
+    with pytest.raises(ValueError, match="OPENAPI_DIAGRAM__JSON_BACKEND='not-installed'"):
+        get_json_backend()
+
+    with pytest.raises(ValueError, match="OPENAPI_DIAGRAM__YAML_BACKEND='not-installed'"):
+        get_yaml_backend()
+
+
+@pytest.mark.usefixtures("_restore_backends")
+def test_register_backends(monkeypatch: pytest.MonkeyPatch):
+    """Registered backends are preferred over the existing ones."""
+    monkeypatch.delenv(JSON_BACKEND_ENV_VAR, raising=False)
+    monkeypatch.delenv(YAML_BACKEND_ENV_VAR, raising=False)
+    calls = []
+
+    def custom_loads(data: bytes | str):
+        calls.append(data)
+        return {"custom": True}
+
+    register_json_backend("custom", custom_loads, lambda _: b"{}")
+    register_yaml_backend("custom", custom_loads)
+
+    assert next(iter(serialization.JSON_BACKENDS)) == "custom"
+    assert loads_json(b"[]") == {"custom": True}
+    assert dumps_json([]) == b"{}"
+    assert loads_yaml(b"[]") == {"custom": True}
+    assert calls == [b"[]", b"[]"]
+
+    monkeypatch.setenv(JSON_BACKEND_ENV_VAR, "json")
+
+    assert loads_json(b"[]") == []
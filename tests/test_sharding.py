@@ -0,0 +1,130 @@
+"""Tests for ``openapi_diagram.sharding``."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from openapi_diagram.filters import OperationFilter
+from openapi_diagram.openapi_to_plantuml import run_openapi_to_plantuml
+from openapi_diagram.sharding import ShardRenderError
+from openapi_diagram.sharding import run_openapi_to_plantuml_sharded
+from openapi_diagram.sharding import shard_openapi_spec
+from openapi_diagram.utils import referenced_components
+from tests import TEST_DATA
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+PETSTORE = TEST_DATA / "petstore-3-0.json"
+
+
+def _petstore() -> dict:
+    return json.loads(PETSTORE.read_text())
+
+
+def test_shard_openapi_spec_by_tag():
+    """Tags are distributed over the shards which only contain their components."""
+    spec_shards = shard_openapi_spec(_petstore(), 2)
+
+    assert [shard.name for shard in spec_shards] == ["1-pet", "2-user"]
+    assert [shard.groups for shard in spec_shards] == [["pet"], ["user", "store"]]
+    assert [shard.operation_count for shard in spec_shards] == [8, 11]
+    assert sorted(spec_shards[0].spec_data["paths"]) == [
+        "/pet",
+        "/pet/findByStatus",
+        "/pet/findByTags",
+        "/pet/{petId}",
+        "/pet/{petId}/uploadImage",
+    ]
+    assert sorted(spec_shards[1].spec_data["components"]["schemas"]) == ["Order", "User"]
+    for shard in spec_shards:
+        refs = referenced_components(shard.spec_data, shard.spec_data["paths"])
+        for ref in refs:
+            _, section, name = ref[2:].split("/")
+            assert name in shard.spec_data["components"][section]
+
+
+def test_shard_openapi_spec_by_path():
+    """Operations are grouped by the first path segment, never more shards than groups."""
+    spec_data = _petstore()
+    spec_data["paths"]["/"] = {"get": {"operationId": "root", "responses": {}}}
+
+    spec_shards = shard_openapi_spec(spec_data, 10, "path")
+
+    assert [shard.name for shard in spec_shards] == ["1-pet", "2-user", "3-store", "4-root"]
+    assert list(spec_shards[3].spec_data["paths"]) == ["/"]
+    assert "components" not in spec_shards[3].spec_data or not any(
+        section != "securitySchemes" for section in spec_shards[3].spec_data["components"]
+    )
+
+
+def test_shard_openapi_spec_edge_cases():
+    """Specs without operations are one shard and at least one shard is required."""
+    spec_shards = shard_openapi_spec({"openapi": "3.0.3", "paths": {}}, 4)
+
+    assert [(shard.name, shard.operation_count) for shard in spec_shards] == [("1", 0)]
+
+    with pytest.raises(ValueError, match="at least 1, got 0"):
+        shard_openapi_spec(_petstore(), 0)
+
+
+def test_run_openapi_to_plantuml_sharded_split(tmp_path: Path):
+    """Split mode merges the diagrams of all shards."""
+    output = tmp_path / "sharded"
+
+    results = run_openapi_to_plantuml_sharded(
+        PETSTORE, output, ["split"], ["puml"], shards=3, max_workers=2
+    )
+
+    expected = run_openapi_to_plantuml(PETSTORE, tmp_path / "plain", "split", "puml")
+    assert [file.name for file in next(iter(results.values()))] == sorted(
+        file.name for file in expected
+    )
+    assert sorted(file.name for file in output.iterdir()) == sorted(file.name for file in expected)
+
+
+def test_run_openapi_to_plantuml_sharded_single(tmp_path: Path):
+    """Single mode writes a diagram per shard and an index linking them."""
+    output = tmp_path / "api.puml"
+
+    results = run_openapi_to_plantuml_sharded(
+        PETSTORE,
+        output,
+        ["single"],
+        ["puml", "svg"],
+        shards=3,
+        operation_filter=OperationFilter(exclude_tags=["store"]),
+    )
+
+    assert sorted(file.name for files in results.values() for file in files) == [
+        "api.1-pet.puml",
+        "api.1-pet.svg",
+        "api.2-user.puml",
+        "api.2-user.svg",
+    ]
+    index = (tmp_path / "api.index.md").read_text()
+    assert "| 1-pet | pet | 8 | [puml](api.1-pet.puml), [svg](api.1-pet.svg) |" in index
+    assert "| 2-user | user | 7 |" in index
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        "api.1-pet.puml",
+        "api.1-pet.svg",
+        "api.2-user.puml",
+        "api.2-user.svg",
+        "api.index.md",
+    ]
+
+
+def test_run_openapi_to_plantuml_sharded_error(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Failing shards raise an error naming them."""
+
+    def fail(*_, **__):
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    monkeypatch.setattr("openapi_diagram.batch.run_openapi_to_plantuml", fail)
+
+    with pytest.raises(ShardRenderError, match=r"1-pet \(split, puml\): RuntimeError: boom"):
+        run_openapi_to_plantuml_sharded(PETSTORE, tmp_path, ["split"], ["puml"], shards=2)
@@ -5,12 +5,25 @@ from __future__ import annotations
 import json
 from pathlib import Path
 from typing import Any
+from unittest.mock import MagicMock
 
 import pytest
 import yaml
 
+from openapi_diagram import utils
 from openapi_diagram.utils import UnsopportFileTypeError
+from openapi_diagram.utils import canonical_spec_hash
+from openapi_diagram.utils import convert_3_dot_1_to_3_dot_0
+from openapi_diagram.utils import dumps_openapi_3_dot_0_json
+from openapi_diagram.utils import is_passthrough_spec
+from openapi_diagram.utils import is_streamable_spec
+from openapi_diagram.utils import load_openapi_spec
 from openapi_diagram.utils import openapi_3_dot_1_compat
+from openapi_diagram.utils import preprocess_spec
+from openapi_diagram.utils import prune_unused_components
+from openapi_diagram.utils import referenced_components
+from openapi_diagram.utils import sniff_openapi_version
+from openapi_diagram.utils import stream_openapi_3_dot_0_json
 from tests import TEST_DATA
 
 
@@ -39,6 +52,90 @@ def test_openapi_3_dot_1_compat_no_op_json():
         assert json.loads(spec_file.read_text()) == json.loads(original_spec_file.read_text())
 
 
+def test_openapi_3_dot_1_compat_passthrough(monkeypatch: pytest.MonkeyPatch):
+    """OpenAPI 3.0 JSON files are passed through without parsing them."""
+    monkeypatch.setattr(utils, "load_openapi_spec", MagicMock(side_effect=AssertionError))
+    original_spec_file = TEST_DATA / "petstore-3-0.json"
+    with openapi_3_dot_1_compat(original_spec_file) as spec_file:
+        assert spec_file == original_spec_file
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_stream_openapi_3_dot_0_json(tmp_path: Path, chunk_size: int):
+    """Streaming writes the same JSON as converting the parsed spec, for any chunk size."""
+    spec = yaml.safe_load((TEST_DATA / "petstore-3-1.yaml").read_text())
+    spec["components"]["examples"] = {"Const": {"value": {"const": 1, "type": ["a", "b"]}}}
+    spec["paths"]["/empty"] = {}
+    spec["webhooks"] = {"newPet": {"post": {"requestBody": {"$ref": "#/x"}}}}
+    spec["x-count"] = 12345
+    spec_file = tmp_path / "openapi_spec.json"
+    spec_file.write_text(json.dumps(spec, indent=2, ensure_ascii=False))
+    output_file = tmp_path / "openapi_spec_3_0.json"
+
+    stream_openapi_3_dot_0_json(spec_file, output_file, chunk_size)
+
+    assert output_file.read_bytes() == dumps_openapi_3_dot_0_json(spec)
+
+
+@pytest.mark.parametrize(
+    "content",
+    ['{"openapi": "3.1.0", "paths": {"/a": }}', '{"openapi": "3.1.0"} {}', "[]", '{"a" 1}'],
+)
+def test_stream_openapi_3_dot_0_json_invalid(tmp_path: Path, content: str):
+    """Invalid JSON raises a decode error."""
+    spec_file = tmp_path / "openapi_spec.json"
+    spec_file.write_text(content)
+
+    with pytest.raises(json.JSONDecodeError):
+        stream_openapi_3_dot_0_json(spec_file, tmp_path / "output.json", 4)
+
+
+def test_openapi_3_dot_1_compat_streaming(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Large 3.1 JSON files are streamed instead of parsed at once."""
+    spec_file = tmp_path / "openapi_spec.json"
+    spec_file.write_text(json.dumps(yaml.safe_load((TEST_DATA / "petstore-3-1.yaml").read_text())))
+
+    assert is_streamable_spec(spec_file) is False
+    assert is_streamable_spec(spec_file, min_size=0) is True
+    assert is_streamable_spec(TEST_DATA / "petstore-3-0.json", min_size=0) is False
+
+    monkeypatch.setattr(utils, "STREAMING_MIN_SIZE", 0)
+    monkeypatch.setattr(utils, "load_openapi_spec", MagicMock(side_effect=AssertionError))
+    with openapi_3_dot_1_compat(spec_file) as compat_file:
+        assert json.loads(compat_file.read_text())["openapi"] == "3.0.3"
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        ('{"openapi": "3.0.3", "info": {}}', "3.0.3"),
+        ('\n  {\n  "info" : {"openapi": "nested"},\n  "openapi" : "3.1.0"\n}', "3.1.0"),
+        ('{"swagger": "2.0"}', None),
+        ('{"openapi": 3}', None),
+        ('["openapi", "3.0.3"]', None),
+        ('{"info": {"title": "truncated"', None),
+    ],
+)
+def test_sniff_openapi_version(tmp_path: Path, content: str, expected: str | None):
+    """Only the top level ``openapi`` string is returned."""
+    spec_file = tmp_path / "openapi_spec.json"
+    spec_file.write_text(content)
+
+    assert sniff_openapi_version(spec_file) == expected
+
+
+def test_sniff_openapi_version_limits(tmp_path: Path):
+    """Versions of non JSON files and versions after ``max_bytes`` are not sniffed."""
+    spec_file = tmp_path / "openapi_spec.json"
+    spec_file.write_text(json.dumps({"paths": {"/items": {}}, "openapi": "3.0.3"}))
+
+    assert sniff_openapi_version(spec_file) == "3.0.3"
+    assert sniff_openapi_version(spec_file, max_bytes=20) is None
+    assert sniff_openapi_version(TEST_DATA / "petstore-3-0.yaml") is None
+    assert is_passthrough_spec(TEST_DATA / "petstore-3-0.json") is True
+    assert is_passthrough_spec(TEST_DATA / "petstore-3-1.yaml") is False
+
+
 def test_openapi_3_dot_1_compat_no_op_yaml():
     """Yaml content is equivalent to json one."""
     desired_spec_file = TEST_DATA / "petstore-3-0.json"
@@ -54,3 +151,234 @@ def test_openapi_3_dot_1_compat_file_type_not_supported():
     ):
         pass
     assert str(execinfo.value) == "File type: *.txt is not supported."
+
+
+def test_canonical_spec_hash():
+    """Hash only depends on the content, not the key order or file format."""
+    json_spec = load_openapi_spec(TEST_DATA / "petstore-3-0.json")
+    yaml_spec = load_openapi_spec(TEST_DATA / "petstore-3-0.yaml")
+    reordered_spec = dict(reversed(json_spec.items()))
+
+    assert canonical_spec_hash(json_spec) == canonical_spec_hash(yaml_spec)
+    assert canonical_spec_hash(json_spec) == canonical_spec_hash(reordered_spec)
+    assert canonical_spec_hash(json_spec) != canonical_spec_hash(
+        load_openapi_spec(TEST_DATA / "petstore-3-1.yaml")
+    )
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "paths:\n  /pets:\n    get:\n      responses:\n        200: {}\n        default: {}\n",
+        "info:\n  title: Pets\n  version: 2024-01-01\n",
+    ],
+)
+def test_canonical_spec_hash_yaml_types(tmp_path: Path, content: str):
+    """YAML specs with integer response codes and dates can be hashed."""
+    spec_file = tmp_path / "openapi_spec.yaml"
+    spec_file.write_text(f"openapi: 3.0.3\n{content}")
+    quoted_file = tmp_path / "quoted_spec.yaml"
+    quoted_file.write_text(
+        f"openapi: 3.0.3\n{content}".replace("200:", "'200':").replace(
+            "2024-01-01", "'2024-01-01'"
+        )
+    )
+
+    assert canonical_spec_hash(load_openapi_spec(spec_file)) == canonical_spec_hash(
+        load_openapi_spec(quoted_file)
+    )
+
+
+def test_convert_3_dot_1_to_3_dot_0_keywords():
+    """3.1 only keywords are replaced by their 3.0 equivalent."""
+    spec: dict[str, Any] = {
+        "openapi": "3.1.0",
+        "components": {
+            "schemas": {
+                "Nulls": {"anyOf": [{"type": "null"}, {"type": "null"}, {"type": "string"}]},
+                "OneOf": {"oneOf": [{"type": "integer"}, {"type": "null"}]},
+                "Nullable": {"type": ["string", "null"]},
+                "Multi": {"type": ["string", "integer", "null"], "examples": []},
+                "Const": {"const": "fixed"},
+                "Range": {"type": "number", "exclusiveMinimum": 0, "exclusiveMaximum": 1.5},
+                "Legacy": {"type": "number", "minimum": 0, "exclusiveMinimum": True},
+                "Object": {
+                    "type": "object",
+                    "properties": {
+                        "const": {"type": "string", "examples": ["a", "b"]},
+                        "examples": {"type": ["integer"]},
+                    },
+                    "default": {"const": 1, "type": ["not", "a", "schema"]},
+                },
+            }
+        },
+    }
+    convert_3_dot_1_to_3_dot_0(spec)
+    schemas = spec["components"]["schemas"]
+    assert spec["openapi"] == "3.0.3"
+    assert schemas["Nulls"] == {"anyOf": [{"type": "string"}], "nullable": True}
+    assert schemas["OneOf"] == {"oneOf": [{"type": "integer"}], "nullable": True}
+    assert schemas["Nullable"] == {"type": "string", "nullable": True}
+    assert schemas["Multi"] == {
+        "anyOf": [{"type": "string"}, {"type": "integer"}],
+        "nullable": True,
+    }
+    assert schemas["Const"] == {"enum": ["fixed"]}
+    assert schemas["Range"] == {
+        "type": "number",
+        "minimum": 0,
+        "exclusiveMinimum": True,
+        "maximum": 1.5,
+        "exclusiveMaximum": True,
+    }
+    assert schemas["Legacy"] == {"type": "number", "minimum": 0, "exclusiveMinimum": True}
+    assert schemas["Object"] == {
+        "type": "object",
+        "properties": {
+            "const": {"type": "string", "example": "a"},
+            "examples": {"type": "integer"},
+        },
+        "default": {"const": 1, "type": ["not", "a", "schema"]},
+    }
+
+
+def test_convert_3_dot_1_to_3_dot_0_deep_and_wide():
+    """Deeply nested and very wide documents do not hit the recursion limit."""
+    depth = 20_000
+    deep_schema: dict[str, Any] = {"type": ["string", "null"]}
+    for _ in range(depth):
+        deep_schema = {"type": "array", "items": deep_schema}
+    schemas = {f"Schema{index}": {"const": index} for index in range(10_000)}
+    spec: dict[str, Any] = {
+        "openapi": "3.1.0",
+        "components": {"schemas": {"Deep": deep_schema, **schemas}},
+    }
+    convert_3_dot_1_to_3_dot_0(spec)
+
+    innermost = spec["components"]["schemas"]["Deep"]
+    for _ in range(depth):
+        innermost = innermost["items"]
+    assert innermost == {"type": "string", "nullable": True}
+    assert spec["components"]["schemas"]["Schema9999"] == {"enum": [9999]}
+
+
+def test_referenced_components():
+    """References are followed transitively."""
+    spec_data = json.loads((TEST_DATA / "petstore-3-0.json").read_text())
+    references = referenced_components(spec_data, {"$ref": "#/components/schemas/Pet"})
+    assert set(references) == {
+        "#/components/schemas/Pet",
+        "#/components/schemas/Category",
+        "#/components/schemas/Tag",
+    }
+
+
+def test_referenced_components_cycle():
+    """Cyclic references terminate."""
+    spec_data = {
+        "components": {
+            "schemas": {
+                "Node": {
+                    "properties": {"children": {"items": {"$ref": "#/components/schemas/Node"}}}
+                }
+            }
+        }
+    }
+    references = referenced_components(spec_data, {"$ref": "#/components/schemas/Node"})
+    assert list(references) == ["#/components/schemas/Node"]
+
+
+def test_referenced_components_discriminator_mapping():
+    """Schemas in discriminator mappings are referenced by ``$ref`` or plain name."""
+    spec_data = {
+        "components": {
+            "schemas": {
+                "Pet": {
+                    "discriminator": {
+                        "propertyName": "kind",
+                        "mapping": {"cat": "#/components/schemas/Cat", "dog": "Dog"},
+                    }
+                },
+                "Cat": {"type": "object"},
+                "Dog": {"type": "object"},
+            }
+        }
+    }
+    references = referenced_components(spec_data, {"$ref": "#/components/schemas/Pet"})
+    assert set(references) == {
+        "#/components/schemas/Pet",
+        "#/components/schemas/Cat",
+        "#/components/schemas/Dog",
+    }
+
+
+def test_prune_unused_components():
+    """Only components reachable from outside of ``components`` are kept."""
+    spec_data: dict[str, Any] = {
+        "openapi": "3.1.0",
+        "paths": {
+            "/nodes": {
+                "get": {
+                    "responses": {
+                        "200": {"$ref": "#/components/responses/Nodes"},
+                    }
+                }
+            }
+        },
+        "webhooks": {
+            "created": {"post": {"requestBody": {"$ref": "#/components/requestBodies/Hook"}}}
+        },
+        "components": {
+            "schemas": {
+                "Node": {"properties": {"next": {"$ref": "#/components/schemas/Node"}}},
+                "a/b": {"type": "string"},
+                "Unused": {"properties": {"other": {"$ref": "#/components/schemas/OnlyUnused"}}},
+                "OnlyUnused": {"type": "string"},
+            },
+            "responses": {
+                "Nodes": {
+                    "description": "Nodes",
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "properties": {
+                                    "node": {"$ref": "#/components/schemas/Node"},
+                                    "id": {"$ref": "#/components/schemas/a~1b/properties/id"},
+                                }
+                            }
+                        }
+                    },
+                },
+            },
+            "requestBodies": {"Hook": {"description": "Hook"}, "Unused": {"description": "-"}},
+            "parameters": {"Unused": {"name": "limit", "in": "query"}},
+            "securitySchemes": {"apiKey": {"type": "apiKey", "name": "key", "in": "header"}},
+        },
+    }
+    pruned = prune_unused_components(spec_data)
+
+    assert pruned["components"] == {
+        "schemas": {
+            "Node": spec_data["components"]["schemas"]["Node"],
+            "a/b": {"type": "string"},
+        },
+        "responses": spec_data["components"]["responses"],
+        "requestBodies": {"Hook": {"description": "Hook"}},
+        "securitySchemes": spec_data["components"]["securitySchemes"],
+    }
+    assert pruned["paths"] is spec_data["paths"]
+    assert len(spec_data["components"]["schemas"]) == 4
+    assert preprocess_spec(spec_data) is spec_data
+    assert preprocess_spec(spec_data, prune_unused=True) == pruned
+
+
+def test_prune_unused_components_petstore():
+    """Unused components of the petstore are dropped, specs without components are unchanged."""
+    spec_data = json.loads((TEST_DATA / "petstore-3-0.json").read_text())
+    components = prune_unused_components(spec_data)["components"]
+    assert set(spec_data["components"]["schemas"]) - set(components["schemas"]) == {
+        "Address",
+        "Customer",
+    }
+    assert "requestBodies" not in components
+    assert prune_unused_components({"openapi": "3.0.3"}) == {"openapi": "3.0.3"}
@@ -0,0 +1,115 @@
+"""Tests for ``openapi_diagram.watch``."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+from typing import Any
+
+from openapi_diagram.watch import watch_openapi_spec
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from openapi_diagram.watch import WatchIteration
+
+
+def _watch(spec_file: Path, renders: list[int]) -> Generator[WatchIteration, None, None]:
+    def render() -> list[Path]:
+        renders.append(len(renders))
+        return [spec_file]
+
+    return watch_openapi_spec(spec_file, render, debounce=0.05, poll_interval=0.01)
+
+
+def test_watch_openapi_spec(tmp_path: Path):
+    """Only changes of the parsed content trigger a render."""
+    spec_file = tmp_path / "spec.json"
+    spec_data: dict[str, Any] = {"openapi": "3.0.3", "info": {"title": "test"}}
+    spec_file.write_text(json.dumps(spec_data))
+    renders: list[int] = []
+    watcher = _watch(spec_file, renders)
+
+    first = next(watcher)
+    assert first.iteration == 0
+    assert first.rendered is True
+    assert first.files == [spec_file]
+
+    spec_file.write_text(json.dumps(spec_data, indent=4))
+    unchanged = next(watcher)
+    assert unchanged.rendered is False
+    assert unchanged.changed_files == [spec_file]
+
+    spec_data["info"]["title"] = "changed"
+    spec_file.write_text(json.dumps(spec_data))
+    changed = next(watcher)
+    assert changed.iteration == 2
+    assert changed.rendered is True
+    assert renders == [0, 1]
+
+
+def test_watch_openapi_spec_yaml_types(tmp_path: Path):
+    """YAML specs with integer response codes and dates are watched."""
+    spec_file = tmp_path / "spec.yaml"
+    responses_file = tmp_path / "responses.yaml"
+    responses_file.write_text("200: {}\ndefault: {}\n")
+    spec_file.write_text(
+        "openapi: 3.0.3\n"
+        "info:\n"
+        "  version: 2024-01-01\n"
+        "paths:\n"
+        "  /pets:\n"
+        "    get:\n"
+        "      responses:\n"
+        "        $ref: 'responses.yaml#/'\n"
+    )
+    renders: list[int] = []
+    watcher = _watch(spec_file, renders)
+
+    assert next(watcher).rendered is True
+    responses_file.write_text("200: {}\n201: {}\ndefault: {}\n")
+    changed = next(watcher)
+    assert changed.error is None
+    assert changed.rendered is True
+    assert renders == [0, 1]
+
+
+def test_watch_openapi_spec_referenced_file(tmp_path: Path):
+    """Locally referenced files are watched as well."""
+    spec_file = tmp_path / "spec.yaml"
+    schema_file = tmp_path / "schemas" / "pet.yaml"
+    schema_file.parent.mkdir()
+    schema_file.write_text("type: object\n")
+    spec_file.write_text(
+        "openapi: 3.0.3\n"
+        "components:\n"
+        "  schemas:\n"
+        "    Pet:\n"
+        "      $ref: 'schemas/pet.yaml#/'\n"
+    )
+    renders: list[int] = []
+    watcher = _watch(spec_file, renders)
+    next(watcher)
+    schema_file.write_text("type: string\n")
+    changed = next(watcher)
+    assert changed.rendered is True
+    assert changed.changed_files == [schema_file.resolve()]
+    assert len(renders) == 2
+
+
+def test_watch_openapi_spec_error(tmp_path: Path):
+    """Parse errors are reported and watching continues."""
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text('{"openapi": "3.0.3"}')
+    renders: list[int] = []
+    watcher = _watch(spec_file, renders)
+    next(watcher)
+    spec_file.write_text('{"openapi": ')
+    broken = next(watcher)
+    assert broken.error is not None
+    assert broken.error.startswith("JSONDecodeError")
+    spec_file.write_text('{"openapi": "3.0.3", "info": {}}')
+    fixed = next(watcher)
+    assert fixed.error is None
+    assert fixed.rendered is True